@@ -13,6 +13,7 @@ from .models import (
     Waermequelle,
     SonneneintragsParameter,
     GwpEingabe,
+    ReferenzImport,
 )
 
 @admin.register(BuildingProject)
@@ -86,3 +87,8 @@ class SonneneintragsParameterAdmin(admin.ModelAdmin):
 class GwpEingabeAdmin(admin.ModelAdmin):
     list_display   = ('gebaeude', 'variante', 'menge', 'spez_co2')
     list_filter    = ('variante',)
+
+@admin.register(ReferenzImport)
+class ReferenzImportAdmin(admin.ModelAdmin):
+    list_display   = ('tabelle', 'datensaetze', 'aktualisiert')
+    readonly_fields = ('tabelle', 'datei_hash', 'datensaetze', 'aktualisiert')
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class MylistConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mylist'
+
+    def ready(self):
+        # Signal-Handler registrieren (Invalidierung der Referenzdaten)
+        from . import signals
+        signals.verbinden()
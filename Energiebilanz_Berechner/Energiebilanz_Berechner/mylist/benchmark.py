@@ -0,0 +1,241 @@
+# mylist/benchmark.py
+
+"""
+Benchmark-Suite für die Rechenkette und die API-Pfade (Befehl `benchmark`).
+
+Jeder Benchmark läuft pro Datensatzgröße `wiederholungen` Mal auf
+synthetischen Daten; festgehalten werden Median und Minimum der Laufzeit
+sowie der Durchsatz (Einheiten pro Sekunde, bezogen auf den Median).
+
+Die Ergebnisse werden als JSON gespeichert und können mit einer früheren
+Datei (Baseline) verglichen werden: ein Benchmark gilt als Regression,
+wenn sein Median um mehr als `schwelle` (Anteil, z. B. 0.2 = 20 %)
+langsamer ist als in der Baseline.
+"""
+
+import io
+import json
+import platform
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from .berechnungen import BERECHNUNGSVERSION, berechne_bilanz, berechne_bilanz_batch
+from .ergebniscache import ergebniscache
+from .referenzdaten import referenzdaten
+
+
+# Datensatzgrößen, wenn keine angegeben sind
+STANDARD_GROESSEN = (100, 1000, 10000)
+
+WIZARD_SCHRITTE = (
+    ("wizard_allg", {
+        "name": "Benchmark", "laenge_ns": 20.0, "breite_ow": 15.0, "geschosshoehe": 3.0, "geschosse": 3,
+    }),
+    ("wizard_energie", {
+        "jahres_heizwert": 10000.0, "tw_kwh_m2": 15.0, "luft_kwh_m2": 8.0, "bel_kwh_m2": 10.0, "nutz_kwh_m2": 5.0,
+    }),
+    ("wizard_verluste", {
+        "verteilungsverlust_kwh": 500.0, "speicherverlust_kwh": 300.0, "warmwasserbedarf_kwh": 2000.0,
+    }),
+    ("wizard_bauteile", {
+        "laenge": 20.0, "breite": 15.0, "geschosshoehe": 3.0, "anz_geschosse": 3,
+        "u_wand_nord": 0.24, "u_wand_sued": 0.24, "u_wand_west": 0.24, "u_wand_ost": 0.24,
+        "u_bodenplatte": 0.3, "u_dach": 0.2,
+    }),
+    ("wizard_beleuchtung", {
+        "bereich": "buero", "beleuchtungsart": "LED", "regelungsart": "Präsenzmelder",
+        "e_soll": 500.0, "laufzeit_hd": 10.0, "laufzeit_da": 250.0,
+    }),
+    ("wizard_gwp", {"variante": "300", "menge": 100.0, "spez_co2": 20.0}),
+)
+
+
+def synthetische_varianten(anzahl, seed=0):
+    """`anzahl` zufällige Gebäudevarianten als Dict aus Spalten (`BATCH_EINGABEN`)."""
+    rng = np.random.default_rng(seed)
+    return {
+        "laenge":                      rng.uniform(5, 60, anzahl).round(2),
+        "breite":                      rng.uniform(5, 40, anzahl).round(2),
+        "geschosshoehe":               rng.uniform(2.5, 4, anzahl).round(2),
+        "anz_geschosse":               rng.integers(1, 12, anzahl).astype(np.float64),
+        "jahres_heizwaermebedarf_kwh": rng.uniform(5000, 200000, anzahl).round(0),
+        "trinkwarmwasser_kwh_pro_m2":  rng.uniform(5, 25, anzahl).round(1),
+        "luftfoerderung_kwh_pro_m2":   rng.uniform(0, 15, anzahl).round(1),
+        "beleuchtung_kwh_pro_m2":      rng.uniform(5, 20, anzahl).round(1),
+        "nutzer_pro_m2":               rng.uniform(0, 10, anzahl).round(1),
+        "verteilungsverlust_kwh":      rng.uniform(0, 2000, anzahl).round(0),
+        "speicherverlust_kwh":         rng.uniform(0, 1000, anzahl).round(0),
+        "warmwasserbedarf_kwh":        rng.uniform(0, 10000, anzahl).round(0),
+    }
+
+
+def _zeilen(spalten):
+    return [dict(zip(spalten, werte)) for werte in zip(*(s.tolist() for s in spalten.values()))]
+
+
+# — Benchmarks: erhalten die Größe, liefern (vorbereitung, lauf, einheiten, aufraeumen) —
+# `vorbereitung()` läuft vor jeder Wiederholung außerhalb der Zeitmessung,
+# `aufraeumen()` einmal am Ende; beide dürfen None sein.
+
+def _skalar(groesse):
+    zeilen = _zeilen(synthetische_varianten(groesse))
+
+    def lauf():
+        for zeile in zeilen:
+            berechne_bilanz(**zeile)
+    return None, lauf, groesse, None
+
+
+def _batch(groesse):
+    spalten = synthetische_varianten(groesse)
+    return None, lambda: berechne_bilanz_batch(spalten), groesse, None
+
+
+def _api(groesse):
+    # Höchstens 2000 Anfragen pro Lauf; unterschiedliche Eingaben, damit der
+    # Ergebnis-Cache (bis auf Wiederholungen) nicht greift
+    anzahl = min(groesse, 2000)
+    spalten = synthetische_varianten(anzahl)
+    parameter = [
+        {
+            "laenge": z["laenge"], "breite": z["breite"], "geschosshoehe": z["geschosshoehe"],
+            "anz_geschosse": int(z["anz_geschosse"]), "jahres_heizbedarf": z["jahres_heizwaermebedarf_kwh"],
+            "tw_pro_m2": z["trinkwarmwasser_kwh_pro_m2"],
+        }
+        for z in _zeilen(spalten)
+    ]
+    client = Client()
+    url = reverse("api_berechnung")
+
+    def lauf():
+        for query in parameter:
+            client.get(url, query)
+    return ergebniscache.leeren, lauf, anzahl, None
+
+
+def _wizard(groesse):
+    # Ein kompletter Wizard-Durchlauf inkl. Ergebnisseite (Größe wird ignoriert)
+    client = Client()
+    schritte = [(reverse(name), daten) for name, daten in WIZARD_SCHRITTE]
+    ergebnis = reverse("wizard_ergebnis")
+
+    def lauf():
+        for url, daten in schritte:
+            client.post(url, daten)
+        client.get(ergebnis)
+    return None, lauf, len(schritte) + 1, None
+
+
+def _pdf(groesse):
+    client = Client()
+    url = reverse("ergebnis_pdf")
+    query = {"laenge": 20, "breite": 15, "geschosshoehe": 3, "geschosse": 3}
+    return None, lambda: client.get(url, query), 1, None
+
+
+def _import(groesse):
+    verzeichnis = tempfile.TemporaryDirectory()
+    pfad = Path(verzeichnis.name) / "druckverlust.csv"
+    zeilen = "".join(f"Bauteil {i},{50 + i % 400}\n" for i in range(groesse))
+    pfad.write_text("bauteil,druckverlust_pa\n" + zeilen, encoding="utf-8")
+
+    def lauf():
+        call_command("import_druckverlust", datei=str(pfad), voll=True, stdout=io.StringIO())
+    return None, lauf, groesse, verzeichnis.cleanup
+
+
+# Name → (Funktion, Einheit, größenabhängig)
+BENCHMARKS = {
+    "skalar": (_skalar, "Varianten/s", True),
+    "batch":  (_batch,  "Varianten/s", True),
+    "api":    (_api,    "Anfragen/s",  True),
+    "wizard": (_wizard, "Schritte/s",  False),
+    "pdf":    (_pdf,    "PDF/s",       False),
+    "import": (_import, "Zeilen/s",    True),
+}
+
+
+def fuehre_aus(namen=None, groessen=STANDARD_GROESSEN, wiederholungen=5, ausgabe=None):
+    """
+    Führt die Benchmarks `namen` (Standard: alle) aus. `ausgabe` wird pro
+    Ergebnis mit dem Ergebnis-Dict aufgerufen. Rückgabe ist das komplette
+    Ergebnis-Dokument (siehe `speichern`).
+    """
+    ergebnisse = []
+    for name in namen or BENCHMARKS:
+        funktion, einheit, groessenabhaengig = BENCHMARKS[name]
+        for groesse in (groessen if groessenabhaengig else groessen[:1]):
+            vorbereitung, lauf, einheiten, aufraeumen = funktion(groesse)
+            try:
+                lauf()  # Aufwärmen (Imports, Caches, Verbindungen)
+                zeiten = []
+                for _ in range(wiederholungen):
+                    if vorbereitung is not None:
+                        vorbereitung()
+                    start = time.perf_counter()
+                    lauf()
+                    zeiten.append(time.perf_counter() - start)
+            finally:
+                if aufraeumen is not None:
+                    aufraeumen()
+            median = statistics.median(zeiten)
+            ergebnis = {
+                "name":      name,
+                "groesse":   groesse if groessenabhaengig else None,
+                "median_s":  median,
+                "min_s":     min(zeiten),
+                "durchsatz": einheiten / median if median > 0 else None,
+                "einheit":   einheit,
+            }
+            ergebnisse.append(ergebnis)
+            if ausgabe is not None:
+                ausgabe(ergebnis)
+    referenzdaten.invalidieren()
+    ergebniscache.leeren()
+
+    return {
+        "zeitpunkt":          timezone.now().isoformat(),
+        "berechnungsversion": BERECHNUNGSVERSION,
+        "python":             platform.python_version(),
+        "plattform":          platform.platform(),
+        "wiederholungen":     wiederholungen,
+        "ergebnisse":         ergebnisse,
+    }
+
+
+def kennung(ergebnis):
+    """Schlüssel eines Ergebnisses für den Vergleich, z. B. 'batch@1000'."""
+    return ergebnis["name"] if ergebnis["groesse"] is None else f"{ergebnis['name']}@{ergebnis['groesse']}"
+
+
+def vergleiche(aktuell, baseline, schwelle=0.2):
+    """
+    Vergleicht zwei Ergebnis-Dokumente. Rückgabe ist eine Liste
+    (kennung, baseline_s, aktuell_s, faktor, regression) für alle
+    Benchmarks, die in beiden Dokumenten vorkommen.
+    """
+    alt = {kennung(e): e["median_s"] for e in baseline["ergebnisse"]}
+    vergleich = []
+    for ergebnis in aktuell["ergebnisse"]:
+        schluessel = kennung(ergebnis)
+        if schluessel not in alt:
+            continue
+        faktor = ergebnis["median_s"] / alt[schluessel] if alt[schluessel] > 0 else float("inf")
+        vergleich.append((schluessel, alt[schluessel], ergebnis["median_s"], faktor, faktor > 1 + schwelle))
+    return vergleich
+
+
+def speichern(dokument, pfad):
+    Path(pfad).write_text(json.dumps(dokument, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def laden(pfad):
+    return json.loads(Path(pfad).read_text(encoding="utf-8"))
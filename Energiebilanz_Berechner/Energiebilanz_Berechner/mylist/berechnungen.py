@@ -2,6 +2,104 @@
 
 import math
 
+import numpy as np
+
+from .messung import gemessen
+
+
+# Version der Rechenkette. Bei jeder Formeländerung erhöhen: zwischengespeicherte
+# Ergebnisse (ergebniscache.py) und ETags werden damit automatisch ungültig.
+BERECHNUNGSVERSION = 1
+
+
+# ————— Hilfsfunktionen für die Array-Kernel —————
+#
+# Öffentlich, weil die übrigen Rechenmodule (Monatsbilanz, Lüftung,
+# Transmission, …) ihre Spalten genauso umwandeln, runden und auf die
+# Nutzfläche beziehen.
+
+def als_spalte(werte):
+    """Wandelt Skalar, Liste oder Array in ein 1-D float64-Array um."""
+    return np.atleast_1d(np.asarray(werte, dtype=np.float64))
+
+
+def runde(werte, stellen=2):
+    """
+    Rundet ein Array exakt wie Pythons ``round(wert, stellen)``.
+
+    ``np.rint(wert * 100) / 100`` weicht bei Werten knapp an der
+    Rundungsgrenze (z. B. 2.675) von ``round()`` ab, weil die Skalierung
+    einen Darstellungsfehler einführt. Nur diese Grenzfälle werden einzeln
+    mit ``round()`` nachgerechnet, alle übrigen bleiben vektorisiert.
+    """
+    faktor = 10.0 ** stellen
+    skaliert = werte * faktor
+    gerundet = np.rint(skaliert) / faktor
+
+    rest = np.abs(skaliert - np.trunc(skaliert))
+    grenzfall = np.abs(rest - 0.5) <= 4 * np.spacing(np.abs(skaliert))
+    if grenzfall.any():
+        gerundet[grenzfall] = [round(float(w), stellen) for w in werte[grenzfall]]
+    return gerundet
+
+
+def spezifisch(absolut, nf_m2):
+    """Teilt durch die Nutzfläche; bei NF <= 0 ist das Ergebnis 0."""
+    return np.divide(absolut, nf_m2, out=np.zeros_like(absolut), where=nf_m2 > 0)
+
+
+def gebaeudedaten_arrays(laenge, breite, geschosshoehe, anz_geschosse):
+    """Höhe, Volumen, BGF und NF (0,8 · BGF) als Arrays, gerundet wie `berechne_gebaeudedaten`."""
+    hoehe = anz_geschosse * geschosshoehe
+    volumen = laenge * breite * hoehe
+    bgf = laenge * breite * anz_geschosse
+    nf = bgf * 0.8
+    return {
+        "hoehe":   runde(hoehe),
+        "volumen": runde(volumen),
+        "bgf":     runde(bgf),
+        "nf":      runde(nf),
+    }
+
+
+def _nutzenergie_arrays(nf_m2, heizwaerme_kwh, tw_pro_m2, luft_pro_m2, bel_pro_m2, nutzer_pro_m2):
+    ne_abs = (heizwaerme_kwh + tw_pro_m2 * nf_m2 + luft_pro_m2 * nf_m2
+              + bel_pro_m2 * nf_m2 + nutzer_pro_m2 * nf_m2)
+    return {
+        "ne_absolut":    runde(ne_abs),
+        "ne_spezifisch": runde(spezifisch(ne_abs, nf_m2)),
+    }
+
+
+def _strombedarf_arrays(nf_m2, tw_pro_m2, luft_pro_m2, bel_pro_m2, nutzer_pro_m2):
+    sb_abs = tw_pro_m2 * nf_m2 + luft_pro_m2 * nf_m2 + bel_pro_m2 * nf_m2 + nutzer_pro_m2 * nf_m2
+    return {
+        "sb_absolut":    runde(sb_abs),
+        "sb_spezifisch": runde(spezifisch(sb_abs, nf_m2)),
+    }
+
+
+def _waermebedarf_arrays(heizwaerme_kwh, verteilungsverlust_kwh, speicherverlust_kwh, warmwasserbedarf_kwh):
+    wb_abs = heizwaerme_kwh + verteilungsverlust_kwh + speicherverlust_kwh + warmwasserbedarf_kwh
+    return {
+        "wb_absolut": runde(wb_abs),
+    }
+
+
+def _endenergie_arrays(nf_m2, sb_absolut, wb_absolut):
+    ee_abs = sb_absolut + wb_absolut
+    return {
+        "ee_absolut":    runde(ee_abs),
+        "ee_spezifisch": runde(spezifisch(ee_abs, nf_m2)),
+    }
+
+
+def als_skalare(ergebnis):
+    """Macht aus einem Array-Ergebnis mit einer Zeile wieder ein Dict aus floats."""
+    return {schluessel: float(werte[0]) for schluessel, werte in ergebnis.items()}
+
+
+@gemessen()
 def berechne_gebaeudedaten(laenge, breite, geschosshoehe, anz_geschosse):
     """
     Berechnet aus den Basisparametern eines Gebäudes:
@@ -24,26 +122,14 @@ def berechne_gebaeudedaten(laenge, breite, geschosshoehe, anz_geschosse):
       "nf":      Nutzfläche in m² (gerundet auf 2 Nachkommastellen)
     }
     """
-    # 1) Gebäudehöhe
-    hoehe = anz_geschosse * geschosshoehe
-
-    # 2) Volumen
-    volumen = laenge * breite * hoehe
-
-    # 3) Bruttogrundfläche (BGF)
-    bgf = laenge * breite * anz_geschosse
-
-    # 4) Nutzfläche (NF) – hier als 80 % der BGF als Beispiel-Faktor
-    nf = bgf * 0.8
-
-    return {
-        "hoehe":   round(hoehe, 2),
-        "volumen": round(volumen, 2),
-        "bgf":     round(bgf, 2),
-        "nf":      round(nf, 2),
-    }
+    # Höhe = Geschosse × Geschosshöhe, Volumen = L × B × Höhe,
+    # BGF = L × B × Geschosse, NF = 80 % der BGF (Beispiel-Faktor)
+    return als_skalare(gebaeudedaten_arrays(
+        als_spalte(laenge), als_spalte(breite), als_spalte(geschosshoehe), als_spalte(anz_geschosse)
+    ))
 
 
+@gemessen()
 def berechne_nutzenergiebedarf(nf_m2,
                                 jahres_heizwaermebedarf_kwh,
                                 trinkwarmwasser_kwh_pro_m2,
@@ -67,27 +153,18 @@ def berechne_nutzenergiebedarf(nf_m2,
       "ne_spezifisch":   spezifischer Nutzenergiebedarf in kWh/m² (gerundet auf 2 Nachkommastellen),
     }
     """
-    # 1) Heizwärmebedarf (kWh-Wert liegt bereits absolut vor)
-    heizwaerme_kwh = jahres_heizwaermebedarf_kwh
-
-    # 2) Verbrauch pro m² multipliziert mit NF
-    tw_kwh   = trinkwarmwasser_kwh_pro_m2 * nf_m2
-    lwt_kwh  = luftfoerderung_kwh_pro_m2 * nf_m2
-    bel_kwh  = beleuchtung_kwh_pro_m2 * nf_m2
-    nutz_kwh = nutzer_pro_m2 * nf_m2
-
-    # 3) Summe aller Anteile
-    ne_abs = heizwaerme_kwh + tw_kwh + lwt_kwh + bel_kwh + nutz_kwh
-
-    # 4) Spezifische Nutzenergie (kWh/m²)
-    ne_spez = ne_abs / nf_m2 if nf_m2 > 0 else 0
-
-    return {
-        "ne_absolut":      round(ne_abs, 2),
-        "ne_spezifisch":   round(ne_spez, 2),
-    }
-
-
+    # Heizwärme (absolut) + Summe der spezifischen Anteile × NF
+    return als_skalare(_nutzenergie_arrays(
+        als_spalte(nf_m2),
+        als_spalte(jahres_heizwaermebedarf_kwh),
+        als_spalte(trinkwarmwasser_kwh_pro_m2),
+        als_spalte(luftfoerderung_kwh_pro_m2),
+        als_spalte(beleuchtung_kwh_pro_m2),
+        als_spalte(nutzer_pro_m2),
+    ))
+
+
+@gemessen()
 def berechne_strombedarf(nf_m2,
                          trinkwarmwasser_kwh_pro_m2,
                          luftfoerderung_kwh_pro_m2,
@@ -109,24 +186,17 @@ def berechne_strombedarf(nf_m2,
       "sb_spezifisch":  spezifischer Strombedarf in kWh/m² (gerundet auf 2 Nachkommastellen),
     }
     """
-    # 1) Einzelne Bausteine (kWh/m² × NF)
-    sb_tw_abs    = trinkwarmwasser_kwh_pro_m2 * nf_m2
-    sb_luft_abs  = luftfoerderung_kwh_pro_m2 * nf_m2
-    sb_bel_abs   = beleuchtung_kwh_pro_m2 * nf_m2
-    sb_nutz_abs  = nutzer_pro_m2 * nf_m2
-
-    # 2) Summe der elektrischen Endenergie
-    sb_sum_abs   = sb_tw_abs + sb_luft_abs + sb_bel_abs + sb_nutz_abs
-
-    # 3) Spezifischer Strombedarf in kWh/m²
-    sb_sum_spec  = sb_sum_abs / nf_m2 if nf_m2 > 0 else 0
-
-    return {
-        "sb_absolut":    round(sb_sum_abs, 2),
-        "sb_spezifisch": round(sb_sum_spec, 2),
-    }
+    # Summe der einzelnen Bausteine (kWh/m² × NF)
+    return als_skalare(_strombedarf_arrays(
+        als_spalte(nf_m2),
+        als_spalte(trinkwarmwasser_kwh_pro_m2),
+        als_spalte(luftfoerderung_kwh_pro_m2),
+        als_spalte(beleuchtung_kwh_pro_m2),
+        als_spalte(nutzer_pro_m2),
+    ))
 
 
+@gemessen()
 def berechne_waermebedarf(jahres_heizwaermebedarf_kwh,
                           verteilungsverlust_kwh=0,
                           speicherverlust_kwh=0,
@@ -145,19 +215,16 @@ def berechne_waermebedarf(jahres_heizwaermebedarf_kwh,
       "wb_absolut":  Gesamt-Wärmebedarf in kWh (gerundet auf 2 Nachkommastellen),
     }
     """
-    # 1) Summe aller thermischen Endenergieanteile
-    wb_sum_abs = (
-        jahres_heizwaermebedarf_kwh +
-        verteilungsverlust_kwh +
-        speicherverlust_kwh +
-        warmwasserbedarf_kwh
-    )
-
-    return {
-        "wb_absolut": round(wb_sum_abs, 2)
-    }
+    # Summe aller thermischen Endenergieanteile
+    return als_skalare(_waermebedarf_arrays(
+        als_spalte(jahres_heizwaermebedarf_kwh),
+        als_spalte(verteilungsverlust_kwh),
+        als_spalte(speicherverlust_kwh),
+        als_spalte(warmwasserbedarf_kwh),
+    ))
 
 
+@gemessen()
 def berechne_endenergiebedarf(nf_m2,
                               ergebnis_strom: dict,
                               ergebnis_waerme: dict):
@@ -175,18 +242,203 @@ def berechne_endenergiebedarf(nf_m2,
       "ee_spezifisch":  spezifischer Endenergiebedarf in kWh/m² (gerundet auf 2 Nachkommastellen),
     }
     """
-    # 1) Absolute Werte aus den Teilergebnissen entnehmen
-    sb_abs = ergebnis_strom.get("sb_absolut", 0)
-    wb_abs = ergebnis_waerme.get("wb_absolut", 0)
+    # Summe aus den absoluten Teilergebnissen, spezifisch bezogen auf NF
+    return als_skalare(_endenergie_arrays(
+        als_spalte(nf_m2),
+        als_spalte(ergebnis_strom.get("sb_absolut", 0)),
+        als_spalte(ergebnis_waerme.get("wb_absolut", 0)),
+    ))
+
+
+@gemessen()
+def berechne_bilanz(laenge,
+                    breite,
+                    geschosshoehe,
+                    anz_geschosse,
+                    jahres_heizwaermebedarf_kwh=0.0,
+                    trinkwarmwasser_kwh_pro_m2=0.0,
+                    luftfoerderung_kwh_pro_m2=0.0,
+                    beleuchtung_kwh_pro_m2=0.0,
+                    nutzer_pro_m2=0.0,
+                    verteilungsverlust_kwh=0.0,
+                    speicherverlust_kwh=0.0,
+                    warmwasserbedarf_kwh=0.0):
+    """
+    Berechnet die gesamte Kette (Gebäudedaten → NE / SB / WB → EE) für ein
+    Gebäude mit den Skalarfunktionen; die Argumente entsprechen den Spalten
+    aus `BATCH_EINGABEN`.
 
-    # 2) Summe aller Endenergie (kWh)
-    ee_sum_abs = sb_abs + wb_abs
+    Rückgabe (Dictionary) mit den Blöcken aus `BATCH_ERGEBNISSE`:
+    {"gebaeudedaten": {...}, "nutzenergie": {...}, "strombedarf": {...},
+     "waermebedarf": {...}, "endenergie": {...}}
+    """
+    geb = berechne_gebaeudedaten(laenge, breite, geschosshoehe, anz_geschosse)
+    ne = berechne_nutzenergiebedarf(
+        geb["nf"], jahres_heizwaermebedarf_kwh, trinkwarmwasser_kwh_pro_m2,
+        luftfoerderung_kwh_pro_m2, beleuchtung_kwh_pro_m2, nutzer_pro_m2,
+    )
+    sb = berechne_strombedarf(
+        geb["nf"], trinkwarmwasser_kwh_pro_m2, luftfoerderung_kwh_pro_m2,
+        beleuchtung_kwh_pro_m2, nutzer_pro_m2,
+    )
+    wb = berechne_waermebedarf(
+        jahres_heizwaermebedarf_kwh, verteilungsverlust_kwh, speicherverlust_kwh, warmwasserbedarf_kwh,
+    )
+    ee = berechne_endenergiebedarf(geb["nf"], sb, wb)
+    return {
+        "gebaeudedaten": geb,
+        "nutzenergie":   ne,
+        "strombedarf":   sb,
+        "waermebedarf":  wb,
+        "endenergie":    ee,
+    }
 
-    # 3) Spezifischer Endenergiebedarf (kWh/m²)
-    ee_sum_spec = ee_sum_abs / nf_m2 if nf_m2 > 0 else 0
 
+# ————— Batch-Berechnung für viele Gebäudevarianten —————
+
+# Eingabespalten der Batch-Berechnung mit ihrem Standardwert
+# (None = Pflichtspalte ohne Standardwert).
+BATCH_EINGABEN = {
+    "laenge":                      None,
+    "breite":                      None,
+    "geschosshoehe":               None,
+    "anz_geschosse":               None,
+    "jahres_heizwaermebedarf_kwh": 0.0,
+    "trinkwarmwasser_kwh_pro_m2":  0.0,
+    "luftfoerderung_kwh_pro_m2":   0.0,
+    "beleuchtung_kwh_pro_m2":      0.0,
+    "nutzer_pro_m2":               0.0,
+    "verteilungsverlust_kwh":      0.0,
+    "speicherverlust_kwh":         0.0,
+    "warmwasserbedarf_kwh":        0.0,
+}
+
+# Ergebnisspalten der Batch-Berechnung, gruppiert nach Teilergebnis
+BATCH_ERGEBNISSE = {
+    "gebaeudedaten": ("hoehe", "volumen", "bgf", "nf"),
+    "nutzenergie":   ("ne_absolut", "ne_spezifisch"),
+    "strombedarf":   ("sb_absolut", "sb_spezifisch"),
+    "waermebedarf":  ("wb_absolut",),
+    "endenergie":    ("ee_absolut", "ee_spezifisch"),
+}
+
+
+def batch_spalten(daten, spalten, eingaben=BATCH_EINGABEN):
+    """
+    Liest alle Eingabespalten (`eingaben`: Name → Standardwert, None =
+    Pflicht) aus `daten` (Dict, DataFrame oder strukturiertes Array) bzw. den
+    Keyword-Argumenten und bringt sie auf eine gemeinsame Länge.
+    """
+    if daten is not None and getattr(daten, "dtype", None) is not None and daten.dtype.names:
+        vorhanden = set(daten.dtype.names)
+    elif daten is not None:
+        vorhanden = set(daten.keys())
+    else:
+        vorhanden = set()
+
+    werte = {}
+    for name, standard in eingaben.items():
+        if name in spalten:
+            werte[name] = np.asarray(spalten[name], dtype=np.float64)
+        elif name in vorhanden:
+            werte[name] = np.asarray(daten[name], dtype=np.float64)
+        elif standard is not None:
+            werte[name] = np.float64(standard)
+        else:
+            raise ValueError(f"Pflichtspalte '{name}' fehlt für die Batch-Berechnung")
+
+    unbekannt = set(spalten) - set(eingaben)
+    if unbekannt:
+        raise ValueError(f"Unbekannte Spalten: {', '.join(sorted(unbekannt))}")
+
+    # Skalare (z. B. Standardwerte) werden auf die Länge der Spalten gebracht
+    gebroadcastet = np.broadcast_arrays(*werte.values())
     return {
-        "ee_absolut":    round(ee_sum_abs, 2),
-        "ee_spezifisch": round(ee_sum_spec, 2),
+        name: np.atleast_1d(np.array(spalte, dtype=np.float64))
+        for name, spalte in zip(werte, gebroadcastet)
     }
 
+
+@gemessen()
+def berechne_bilanz_batch(daten=None, **spalten):
+    """
+    Berechnet die gesamte Kette (Gebäudedaten → NE / SB / WB → EE) für viele
+    Gebäudevarianten in einem Durchlauf mit NumPy-Arrays.
+
+    Die Ergebnisse stimmen exakt mit den Skalarfunktionen überein, inklusive
+    der Rundung der Zwischenergebnisse (gerundete NF geht in NE/SB ein,
+    gerundete SB/WB gehen in EE ein).
+
+    Argumente:
+    - daten: optional ein Dict aus Spalten, ein pandas-DataFrame oder ein
+      strukturiertes NumPy-Array mit den Spaltennamen aus `BATCH_EINGABEN`
+    - **spalten: einzelne Spalten als Array/Liste/Skalar; überschreiben
+      gleichnamige Spalten aus `daten`
+
+    Pflichtspalten sind laenge, breite, geschosshoehe und anz_geschosse;
+    alle anderen Spalten sind standardmäßig 0.
+
+    Rückgabe (Dictionary):
+    {
+      "hoehe", "volumen", "bgf", "nf",
+      "ne_absolut", "ne_spezifisch",
+      "sb_absolut", "sb_spezifisch",
+      "wb_absolut",
+      "ee_absolut", "ee_spezifisch":  je ein float64-Array (gerundet auf 2 Nachkommastellen)
+    }
+    """
+    e = batch_spalten(daten, spalten)
+
+    geb = gebaeudedaten_arrays(e["laenge"], e["breite"], e["geschosshoehe"], e["anz_geschosse"])
+    nf = geb["nf"]
+
+    ne = _nutzenergie_arrays(
+        nf,
+        e["jahres_heizwaermebedarf_kwh"],
+        e["trinkwarmwasser_kwh_pro_m2"],
+        e["luftfoerderung_kwh_pro_m2"],
+        e["beleuchtung_kwh_pro_m2"],
+        e["nutzer_pro_m2"],
+    )
+    sb = _strombedarf_arrays(
+        nf,
+        e["trinkwarmwasser_kwh_pro_m2"],
+        e["luftfoerderung_kwh_pro_m2"],
+        e["beleuchtung_kwh_pro_m2"],
+        e["nutzer_pro_m2"],
+    )
+    wb = _waermebedarf_arrays(
+        e["jahres_heizwaermebedarf_kwh"],
+        e["verteilungsverlust_kwh"],
+        e["speicherverlust_kwh"],
+        e["warmwasserbedarf_kwh"],
+    )
+    ee = _endenergie_arrays(nf, sb["sb_absolut"], wb["wb_absolut"])
+
+    return {**geb, **ne, **sb, **wb, **ee}
+
+
+# Zeilen je Umwandlungsblock in `batch_als_datensaetze`
+DATENSATZ_BLOCK = 1024
+
+
+def batch_als_datensaetze(ergebnis):
+    """
+    Zerlegt ein Ergebnis von `berechne_bilanz_batch` wieder in einzelne
+    Datensätze mit den Blöcken aus `BATCH_ERGEBNISSE`, z. B.
+    {"gebaeudedaten": {...}, "nutzenergie": {...}, ...}.
+
+    Generator: die Spalten werden blockweise (je `DATENSATZ_BLOCK` Zeilen)
+    in Python-Zahlen umgewandelt, damit große Ergebnisse nicht komplett als
+    Listen und Dicts im Speicher liegen müssen.
+    """
+    anzahl = len(next(iter(ergebnis.values()), ()))
+    for start in range(0, anzahl, DATENSATZ_BLOCK):
+        listen = {
+            schluessel: werte[start:start + DATENSATZ_BLOCK].tolist() for schluessel, werte in ergebnis.items()
+        }
+        for i in range(min(DATENSATZ_BLOCK, anzahl - start)):
+            yield {
+                block: {schluessel: listen[schluessel][i] for schluessel in schluessel_liste}
+                for block, schluessel_liste in BATCH_ERGEBNISSE.items()
+            }
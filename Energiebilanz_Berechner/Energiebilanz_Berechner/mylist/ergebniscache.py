@@ -0,0 +1,133 @@
+# mylist/ergebniscache.py
+
+"""
+Inhaltsadressierter Zwischenspeicher für die Ergebnisse der Rechenkette
+(`berechnungen.berechne_bilanz`).
+
+Der Schlüssel ist ein SHA-256 über den normalisierten Eingabevektor (alle
+Spalten aus `BATCH_EINGABEN` in fester Reihenfolge, Standardwerte ergänzt,
+Zahlen als float) und die `BERECHNUNGSVERSION`. Gleiche Eingaben aus
+/api/berechnung/, der Schnellberechnung oder dem Wizard treffen damit
+denselben Eintrag; eine Formeländerung mit neuer Version macht alle alten
+Einträge unerreichbar.
+
+Zwei Stufen:
+  1. LRU im Prozess (`ERGEBNISCACHE_GROESSE` Einträge, 0 = aus)
+  2. optional ein gemeinsamer Django-Cache (`ERGEBNISCACHE_DJANGO` = Alias
+     aus `CACHES`, z. B. "default"; None = aus), damit mehrere Worker
+     Ergebnisse teilen
+
+Treffer und Fehlschläge werden pro Prozess gezählt (`statistik()`).
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .berechnungen import BATCH_EINGABEN, BERECHNUNGSVERSION, berechne_bilanz
+
+
+CACHE_PREFIX = "mylist:ergebnis:"
+
+
+def normalisiere(eingaben):
+    """
+    Eingabevektor in Spaltenreihenfolge von `BATCH_EINGABEN`: fehlende
+    Spalten mit Standardwert, Zahlen als float (-0.0 wird zu 0.0).
+    Unbekannte oder fehlende Pflichtspalten lösen einen ValueError aus.
+    """
+    unbekannt = set(eingaben) - set(BATCH_EINGABEN)
+    if unbekannt:
+        raise ValueError(f"Unbekannte Eingaben: {', '.join(sorted(unbekannt))}")
+
+    vektor = []
+    for name, standard in BATCH_EINGABEN.items():
+        wert = eingaben.get(name, standard)
+        if name not in eingaben and standard is None:
+            raise ValueError(f"Pflichteingabe '{name}' fehlt")
+        vektor.append(None if wert is None else float(wert) + 0.0)
+    return tuple(vektor)
+
+
+def ergebnis_schluessel(vektor):
+    """SHA-256 (hex) über Berechnungsversion und normalisierten Eingabevektor."""
+    inhalt = json.dumps([BERECHNUNGSVERSION, vektor], separators=(",", ":"))
+    return hashlib.sha256(inhalt.encode("utf-8")).hexdigest()
+
+
+def _kopie(ergebnis):
+    # Aufrufer dürfen ihr Ergebnis verändern, ohne den Cache zu verfälschen
+    return {block: dict(werte) for block, werte in ergebnis.items()}
+
+
+class Ergebniscache:
+    """LRU-Zwischenspeicher eines Prozesses mit optionaler zweiter Stufe."""
+
+    def __init__(self):
+        self._eintraege = OrderedDict()
+        self._sperre = threading.Lock()
+        self._zaehler = {"treffer": 0, "treffer_geteilt": 0, "fehlschlaege": 0}
+
+    @staticmethod
+    def _geteilter_cache():
+        alias = getattr(settings, "ERGEBNISCACHE_DJANGO", None)
+        return caches[alias] if alias else None
+
+    def bilanz(self, **eingaben):
+        """
+        Ergebnis von `berechne_bilanz(**eingaben)`, aus dem Cache oder neu
+        berechnet. Rückgabe ist immer eine eigene Kopie.
+        """
+        vektor = normalisiere(eingaben)
+        schluessel = ergebnis_schluessel(vektor)
+        groesse = getattr(settings, "ERGEBNISCACHE_GROESSE", 1024)
+
+        with self._sperre:
+            ergebnis = self._eintraege.get(schluessel)
+            if ergebnis is not None:
+                self._eintraege.move_to_end(schluessel)
+                self._zaehler["treffer"] += 1
+                return _kopie(ergebnis)
+
+        geteilt = self._geteilter_cache()
+        ergebnis = geteilt.get(CACHE_PREFIX + schluessel) if geteilt is not None else None
+        if ergebnis is not None:
+            zaehler = "treffer_geteilt"
+        else:
+            zaehler = "fehlschlaege"
+            ergebnis = berechne_bilanz(**dict(zip(BATCH_EINGABEN, vektor)))
+            if geteilt is not None:
+                geteilt.set(
+                    CACHE_PREFIX + schluessel, ergebnis,
+                    getattr(settings, "ERGEBNISCACHE_TIMEOUT", 60 * 60 * 24),
+                )
+
+        with self._sperre:
+            self._zaehler[zaehler] += 1
+            if groesse > 0:
+                self._eintraege[schluessel] = ergebnis
+                self._eintraege.move_to_end(schluessel)
+                while len(self._eintraege) > groesse:
+                    self._eintraege.popitem(last=False)
+        return _kopie(ergebnis)
+
+    def statistik(self):
+        """Zähler dieses Prozesses: treffer, treffer_geteilt, fehlschlaege, eintraege, trefferquote."""
+        with self._sperre:
+            werte = dict(self._zaehler, eintraege=len(self._eintraege))
+        anfragen = werte["treffer"] + werte["treffer_geteilt"] + werte["fehlschlaege"]
+        werte["trefferquote"] = (werte["treffer"] + werte["treffer_geteilt"]) / anfragen if anfragen else 0.0
+        return werte
+
+    def leeren(self):
+        """Verwirft die Einträge und Zähler dieses Prozesses (der gemeinsame Cache bleibt)."""
+        with self._sperre:
+            self._eintraege.clear()
+            self._zaehler = dict.fromkeys(self._zaehler, 0)
+
+
+ergebniscache = Ergebniscache()
@@ -22,6 +22,7 @@ class GebaeudeAllgForm(forms.ModelForm):
             'breite_ow',
             'geschosshoehe',
             'geschosse',
+            'klimaregion',
         ]
         widgets = {
             'laenge_ns':      forms.NumberInput(attrs={'step': '0.01'}),
@@ -53,6 +54,11 @@ class GebaeudeEnergieKennzahlenForm(forms.ModelForm):
             'nutz_kwh_m2':     forms.NumberInput(attrs={'step': '0.1'}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Leer gelassen → Heizwärmebedarf per Monatsbilanzverfahren (siehe views)
+        self.fields['jahres_heizwert'].required = False
+
 
 class GebaeudeVerlusteForm(forms.ModelForm):
     """
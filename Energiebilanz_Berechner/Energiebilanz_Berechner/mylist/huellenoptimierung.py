@@ -0,0 +1,328 @@
+# mylist/huellenoptimierung.py
+
+"""
+Optimierung der Gebäudehülle: U-Werte und Fensterflächenanteile
+(/api/optimierung/huelle/).
+
+Jede Variante wird vektorisiert bewertet: Heizwärmebedarf nach dem
+Monatsbilanzverfahren (`berechne_heizwaerme_monatlich`), daraus die
+Endenergie über `berechne_bilanz_batch`, dazu Herstellungs-GWP und Kosten
+der Dämmung und Fenster aus einfachen Kennwerten (`ANNAHMEN`). Die
+Dämmstärke ergibt sich aus dem U-Wert: d = λ · (1/U − 1/U_ohne).
+
+Gesucht wird mit NSGA-II (genetisch, ohne Gradienten, Randbedingungen über
+Constraint-Dominanz nach Deb). Ergebnis ist die Pareto-Front der
+zulässigen Lösungen über die gewählten `ziele`, nicht ein einzelner Punkt.
+Die Bewertung einer Generation lässt sich mit `prozesse` > 1 auf einen
+Prozess-Pool verteilen (siehe prozesspool.py; lohnt erst bei großen Populationen).
+"""
+
+import numpy as np
+
+from .berechnungen import berechne_bilanz_batch
+from .monatsbilanz import STANDARDWERTE, bauteil_eingaben, berechne_heizwaerme_monatlich
+from .prozesspool import prozesspool
+from .transmission import fx_werte, huellflaechen
+
+
+# Entscheidungsvariablen (Eingaben der Monatsbilanz) mit Standardgrenzen;
+# Fensteranteile als Anteil der Fassaden- bzw. Dachfläche (0 … 1)
+GRENZEN = {
+    "u_wand_nord":  (0.10, 0.40),
+    "u_wand_ost":   (0.10, 0.40),
+    "u_wand_sued":  (0.10, 0.40),
+    "u_wand_west":  (0.10, 0.40),
+    "u_dach":       (0.08, 0.30),
+    "u_boden":      (0.10, 0.50),
+    "fenster_nord": (0.05, 0.60),
+    "fenster_ost":  (0.05, 0.60),
+    "fenster_sued": (0.05, 0.60),
+    "fenster_west": (0.05, 0.60),
+    "fenster_dach": (0.00, 0.10),
+}
+
+# Kennwerte für Herstellung und Betrieb (grobe Richtwerte, je Anfrage überschreibbar)
+ANNAHMEN = {
+    "lambda_daemmung":       0.035,   # Wärmeleitfähigkeit Dämmstoff (W/(m·K))
+    "gwp_daemmung":          60.0,    # kg CO₂-Äq. je m³ Dämmstoff
+    "kosten_daemmung":       250.0,   # € je m³ Dämmstoff (eingebaut)
+    "gwp_fenster":           60.0,    # kg CO₂-Äq. je m² Fensterfläche
+    "kosten_fenster":        500.0,   # € je m² Fensterfläche
+    "u_ohne_daemmung_wand":  1.4,     # U-Wert der Konstruktion ohne Dämmung (W/(m²K))
+    "u_ohne_daemmung_dach":  1.4,
+    "u_ohne_daemmung_boden": 1.2,
+    "emissionsfaktor":       0.3,     # kg CO₂-Äq. je kWh Endenergie
+    "betrachtungszeitraum":  50.0,    # Jahre
+}
+
+# Kennwerte einer Variante, die als Ziel oder Budget dienen können
+ZIELE = ("endenergie", "heizwaerme", "gwp_herstellung", "gwp_betrieb", "gwp_gesamt", "kosten")
+
+FASSADEN = ("nord", "ost", "sued", "west")
+
+
+def bewerte(klima, geometrie, variablen, monatsbilanz=None, bilanz=None, annahmen=None):
+    """
+    Bewertet Hüllenvarianten.
+
+    - klima: aus `lade_klimadaten`
+    - geometrie: laenge, breite, geschosshoehe, anz_geschosse
+    - variablen: Name aus `GRENZEN` → Array (eine Zeile je Variante)
+    - monatsbilanz: weitere feste Eingaben der Monatsbilanz (z. B. luftwechsel)
+    - bilanz: weitere feste Spalten aus `BATCH_EINGABEN` (z. B. trinkwarmwasser_kwh_pro_m2)
+    - annahmen: Abweichungen von `ANNAHMEN`
+
+    Rückgabe: Dict Kennwert aus `ZIELE` → float64-Array.
+    """
+    monatsbilanz = dict(monatsbilanz or {})
+    annahmen = {**ANNAHMEN, **(annahmen or {})}
+
+    def wert(name, rueckfall):
+        if name in variablen:
+            return np.asarray(variablen[name], dtype=np.float64)
+        return np.float64(monatsbilanz.get(name, monatsbilanz.get(rueckfall, STANDARDWERTE.get(rueckfall))))
+
+    heizwaerme = berechne_heizwaerme_monatlich(klima, **geometrie, **{**monatsbilanz, **variablen})["q_h_jahr"]
+    ergebnis = berechne_bilanz_batch(
+        {**geometrie, **(bilanz or {})}, jahres_heizwaermebedarf_kwh=heizwaerme
+    )
+
+    flaechen = huellflaechen(
+        geometrie["laenge"], geometrie["breite"], geometrie["geschosshoehe"], geometrie["anz_geschosse"],
+        {**{name: wert(f"fenster_{name}", "fensteranteil") for name in FASSADEN},
+         "dach": wert("fenster_dach", "fenster_dach")},
+    )
+
+    def daemmvolumen(u_wert, u_ohne, flaeche):
+        dicke = annahmen["lambda_daemmung"] * (1.0 / u_wert - 1.0 / u_ohne)
+        return np.maximum(dicke, 0.0) * flaeche
+
+    volumen = sum(
+        daemmvolumen(wert(f"u_wand_{name}", "u_wand"), annahmen["u_ohne_daemmung_wand"], flaechen["waende"][name])
+        for name in FASSADEN
+    )
+    volumen = volumen + daemmvolumen(
+        wert("u_dach", "u_dach"), annahmen["u_ohne_daemmung_dach"], flaechen["dach"]
+    ) + daemmvolumen(wert("u_boden", "u_boden"), annahmen["u_ohne_daemmung_boden"], flaechen["boden"])
+    fensterflaeche = sum(flaechen["fenster"].values())
+
+    endenergie = ergebnis["ee_absolut"]
+    gwp_herstellung = volumen * annahmen["gwp_daemmung"] + fensterflaeche * annahmen["gwp_fenster"]
+    gwp_betrieb = endenergie * annahmen["emissionsfaktor"] * annahmen["betrachtungszeitraum"]
+    anzahl = len(endenergie)
+    return {
+        "endenergie":      endenergie,
+        "heizwaerme":      np.broadcast_to(heizwaerme, anzahl).astype(np.float64),
+        "gwp_herstellung": np.broadcast_to(gwp_herstellung, anzahl).astype(np.float64),
+        "gwp_betrieb":     gwp_betrieb,
+        "gwp_gesamt":      gwp_herstellung + gwp_betrieb,
+        "kosten":          np.broadcast_to(
+            volumen * annahmen["kosten_daemmung"] + fensterflaeche * annahmen["kosten_fenster"], anzahl
+        ).astype(np.float64),
+    }
+
+
+def ausgangsloesung(bauteil=None, projekt=None):
+    """
+    Variablen der bestehenden Planung: U-Werte aus einem `Bauteil`,
+    Fensterflächenanteile aus einem `BuildingProject` (dort in %).
+    Rückgabe: (variablen, monatsbilanz) mit den festen Lüftungsangaben des Bauteils.
+    """
+    variablen, monatsbilanz = {}, {}
+    if bauteil is not None:
+        for name, wert in bauteil_eingaben(bauteil).items():
+            (variablen if name in GRENZEN else monatsbilanz)[name] = wert
+    if projekt is not None:
+        for name in (*FASSADEN, "dach"):
+            variablen[f"fenster_{name}"] = getattr(projekt, f"fenster_{name}") / 100.0
+    return variablen, monatsbilanz
+
+
+# ————— NSGA-II —————
+
+def _dominanz(ziele, verletzung):
+    """D[i, j] ist True, wenn Lösung i Lösung j dominiert (Constraint-Dominanz nach Deb)."""
+    kleiner_gleich = (ziele[:, None, :] <= ziele[None, :, :]).all(axis=-1)
+    kleiner = (ziele[:, None, :] < ziele[None, :, :]).any(axis=-1)
+    zulaessig = (verletzung[:, None] == 0) & (verletzung[None, :] == 0)
+    return (zulaessig & kleiner_gleich & kleiner) | (verletzung[:, None] < verletzung[None, :])
+
+
+def _raenge(dominanz):
+    """Nicht-dominierte Sortierung: Rang 0 = erste Front."""
+    rang = np.full(len(dominanz), -1)
+    dominiert_von = dominanz.sum(axis=0)
+    aktuell, stufe = np.flatnonzero(dominiert_von == 0), 0
+    while aktuell.size:
+        rang[aktuell] = stufe
+        dominiert_von = dominiert_von - dominanz[aktuell].sum(axis=0)
+        dominiert_von[rang >= 0] = -1
+        aktuell, stufe = np.flatnonzero(dominiert_von == 0), stufe + 1
+    return rang
+
+
+def _abstaende(ziele, rang):
+    """Crowding-Distanz je Lösung innerhalb ihrer Front (Ränder: unendlich)."""
+    abstand = np.zeros(len(ziele))
+    for stufe in np.unique(rang):
+        front = np.flatnonzero(rang == stufe)
+        for spalte in ziele[front].T:
+            ordnung = front[np.argsort(spalte, kind="stable")]
+            spanne = spalte.max() - spalte.min()
+            abstand[ordnung[[0, -1]]] = np.inf
+            if len(front) > 2 and spanne > 0:
+                sortiert = np.sort(spalte, kind="stable")
+                abstand[ordnung[1:-1]] += (sortiert[2:] - sortiert[:-2]) / spanne
+    return abstand
+
+
+def _turnier(rng, rang, abstand, anzahl):
+    """Binäre Turnierauswahl nach Rang, bei Gleichstand nach Crowding-Distanz."""
+    a, b = rng.integers(0, len(rang), size=(2, anzahl))
+    besser_a = (rang[a] < rang[b]) | ((rang[a] == rang[b]) & (abstand[a] >= abstand[b]))
+    return np.where(besser_a, a, b)
+
+
+def _sbx(rng, eltern1, eltern2, eta=15.0, wahrscheinlichkeit=0.9):
+    """Simulated Binary Crossover auf normierten Variablen in [0, 1]."""
+    u = rng.random(eltern1.shape)
+    beta = np.where(u <= 0.5, (2 * u) ** (1 / (eta + 1)), (1 / (2 * (1 - u))) ** (1 / (eta + 1)))
+    # Je Paar mit `wahrscheinlichkeit` kreuzen, je Variable zu 50 %
+    kreuzen = (rng.random((len(eltern1), 1)) < wahrscheinlichkeit) & (rng.random(eltern1.shape) < 0.5)
+    beta = np.where(kreuzen, beta, 1.0)
+    kind1 = 0.5 * ((1 + beta) * eltern1 + (1 - beta) * eltern2)
+    kind2 = 0.5 * ((1 - beta) * eltern1 + (1 + beta) * eltern2)
+    return np.clip(np.concatenate([kind1, kind2]), 0.0, 1.0)
+
+
+def _mutation(rng, x, eta=20.0):
+    """Polynomielle Mutation, im Mittel eine Variable je Lösung."""
+    u = rng.random(x.shape)
+    delta = np.where(u < 0.5, (2 * u) ** (1 / (eta + 1)) - 1, 1 - (2 * (1 - u)) ** (1 / (eta + 1)))
+    mutieren = rng.random(x.shape) < 1.0 / x.shape[1]
+    return np.clip(x + mutieren * delta, 0.0, 1.0)
+
+
+def _bewerte_block(kontext, variablen):
+    klima, geometrie, monatsbilanz, bilanz, annahmen = kontext
+    return bewerte(klima, geometrie, variablen, monatsbilanz, bilanz, annahmen)
+
+
+def optimiere(klima, geometrie, ziele=("endenergie", "gwp_herstellung"), grenzen=None, budget=None,
+              monatsbilanz=None, bilanz=None, annahmen=None, startloesungen=(), population=80,
+              generationen=60, seed=None, prozesse=None):
+    """
+    Sucht die Pareto-Front der Hüllenvarianten.
+
+    - ziele: zu minimierende Kennwerte aus `ZIELE` (mindestens einer)
+    - grenzen: Variable → (min, max); Standard `GRENZEN`. Variablen, die hier
+      fehlen, bleiben fest (Wert aus `monatsbilanz` bzw. `STANDARDWERTE`)
+    - budget: Kennwert aus `ZIELE` → Höchstwert (z. B. {"kosten": 150000})
+    - startloesungen: Variablen-Dicts, die in die Anfangspopulation kommen
+      (z. B. die bestehende Planung aus `ausgangsloesung`)
+
+    Rückgabe: {"ziele", "seed", "auswertungen", "generationen",
+    "front": [{"variablen": {...}, "kennwerte": {...}}, ...]} — die
+    zulässigen, nicht dominierten Lösungen, aufsteigend nach dem ersten Ziel.
+    Ist keine Lösung zulässig, ist die Front leer.
+    """
+    grenzen = dict(GRENZEN if grenzen is None else grenzen)
+    budget = dict(budget or {})
+    unbekannt = set(grenzen) - set(GRENZEN)
+    if unbekannt:
+        raise ValueError(f"Unbekannte Variablen: {', '.join(sorted(unbekannt))}")
+    if not grenzen:
+        raise ValueError("Mindestens eine Variable")
+    unbekannt = (set(ziele) | set(budget)) - set(ZIELE)
+    if unbekannt or not ziele:
+        raise ValueError(f"Ziele und Budgets müssen aus {', '.join(ZIELE)} sein")
+    for name, (unten, oben) in grenzen.items():
+        if not 0 <= unten <= oben:
+            raise ValueError(f"Ungültige Grenzen für '{name}'")
+        if name.startswith("u_") and unten <= 0:
+            raise ValueError(f"U-Wert '{name}' muss > 0 sein")
+        if name.startswith("fenster_") and oben > 1:
+            raise ValueError(f"Fensteranteil '{name}' muss <= 1 sein")
+    if population < 4 or generationen < 1:
+        raise ValueError("Mindestens 4 Lösungen je Population und eine Generation")
+    population += population % 2
+
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % 2**32)
+    rng = np.random.default_rng(seed)
+    namen = list(grenzen)
+    unten = np.array([grenzen[name][0] for name in namen])
+    spanne = np.array([grenzen[name][1] for name in namen]) - unten
+    # Fx-Werte einmal hier lesen und mitgeben, damit die Worker (auch bei "spawn") ohne Datenbank rechnen
+    fx = {f"fx_{name}": wert for name, wert in fx_werte().items() if name != "boden"}
+    kontext = (klima, geometrie, {**fx, **(monatsbilanz or {})}, dict(bilanz or {}), dict(annahmen or {}))
+
+    def variablen(x):
+        return dict(zip(namen, (unten + x * spanne).T))
+
+    pool = prozesspool(prozesse) if prozesse and prozesse > 1 else None
+
+    def auswerten(x):
+        if pool is None:
+            kennwerte = _bewerte_block(kontext, variablen(x))
+        else:
+            teile = [teil for teil in np.array_split(x, prozesse) if len(teil)]
+            bloecke = list(pool.map(_bewerte_block, [kontext] * len(teile), [variablen(t) for t in teile]))
+            kennwerte = {name: np.concatenate([b[name] for b in bloecke]) for name in ZIELE}
+        zielwerte = np.column_stack([kennwerte[ziel] for ziel in ziele])
+        verletzung = sum(
+            (np.maximum(kennwerte[name] - grenze, 0.0) / max(abs(grenze), 1.0) for name, grenze in budget.items()),
+            np.zeros(len(x)),
+        )
+        return kennwerte, zielwerte, verletzung
+
+    try:
+        x = rng.random((population, len(namen)))
+        for i, start in enumerate(list(startloesungen)[:population]):
+            bekannt = [j for j, name in enumerate(namen) if name in start]
+            werte = np.array([start[namen[j]] for j in bekannt], dtype=np.float64)
+            x[i, bekannt] = np.clip(
+                np.divide(werte - unten[bekannt], spanne[bekannt], out=np.zeros(len(bekannt)), where=spanne[bekannt] > 0),
+                0.0, 1.0,
+            )
+        kennwerte, zielwerte, verletzung = auswerten(x)
+
+        for _ in range(generationen):
+            rang = _raenge(_dominanz(zielwerte, verletzung))
+            abstand = _abstaende(zielwerte, rang)
+            eltern = _turnier(rng, rang, abstand, population)
+            kinder = _mutation(rng, _sbx(rng, x[eltern[: population // 2]], x[eltern[population // 2:]]))
+            kinder_kennwerte, kinder_ziele, kinder_verletzung = auswerten(kinder)
+
+            # Eltern und Kinder zusammen, die besten `population` überleben
+            x = np.concatenate([x, kinder])
+            kennwerte = {name: np.concatenate([kennwerte[name], kinder_kennwerte[name]]) for name in ZIELE}
+            zielwerte = np.concatenate([zielwerte, kinder_ziele])
+            verletzung = np.concatenate([verletzung, kinder_verletzung])
+            rang = _raenge(_dominanz(zielwerte, verletzung))
+            abstand = _abstaende(zielwerte, rang)
+            auswahl = np.lexsort((-abstand, rang))[:population]
+            x, zielwerte, verletzung = x[auswahl], zielwerte[auswahl], verletzung[auswahl]
+            kennwerte = {name: werte[auswahl] for name, werte in kennwerte.items()}
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    rang = _raenge(_dominanz(zielwerte, verletzung))
+    front = np.flatnonzero((rang == 0) & (verletzung == 0))
+    front = front[np.unique(np.round(zielwerte[front], 6), axis=0, return_index=True)[1]]
+    front = front[np.argsort(zielwerte[front, 0], kind="stable")]
+    werte = variablen(x[front])
+    return {
+        "ziele":        list(ziele),
+        "seed":         seed,
+        "auswertungen": population * (generationen + 1),
+        "generationen": generationen,
+        "front": [
+            {
+                "variablen": {name: round(float(werte[name][i]), 4) for name in namen},
+                "kennwerte": {name: float(kennwerte[name][j]) for name in ZIELE},
+            }
+            for i, j in enumerate(front)
+        ],
+    }
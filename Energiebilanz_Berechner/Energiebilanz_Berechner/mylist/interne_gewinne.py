@@ -0,0 +1,158 @@
+# mylist/interne_gewinne.py
+
+"""
+Interne Wärmegewinne und Beleuchtungsstrom aus den `Beleuchtung`- und
+`Waermequelle`-Einträgen eines oder vieler Gebäude.
+
+    Q_Bel = Σ p_Bel · A_Zone · t_h/d · t_d/a        (p_Bel = e_soll in W/m²)
+    Q_WQ  = Σ Anzahl · P · t_h/d · t_d/a
+
+Die Nutzfläche eines Gebäudes wird wie in der Stundensimulation zu
+gleichen Teilen auf seine Beleuchtungszonen aufgeteilt. Der
+Beleuchtungsstrom wird vollständig als Wärme im Gebäude wirksam; die
+Monatswerte verteilen die Jahreswerte nach den Tagen je Monat.
+
+Die Einträge aller Gebäude liegen als flache Spalten mit einem
+Gebäudeindex vor und werden mit `np.bincount` je Gebäude summiert, sodass
+ein Aufruf beliebig viele Gebäude rechnet. `interne_gewinne_fuer_gebaeude`
+liest dafür je Modell eine Abfrage.
+
+Für die Monatsbilanz ergibt sich daraus die mittlere Gewinnleistung q_i in
+W/m² NF (`q_i` in `monatsbilanz.STANDARDWERTE`), die Stundensimulation
+verwendet dieselben Einträge über `beleuchtungsprofil` und
+`waermequellenprofil`.
+"""
+
+import numpy as np
+
+from .berechnungen import als_spalte, gebaeudedaten_arrays, runde, spezifisch
+from .messung import gemessen
+from .monatsbilanz import TAGE_PRO_MONAT
+
+
+BELEUCHTUNG_SPALTEN = ("e_soll", "laufzeit_hd", "laufzeit_da")
+WAERMEQUELLEN_SPALTEN = ("anzahl", "leistung_kw", "betrieb_hd", "betrieb_da")
+
+# Ergebnisse je Gebäude (Arrays (n,), gerundet auf 2 Nachkommastellen)
+GEWINNE_ERGEBNISSE = (
+    "beleuchtung_kwh", "beleuchtung_spezifisch", "waermequellen_kwh", "interne_gewinne_kwh", "q_i",
+)
+
+
+def _betriebsstunden(stunden_pro_tag, tage_pro_jahr):
+    return np.clip(stunden_pro_tag, 0.0, 24.0) * np.clip(tage_pro_jahr, 0.0, 365.0)
+
+
+def _eintraege(eintraege, spalten, anzahl):
+    """Spalten-Dict mit "gebaeude" (Index 0 … anzahl−1) → (Gebäudeindex, float-Spalten); None = keine Einträge."""
+    if eintraege is None:
+        return np.zeros(0, dtype=np.intp), {name: np.zeros(0) for name in spalten}
+    gebaeude = np.asarray(eintraege["gebaeude"], dtype=np.intp)
+    if np.any((gebaeude < 0) | (gebaeude >= anzahl)):
+        raise ValueError("Gebäudeindex außerhalb der Nutzflächen")
+    werte = {name: np.asarray(eintraege[name], dtype=np.float64) for name in spalten}
+    return gebaeude, werte
+
+
+@gemessen()
+def berechne_interne_gewinne(nf, beleuchtung=None, waermequellen=None):
+    """
+    Beleuchtungsstrom und interne Gewinne für n Gebäude.
+
+    Argumente:
+    - nf: Nutzfläche je Gebäude in m² (Skalar oder Array (n,))
+    - beleuchtung: Dict mit den Spalten "gebaeude" (Index in `nf`) und
+      `BELEUCHTUNG_SPALTEN`, je ein Eintrag pro Zeile
+    - waermequellen: Dict mit "gebaeude" und `WAERMEQUELLEN_SPALTEN`
+
+    Rückgabe (Dictionary):
+    {
+      "beleuchtung_kwh":         Beleuchtungsstrom in kWh/a,
+      "beleuchtung_spezifisch":  Beleuchtungsstrom in kWh/(m² NF · a),
+      "waermequellen_kwh":       Wärmeabgabe der Wärmequellen in kWh/a,
+      "interne_gewinne_kwh":     Summe beider in kWh/a,
+      "q_i":                     mittlere interne Gewinnleistung in W/m² NF,
+      "gewinne_monate":          interne Gewinne je Monat in kWh (n, 12)
+    }
+    """
+    nf = als_spalte(nf)
+    anzahl = len(nf)
+
+    index, bel = _eintraege(beleuchtung, BELEUCHTUNG_SPALTEN, anzahl)
+    zonen = np.bincount(index, minlength=anzahl)
+    zonenflaeche = nf[index] / zonen[index]
+    beleuchtung_kwh = np.bincount(
+        index,
+        weights=bel["e_soll"] * zonenflaeche * _betriebsstunden(bel["laufzeit_hd"], bel["laufzeit_da"]) / 1000.0,
+        minlength=anzahl,
+    )
+
+    index, wq = _eintraege(waermequellen, WAERMEQUELLEN_SPALTEN, anzahl)
+    waermequellen_kwh = np.bincount(
+        index,
+        weights=wq["anzahl"] * wq["leistung_kw"] * _betriebsstunden(wq["betrieb_hd"], wq["betrieb_da"]),
+        minlength=anzahl,
+    )
+
+    gewinne = beleuchtung_kwh + waermequellen_kwh
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q_i = np.where(nf > 0, gewinne * 1000.0 / (8760.0 * nf), 0.0)
+
+    return {
+        "beleuchtung_kwh":        runde(beleuchtung_kwh),
+        "beleuchtung_spezifisch": runde(spezifisch(beleuchtung_kwh, nf)),
+        "waermequellen_kwh":      runde(waermequellen_kwh),
+        "interne_gewinne_kwh":    runde(gewinne),
+        "q_i":                    runde(q_i, 4),
+        "gewinne_monate":         runde(gewinne[:, None] * TAGE_PRO_MONAT / 365.0),
+    }
+
+
+def eintragsspalten(eintraege, spalten):
+    """
+    Wandelt Einträge eines Gebäudes (Dicts wie im Wizard-Entwurf oder
+    Modellinstanzen) in das Spalten-Dict für `berechne_interne_gewinne`.
+    """
+    eintraege = list(eintraege)
+    zeilen = [
+        [e[name] if isinstance(e, dict) else getattr(e, name) for name in spalten] for e in eintraege
+    ]
+    werte = np.array(zeilen, dtype=np.float64).reshape(len(eintraege), len(spalten))
+    return {"gebaeude": np.zeros(len(eintraege), dtype=np.intp), **dict(zip(spalten, werte.T))}
+
+
+def interne_gewinne_fuer_gebaeude(gebaeude):
+    """
+    Interne Gewinne für ein QuerySet oder eine Liste von `Gebaeude` (NF wie
+    in der Monatsbilanz aus `gebaeudedaten_arrays`).
+    Liest die Gebäude und alle zugehörigen `Beleuchtung`- und
+    `Waermequelle`-Einträge mit je einer Abfrage.
+
+    Rückgabe wie `berechne_interne_gewinne` mit zusätzlich "gebaeude_id".
+    """
+    from .models import Beleuchtung, Waermequelle
+
+    felder = ("pk", "laenge_ns", "breite_ow", "geschosshoehe", "geschosse")
+    if hasattr(gebaeude, "values_list"):
+        zeilen = gebaeude.values_list(*felder)
+    else:
+        zeilen = [[getattr(g, name) for name in felder] for g in gebaeude]
+    geometrie = np.array(list(zeilen), dtype=np.float64).reshape(-1, len(felder))
+    ids = geometrie[:, 0].astype(np.int64)
+    reihenfolge = np.argsort(ids)
+    nf = gebaeudedaten_arrays(*geometrie[:, 1:].T)["nf"]
+
+    def spalten(modell, felder):
+        zeilen = np.array(
+            modell.objects.filter(gebaeude_id__in=ids.tolist()).values_list("gebaeude_id", *felder),
+            dtype=np.float64,
+        ).reshape(-1, len(felder) + 1)
+        gebaeude_index = reihenfolge[np.searchsorted(ids[reihenfolge], zeilen[:, 0].astype(np.int64))]
+        return {"gebaeude": gebaeude_index, **dict(zip(felder, zeilen[:, 1:].T))}
+
+    ergebnis = berechne_interne_gewinne(
+        nf,
+        beleuchtung=spalten(Beleuchtung, BELEUCHTUNG_SPALTEN),
+        waermequellen=spalten(Waermequelle, WAERMEQUELLEN_SPALTEN),
+    )
+    return {"gebaeude_id": ids, **ergebnis}
@@ -0,0 +1,249 @@
+# mylist/lasttest.py
+
+"""
+Lasttest für den kompletten Eingabe-Wizard (Befehl `lasttest`).
+
+Virtuelle Nutzer laufen parallel (ein Thread pro Nutzer, eigene Session
+und Cookies) durch alle zehn Schritte `wizard_allg` … `wizard_ergebnis`:
+pro Schritt wird die Seite geladen (GET, liefert CSRF-Token und
+Auswahlwerte) und das Formular abgeschickt (POST), dazwischen liegt eine
+zufällige Denkzeit um `denkzeit`. Ein fehlgeschlagener Schritt bricht den
+Durchlauf ab, der Nutzer beginnt dann von vorn.
+
+Gemessen wird gegen einen laufenden Server über HTTP (nur Standardbibliothek),
+damit Session-Schreibzugriffe und Datenbanksperren wie im Betrieb wirken.
+Der Bericht enthält Durchsatz, Perzentile je Schritt und Fehlerquoten.
+"""
+
+import http.client
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+from django.urls import reverse
+
+
+# Schritt-URL-Name → POST-Daten (None = nur GET)
+WIZARD_ABLAUF = (
+    ("wizard_allg", {
+        "name": "Lasttest", "laenge_ns": 20.0, "breite_ow": 15.0, "geschosshoehe": 3.0, "geschosse": 3,
+    }),
+    ("wizard_energie", {
+        "jahres_heizwert": 10000.0, "tw_kwh_m2": 15.0, "luft_kwh_m2": 8.0, "bel_kwh_m2": 10.0, "nutz_kwh_m2": 5.0,
+    }),
+    ("wizard_verluste", {
+        "verteilungsverlust_kwh": 500.0, "speicherverlust_kwh": 300.0, "warmwasserbedarf_kwh": 2000.0,
+    }),
+    ("wizard_bauteile", {
+        "laenge": 20.0, "breite": 15.0, "geschosshoehe": 3.0, "anz_geschosse": 3,
+        "u_wand_nord": 0.24, "u_wand_sued": 0.24, "u_wand_west": 0.24, "u_wand_ost": 0.24,
+        "u_bodenplatte": 0.3, "u_dach": 0.2,
+    }),
+    ("wizard_lueftung", {
+        "lueftungstyp": "Zentrale Lüftung", "luftwechselrate": 0.5, "wrg_wirkungsgrad": 80.0,
+        "raum_temp_soll": 20.0, "laufzeit_hd": 12.0, "laufzeit_da": 365.0,
+    }),
+    ("wizard_beleuchtung", {
+        "bereich": "buero", "beleuchtungsart": "LED", "regelungsart": "Präsenzmelder",
+        "e_soll": 500.0, "laufzeit_hd": 10.0, "laufzeit_da": 250.0,
+    }),
+    ("wizard_waermequelle", {
+        "name": "Quelle 1", "anzahl": 2, "leistung_kw": 1.5, "betrieb_hd": 8.0, "betrieb_da": 250.0,
+    }),
+    ("wizard_gwp", {"variante": "300", "menge": 100.0, "spez_co2": 20.0}),
+    ("wizard_sonneneintrag", {
+        "fassadenorientierung": "Sued", "verglasungsart": "zweifach", "fensterneigung": 90.0,
+    }),
+    ("wizard_ergebnis", None),
+)
+
+# Auswahlfelder, deren Wert aus der geladenen Seite übernommen wird (erste Option)
+AUSWAHL_AUS_SEITE = ("sonnenschutzart",)
+
+
+def _erste_option(html, feld):
+    auswahl = re.search(rf'<select[^>]*name="{feld}"[^>]*>(.*?)</select>', html, re.S)
+    if auswahl is None:
+        return None
+    option = re.search(r'<option value="([^"]+)"', auswahl.group(1))
+    return option.group(1) if option else None
+
+
+class Sitzung:
+    """HTTP-Verbindung eines virtuellen Nutzers mit eigenen Cookies."""
+
+    def __init__(self, basis_url, timeout):
+        teile = urlsplit(basis_url)
+        klasse = http.client.HTTPSConnection if teile.scheme == "https" else http.client.HTTPConnection
+        self.verbindung = klasse(teile.hostname, teile.port, timeout=timeout)
+        self.basis_url = basis_url.rstrip("/")
+        self.cookies = {}
+
+    def anfrage(self, methode, pfad, daten=None):
+        """Rückgabe (status, html); folgt keinen Weiterleitungen."""
+        kopf = {"Cookie": "; ".join(f"{k}={v}" for k, v in self.cookies.items())}
+        koerper = None
+        if daten is not None:
+            koerper = urlencode({**daten, "csrfmiddlewaretoken": self.cookies.get("csrftoken", "")})
+            kopf["Content-Type"] = "application/x-www-form-urlencoded"
+            kopf["Referer"] = self.basis_url + pfad
+        try:
+            self.verbindung.request(methode, pfad, body=koerper, headers=kopf)
+            antwort = self.verbindung.getresponse()
+            inhalt = antwort.read()
+        except (OSError, http.client.HTTPException):
+            # Verbindung beim nächsten Versuch neu aufbauen
+            self.verbindung.close()
+            raise
+        for cookie in antwort.headers.get_all("Set-Cookie") or ():
+            for name, morsel in SimpleCookie(cookie).items():
+                self.cookies[name] = morsel.value
+        if antwort.getheader("Connection", "").lower() == "close":
+            self.verbindung.close()
+        return antwort.status, inhalt.decode("utf-8", "replace")
+
+    def schliessen(self):
+        self.verbindung.close()
+
+
+class Lasttest:
+    """
+    Führt den Lasttest aus, siehe Moduldokumentation.
+
+    - nutzer: Anzahl paralleler virtueller Nutzer
+    - durchlaeufe: Wizard-Durchläufe pro Nutzer (ignoriert, wenn `dauer` gesetzt ist)
+    - dauer: Laufzeit in Sekunden; Nutzer starten so lange neue Durchläufe
+    - denkzeit: mittlere Pause zwischen zwei Schritten in Sekunden (±50 %)
+    - hochlauf: Zeitraum in Sekunden, über den die Nutzer gestaffelt starten
+    """
+
+    def __init__(self, basis_url, nutzer=10, durchlaeufe=5, dauer=None, denkzeit=1.0, hochlauf=0.0, timeout=30):
+        self.basis_url = basis_url.rstrip("/")
+        self.nutzer = nutzer
+        self.durchlaeufe = durchlaeufe
+        self.dauer = dauer
+        self.denkzeit = denkzeit
+        self.hochlauf = hochlauf
+        self.timeout = timeout
+        self.schritte = [(name, reverse(name), daten) for name, daten in WIZARD_ABLAUF]
+        self._messungen = []   # (schritt, sekunden, ok)
+        self._fehler = Counter()
+        self._ergebnis = Counter()
+        self._sperre = threading.Lock()
+
+    def ausfuehren(self):
+        """Startet alle Nutzer, wartet auf sie und gibt den Bericht zurück (siehe `bericht`)."""
+        start = time.perf_counter()
+        ende = start + self.dauer if self.dauer else None
+        threads = [
+            threading.Thread(target=self._nutzer, args=(i, ende), daemon=True)
+            for i in range(self.nutzer)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.bericht(time.perf_counter() - start)
+
+    def _pause(self, sekunden):
+        if sekunden > 0:
+            time.sleep(sekunden)
+
+    def _nutzer(self, nummer, ende):
+        zufall = random.Random(nummer)
+        if self.nutzer > 1:
+            self._pause(self.hochlauf * nummer / (self.nutzer - 1))
+        sitzung = Sitzung(self.basis_url, self.timeout)
+        try:
+            durchlauf = 0
+            while (time.perf_counter() < ende) if ende else (durchlauf < self.durchlaeufe):
+                durchlauf += 1
+                ok = self._durchlauf(sitzung, zufall)
+                with self._sperre:
+                    self._ergebnis["ok" if ok else "fehler"] += 1
+        finally:
+            sitzung.schliessen()
+
+    def _schritt(self, sitzung, name, methode, pfad, daten=None):
+        start = time.perf_counter()
+        try:
+            status, html = sitzung.anfrage(methode, pfad, daten)
+        except (OSError, http.client.HTTPException) as e:
+            fehler = f"{type(e).__name__}: {e}"
+            status, html = None, ""
+        else:
+            # Formulare leiten bei Erfolg weiter, ein erneut angezeigtes Formular ist ein Fehler
+            erwartet = (302,) if daten is not None else (200,)
+            fehler = None if status in erwartet else f"HTTP {status}"
+        self._messungen.append((f"{name} {methode}", time.perf_counter() - start, fehler is None))
+        if fehler is not None:
+            with self._sperre:
+                self._fehler[f"{name} {methode}: {fehler}"] += 1
+            return None
+        return html
+
+    def _durchlauf(self, sitzung, zufall):
+        for name, pfad, daten in self.schritte:
+            html = self._schritt(sitzung, name, "GET", pfad)
+            if html is None:
+                return False
+            if daten is not None:
+                daten = dict(daten)
+                for feld in AUSWAHL_AUS_SEITE:
+                    wert = _erste_option(html, feld)
+                    if wert is not None:
+                        daten[feld] = wert
+                self._pause(self.denkzeit * zufall.uniform(0.5, 1.5))
+                if self._schritt(sitzung, name, "POST", pfad, daten) is None:
+                    return False
+        return True
+
+    def bericht(self, gesamtdauer):
+        """
+        {"nutzer", "dauer_s", "durchlaeufe", "durchlaeufe_fehler", "durchlaeufe_pro_s",
+         "anfragen", "anfragen_pro_s", "fehlerquote",
+         "schritte": {"<schritt> <methode>": {"anzahl", "fehler", "fehlerquote", "p50_ms", "p95_ms", "p99_ms", "max_ms"}},
+         "fehler": {Meldung: Anzahl}}
+        """
+        nach_schritt = {}
+        for schritt, dauer, ok in self._messungen:
+            nach_schritt.setdefault(schritt, ([], []))[0 if ok else 1].append(dauer)
+
+        reihenfolge = [f"{name} {methode}" for name, _pfad, daten in self.schritte
+                       for methode in (("GET", "POST") if daten is not None else ("GET",))]
+        schritte = {}
+        for schritt in reihenfolge:
+            if schritt not in nach_schritt:
+                continue
+            ok, fehler = nach_schritt[schritt]
+            zeiten = np.array(ok + fehler) * 1000
+            p50, p95, p99 = np.percentile(zeiten, (50, 95, 99))
+            schritte[schritt] = {
+                "anzahl":      len(zeiten),
+                "fehler":      len(fehler),
+                "fehlerquote": len(fehler) / len(zeiten),
+                "p50_ms":      float(p50),
+                "p95_ms":      float(p95),
+                "p99_ms":      float(p99),
+                "max_ms":      float(zeiten.max()),
+            }
+
+        anfragen = len(self._messungen)
+        fehlerhaft = sum(1 for _schritt, _dauer, ok in self._messungen if not ok)
+        return {
+            "nutzer":             self.nutzer,
+            "dauer_s":            gesamtdauer,
+            "durchlaeufe":        self._ergebnis["ok"],
+            "durchlaeufe_fehler": self._ergebnis["fehler"],
+            "durchlaeufe_pro_s":  self._ergebnis["ok"] / gesamtdauer if gesamtdauer else 0.0,
+            "anfragen":           anfragen,
+            "anfragen_pro_s":     anfragen / gesamtdauer if gesamtdauer else 0.0,
+            "fehlerquote":        fehlerhaft / anfragen if anfragen else 0.0,
+            "schritte":           schritte,
+            "fehler":             dict(self._fehler.most_common()),
+        }
@@ -0,0 +1,170 @@
+# mylist/lueftungsbilanz.py
+
+"""
+Lüftungswärmebedarf und Ventilatorstrom für die Lüftungsangaben des
+`Bauteil` (Wizard-Schritt Lüftung, Ergebnisfelder lb_absolut/lb_spezifisch).
+
+Lüftungswärmebedarf je Monat (während der Betriebszeit der Lüftung):
+
+    Q_L = 0,34 Wh/(m³K) · V̇ · (1 − η_WRG) · max(θ_i − θ_e, 0) · t_Betrieb
+
+mit V̇ = n · 0,8 · V_e (Nettovolumen wie in der Monatsbilanz) und den
+Monatsmitteln der Außentemperatur aus `KlimaregionTemperatur`.
+
+Ventilatorstrom nach dem SFP-Ansatz: die spezifische Ventilatorleistung
+SFP = Δp / (η_Ventilator · 3600) in W/(m³/h) aus der Summe der
+Druckverluste (`DruckverlustBauteil`) und daraus P = SFP · V̇.
+
+Wie berechnungen.py gibt es eine Skalar- (`berechne_lueftung`) und eine
+Batch-Schnittstelle (`berechne_lueftung_batch`) mit demselben Kernel.
+"""
+
+import numpy as np
+
+from .berechnungen import (
+    als_skalare,
+    als_spalte,
+    batch_spalten,
+    gebaeudedaten_arrays,
+    runde,
+    spezifisch,
+)
+from .messung import gemessen
+from .monatsbilanz import STUNDEN_PRO_MONAT, lade_klimadaten
+from .referenzdaten import referenzdaten
+
+
+# Eingabespalten (Feldnamen und Einheiten wie im `Bauteil`) mit Standardwert,
+# None = Pflichtspalte. Ohne druckverlust_pa gilt die Summe aller
+# Einträge aus `DruckverlustBauteil`.
+LUEFTUNG_EINGABEN = {
+    "laenge":                 None,
+    "breite":                 None,
+    "geschosshoehe":          None,
+    "anz_geschosse":          None,
+    "luftwechselrate":        0.7,     # 1/h
+    "wrg_wirkungsgrad":       0.0,     # %
+    "raum_temp_soll":         19.0,    # °C
+    "laufzeit_hd":            24.0,    # Betriebsstunden pro Tag
+    "laufzeit_da":            365.0,   # Betriebstage pro Jahr
+    "druckverlust_pa":        None,    # Summe der Druckverluste in Pa
+    "ventilatorwirkungsgrad": 0.6,     # Gesamtwirkungsgrad Ventilator/Motor
+}
+
+# Ergebnisse (Skalare bzw. Arrays (n,), gerundet auf 2 Nachkommastellen)
+LUEFTUNG_ERGEBNISSE = (
+    "luftvolumenstrom", "lb_absolut", "lb_spezifisch", "sfp", "ventilator_kwh", "ventilator_spezifisch",
+)
+
+
+def summe_druckverluste(bauteile=None):
+    """
+    Summe der Druckverluste (Pa) aus `DruckverlustBauteil`: der genannten
+    Bauteile oder, ohne Angabe, aller Einträge. Unbekannte Bauteile lösen
+    LookupError aus.
+    """
+    tabelle = referenzdaten.tabelle("druckverlust")
+    if bauteile is None:
+        return float(sum(tabelle.values()))
+    fehlend = [name for name in bauteile if name not in tabelle]
+    if fehlend:
+        raise LookupError(f"Keine Druckverluste für: {', '.join(fehlend)}")
+    return float(sum(tabelle[name] for name in bauteile))
+
+
+def _lueftung_arrays(theta_e, laenge, breite, geschosshoehe, anz_geschosse, luftwechselrate,
+                     wrg_wirkungsgrad, raum_temp_soll, laufzeit_hd, laufzeit_da, druckverlust_pa,
+                     ventilatorwirkungsgrad):
+    geb = gebaeudedaten_arrays(laenge, breite, geschosshoehe, anz_geschosse)
+    nf = geb["nf"]
+    volumenstrom = luftwechselrate * 0.8 * geb["volumen"]                 # m³/h
+    betriebsanteil = np.clip(laufzeit_hd / 24.0, 0.0, 1.0) * np.clip(laufzeit_da / 365.0, 0.0, 1.0)
+
+    # Monatsachse: Gebäudewerte (n,) → (n, 1), Temperaturen (12,) bzw. (n, 12)
+    delta_theta = np.maximum(raum_temp_soll[:, None] - np.atleast_2d(theta_e), 0.0)
+    lb_monate = (
+        0.34 * (volumenstrom * (1.0 - wrg_wirkungsgrad / 100.0) * betriebsanteil)[:, None]
+        * delta_theta * STUNDEN_PRO_MONAT / 1000.0
+    )
+    lb_abs = lb_monate.sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sfp = np.where(ventilatorwirkungsgrad > 0, druckverlust_pa / (ventilatorwirkungsgrad * 3600.0), 0.0)
+    ventilator_kwh = sfp * volumenstrom * 8760.0 * betriebsanteil / 1000.0
+
+    return {
+        "luftvolumenstrom":      runde(volumenstrom),
+        "lb_monate":             lb_monate,
+        "lb_absolut":            runde(lb_abs),
+        "lb_spezifisch":         runde(spezifisch(lb_abs, nf)),
+        "sfp":                   runde(sfp, 4),
+        "ventilator_kwh":        runde(ventilator_kwh),
+        "ventilator_spezifisch": runde(spezifisch(ventilator_kwh, nf)),
+    }
+
+
+@gemessen()
+def berechne_lueftung_batch(klima, daten=None, **spalten):
+    """
+    Lüftungswärmebedarf und Ventilatorstrom für viele Varianten.
+
+    Argumente:
+    - klima: Dictionary aus `lade_klimadaten(...)` ("theta_e" (12,) oder (n, 12))
+    - daten, **spalten: Eingabespalten aus `LUEFTUNG_EINGABEN` wie bei
+      `berechne_bilanz_batch` (Dict, DataFrame, strukturiertes Array oder
+      einzelne Spalten)
+
+    Rückgabe (Dictionary, je ein float64-Array):
+    {
+      "luftvolumenstrom":       Außenluftvolumenstrom in m³/h,
+      "lb_monate":              Lüftungswärmebedarf je Monat in kWh (n, 12),
+      "lb_absolut":             Lüftungswärmebedarf in kWh/a,
+      "lb_spezifisch":          Lüftungswärmebedarf in kWh/(m² NF · a),
+      "sfp":                    spezifische Ventilatorleistung in W/(m³/h),
+      "ventilator_kwh":         Ventilatorstrom in kWh/a,
+      "ventilator_spezifisch":  Ventilatorstrom in kWh/(m² NF · a)
+    }
+    """
+    eingaben = {**LUEFTUNG_EINGABEN, "druckverlust_pa": summe_druckverluste()}
+    e = batch_spalten(daten, spalten, eingaben)
+    return _lueftung_arrays(np.asarray(klima["theta_e"], dtype=np.float64), **e)
+
+
+@gemessen()
+def berechne_lueftung(klima, laenge, breite, geschosshoehe, anz_geschosse, **eingaben):
+    """
+    Skalar-Variante von `berechne_lueftung_batch` für ein Gebäude; weitere
+    Eingaben aus `LUEFTUNG_EINGABEN` als Keyword-Argumente.
+
+    Rückgabe (Dictionary) mit den Werten aus `LUEFTUNG_ERGEBNISSE` als float
+    und "lb_monate" als Liste der 12 Monatswerte (gerundet auf 2 Nachkommastellen).
+    """
+    ergebnis = berechne_lueftung_batch(
+        klima, laenge=als_spalte(laenge), breite=als_spalte(breite),
+        geschosshoehe=als_spalte(geschosshoehe), anz_geschosse=als_spalte(anz_geschosse), **eingaben,
+    )
+    lb_monate = runde(ergebnis.pop("lb_monate")[0]).tolist()
+    return {**als_skalare(ergebnis), "lb_monate": lb_monate}
+
+
+def lueftung_fuer_bauteil(bauteil, klimaregion=None):
+    """
+    Rechnet die Lüftung eines `Bauteil` aus dem Wizard und setzt
+    `lb_absolut` und `lb_spezifisch` (ohne zu speichern). Nicht gesetzte
+    Lüftungsfelder bekommen die Standardwerte aus `LUEFTUNG_EINGABEN`.
+
+    Rückgabe wie `berechne_lueftung`; LookupError ohne Klimadaten.
+    """
+    eingaben = {
+        name: getattr(bauteil, name)
+        for name in ("luftwechselrate", "wrg_wirkungsgrad", "raum_temp_soll", "laufzeit_hd", "laufzeit_da")
+        if getattr(bauteil, name) is not None
+    }
+    ergebnis = berechne_lueftung(
+        lade_klimadaten(klimaregion),
+        bauteil.laenge, bauteil.breite, bauteil.geschosshoehe, bauteil.anz_geschosse,
+        **eingaben,
+    )
+    bauteil.lb_absolut = ergebnis["lb_absolut"]
+    bauteil.lb_spezifisch = ergebnis["lb_spezifisch"]
+    return ergebnis
@@ -0,0 +1,97 @@
+# mylist/management/commands/benchmark.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from mylist.benchmark import BENCHMARKS, STANDARD_GROESSEN, fuehre_aus, kennung, laden, speichern, vergleiche
+
+
+class Command(BaseCommand):
+    help = (
+        "Misst Durchsatz und Laufzeit der Rechenkette (skalar/Batch), von /api/berechnung/, "
+        "des Wizards, des PDF-Exports und eines Imports auf synthetischen Daten; "
+        "optional Vergleich mit einer Baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--nur", default=None,
+            help="Kommagetrennte Auswahl der Benchmarks (%s)" % ", ".join(BENCHMARKS),
+        )
+        parser.add_argument(
+            "--groessen", default=",".join(map(str, STANDARD_GROESSEN)),
+            help="Kommagetrennte Datensatzgrößen (Standard: %(default)s)",
+        )
+        parser.add_argument(
+            "--wiederholungen", type=int, default=5,
+            help="Messungen pro Benchmark und Größe (Standard: %(default)s)",
+        )
+        parser.add_argument("--ausgabe", help="Ergebnisse als JSON in diese Datei schreiben")
+        parser.add_argument("--baseline", help="JSON-Datei eines früheren Laufs zum Vergleich")
+        parser.add_argument(
+            "--schwelle", type=float, default=0.2,
+            help="Erlaubte Verlangsamung gegenüber der Baseline als Anteil (Standard: %(default)s = 20 %%)",
+        )
+        parser.add_argument(
+            "--ohne-testdatenbank", action="store_true",
+            help="Die konfigurierte Datenbank verwenden statt einer temporären Testdatenbank "
+                 "(Achtung: Wizard- und Import-Benchmark schreiben Daten)",
+        )
+
+    def handle(self, *args, **options):
+        namen = options["nur"].split(",") if options["nur"] else list(BENCHMARKS)
+        unbekannt = [name for name in namen if name not in BENCHMARKS]
+        if unbekannt:
+            raise CommandError(f"Unbekannte Benchmarks: {', '.join(unbekannt)}")
+        try:
+            groessen = [int(g) for g in options["groessen"].split(",")]
+        except ValueError:
+            raise CommandError("--groessen erwartet ganze Zahlen, z. B. 100,1000")
+        baseline = laden(options["baseline"]) if options["baseline"] else None
+
+        try:
+            setup_test_environment()
+            eigene_umgebung = True
+        except RuntimeError:
+            # Bereits in einer Testumgebung (z. B. aus einem TestCase aufgerufen)
+            eigene_umgebung = False
+        datenbanken = None
+        if not options["ohne_testdatenbank"]:
+            datenbanken = setup_databases(verbosity=0, interactive=False)
+        try:
+            dokument = fuehre_aus(namen, groessen, options["wiederholungen"], ausgabe=self._zeile)
+        finally:
+            if datenbanken is not None:
+                teardown_databases(datenbanken, verbosity=0)
+            if eigene_umgebung:
+                teardown_test_environment()
+
+        if options["ausgabe"]:
+            speichern(dokument, options["ausgabe"])
+            self.stdout.write(f"Ergebnisse geschrieben: {options['ausgabe']}")
+
+        if baseline is None:
+            return
+        vergleich = vergleiche(dokument, baseline, options["schwelle"])
+        regressionen = [zeile for zeile in vergleich if zeile[4]]
+        for schluessel, alt, neu, faktor, regression in vergleich:
+            text = f"{schluessel:<16} {alt * 1000:10.2f} ms → {neu * 1000:10.2f} ms  ×{faktor:.2f}"
+            self.stdout.write(self.style.ERROR(text) if regression else text)
+        if regressionen:
+            raise CommandError(
+                f"{len(regressionen)} Benchmark(s) mehr als {options['schwelle']:.0%} langsamer als die Baseline: "
+                + ", ".join(zeile[0] for zeile in regressionen)
+            )
+        self.stdout.write(self.style.SUCCESS(f"✅ Keine Regression gegenüber der Baseline ({len(vergleich)} Vergleiche)."))
+
+    def _zeile(self, ergebnis):
+        durchsatz = f"{ergebnis['durchsatz']:12.1f} {ergebnis['einheit']}" if ergebnis["durchsatz"] else ""
+        self.stdout.write(
+            f"{kennung(ergebnis):<16} Median {ergebnis['median_s'] * 1000:10.2f} ms  "
+            f"Min {ergebnis['min_s'] * 1000:10.2f} ms  {durchsatz}"
+        )
@@ -0,0 +1,101 @@
+# mylist/management/commands/import_all.py
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from mylist.referenzimport import (
+    IMPORTE,
+    erfasse_lauf,
+    finde_csv_dateien,
+    importiere,
+    inhalts_hash,
+    ist_unveraendert,
+    lese_parallel,
+    uebersprungen_text,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Importiert alle Referenztabellen (CSV-Dateien aus mylist/management/commands/csv/ "
+        "und klimadaten_full.csv) in einem Schritt: paralleles Einlesen, Schreiben in einer Transaktion"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prozesse", type=int, default=None,
+            help="Anzahl Prozesse zum Einlesen der CSV-Dateien (Standard: Anzahl CPU-Kerne, 1 = ohne Pool)",
+        )
+        parser.add_argument(
+            "--voll", action="store_true",
+            help="Tabellen komplett löschen und neu befüllen statt inkrementell abzugleichen",
+        )
+        parser.add_argument(
+            "--erzwingen", action="store_true",
+            help="Auch Tabellen abgleichen, deren CSV-Datei sich seit dem letzten Import nicht geändert hat",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        dateien, unbekannt = finde_csv_dateien()
+
+        for pfad in unbekannt:
+            self.stderr.write(self.style.WARNING(f"⚠ Keine Importdefinition für {pfad.name}, übersprungen."))
+        for name, tabelle in IMPORTE.items():
+            if name not in dateien:
+                self.stderr.write(self.style.WARNING(
+                    f"⚠ {tabelle.modellname}: CSV-Datei nicht gefunden ({tabelle.pfad}), übersprungen."
+                ))
+
+        # 1) Unveränderte Dateien aussortieren (nur Hash, kein Parsen)
+        voll = options["voll"]
+        auftraege, unveraendert = {}, []
+        pruefen = not voll and not options["erzwingen"]
+        for name, pfad in dateien.items():
+            inhalt = pfad.read_bytes()
+            if pruefen and ist_unveraendert(IMPORTE[name], inhalts_hash(IMPORTE[name], inhalt)):
+                unveraendert.append(name)
+                erfasse_lauf(IMPORTE[name], "unveraendert")
+            else:
+                auftraege[name] = (pfad, inhalt)
+
+        # 2) Parallel einlesen und prüfen
+        prozesse = options["prozesse"] or max(1, min(len(auftraege), os.cpu_count() or 1))
+        try:
+            gelesen = lese_parallel(auftraege, prozesse)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        # 3) In Abhängigkeitsreihenfolge in einer Transaktion schreiben
+        zeilen = []
+        with transaction.atomic():
+            for name, tabelle in IMPORTE.items():
+                if name in unveraendert:
+                    zeilen.append((tabelle.modellname, "–", "–", "–", "CSV-Datei unverändert"))
+                if name not in gelesen:
+                    continue
+                daten, lesezeit = gelesen[name]
+                if daten.uebersprungen:
+                    self.stderr.write(self.style.WARNING(f"⚠ {tabelle.modellname}: {uebersprungen_text(daten)}"))
+                schreibstart = time.perf_counter()
+                ergebnis = importiere(daten, voll=voll)
+                schreibzeit = time.perf_counter() - schreibstart
+                zeilen.append((
+                    tabelle.modellname, str(len(daten)),
+                    f"{lesezeit * 1000:.0f} ms", f"{schreibzeit * 1000:.0f} ms", ergebnis,
+                ))
+
+        kopf = ("Tabelle", "Zeilen", "Lesen", "Schreiben", "Ergebnis")
+        breiten = [max(len(z[i]) for z in [kopf] + zeilen) for i in range(4)]
+        for zeile in [kopf] + zeilen:
+            self.stdout.write("  ".join(
+                [zeile[0].ljust(breiten[0])] + [zeile[i].rjust(breiten[i]) for i in (1, 2, 3)] + [zeile[4]]
+            ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(gelesen)} Tabelle(n) importiert, {len(unveraendert)} unverändert "
+            f"({(time.perf_counter() - start) * 1000:.0f} ms, {prozesse} Prozess(e))."
+        ))
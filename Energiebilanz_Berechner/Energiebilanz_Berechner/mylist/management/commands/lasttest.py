@@ -0,0 +1,94 @@
+# mylist/management/commands/lasttest.py
+
+import json
+import socket
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mylist.lasttest import Lasttest
+
+
+class Command(BaseCommand):
+    help = (
+        "Lasttest des kompletten Wizards mit parallelen virtuellen Nutzern gegen einen "
+        "laufenden Server (--url) oder einen dafür gestarteten runserver (--starten)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Basis-URL des Servers (Standard: %(default)s)")
+        parser.add_argument(
+            "--starten", action="store_true",
+            help="runserver auf dem Port aus --url starten und am Ende beenden (sonst muss der Server bereits laufen)",
+        )
+        parser.add_argument("--nutzer", type=int, default=10, help="Parallele virtuelle Nutzer (Standard: %(default)s)")
+        parser.add_argument("--durchlaeufe", type=int, default=5, help="Wizard-Durchläufe pro Nutzer (Standard: %(default)s)")
+        parser.add_argument("--dauer", type=float, default=None, help="Laufzeit in Sekunden statt fester Durchläufe")
+        parser.add_argument("--denkzeit", type=float, default=1.0, help="Mittlere Denkzeit zwischen Schritten in s (Standard: %(default)s)")
+        parser.add_argument("--hochlauf", type=float, default=0.0, help="Nutzer gestaffelt über diese Sekunden starten")
+        parser.add_argument("--timeout", type=float, default=30.0, help="Timeout pro Anfrage in s (Standard: %(default)s)")
+        parser.add_argument("--ausgabe", help="Bericht zusätzlich als JSON in diese Datei schreiben")
+
+    def handle(self, *args, **options):
+        if options["nutzer"] < 1:
+            raise CommandError("--nutzer muss mindestens 1 sein")
+        server = self._starte_server(options["url"]) if options["starten"] else None
+        try:
+            lasttest = Lasttest(
+                options["url"],
+                nutzer=options["nutzer"],
+                durchlaeufe=options["durchlaeufe"],
+                dauer=options["dauer"],
+                denkzeit=options["denkzeit"],
+                hochlauf=options["hochlauf"],
+                timeout=options["timeout"],
+            )
+            bericht = lasttest.ausfuehren()
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+        self._ausgeben(bericht)
+        if options["ausgabe"]:
+            with open(options["ausgabe"], "w", encoding="utf-8") as datei:
+                json.dump(bericht, datei, indent=2, ensure_ascii=False)
+
+    def _starte_server(self, url):
+        host, _, port = url.split("://", 1)[-1].rstrip("/").partition(":")
+        port = int(port or 8000)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "django", "runserver", f"{host}:{port}", "--noreload"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        # Warten, bis der Port Verbindungen annimmt
+        frist = time.monotonic() + 30
+        while time.monotonic() < frist:
+            if server.poll() is not None:
+                raise CommandError("runserver wurde unerwartet beendet")
+            try:
+                socket.create_connection((host, port), timeout=1).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f"runserver auf {host}:{port} nicht erreichbar")
+
+    def _ausgeben(self, bericht):
+        self.stdout.write(
+            f"{bericht['nutzer']} Nutzer, {bericht['dauer_s']:.1f} s: "
+            f"{bericht['durchlaeufe']} Durchläufe ({bericht['durchlaeufe_pro_s']:.2f}/s), "
+            f"{bericht['anfragen']} Anfragen ({bericht['anfragen_pro_s']:.1f}/s), "
+            f"Fehlerquote {bericht['fehlerquote']:.1%}"
+        )
+        kopf = f"{'Schritt':<28} {'Anzahl':>7} {'Fehler':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+        self.stdout.write(kopf)
+        for schritt, werte in bericht["schritte"].items():
+            self.stdout.write(
+                f"{schritt:<28} {werte['anzahl']:>7} {werte['fehler']:>7} {werte['p50_ms']:>9.1f} "
+                f"{werte['p95_ms']:>9.1f} {werte['p99_ms']:>9.1f} {werte['max_ms']:>9.1f}"
+            )
+        for meldung, anzahl in bericht["fehler"].items():
+            self.stderr.write(self.style.WARNING(f"⚠ {anzahl}× {meldung}"))
@@ -0,0 +1,172 @@
+# mylist/messung.py
+
+"""
+Laufzeitmessung pro Request.
+
+`MessungMiddleware` misst für jede Anfrage die Gesamtzeit, Anzahl und Dauer
+der Datenbankabfragen (über `connection.execute_wrapper`), die Zeit in
+gemessenen Funktionen (Decorator `gemessen`, z. B. Rechenkette oder
+PDF-Erzeugung) und die Antwortgröße. Die Werte gehen
+
+  - als `Server-Timing`-Header an den Client (`MESSUNG_SERVER_TIMING`) und
+  - in ein rollierendes Aggregat pro URL-Name (die letzten
+    `MESSUNG_FENSTER` Anfragen), abrufbar über `statistik()`.
+
+Zusätzlich gehen Anfragen und jeder `gemessen`-Aufruf in die Metriken
+für /metrics (siehe metriken.py). Im Server-Timing werden verschachtelte
+Aufrufe derselben Kategorie (z. B. `berechne_bilanz` →
+`berechne_strombedarf`) nur einmal gezählt, in den Metriken erscheint
+jede Funktion mit ihrer eigenen Laufzeit.
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from functools import wraps
+
+import numpy as np
+from django.conf import settings
+from django.db import connections
+
+from .metriken import metriken
+
+
+_aktuell = contextvars.ContextVar("mylist_messung", default=None)
+
+
+class Messung:
+    """Messwerte einer Anfrage."""
+
+    __slots__ = ("abfragen", "db_zeit", "zeiten", "_aktiv")
+
+    def __init__(self):
+        self.abfragen = 0
+        self.db_zeit = 0.0
+        self.zeiten = {}
+        self._aktiv = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper für alle Datenbankabfragen des Requests
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_zeit += time.perf_counter() - start
+            self.abfragen += 1
+
+
+def gemessen(kategorie="berechnung"):
+    """
+    Decorator: addiert die Laufzeit der Funktion in der laufenden Messung
+    unter `kategorie` (erscheint als eigener Eintrag im Server-Timing).
+    """
+    def decorator(funktion):
+        @wraps(funktion)
+        def wrapper(*args, **kwargs):
+            messung = _aktuell.get()
+            aeusserer = messung is not None and kategorie not in messung._aktiv
+            if aeusserer:
+                messung._aktiv.add(kategorie)
+            start = time.perf_counter()
+            try:
+                return funktion(*args, **kwargs)
+            finally:
+                dauer = time.perf_counter() - start
+                metriken.beobachte(
+                    "mylist_funktion_dauer_sekunden", dauer, kategorie=kategorie, funktion=funktion.__name__
+                )
+                if aeusserer:
+                    messung._aktiv.discard(kategorie)
+                    messung.zeiten[kategorie] = messung.zeiten.get(kategorie, 0.0) + dauer
+        return wrapper
+    return decorator
+
+
+# — Rollierendes Aggregat —
+
+_fenster = {}
+_sperre = threading.Lock()
+
+
+def _erfasse(name, dauer):
+    werte = _fenster.get(name)
+    if werte is None:
+        with _sperre:
+            werte = _fenster.setdefault(name, deque(maxlen=getattr(settings, "MESSUNG_FENSTER", 1000)))
+    werte.append(dauer)
+
+
+def statistik():
+    """
+    URL-Name → {"anzahl", "p50", "p95", "p99"} (Millisekunden) über die
+    letzten `MESSUNG_FENSTER` Anfragen dieses Prozesses.
+    """
+    with _sperre:
+        fenster = {name: list(werte) for name, werte in _fenster.items()}
+    ergebnis = {}
+    for name, werte in sorted(fenster.items()):
+        if not werte:
+            continue
+        p50, p95, p99 = np.percentile(np.array(werte) * 1000, (50, 95, 99))
+        ergebnis[name] = {"anzahl": len(werte), "p50": p50, "p95": p95, "p99": p99}
+    return ergebnis
+
+
+def zuruecksetzen():
+    """Verwirft das Aggregat (z. B. zwischen Tests)."""
+    with _sperre:
+        _fenster.clear()
+
+
+# — Middleware —
+
+def _server_timing(gesamt, messung, groesse):
+    eintraege = [f"total;dur={gesamt * 1000:.1f}"]
+    if messung.abfragen:
+        eintraege.append(f'db;dur={messung.db_zeit * 1000:.1f};desc="{messung.abfragen} queries"')
+    for kategorie, dauer in messung.zeiten.items():
+        eintraege.append(f"{kategorie};dur={dauer * 1000:.1f}")
+    if groesse is not None:
+        eintraege.append(f'size;desc="{groesse} B"')
+    return ", ".join(eintraege)
+
+
+class MessungMiddleware:
+    """
+    Misst jede Anfrage (siehe Moduldokumentation). Sollte als erste
+    Middleware eingetragen sein, damit die Gesamtzeit alles umfasst.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "MESSUNG_AKTIV", True):
+            return self.get_response(request)
+
+        messung = Messung()
+        token = _aktuell.set(messung)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for verbindung in connections.all():
+                    stack.enter_context(verbindung.execute_wrapper(messung))
+                response = self.get_response(request)
+        finally:
+            _aktuell.reset(token)
+        gesamt = time.perf_counter() - start
+
+        match = getattr(request, "resolver_match", None)
+        url_name = match.url_name if match and match.url_name else "<unbekannt>"
+        _erfasse(url_name, gesamt)
+        metriken.zaehle(
+            "mylist_anfragen_total", url_name=url_name, methode=request.method, status=response.status_code
+        )
+        metriken.beobachte("mylist_anfrage_dauer_sekunden", gesamt, url_name=url_name)
+
+        if getattr(settings, "MESSUNG_SERVER_TIMING", True):
+            groesse = None if response.streaming else len(response.content)
+            response["Server-Timing"] = _server_timing(gesamt, messung, groesse)
+        return response
@@ -0,0 +1,262 @@
+# mylist/metriken.py
+
+"""
+Metriken im Prometheus-Textformat für den Endpunkt /metrics.
+
+Jeder Prozess sammelt Zähler, Histogramme und Messwerte (Gauges) in einer
+eigenen Registry (`metriken`). Quellen:
+
+  - Anfragen und Latenzen je URL-Name (MessungMiddleware, messung.py)
+  - Aufrufe und Laufzeiten der `@gemessen`-Funktionen, d. h. der
+    `berechne_*`-Funktionen und der PDF-Erzeugung
+  - Treffer/Fehlschläge des Referenzdaten- und des Ergebnis-Caches
+    (beim Schreiben eines Abzugs über `SAMMLER` abgefragt, kein Aufwand
+    im Lookup selbst)
+  - Läufe der Import-Befehle (referenzimport.py)
+
+Mehrere Prozesse (gunicorn-Worker, Management-Befehle): Ist
+`METRIKEN_VERZEICHNIS` gesetzt, schreibt jeder Prozess höchstens alle
+`METRIKEN_SCHREIBINTERVALL` Sekunden einen Abzug `<pid>.json` in dieses
+Verzeichnis (atomar per `os.replace`). /metrics fasst alle Abzüge
+zusammen: Zähler und Histogramme werden addiert, Gauges als Maximum
+übernommen. Ohne Verzeichnis liefert /metrics nur den eigenen Prozess.
+
+Abzüge, die länger als `METRIKEN_MAX_ALTER` Sekunden nicht erneuert
+wurden (beendete Worker), löscht /metrics beim Zusammenfassen. Ein noch
+laufender, aber so lange untätiger Prozess schreibt seinen Abzug beim
+nächsten Wert wieder vollständig. Schreibfehler (z. B. Verzeichnis nicht
+beschreibbar) werden protokolliert und lassen die Anfrage nicht scheitern.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+ZAEHLER = "counter"
+HISTOGRAMM = "histogram"
+GAUGE = "gauge"
+
+# Obergrenzen der Histogramm-Buckets in Sekunden
+LATENZ_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Name → (Typ, Beschreibung)
+DEFINITIONEN = {
+    "mylist_anfragen_total":                (ZAEHLER, "HTTP-Anfragen je URL-Name, Methode und Statuscode"),
+    "mylist_anfrage_dauer_sekunden":        (HISTOGRAMM, "Antwortzeit je URL-Name"),
+    "mylist_funktion_dauer_sekunden":       (HISTOGRAMM, "Laufzeit gemessener Funktionen (Rechenkette, PDF) je Kategorie und Funktion"),
+    "mylist_referenzdaten_zugriffe_total":  (ZAEHLER, "Zugriffe auf den Referenzdaten-Cache je Tabelle (treffer/fehlschlag)"),
+    "mylist_ergebniscache_zugriffe_total":  (ZAEHLER, "Zugriffe auf den Ergebnis-Cache (treffer/treffer_geteilt/fehlschlag)"),
+    "mylist_import_laeufe_total":           (ZAEHLER, "Import-Läufe je Tabelle und Art (voll/inkrementell/unveraendert)"),
+    "mylist_import_datensaetze_total":      (ZAEHLER, "Importierte Datensätze je Tabelle"),
+    "mylist_import_dauer_sekunden":         (HISTOGRAMM, "Schreibdauer eines Imports je Tabelle"),
+    "mylist_import_letzter_lauf_sekunden":  (GAUGE, "Zeitpunkt (Unix-Zeit) des letzten Imports je Tabelle"),
+    "mylist_referenzimport_datensaetze":    (GAUGE, "Datensätze je Referenztabelle laut letztem erfolgreichem Import (Datenbank)"),
+    "mylist_referenzimport_aktualisiert_sekunden": (GAUGE, "Zeitpunkt (Unix-Zeit) des letzten erfolgreichen Imports je Tabelle (Datenbank)"),
+}
+
+
+def _schluessel(labels):
+    return tuple(sorted((name, str(wert)) for name, wert in labels.items()))
+
+
+class Metriken:
+    """Registry eines Prozesses, siehe Moduldokumentation."""
+
+    def __init__(self):
+        self._werte = {}
+        self._sperre = threading.Lock()
+        self._naechstes_schreiben = 0.0
+
+    def zaehle(self, name, wert=1, **labels):
+        """Erhöht einen Zähler."""
+        schluessel = (name, _schluessel(labels))
+        with self._sperre:
+            self._werte[schluessel] = self._werte.get(schluessel, 0) + wert
+        self._vielleicht_schreiben()
+
+    def beobachte(self, name, sekunden, **labels):
+        """Trägt eine Dauer in ein Histogramm ein."""
+        schluessel = (name, _schluessel(labels))
+        with self._sperre:
+            histogramm = self._werte.get(schluessel)
+            if histogramm is None:
+                # [Anzahl je Bucket …, Anzahl > letzter Bucket, Summe]
+                histogramm = self._werte[schluessel] = [0] * (len(LATENZ_BUCKETS) + 1) + [0.0]
+            for i, grenze in enumerate(LATENZ_BUCKETS):
+                if sekunden <= grenze:
+                    break
+            else:
+                i = len(LATENZ_BUCKETS)
+            histogramm[i] += 1
+            histogramm[-1] += sekunden
+        self._vielleicht_schreiben()
+
+    def setze(self, name, wert, **labels):
+        """Setzt einen Messwert (Gauge)."""
+        with self._sperre:
+            self._werte[(name, _schluessel(labels))] = wert
+        self._vielleicht_schreiben()
+
+    # — Abzüge —
+
+    def abzug(self):
+        """Alle Werte dieses Prozesses inkl. `SAMMLER` als JSON-taugliche Liste."""
+        with self._sperre:
+            werte = [
+                [name, list(labels), list(wert) if isinstance(wert, list) else wert]
+                for (name, labels), wert in self._werte.items()
+            ]
+        for sammler in SAMMLER:
+            for name, labels, wert in sammler():
+                werte.append([name, list(_schluessel(labels)), wert])
+        return werte
+
+    def _vielleicht_schreiben(self):
+        if time.monotonic() >= self._naechstes_schreiben:
+            self.schreiben()
+
+    def schreiben(self):
+        """Schreibt den Abzug dieses Prozesses nach `METRIKEN_VERZEICHNIS` (falls gesetzt)."""
+        self._naechstes_schreiben = time.monotonic() + getattr(settings, "METRIKEN_SCHREIBINTERVALL", 5)
+        verzeichnis = getattr(settings, "METRIKEN_VERZEICHNIS", None)
+        if not verzeichnis:
+            return
+        verzeichnis = Path(verzeichnis)
+        try:
+            verzeichnis.mkdir(parents=True, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=verzeichnis, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as datei:
+                    json.dump(self.abzug(), datei)
+                os.replace(temp, verzeichnis / f"{os.getpid()}.json")
+            except OSError:
+                Path(temp).unlink(missing_ok=True)
+                raise
+        except OSError as fehler:
+            # Läuft innerhalb jeder Anfrage (MessungMiddleware): nur protokollieren
+            logger.warning("Metriken-Abzug nach %s nicht geschrieben: %s", verzeichnis, fehler)
+
+    def zuruecksetzen(self):
+        """Verwirft alle Werte dieses Prozesses (z. B. zwischen Tests)."""
+        with self._sperre:
+            self._werte.clear()
+
+
+def _zusammenfassen(abzuege):
+    """Addiert Zähler und Histogramme mehrerer Abzüge, Gauges als Maximum."""
+    summe = {}
+    for abzug in abzuege:
+        for name, labels, wert in abzug:
+            typ = DEFINITIONEN.get(name, (GAUGE,))[0]
+            schluessel = (name, tuple(tuple(paar) for paar in labels))
+            bisher = summe.get(schluessel)
+            if bisher is None:
+                summe[schluessel] = list(wert) if typ == HISTOGRAMM else wert
+            elif typ == HISTOGRAMM:
+                summe[schluessel] = [a + b for a, b in zip(bisher, wert)]
+            elif typ == ZAEHLER:
+                summe[schluessel] = bisher + wert
+            else:
+                summe[schluessel] = max(bisher, wert)
+    return summe
+
+
+def _alle_abzuege():
+    verzeichnis = getattr(settings, "METRIKEN_VERZEICHNIS", None)
+    if not verzeichnis:
+        return [metriken.abzug()]
+    metriken.schreiben()
+    abzuege = []
+    veraltet = time.time() - getattr(settings, "METRIKEN_MAX_ALTER", 3600)
+    for pfad in sorted(Path(verzeichnis).glob("*.json")):
+        try:
+            if pfad.stat().st_mtime < veraltet:
+                # Abzug eines beendeten Prozesses
+                pfad.unlink()
+                continue
+            abzuege.append(json.loads(pfad.read_text()))
+        except (OSError, ValueError):
+            # Datei wird gerade ersetzt oder ist unvollständig
+            continue
+    return abzuege
+
+
+def _labelwert(wert):
+    return str(wert).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labeltext(labels, extra=()):
+    paare = list(labels) + list(extra)
+    if not paare:
+        return ""
+    return "{" + ",".join(f'{name}="{_labelwert(wert)}"' for name, wert in paare) + "}"
+
+
+def _zahl(wert):
+    return repr(float(wert)) if isinstance(wert, float) else str(wert)
+
+
+def prometheus_text(zusaetzlich=()):
+    """
+    Alle Metriken (über alle Prozesse, siehe Moduldokumentation) im
+    Prometheus-Textformat 0.0.4. `zusaetzlich` sind weitere
+    (name, labels, wert)-Tupel, z. B. aus der Datenbank gelesene Gauges.
+    """
+    abzuege = _alle_abzuege()
+    abzuege.append([[name, list(_schluessel(labels)), wert] for name, labels, wert in zusaetzlich])
+    summe = _zusammenfassen(abzuege)
+
+    nach_name = {}
+    for (name, labels), wert in sorted(summe.items()):
+        nach_name.setdefault(name, []).append((labels, wert))
+
+    zeilen = []
+    for name, eintraege in nach_name.items():
+        typ, hilfe = DEFINITIONEN.get(name, (GAUGE, name))
+        zeilen.append(f"# HELP {name} {hilfe}")
+        zeilen.append(f"# TYPE {name} {typ}")
+        for labels, wert in eintraege:
+            if typ != HISTOGRAMM:
+                zeilen.append(f"{name}{_labeltext(labels)} {_zahl(wert)}")
+                continue
+            kumuliert = 0
+            for grenze, anzahl in zip(LATENZ_BUCKETS, wert):
+                kumuliert += anzahl
+                zeilen.append(f"{name}_bucket{_labeltext(labels, [('le', grenze)])} {kumuliert}")
+            anzahl = kumuliert + wert[len(LATENZ_BUCKETS)]
+            zeilen.append(f"{name}_bucket{_labeltext(labels, [('le', '+Inf')])} {anzahl}")
+            zeilen.append(f"{name}_sum{_labeltext(labels)} {_zahl(wert[-1])}")
+            zeilen.append(f"{name}_count{_labeltext(labels)} {anzahl}")
+    return "\n".join(zeilen) + "\n"
+
+
+# — Sammler: liefern beim Abzug (name, labels, wert) aus anderen Modulen —
+
+def _referenzdaten_zugriffe():
+    from .referenzdaten import referenzdaten
+    for tabelle, (treffer, fehlschlaege) in referenzdaten.statistik().items():
+        yield "mylist_referenzdaten_zugriffe_total", {"tabelle": tabelle, "ergebnis": "treffer"}, treffer
+        yield "mylist_referenzdaten_zugriffe_total", {"tabelle": tabelle, "ergebnis": "fehlschlag"}, fehlschlaege
+
+
+def _ergebniscache_zugriffe():
+    from .ergebniscache import ergebniscache
+    statistik = ergebniscache.statistik()
+    for ergebnis, zaehler in (("treffer", "treffer"), ("treffer_geteilt", "treffer_geteilt"), ("fehlschlag", "fehlschlaege")):
+        yield "mylist_ergebniscache_zugriffe_total", {"ergebnis": ergebnis}, statistik[zaehler]
+
+
+SAMMLER = [_referenzdaten_zugriffe, _ergebniscache_zugriffe]
+
+
+metriken = Metriken()
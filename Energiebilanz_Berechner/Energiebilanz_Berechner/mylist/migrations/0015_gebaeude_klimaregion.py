@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mylist', '0014_beleuchtung_waermequelle_gwpeingabe_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gebaeude',
+            name='klimaregion',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Klimaregion des Standorts (1 bis 15, Tabelle E.1); leer = Referenzklima Potsdam', null=True),
+        ),
+        migrations.AlterField(
+            model_name='gebaeude',
+            name='jahres_heizwert',
+            field=models.FloatField(default=0, help_text='Heizwärmebedarf absolut (kWh/Jahr); leer lassen für das Monatsbilanzverfahren'),
+        ),
+    ]
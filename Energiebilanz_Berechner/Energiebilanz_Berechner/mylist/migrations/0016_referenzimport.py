@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mylist', '0015_gebaeude_klimaregion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferenzImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tabelle', models.CharField(max_length=50, unique=True)),
+                ('datei_hash', models.CharField(help_text='SHA-256 über CSV-Inhalt und Spaltendefinition', max_length=64)),
+                ('datensaetze', models.PositiveIntegerField(default=0)),
+                ('aktualisiert', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
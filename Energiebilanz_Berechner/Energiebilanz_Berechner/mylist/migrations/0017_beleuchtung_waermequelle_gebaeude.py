@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mylist', '0016_referenzimport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='beleuchtung',
+            name='gebaeude',
+            field=models.ForeignKey(blank=True, help_text='Gebäude der Beleuchtungszone (leer bei Einträgen ohne Zuordnung)', null=True, on_delete=django.db.models.deletion.CASCADE, to='mylist.gebaeude'),
+        ),
+        migrations.AddField(
+            model_name='waermequelle',
+            name='gebaeude',
+            field=models.ForeignKey(blank=True, help_text='Gebäude der Wärmequelle (leer bei Einträgen ohne Zuordnung)', null=True, on_delete=django.db.models.deletion.CASCADE, to='mylist.gebaeude'),
+        ),
+    ]
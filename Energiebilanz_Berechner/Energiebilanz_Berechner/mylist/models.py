@@ -25,10 +25,15 @@ class Gebaeude(models.Model):
     breite_ow = models.FloatField(help_text="Breite Ost/West in m")
     geschosshoehe = models.FloatField(help_text="Geschosshöhe in m")
     geschosse = models.IntegerField(help_text="Anzahl Geschosse")
+    klimaregion = models.PositiveSmallIntegerField(
+        null=True, blank=True,
+        help_text="Klimaregion des Standorts (1 bis 15, Tabelle E.1); leer = Referenzklima Potsdam"
+    )
 
     # 2) Primäre Energiekennzahlen (Wizard-Schritt „Wärme“ / „Bauteile“)
     jahres_heizwert = models.FloatField(
-        help_text="Heizwärmebedarf absolut (kWh/Jahr)", default=0
+        help_text="Heizwärmebedarf absolut (kWh/Jahr); leer lassen für das Monatsbilanzverfahren",
+        default=0
     )
     tw_kwh_m2 = models.FloatField(
         help_text="Warmwasserbedarf in kWh/m² (spezifisch)", default=0
@@ -594,6 +599,10 @@ class Beleuchtung(models.Model):
     e_soll          = models.FloatField(help_text="Soll-Beleuchtungsstärke in W/m²")
     laufzeit_hd     = models.FloatField(help_text="Betriebsstunden pro Tag")
     laufzeit_da     = models.FloatField(help_text="Betriebstage pro Jahr")
+    gebaeude        = models.ForeignKey(
+        Gebaeude, on_delete=models.CASCADE, null=True, blank=True,
+        help_text="Gebäude der Beleuchtungszone (leer bei Einträgen ohne Zuordnung)"
+    )
 
     def __str__(self):
         return f"{self.get_bereich_display()} – {self.beleuchtungsart}"
@@ -604,6 +613,10 @@ class Waermequelle(models.Model):
     leistung_kw = models.FloatField(help_text="Nennleistung in kW")
     betrieb_hd  = models.FloatField(help_text="Betriebsstunden pro Tag")
     betrieb_da  = models.FloatField(help_text="Betriebstage pro Jahr")
+    gebaeude    = models.ForeignKey(
+        Gebaeude, on_delete=models.CASCADE, null=True, blank=True,
+        help_text="Gebäude der Wärmequelle (leer bei Einträgen ohne Zuordnung)"
+    )
 
     def __str__(self):
         return self.name
@@ -664,3 +677,18 @@ class GwpEingabe(models.Model):
     def __str__(self):
         return f"{self.gebaeude} / Var. {self.variante}"
 
+
+
+class ReferenzImport(models.Model):
+    """
+    Stand des letzten Imports je Referenztabelle (siehe referenzimport.py).
+    Über den Inhalts-Hash erkennt der inkrementelle Import unveränderte
+    CSV-Dateien und überspringt sie.
+    """
+    tabelle       = models.CharField(max_length=50, unique=True)
+    datei_hash    = models.CharField(max_length=64, help_text="SHA-256 über CSV-Inhalt und Spaltendefinition")
+    datensaetze   = models.PositiveIntegerField(default=0)
+    aktualisiert  = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.tabelle} ({self.datensaetze} Datensätze, {self.aktualisiert:%d.%m.%Y %H:%M})"
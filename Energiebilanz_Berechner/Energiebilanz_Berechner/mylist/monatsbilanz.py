@@ -0,0 +1,293 @@
+# mylist/monatsbilanz.py
+
+"""
+Monatsbilanzverfahren für den Heizwärmebedarf (angelehnt an DIN V 4108-6 /
+DIN V 18599-2).
+
+Pro Monat werden Transmissions- und Lüftungswärmeverluste sowie solare und
+interne Wärmegewinne bestimmt; die Gewinne gehen mit dem Ausnutzungsgrad η
+in die Bilanz ein. Alle Größen sind NumPy-Arrays mit den 12 Monaten in der
+letzten Achse, sodass dieselbe Funktion ein einzelnes Gebäude (z. B. bei
+jeder Eingabe im Wizard) oder tausende Varianten auf einmal rechnet.
+
+Klimadaten kommen aus `KlimaregionTemperatur` (Tabelle E.1) und
+`SolarStrahlungMonat` (Tabelle E.13).
+"""
+
+import numpy as np
+
+from .berechnungen import als_spalte, gebaeudedaten_arrays, runde
+from .messung import gemessen
+from .referenzdaten import MONATE_KLIMA, MONATE_STRAHLUNG, referenzdaten
+from .transmission import FASSADEN, berechne_h_t, huellflaechen
+
+
+# Monatsspalten der Tabelle E.1 (SolarStrahlungMonat verwendet 'maerz', siehe MONATE_STRAHLUNG)
+MONATE = MONATE_KLIMA
+
+TAGE_PRO_MONAT = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.float64)
+STUNDEN_PRO_MONAT = TAGE_PRO_MONAT * 24.0
+
+# Referenzklima nach DIN V 18599 (Potsdam), wenn keine Klimaregion gewählt ist
+REFERENZ_KLIMAREGION = 4
+
+# Flächen der Hüllfläche und die zugehörige Strahlungsrichtung (orientierung, neigung).
+# Tabelle E.13 liegt bisher nur für den Referenzort Fichtelberg vor und wird
+# für alle Klimaregionen verwendet.
+FLAECHEN_STRAHLUNG = {
+    "nord": ("Nord", 90),
+    "ost":  ("Ost", 90),
+    "sued": ("Süd", 90),
+    "west": ("West", 90),
+    "dach": ("horizontal", 0),
+}
+
+# Standardwerte (DIN V 4108-6 Anhang D bzw. GEG-Referenzgebäude), solange
+# keine genaueren Eingaben vorliegen
+STANDARDWERTE = {
+    "theta_i":        19.0,   # Innentemperatur (°C)
+    "q_i":            5.0,    # interne Wärmegewinne (W/m² NF)
+    "luftwechsel":    0.7,    # Luftwechselrate (1/h)
+    "wrg":            0.0,    # Wirkungsgrad Wärmerückgewinnung (0 … 1)
+    "u_wand":         0.28,   # W/(m²K)
+    "u_dach":         0.20,
+    "u_boden":        0.35,
+    "u_fenster":      1.30,
+    "fx_boden":       0.6,    # Temperaturkorrekturfaktor Bodenplatte
+    "delta_u_wb":     0.05,   # Wärmebrückenzuschlag (W/(m²K))
+    "g_wirksam":      0.6 * 0.9 * 0.7,   # g⊥ · F_S (Verschattung) · F_F (Rahmenanteil)
+    "fensteranteil":  0.2,    # Fensterflächenanteil der Fassaden
+    "fenster_dach":   0.0,    # Fensterflächenanteil des Dachs
+    "c_wirk":         50.0,   # wirksame Wärmespeicherfähigkeit (Wh/(m³K)), schwere Bauart
+}
+
+
+# Weitere optionale Eingaben ohne Standardwert (Rückfall in Klammern)
+ZUSATZEINGABEN = {
+    "fenster_nord": "Fensterflächenanteil Nordfassade (fensteranteil)",
+    "fenster_ost":  "Fensterflächenanteil Ostfassade (fensteranteil)",
+    "fenster_sued": "Fensterflächenanteil Südfassade (fensteranteil)",
+    "fenster_west": "Fensterflächenanteil Westfassade (fensteranteil)",
+    "u_wand_nord":  "U-Wert Nordwand (u_wand)",
+    "u_wand_ost":   "U-Wert Ostwand (u_wand)",
+    "u_wand_sued":  "U-Wert Südwand (u_wand)",
+    "u_wand_west":  "U-Wert Westwand (u_wand)",
+    "fx_wand":      "Temperaturkorrekturfaktor Außenwände (Tabelle Temperaturkorrekturfaktor)",
+    "fx_fenster":   "Temperaturkorrekturfaktor Fenster (Tabelle Temperaturkorrekturfaktor)",
+    "fx_dach":      "Temperaturkorrekturfaktor Dach (Tabelle Temperaturkorrekturfaktor)",
+    "h_t":          "Transmissionswärmetransferkoeffizient in W/K (aus den U-Werten)",
+}
+
+
+def lade_klimadaten(klimaregion=None):
+    """
+    Liefert Monatstemperaturen und Strahlungsintensitäten aus dem
+    Referenzdaten-Cache (siehe referenzdaten.py).
+
+    Argumente:
+    - klimaregion: Nummer der Klimaregion (1 bis 15); None → Referenzklima Potsdam
+
+    Rückgabe (Dictionary):
+    {
+      "theta_e":   Array (12,) mittlere Außentemperatur je Monat in °C,
+      "strahlung": Dict Fläche → Array (12,) Strahlungsintensität in W/m²
+                   (fehlende Tabellenzeilen → 0)
+    }
+
+    Wirft `LookupError`, wenn für die Klimaregion keine Temperaturen vorliegen.
+    """
+    region = klimaregion or REFERENZ_KLIMAREGION
+    klima = referenzdaten.klima(region)
+    if klima is None:
+        raise LookupError(f"Keine Klimadaten für Klimaregion {region} vorhanden")
+
+    strahlung = {}
+    for flaeche, (orientierung, neigung) in FLAECHEN_STRAHLUNG.items():
+        werte = referenzdaten.strahlung(orientierung, neigung)
+        strahlung[flaeche] = np.zeros(12) if werte is None else np.nan_to_num(werte)
+
+    return {
+        "theta_e":   klima["temperaturen"],
+        "strahlung": strahlung,
+    }
+
+
+def _ausnutzungsgrad(gamma, a):
+    """Ausnutzungsgrad der Wärmegewinne η = (1 − γ^a) / (1 − γ^(a+1)); für γ = 1: a / (a + 1)."""
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        eta = (1.0 - gamma ** a) / (1.0 - gamma ** (a + 1.0))
+    eta = np.where(np.isclose(gamma, 1.0), a / (a + 1.0), eta)
+    return np.where(gamma > 0, eta, 1.0)
+
+
+@gemessen()
+def berechne_heizwaerme_monatlich(klima, laenge, breite, geschosshoehe, anz_geschosse, **eingaben):
+    """
+    Berechnet den monatlichen Heizwärmebedarf für ein oder viele Gebäude.
+
+    Argumente:
+    - klima: Dictionary aus `lade_klimadaten(...)`; "theta_e" darf auch die
+      Form (n, 12) haben, wenn die Gebäude in verschiedenen Regionen liegen
+    - laenge, breite, geschosshoehe, anz_geschosse: Geometrie wie in
+      `berechne_gebaeudedaten` (Skalar oder Array der Länge n)
+    - **eingaben: optionale Werte aus `STANDARDWERTE` und `ZUSATZEINGABEN`,
+      jeweils Skalar oder Array der Länge n
+
+    Rückgabe (Dictionary, Monatswerte als Array (n, 12) in kWh):
+    {
+      "h_t", "h_v":         Wärmetransferkoeffizienten in W/K (n,),
+      "volumen", "nf":      Bruttovolumen in m³ und Nutzfläche in m² (n,),
+      "a_fenster":          Dict Fläche aus `FLAECHEN_STRAHLUNG` → Fensterfläche in m² (n,),
+      "q_t", "q_v":         Transmissions- und Lüftungswärmeverluste,
+      "q_s", "q_i":         solare und interne Wärmegewinne,
+      "eta":                Ausnutzungsgrad der Gewinne (n, 12),
+      "q_h":                Heizwärmebedarf je Monat,
+      "q_h_jahr":           Jahres-Heizwärmebedarf in kWh (n,), gerundet auf 2 Nachkommastellen
+    }
+    """
+    unbekannt = set(eingaben) - set(STANDARDWERTE) - set(ZUSATZEINGABEN)
+    if unbekannt:
+        raise ValueError(f"Unbekannte Eingaben: {', '.join(sorted(unbekannt))}")
+
+    def wert(name, standard=None):
+        return als_spalte(eingaben.get(name, STANDARDWERTE.get(name, standard)))
+
+    gebaeudedaten = gebaeudedaten_arrays(
+        als_spalte(laenge), als_spalte(breite), als_spalte(geschosshoehe), als_spalte(anz_geschosse)
+    )
+    volumen, nf = gebaeudedaten["volumen"], gebaeudedaten["nf"]
+
+    # 1) Hüllflächen und Fensterflächen (transmission.py)
+    fensteranteil = wert("fensteranteil")
+    flaechen = huellflaechen(
+        laenge, breite, geschosshoehe, anz_geschosse,
+        {**{name: wert(f"fenster_{name}", fensteranteil) for name in FASSADEN}, "dach": wert("fenster_dach")},
+    )
+    fenster = flaechen["fenster"]
+
+    # 2) Transmission H_T = Σ U·A·Fx + ΔU_WB · A_ges (Fx aus `Temperaturkorrekturfaktor`)
+    if "h_t" in eingaben:
+        h_t = wert("h_t")
+    else:
+        u_wand = wert("u_wand")
+        h_t = berechne_h_t(
+            flaechen,
+            {name: wert(f"u_wand_{name}", u_wand) for name in FASSADEN},
+            wert("u_dach"), wert("u_boden"), wert("u_fenster"), wert("delta_u_wb"),
+            fx={"boden": wert("fx_boden"),
+                **{name: wert(f"fx_{name}") for name in ("wand", "fenster", "dach") if f"fx_{name}" in eingaben}},
+        )["h_t"]
+
+    # 3) Lüftung H_V = ρ·c · n · V (0,34 Wh/(m³K), Nettovolumen = 0,8 · V_e)
+    h_v = 0.34 * wert("luftwechsel") * (1.0 - wert("wrg")) * 0.8 * volumen
+
+    # Monatsachse: Gebäudewerte (n,) → (n, 1), Klimawerte (12,) bzw. (n, 12)
+    theta_e = np.atleast_2d(np.asarray(klima["theta_e"], dtype=np.float64))
+    delta_theta = wert("theta_i")[:, None] - theta_e
+    kwh = STUNDEN_PRO_MONAT / 1000.0
+
+    q_t = h_t[:, None] * delta_theta * kwh
+    q_v = h_v[:, None] * delta_theta * kwh
+
+    # 4) Gewinne
+    g = wert("g_wirksam")[:, None]
+    strahlung = klima["strahlung"]
+    q_s = sum(
+        fenster[name][:, None] * g * np.asarray(strahlung[name], dtype=np.float64)
+        for name in FLAECHEN_STRAHLUNG
+    ) * kwh
+    q_i = (wert("q_i") * nf)[:, None] * kwh
+
+    # 5) Ausnutzungsgrad über die Zeitkonstante τ = C_wirk / H
+    h = h_t + h_v
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tau = np.where(h > 0, wert("c_wirk") * volumen / h, 0.0)
+    a = 1.0 + tau[:, None] / 16.0
+
+    q_l = q_t + q_v
+    q_g = q_s + q_i
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = np.where(q_l > 0, q_g / q_l, np.inf)
+    eta = _ausnutzungsgrad(gamma, a)
+
+    q_h = np.where(q_l > 0, np.maximum(q_l - eta * q_g, 0.0), 0.0)
+
+    return {
+        "h_t":      h_t,
+        "h_v":      h_v,
+        "volumen":  volumen,
+        "nf":       nf,
+        "a_fenster": fenster,
+        "q_t":      q_t,
+        "q_v":      q_v,
+        "q_s":      q_s,
+        "q_i":      q_i,
+        "eta":      eta,
+        "q_h":      q_h,
+        "q_h_jahr": runde(q_h.sum(axis=1)),
+    }
+
+
+@gemessen()
+def berechne_jahres_heizwaermebedarf(klima, laenge, breite, geschosshoehe, anz_geschosse, **eingaben):
+    """
+    Skalar-Variante von `berechne_heizwaerme_monatlich` für ein Gebäude.
+
+    Rückgabe (Dictionary):
+    {
+      "q_h_jahr":   Jahres-Heizwärmebedarf in kWh (gerundet auf 2 Nachkommastellen),
+      "q_h_monate": Liste der 12 Monatswerte in kWh (gerundet auf 2 Nachkommastellen),
+    }
+    """
+    ergebnis = berechne_heizwaerme_monatlich(
+        klima, laenge, breite, geschosshoehe, anz_geschosse, **eingaben
+    )
+    return {
+        "q_h_jahr":   float(ergebnis["q_h_jahr"][0]),
+        "q_h_monate": runde(ergebnis["q_h"][0]).tolist(),
+    }
+
+
+def heizwaerme_fuer_gebaeude(gebaeude, bauteil=None, q_i=None):
+    """
+    Jahres-Heizwärmebedarf (kWh) für ein `Gebaeude` nach dem Monatsbilanzverfahren.
+
+    Liegt ein `Bauteil` aus dem Wizard vor, werden dessen U-Werte und
+    Lüftungsangaben verwendet, sonst die `STANDARDWERTE`. `q_i` ersetzt die
+    pauschalen internen Gewinne (W/m² NF, z. B. aus interne_gewinne.py).
+    """
+    eingaben = {}
+    if bauteil is not None:
+        eingaben.update(bauteil_eingaben(bauteil))
+    if q_i is not None:
+        eingaben["q_i"] = q_i
+
+    klima = lade_klimadaten(gebaeude.klimaregion)
+    return berechne_jahres_heizwaermebedarf(
+        klima,
+        gebaeude.laenge_ns,
+        gebaeude.breite_ow,
+        gebaeude.geschosshoehe,
+        gebaeude.geschosse,
+        **eingaben,
+    )["q_h_jahr"]
+
+
+def bauteil_eingaben(bauteil):
+    """Übernimmt die gesetzten U-Werte und Lüftungsangaben eines `Bauteil` als Eingaben der Monatsbilanz."""
+    eingaben = {}
+    for richtung in ("nord", "ost", "sued", "west"):
+        u_wert = getattr(bauteil, f"u_wand_{richtung}")
+        if u_wert is not None:
+            eingaben[f"u_wand_{richtung}"] = u_wert
+    if bauteil.u_dach is not None:
+        eingaben["u_dach"] = bauteil.u_dach
+    if bauteil.u_bodenplatte is not None:
+        eingaben["u_boden"] = bauteil.u_bodenplatte
+    if bauteil.luftwechselrate is not None:
+        eingaben["luftwechsel"] = bauteil.luftwechselrate
+    if bauteil.wrg_wirkungsgrad is not None:
+        eingaben["wrg"] = bauteil.wrg_wirkungsgrad / 100.0
+    if bauteil.raum_temp_soll is not None:
+        eingaben["theta_i"] = bauteil.raum_temp_soll
+    return eingaben
@@ -0,0 +1,183 @@
+# mylist/parameterstudie.py
+
+"""
+Parameterstudien über viele Gebäudevarianten (/api/berechnung/studie/).
+
+Eine Studie besteht aus Achsen (je Eingabespalte aus `BATCH_EINGABEN` eine
+Liste von Werten) und festen Werten für die übrigen Spalten. Untersucht
+wird das kartesische Produkt aller Achsen; es wird nie vollständig
+aufgebaut, sondern blockweise über den flachen Index erzeugt
+(`np.unravel_index`) und mit `berechne_bilanz_batch` gerechnet. Die
+Reihenfolge ist zeilenweise (C-Ordnung): die letzte Achse läuft am
+schnellsten.
+
+Ergebnisse gibt es spaltenweise (`spalten`) oder, für sehr große Studien,
+nur als Reduktion je Zielgröße (`reduziere`: Minimum, Maximum und die
+Parameter, bei denen sie auftreten).
+"""
+
+import math
+
+import numpy as np
+
+from .berechnungen import BATCH_EINGABEN, BATCH_ERGEBNISSE, berechne_bilanz_batch
+
+
+# Alle Ergebnisspalten der Batch-Berechnung, mögliche Zielgrößen einer Studie
+ZIELGROESSEN = tuple(spalte for spalten in BATCH_ERGEBNISSE.values() for spalte in spalten)
+
+# Standardgröße der Rechenblöcke (Varianten pro Aufruf von berechne_bilanz_batch)
+STANDARD_BLOCKGROESSE = 100_000
+
+
+def achsenwerte(angabe, hoechstens=None):
+    """
+    Wandelt eine Achsenangabe in ein float64-Array um:
+    - Liste von Werten: [10, 20, 30]
+    - Bereich mit Anzahl Punkten (inkl. Endpunkt): {"von": 10, "bis": 50, "schritte": 5}
+    - Bereich mit Schrittweite (inkl. Endpunkt, falls getroffen): {"von": 10, "bis": 50, "schritt": 10}
+
+    Ungültige Angaben und Achsen mit mehr als `hoechstens` Werten lösen
+    ValueError aus.
+    """
+    werte = _achsenwerte(angabe, hoechstens)
+    if hoechstens is not None and len(werte) > hoechstens:
+        raise ValueError(f"Höchstens {hoechstens} Werte pro Achse")
+    return werte
+
+
+def _achsenwerte(angabe, hoechstens):
+    if isinstance(angabe, dict):
+        unbekannt = set(angabe) - {"von", "bis", "schritte", "schritt"}
+        if unbekannt:
+            raise ValueError(f"Unbekannte Angaben: {', '.join(sorted(unbekannt))}")
+        try:
+            von, bis = _zahl(angabe["von"]), _zahl(angabe["bis"])
+        except KeyError:
+            raise ValueError("Bereich braucht 'von' und 'bis'")
+        if ("schritte" in angabe) == ("schritt" in angabe):
+            raise ValueError("Bereich braucht genau eine der Angaben 'schritte' oder 'schritt'")
+        if "schritte" in angabe:
+            schritte = _zahl(angabe["schritte"])
+            if not schritte.is_integer() or schritte < 1:
+                raise ValueError("'schritte' muss eine ganze Zahl >= 1 sein")
+            if hoechstens is not None and schritte > hoechstens:
+                raise ValueError(f"Höchstens {hoechstens} Werte pro Achse")
+            return np.linspace(von, bis, int(schritte))
+        schritt = _zahl(angabe["schritt"])
+        if schritt <= 0 or bis < von:
+            raise ValueError("'schritt' muss > 0 und 'bis' >= 'von' sein")
+        # Toleranz, damit z. B. 0.1 … 0.3 in Schritten von 0.1 den Endpunkt enthält
+        anzahl = math.floor((bis - von) / schritt * (1 + 1e-12) + 1e-9) + 1
+        if hoechstens is not None and anzahl > hoechstens:
+            raise ValueError(f"Höchstens {hoechstens} Werte pro Achse")
+        return np.round(von + schritt * np.arange(anzahl), 10)
+
+    if isinstance(angabe, (list, tuple)):
+        if not angabe:
+            raise ValueError("Leere Werteliste")
+        return np.array([_zahl(wert) for wert in angabe], dtype=np.float64)
+
+    return np.array([_zahl(angabe)], dtype=np.float64)
+
+
+def _zahl(wert):
+    if isinstance(wert, bool) or wert is None:
+        raise ValueError(f"Ungültiger Wert: {wert!r}")
+    try:
+        zahl = float(wert)
+    except (TypeError, ValueError):
+        raise ValueError(f"Ungültiger Wert: {wert!r}")
+    if not math.isfinite(zahl):
+        raise ValueError(f"Ungültiger Wert: {wert!r}")
+    return zahl
+
+
+class Parameterstudie:
+    """
+    Kartesisches Produkt der `achsen` (Spalte → Werte) bei festen Werten
+    `feste` (Spalte → Skalar) für die übrigen Eingabespalten.
+    """
+
+    def __init__(self, achsen, feste=None):
+        self.achsen = {name: np.atleast_1d(np.asarray(werte, dtype=np.float64)) for name, werte in achsen.items()}
+        self.feste = dict(feste or {})
+
+        unbekannt = (set(self.achsen) | set(self.feste)) - set(BATCH_EINGABEN)
+        if unbekannt:
+            raise ValueError(f"Unbekannte Spalten: {', '.join(sorted(unbekannt))}")
+        doppelt = set(self.achsen) & set(self.feste)
+        if doppelt:
+            raise ValueError(f"Spalten sowohl als Achse als auch fest angegeben: {', '.join(sorted(doppelt))}")
+        for name, standard in BATCH_EINGABEN.items():
+            if standard is None and name not in self.achsen and name not in self.feste:
+                raise ValueError(f"Pflichtspalte '{name}' fehlt für die Parameterstudie")
+        for name, werte in self.achsen.items():
+            if werte.ndim != 1 or not len(werte):
+                raise ValueError(f"Achse '{name}' braucht mindestens einen Wert")
+
+        self.form = tuple(len(werte) for werte in self.achsen.values())
+        self.anzahl = math.prod(self.form)
+
+    def parameter(self, index):
+        """Werte aller Achsen für den flachen Index `index`."""
+        positionen = np.unravel_index(index, self.form) if self.form else ()
+        return {name: float(werte[i]) for (name, werte), i in zip(self.achsen.items(), positionen)}
+
+    def bloecke(self, blockgroesse=STANDARD_BLOCKGROESSE):
+        """
+        Generator über (start, ergebnis): `ergebnis` ist das Ergebnis von
+        `berechne_bilanz_batch` für die Varianten start … start + Blockgröße.
+        """
+        for start in range(0, self.anzahl, blockgroesse):
+            index = np.arange(start, min(start + blockgroesse, self.anzahl))
+            positionen = np.unravel_index(index, self.form) if self.form else ()
+            spalten = {name: werte[i] for (name, werte), i in zip(self.achsen.items(), positionen)}
+            # Feste Werte bleiben Skalare und werden in der Batch-Berechnung gebroadcastet
+            yield start, berechne_bilanz_batch(spalten, **self.feste)
+
+    def spalten(self, ziele=ZIELGROESSEN, blockgroesse=STANDARD_BLOCKGROESSE):
+        """Alle Varianten: Dict Zielgröße → float64-Array der Länge `anzahl`."""
+        _pruefe_ziele(ziele)
+        ergebnis = {ziel: np.empty(self.anzahl, dtype=np.float64) for ziel in ziele}
+        for start, block in self.bloecke(blockgroesse):
+            for ziel in ziele:
+                ergebnis[ziel][start:start + len(block[ziel])] = block[ziel]
+        return ergebnis
+
+    def reduziere(self, ziele=ZIELGROESSEN, blockgroesse=STANDARD_BLOCKGROESSE):
+        """
+        Minimum und Maximum je Zielgröße, ohne alle Varianten zu behalten.
+
+        Rückgabe: {ziel: {"min", "max", "argmin", "argmax"}}; argmin/argmax
+        sind {"index": flacher Index, "parameter": Achsenwerte}. Bei
+        gleichen Werten zählt die erste Variante.
+        """
+        _pruefe_ziele(ziele)
+        bester = {ziel: [math.inf, -1, -math.inf, -1] for ziel in ziele}   # min, argmin, max, argmax
+        for start, block in self.bloecke(blockgroesse):
+            for ziel in ziele:
+                werte = block[ziel]
+                stand = bester[ziel]
+                i = int(np.argmin(werte))
+                if werte[i] < stand[0]:
+                    stand[0], stand[1] = float(werte[i]), start + i
+                i = int(np.argmax(werte))
+                if werte[i] > stand[2]:
+                    stand[2], stand[3] = float(werte[i]), start + i
+
+        return {
+            ziel: {
+                "min":    kleinster,
+                "max":    groesster,
+                "argmin": {"index": argmin, "parameter": self.parameter(argmin)},
+                "argmax": {"index": argmax, "parameter": self.parameter(argmax)},
+            }
+            for ziel, (kleinster, argmin, groesster, argmax) in bester.items()
+        }
+
+
+def _pruefe_ziele(ziele):
+    unbekannt = set(ziele) - set(ZIELGROESSEN)
+    if unbekannt:
+        raise ValueError(f"Unbekannte Zielgrößen: {', '.join(sorted(unbekannt))}")
@@ -0,0 +1,35 @@
+# mylist/prozesspool.py
+
+"""
+Prozesspools für rechenintensive Aufgaben (paralleles Einlesen der
+Referenz-CSVs in referenzimport.py, Bewertung in huellenoptimierung.py).
+
+Bei "fork" erben die Kindprozesse die geladenen Apps, bei "spawn" (macOS,
+Windows) und "forkserver" starten sie ohne; `prozess_start` richtet Django
+dort vor der ersten Aufgabe ein. Geerbte Datenbankverbindungen werden
+vor dem Start des Pools geschlossen.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.db import connections
+
+
+def prozess_start():
+    """Initializer der Pool-Prozesse: lädt die Apps, wenn sie noch nicht bereit sind."""
+    if not apps.ready:
+        import django
+        django.setup()
+
+
+def prozesspool(prozesse):
+    """
+    `ProcessPoolExecutor` mit `prozesse` Workern und `prozess_start` als
+    Initializer. Offene Verbindungen außerhalb einer Transaktion werden
+    vorher geschlossen, damit kein Kindprozess sie weiterverwendet.
+    """
+    for verbindung in connections.all(initialized_only=True):
+        if not verbindung.in_atomic_block:
+            verbindung.close()
+    return ProcessPoolExecutor(max_workers=prozesse, initializer=prozess_start)
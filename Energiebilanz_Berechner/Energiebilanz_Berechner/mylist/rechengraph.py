@@ -0,0 +1,295 @@
+# mylist/rechengraph.py
+
+"""
+Inkrementelle Neuberechnung der Rechenkette als Abhängigkeitsgraph
+(/api/berechnung/live/).
+
+Die Bilanz ist ein gerichteter azyklischer Graph benannter Größen:
+Eingaben (Spalten aus `BATCH_EINGABEN`) und abgeleitete Knoten, deren
+Funktion die Werte ihrer Abhängigkeiten bekommt (`BILANZ_KNOTEN`, gerechnet
+mit den Skalarfunktionen aus berechnungen.py, also mit denselben
+Ergebnissen wie `berechne_bilanz`).
+
+Jeder Knoten merkt sich seinen Wert, die Revision seiner letzten Änderung
+und die Revision, zu der er zuletzt geprüft wurde. `setze()` erhöht die
+Revision nur für tatsächlich geänderte Eingaben; beim nächsten Abruf werden
+nur Knoten neu gerechnet, von deren Abhängigkeiten sich eine geändert hat.
+Liefert ein Knoten trotzdem denselben Wert (z. B. NF bei geänderter
+Geschosshöhe), bleibt seine Änderungsrevision stehen und die Knoten
+dahinter werden nicht neu gerechnet.
+
+`MODELL_KNOTEN` ersetzt die Eingaben für Heizwärmebedarf, Luftförderung
+und Beleuchtung durch Knoten der Monatsbilanz (monatsbilanz.py), der
+Lüftungsbilanz (lueftungsbilanz.py) und der internen Gewinne
+(interne_gewinne.py); deren Eingaben stehen in `MODELL_EINGABEN`. Weitere
+Teile (z. B. GWP) werden mit `eingabe()` und `definiere()` angehängt.
+Knotenwerte müssen sich mit `==` vergleichen lassen (NumPy-Arrays, auch in
+Dicts, werden elementweise verglichen).
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+
+from .berechnungen import (
+    BATCH_EINGABEN,
+    BATCH_ERGEBNISSE,
+    berechne_gebaeudedaten,
+    berechne_nutzenergiebedarf,
+    berechne_strombedarf,
+    berechne_waermebedarf,
+    berechne_endenergiebedarf,
+)
+from .interne_gewinne import (
+    BELEUCHTUNG_SPALTEN,
+    WAERMEQUELLEN_SPALTEN,
+    berechne_interne_gewinne,
+    eintragsspalten,
+)
+from .lueftungsbilanz import berechne_lueftung
+from .monatsbilanz import REFERENZ_KLIMAREGION, berechne_jahres_heizwaermebedarf, lade_klimadaten
+
+
+def _nf(gebaeudedaten):
+    return gebaeudedaten["nf"]
+
+
+# Abgeleitete Knoten der Bilanz: Name → (Funktion, Abhängigkeiten). Die
+# Blöcke heißen wie in `BATCH_ERGEBNISSE`; "nf" ist ein eigener Knoten,
+# damit Änderungen, die die Nutzfläche nicht berühren, dort enden.
+BILANZ_KNOTEN = {
+    "gebaeudedaten": (berechne_gebaeudedaten, ("laenge", "breite", "geschosshoehe", "anz_geschosse")),
+    "nf":            (_nf, ("gebaeudedaten",)),
+    "nutzenergie":   (berechne_nutzenergiebedarf, (
+        "nf", "jahres_heizwaermebedarf_kwh", "trinkwarmwasser_kwh_pro_m2",
+        "luftfoerderung_kwh_pro_m2", "beleuchtung_kwh_pro_m2", "nutzer_pro_m2",
+    )),
+    "strombedarf":   (berechne_strombedarf, (
+        "nf", "trinkwarmwasser_kwh_pro_m2", "luftfoerderung_kwh_pro_m2",
+        "beleuchtung_kwh_pro_m2", "nutzer_pro_m2",
+    )),
+    "waermebedarf":  (berechne_waermebedarf, (
+        "jahres_heizwaermebedarf_kwh", "verteilungsverlust_kwh", "speicherverlust_kwh", "warmwasserbedarf_kwh",
+    )),
+    "endenergie":    (berechne_endenergiebedarf, ("nf", "strombedarf", "waermebedarf")),
+}
+
+
+def _interne_gewinne(nf, beleuchtung, waermequellen):
+    # Wie im Wizard: ohne Einträge gelten die pauschalen Gewinne der Monatsbilanz
+    if not beleuchtung and not waermequellen:
+        return None
+    ergebnis = berechne_interne_gewinne(
+        nf,
+        beleuchtung=eintragsspalten(beleuchtung, BELEUCHTUNG_SPALTEN),
+        waermequellen=eintragsspalten(waermequellen, WAERMEQUELLEN_SPALTEN),
+    )
+    ergebnis.pop("gewinne_monate")
+    return {name: float(werte[0]) for name, werte in ergebnis.items()}
+
+
+def _beleuchtung(interne_gewinne):
+    return interne_gewinne["beleuchtung_spezifisch"] if interne_gewinne else 0.0
+
+
+def _heizwaerme(klima, laenge, breite, geschosshoehe, anz_geschosse, interne_gewinne, monatsbilanz):
+    eingaben = dict(monatsbilanz)
+    if interne_gewinne:
+        eingaben.setdefault("q_i", interne_gewinne["q_i"])
+    return berechne_jahres_heizwaermebedarf(klima, laenge, breite, geschosshoehe, anz_geschosse, **eingaben)
+
+
+def _q_h_jahr(heizwaerme):
+    return heizwaerme["q_h_jahr"]
+
+
+def _lueftung(klima, laenge, breite, geschosshoehe, anz_geschosse, lueftung):
+    return berechne_lueftung(klima, laenge, breite, geschosshoehe, anz_geschosse, **lueftung)
+
+
+def _luftfoerderung(lueftungsbilanz):
+    return lueftungsbilanz["ventilator_spezifisch"]
+
+
+# Eingaben der Modellknoten mit Standardwerten: Zusatzwerte der Monatsbilanz
+# (`STANDARDWERTE`/`ZUSATZEINGABEN`) und der Lüftung (`LUEFTUNG_EINGABEN`)
+# als Dict, Beleuchtungs- und Wärmequellen-Einträge als Folge von Dicts mit
+# den Spalten aus interne_gewinne.py.
+MODELL_EINGABEN = {
+    "klimaregion":   REFERENZ_KLIMAREGION,
+    "monatsbilanz":  {},
+    "lueftung":      {},
+    "beleuchtung":   (),
+    "waermequellen": (),
+}
+
+_GEOMETRIE = ("laenge", "breite", "geschosshoehe", "anz_geschosse")
+
+# Bilanz mit Monatsbilanz, Lüftung und Beleuchtung: die drei Eingaben
+# jahres_heizwaermebedarf_kwh, luftfoerderung_kwh_pro_m2 und
+# beleuchtung_kwh_pro_m2 werden zu Knoten. Reihenfolge: Abhängigkeiten zuerst.
+MODELL_KNOTEN = {
+    "gebaeudedaten":               BILANZ_KNOTEN["gebaeudedaten"],
+    "nf":                          BILANZ_KNOTEN["nf"],
+    "klima":                       (lade_klimadaten, ("klimaregion",)),
+    "interne_gewinne":             (_interne_gewinne, ("nf", "beleuchtung", "waermequellen")),
+    "beleuchtung_kwh_pro_m2":      (_beleuchtung, ("interne_gewinne",)),
+    "heizwaerme":                  (_heizwaerme, ("klima", *_GEOMETRIE, "interne_gewinne", "monatsbilanz")),
+    "jahres_heizwaermebedarf_kwh": (_q_h_jahr, ("heizwaerme",)),
+    "lueftungsbilanz":             (_lueftung, ("klima", *_GEOMETRIE, "lueftung")),
+    "luftfoerderung_kwh_pro_m2":   (_luftfoerderung, ("lueftungsbilanz",)),
+    **BILANZ_KNOTEN,
+}
+
+
+def _gleich(alt, neu):
+    if isinstance(alt, np.ndarray) or isinstance(neu, np.ndarray):
+        return np.array_equal(alt, neu)
+    if isinstance(alt, dict) and isinstance(neu, dict):
+        return alt.keys() == neu.keys() and all(_gleich(alt[name], neu[name]) for name in alt)
+    return alt == neu
+
+
+class Rechengraph:
+    """
+    Memoisierter Abhängigkeitsgraph, siehe Moduldokumentation.
+
+    Ohne Argumente enthält er die Eingaben aus `BATCH_EINGABEN` (mit ihren
+    Standardwerten; Pflichteingaben müssen vor dem ersten Abruf gesetzt
+    werden) und die Knoten aus `BILANZ_KNOTEN`. Standardwerte für Namen,
+    die ein Knoten berechnet, entfallen, z. B. für das vollständige Modell:
+
+        Rechengraph(standardwerte={**BATCH_EINGABEN, **MODELL_EINGABEN}, knoten=MODELL_KNOTEN)
+    """
+
+    def __init__(self, eingaben=None, standardwerte=BATCH_EINGABEN, knoten=BILANZ_KNOTEN):
+        self._revision = 0
+        self._eingaben = {}    # Name → [Wert, geändert in Revision]
+        self._knoten = {}      # Name → (Funktion, Abhängigkeiten)
+        self._stand = {}       # Name → [Wert, geändert in Revision, geprüft in Revision]
+        self.neu_berechnet = []
+        for name, standard in standardwerte.items():
+            if name not in knoten:
+                self.eingabe(name, standard)
+        for name, (funktion, abhaengigkeiten) in knoten.items():
+            self.definiere(name, funktion, abhaengigkeiten)
+        if eingaben:
+            self.setze(**eingaben)
+
+    def eingabe(self, name, standard=None):
+        """Fügt eine Eingabe hinzu (None = Pflichteingabe ohne Standardwert)."""
+        self._pruefe_neu(name)
+        self._eingaben[name] = [standard, self._revision]
+
+    def definiere(self, name, funktion, abhaengigkeiten):
+        """
+        Fügt einen abgeleiteten Knoten hinzu. Abhängigkeiten müssen bereits
+        existieren; Zyklen sind damit ausgeschlossen.
+        """
+        self._pruefe_neu(name)
+        unbekannt = [abh for abh in abhaengigkeiten if abh not in self._eingaben and abh not in self._knoten]
+        if unbekannt:
+            raise ValueError(f"Unbekannte Abhängigkeiten von '{name}': {', '.join(unbekannt)}")
+        self._knoten[name] = (funktion, tuple(abhaengigkeiten))
+
+    def _pruefe_neu(self, name):
+        if name in self._eingaben or name in self._knoten:
+            raise ValueError(f"Knoten '{name}' existiert bereits")
+
+    def setze(self, **eingaben):
+        """
+        Setzt Eingaben. Rückgabe ist die Liste der Eingaben, deren Wert sich
+        tatsächlich geändert hat; `neu_berechnet` wird zurückgesetzt.
+        """
+        unbekannt = set(eingaben) - set(self._eingaben)
+        if unbekannt:
+            raise ValueError(f"Unbekannte Eingaben: {', '.join(sorted(unbekannt))}")
+        geaendert = [name for name, wert in eingaben.items() if not _gleich(self._eingaben[name][0], wert)]
+        if geaendert:
+            self._revision += 1
+            for name in geaendert:
+                self._eingaben[name] = [eingaben[name], self._revision]
+        self.neu_berechnet = []
+        return geaendert
+
+    def wert(self, name):
+        """Aktueller Wert einer Eingabe oder eines Knotens (rechnet nur, was veraltet ist)."""
+        if name not in self._eingaben and name not in self._knoten:
+            raise KeyError(name)
+        return self._aktualisiere(name)[0]
+
+    def _aktualisiere(self, name):
+        if name in self._eingaben:
+            eintrag = self._eingaben[name]
+            if eintrag[0] is None:
+                raise ValueError(f"Pflichteingabe '{name}' fehlt")
+            return eintrag
+
+        eintrag = self._stand.get(name)
+        if eintrag is not None and eintrag[2] == self._revision:
+            return eintrag
+        funktion, abhaengigkeiten = self._knoten[name]
+        werte = [self._aktualisiere(abh) for abh in abhaengigkeiten]
+        if eintrag is not None and all(abh[1] <= eintrag[2] for abh in werte):
+            eintrag[2] = self._revision
+            return eintrag
+
+        wert = funktion(*(abh[0] for abh in werte))
+        self.neu_berechnet.append(name)
+        if eintrag is not None and _gleich(eintrag[0], wert):
+            # Gleicher Wert: Änderungsrevision bleibt, Nachfolger bleiben gültig
+            eintrag[2] = self._revision
+        else:
+            eintrag = self._stand[name] = [wert, self._revision, self._revision]
+        return eintrag
+
+    def ergebnis(self):
+        """Blöcke wie bei `berechne_bilanz` (jeweils eine eigene Kopie)."""
+        return {block: dict(self.wert(block)) for block in BATCH_ERGEBNISSE}
+
+
+class LiveSitzungen:
+    """
+    Rechengraphen laufender Live-Berechnungen eines Prozesses, LRU mit
+    `LIVE_SITZUNGEN` Einträgen. Neue Sitzungen starten mit allen Eingaben 0
+    (wie fehlende Parameter bei /api/berechnung/).
+    """
+
+    def __init__(self):
+        self._graphen = OrderedDict()
+        self._sperre = threading.Lock()
+
+    def rechne(self, sitzung, eingaben):
+        """
+        Setzt die geänderten `eingaben` im Graphen der Sitzung und rechnet.
+
+        Rückgabe: (sitzung, neu, ergebnis, neu_berechnet); `neu` ist True,
+        wenn die Sitzung unbekannt war (abgelaufen oder anderer Prozess) und
+        ein neuer Graph angelegt wurde — dann fehlen dem Graphen alle zuvor
+        gesendeten Eingaben.
+        """
+        groesse = getattr(settings, "LIVE_SITZUNGEN", 1000)
+        with self._sperre:
+            graph = self._graphen.get(sitzung) if sitzung else None
+            neu = graph is None
+            if neu:
+                sitzung = uuid.uuid4().hex
+                graph = Rechengraph(standardwerte=dict.fromkeys(BATCH_EINGABEN, 0.0))
+            graph.setze(**eingaben)
+            ergebnis = graph.ergebnis()
+            if groesse > 0:
+                self._graphen[sitzung] = graph
+                self._graphen.move_to_end(sitzung)
+                while len(self._graphen) > groesse:
+                    self._graphen.popitem(last=False)
+            return sitzung, neu, ergebnis, list(graph.neu_berechnet)
+
+    def leeren(self):
+        with self._sperre:
+            self._graphen.clear()
+
+
+live_sitzungen = LiveSitzungen()
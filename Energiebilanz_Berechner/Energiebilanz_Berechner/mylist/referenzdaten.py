@@ -0,0 +1,213 @@
+# mylist/referenzdaten.py
+
+"""
+Prozessweiter Zwischenspeicher für die Referenztabellen (Klimadaten,
+Strahlung, Sonnenschutz, Sonneneintragskennwerte, Fx-Faktoren,
+Druckverluste).
+
+Jede Tabelle wird beim ersten Zugriff einmal pro Prozess geladen und als
+kompakter Index (Dict, Monatswerte als schreibgeschützte NumPy-Arrays)
+gehalten. Änderungen über das ORM invalidieren den Index per
+`post_save`/`post_delete` (siehe signals.py), die `import_*`-Befehle
+invalidieren ihn am Ende explizit.
+
+Damit auch andere Prozesse (z. B. mehrere gunicorn-Worker nach einem
+Import) neu laden, wird bei jeder Invalidierung zusätzlich ein
+Versionsstempel im Django-Cache gesetzt. Jeder Prozess vergleicht ihn
+höchstens alle `REFERENZDATEN_PRUEFINTERVALL` Sekunden; dafür muss ein
+gemeinsam genutzter Cache (Memcached, Redis, Datenbank) konfiguriert sein.
+"""
+
+import threading
+import time
+import uuid
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+
+VERSION_CACHE_KEY = "mylist:referenzdaten:version"
+
+MONATE_KLIMA = ("jan", "feb", "maer", "apr", "mai", "jun", "jul", "aug", "sep", "okt", "nov", "dez")
+MONATE_STRAHLUNG = ("jan", "feb", "maerz", "apr", "mai", "jun", "jul", "aug", "sep", "okt", "nov", "dez")
+
+
+def _monatswerte(werte):
+    array = np.array([np.nan if w is None else w for w in werte], dtype=np.float64)
+    array.setflags(write=False)
+    return array
+
+
+def strahlung_schluessel(orientierung, neigung):
+    """Normalisierter Schlüssel (orientierung, neigung) für die Strahlungstabelle, z. B. ('süd', 90)."""
+    return orientierung.strip().lower(), int(str(neigung).strip().rstrip("°"))
+
+
+def _lade_klima():
+    from .models import KlimaregionTemperatur
+    return {
+        region: {
+            "referenzort":  referenzort,
+            "temperaturen": _monatswerte(werte),
+            "jahreswert":   jahreswert,
+        }
+        for region, referenzort, jahreswert, *werte in KlimaregionTemperatur.objects.values_list(
+            "region", "referenzort", "jahreswert", *MONATE_KLIMA
+        )
+    }
+
+
+def _lade_strahlung():
+    from .models import SolarStrahlungMonat
+    return {
+        strahlung_schluessel(orientierung, neigung): {
+            "strahlung":  _monatswerte(werte),
+            "jahreswert": jahreswert,
+        }
+        for orientierung, neigung, jahreswert, *werte in SolarStrahlungMonat.objects.values_list(
+            "orientierung", "neigung", "jahreswert", *MONATE_STRAHLUNG
+        )
+    }
+
+
+def _lade_sonnenschutz():
+    from .models import SonnenschutzFaktor
+    return {
+        zeile["zeile"]: zeile
+        for zeile in SonnenschutzFaktor.objects.values(
+            "id", "zeile", "sonnenschutzvorrichtung",
+            "f_c_g_le_0_40_zweifach", "f_c_g_le_0_40_dreifach", "f_c_g_gt_0_40_zweifach",
+        )
+    }
+
+
+def _lade_sonneneintrag():
+    from .models import SonneneintragsKennwert
+    return {
+        zeile["kennwert_key"]: zeile
+        for zeile in SonneneintragsKennwert.objects.values(
+            "typ", "kennwert_key", "beschreibung", "bauart",
+            "wohng_A", "wohng_B", "wohng_C", "nw_A", "nw_B", "nw_C",
+        )
+    }
+
+
+def _lade_temperaturkorrektur():
+    from .models import Temperaturkorrekturfaktor
+    return dict(Temperaturkorrekturfaktor.objects.values_list("bauteil", "fx"))
+
+
+def _lade_druckverlust():
+    from .models import DruckverlustBauteil
+    return dict(DruckverlustBauteil.objects.values_list("bauteil", "druckverlust_pa"))
+
+
+# Tabellenname → (Modellname, Ladefunktion)
+TABELLEN = {
+    "klima":               ("KlimaregionTemperatur", _lade_klima),
+    "strahlung":           ("SolarStrahlungMonat", _lade_strahlung),
+    "sonnenschutz":        ("SonnenschutzFaktor", _lade_sonnenschutz),
+    "sonneneintrag":       ("SonneneintragsKennwert", _lade_sonneneintrag),
+    "temperaturkorrektur": ("Temperaturkorrekturfaktor", _lade_temperaturkorrektur),
+    "druckverlust":        ("DruckverlustBauteil", _lade_druckverlust),
+}
+
+
+class Referenzdaten:
+    """
+    Registry der geladenen Referenztabellen eines Prozesses.
+
+    Die Indizes sind nach dem Laden unveränderlich und werden bei einer
+    Invalidierung komplett ersetzt, Leser brauchen daher keine Sperre.
+    """
+
+    def __init__(self):
+        self._tabellen = {}
+        self._sperre = threading.Lock()
+        self._version = None
+        self._naechste_pruefung = 0.0
+        # Tabelle → [Treffer, Fehlschläge]; ohne Sperre gezählt, da nur Statistik
+        self._zaehler = {name: [0, 0] for name in TABELLEN}
+
+    # — Zugriff —
+
+    def tabelle(self, name):
+        """Gibt den kompletten Index einer Tabelle aus `TABELLEN` zurück."""
+        self._pruefe_version()
+        index = self._tabellen.get(name)
+        if index is None:
+            with self._sperre:
+                index = self._tabellen.get(name)
+                if index is None:
+                    self._zaehler[name][1] += 1
+                    index = self._tabellen[name] = TABELLEN[name][1]()
+                    return index
+        self._zaehler[name][0] += 1
+        return index
+
+    def klima(self, region):
+        """Klimaregion → {"referenzort", "temperaturen" (12,), "jahreswert"} oder None."""
+        return self.tabelle("klima").get(region)
+
+    def strahlung(self, orientierung, neigung):
+        """(orientierung, neigung) → Strahlungsintensität je Monat (12,) in W/m² oder None."""
+        zeile = self.tabelle("strahlung").get(strahlung_schluessel(orientierung, neigung))
+        return None if zeile is None else zeile["strahlung"]
+
+    def sonnenschutz(self, zeile):
+        """Zeilennummer (z. B. '3.1.2') → Fc-Werte als Dict oder None."""
+        return self.tabelle("sonnenschutz").get(zeile)
+
+    def sonneneintrag(self, kennwert_key):
+        """kennwert_key → Zeile der S1–S6-Tabelle als Dict oder None."""
+        return self.tabelle("sonneneintrag").get(kennwert_key)
+
+    def fx(self, bauteil):
+        """Bauteilbezeichnung → Temperaturkorrekturfaktor Fx oder None."""
+        return self.tabelle("temperaturkorrektur").get(bauteil)
+
+    def druckverlust(self, bauteil):
+        """Bauteilbezeichnung → Druckverlust in Pa oder None."""
+        return self.tabelle("druckverlust").get(bauteil)
+
+    def statistik(self):
+        """Tabelle → (Treffer, Fehlschläge) der Zugriffe über `tabelle()` in diesem Prozess."""
+        return {name: tuple(zaehler) for name, zaehler in self._zaehler.items()}
+
+    # — Invalidierung —
+
+    def invalidieren(self, name=None):
+        """
+        Verwirft eine Tabelle (oder alle bei `name=None`) in diesem Prozess
+        und setzt einen neuen Versionsstempel für die übrigen Prozesse.
+        """
+        with self._sperre:
+            if name is None:
+                self._tabellen = {}
+            else:
+                self._tabellen.pop(name, None)
+            self._version = uuid.uuid4().hex
+            cache.set(VERSION_CACHE_KEY, self._version, None)
+
+    def _pruefe_version(self):
+        jetzt = time.monotonic()
+        if jetzt < self._naechste_pruefung:
+            return
+        self._naechste_pruefung = jetzt + getattr(settings, "REFERENZDATEN_PRUEFINTERVALL", 30)
+        version = cache.get(VERSION_CACHE_KEY)
+        if version != self._version:
+            with self._sperre:
+                self._tabellen = {}
+                self._version = version
+
+
+def tabelle_fuer_modell(modell):
+    """Name der Referenztabelle zu einer Modellklasse oder None."""
+    for name, (modellname, _lader) in TABELLEN.items():
+        if modell.__name__ == modellname:
+            return name
+    return None
+
+
+referenzdaten = Referenzdaten()
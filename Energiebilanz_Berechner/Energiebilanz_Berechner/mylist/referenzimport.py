@@ -0,0 +1,487 @@
+# mylist/referenzimport.py
+
+"""
+Gemeinsamer Bulk-Loader für die Referenztabellen der `import_*`-Befehle.
+
+Jede Tabelle ist als `ImportTabelle` beschrieben (CSV-Datei, Encoding,
+Spaltenzuordnung, Typen, natürlicher Schlüssel). `lese_csv()` liest die
+Datei einmal mit pandas ein und prüft bzw. konvertiert jede Spalte
+vektorisiert; `schreibe_tabelle()` ersetzt den Tabelleninhalt mit
+`bulk_create` innerhalb einer Transaktion, sodass Leser nie eine halb
+leere Tabelle sehen.
+
+Der Standardweg der Befehle ist der inkrementelle Abgleich `abgleichen()`:
+Über den Inhalts-Hash (Modell `ReferenzImport`) werden unveränderte Dateien
+übersprungen, sonst werden Zeilen über ihren natürlichen Schlüssel und
+einen Zeilen-Hash verglichen und nur Einfügungen, Änderungen und
+Löschungen geschrieben. Primärschlüssel bleiben so stabil, was für
+PROTECT-Fremdschlüssel (z. B. `SonneneintragsParameter.sonnenschutzart`)
+nötig ist.
+
+`import_all` liest alle Dateien über `lese_parallel()` in einem Prozesspool
+ein und schreibt sie anschließend in einer gemeinsamen Transaktion.
+"""
+
+import hashlib
+import io
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from django.db.models import ProtectedError
+
+from .metriken import metriken
+from .prozesspool import prozesspool
+from .referenzdaten import MONATE_KLIMA, MONATE_STRAHLUNG, referenzdaten
+
+
+CSV_VERZEICHNIS = Path(__file__).resolve().parent / "management" / "commands" / "csv"
+
+# Datensätze pro INSERT-Statement bei bulk_create
+BULK_BATCHGROESSE = 500
+
+TEXT = "text"
+ZAHL = "zahl"
+GANZZAHL = "ganzzahl"
+
+
+def _projektverzeichnis():
+    # Verzeichnis mit manage.py
+    return settings.BASE_DIR
+
+
+class Spalte:
+    """Zuordnung CSV-Spalte → Modellfeld mit Typ und Pflichtangabe."""
+
+    def __init__(self, feld, typ=TEXT, csv=None, pflicht=True):
+        self.feld = feld
+        self.typ = typ
+        self.csv = csv or feld
+        self.pflicht = pflicht
+
+
+class ImportTabelle:
+    """Beschreibung einer importierbaren Referenztabelle."""
+
+    def __init__(self, name, modell, datei, spalten, schluessel, encoding="utf-8-sig", verzeichnis=None):
+        self.name = name                # Tabellenname wie in referenzdaten.TABELLEN
+        self.modellname = modell
+        self.datei = datei
+        self.spalten = spalten
+        self.schluessel = schluessel    # natürlicher Schlüssel (Tupel von Feldnamen)
+        self.encoding = encoding
+        self._verzeichnis = verzeichnis
+
+    @property
+    def modell(self):
+        return apps.get_model("mylist", self.modellname)
+
+    @property
+    def pfad(self):
+        verzeichnis = self._verzeichnis() if self._verzeichnis else CSV_VERZEICHNIS
+        return Path(verzeichnis) / self.datei
+
+
+class Importdaten:
+    """Ergebnis von `lese_csv()`: gültige Datensätze und übersprungene CSV-Zeilen."""
+
+    def __init__(self, tabelle, datensaetze, uebersprungen, datei_hash):
+        self.tabelle = tabelle
+        self.datensaetze = datensaetze      # Liste von Feld-Dicts
+        self.uebersprungen = uebersprungen  # Zeilennummern der CSV (1 = Kopfzeile)
+        self.datei_hash = datei_hash        # siehe inhalts_hash()
+
+    def __len__(self):
+        return len(self.datensaetze)
+
+
+# Reihenfolge = Importreihenfolge (abhängige Tabellen zuletzt)
+IMPORTE = {
+    tabelle.name: tabelle
+    for tabelle in (
+        ImportTabelle(
+            "klima", "KlimaregionTemperatur", "klimadaten_full.csv",
+            [Spalte("region", GANZZAHL), Spalte("referenzort")]
+            + [Spalte(monat, ZAHL) for monat in MONATE_KLIMA]
+            + [Spalte("jahreswert", ZAHL)],
+            schluessel=("region",),
+            verzeichnis=_projektverzeichnis,
+        ),
+        ImportTabelle(
+            "strahlung", "SolarStrahlungMonat", "solarstrahlung_fichtelberg.csv",
+            [Spalte("orientierung", csv="orientation"), Spalte("neigung", GANZZAHL)]
+            + [Spalte(monat, GANZZAHL) for monat in MONATE_STRAHLUNG]
+            + [Spalte("jahreswert", GANZZAHL)],
+            schluessel=("orientierung", "neigung"),
+        ),
+        ImportTabelle(
+            "sonnenschutz", "SonnenschutzFaktor", "sonnenschutzfaktor.csv",
+            [
+                Spalte("zeile"),
+                Spalte("sonnenschutzvorrichtung"),
+                Spalte("f_c_g_le_0_40_zweifach", ZAHL),
+                Spalte("f_c_g_le_0_40_dreifach", ZAHL),
+                Spalte("f_c_g_gt_0_40_zweifach", ZAHL),
+            ],
+            schluessel=("zeile",),
+        ),
+        ImportTabelle(
+            "sonneneintrag", "SonneneintragsKennwert", "sonneneintragskennwerte.csv",
+            [
+                Spalte("typ"),
+                Spalte("kennwert_key"),
+                Spalte("beschreibung"),
+                Spalte("bauart", pflicht=False),
+            ]
+            + [Spalte(f, ZAHL, pflicht=False) for f in ("wohng_A", "wohng_B", "wohng_C", "nw_A", "nw_B", "nw_C")],
+            schluessel=("kennwert_key",),
+        ),
+        ImportTabelle(
+            "temperaturkorrektur", "Temperaturkorrekturfaktor", "temperaturkorrekturfaktoren.csv",
+            [Spalte("bauteil", csv="Bauteil"), Spalte("fx", ZAHL, csv="Fx")],
+            schluessel=("bauteil",),
+            encoding="latin-1",
+        ),
+        ImportTabelle(
+            "druckverlust", "DruckverlustBauteil", "bauteil_druckverlust.csv",
+            [Spalte("bauteil"), Spalte("druckverlust_pa", GANZZAHL)],
+            schluessel=("bauteil",),
+        ),
+    )
+}
+
+
+# ————— Einlesen —————
+
+def inhalts_hash(tabelle, inhalt):
+    """SHA-256 über Spaltendefinition und CSV-Inhalt (Bytes) einer Tabelle."""
+    h = hashlib.sha256(repr([(s.feld, s.typ, s.csv, s.pflicht) for s in tabelle.spalten]).encode())
+    h.update(inhalt)
+    return h.hexdigest()
+
+
+def zeilen_hash(werte):
+    """Hash über die Feldwerte eines Datensatzes (in Spaltenreihenfolge)."""
+    return hashlib.sha1(repr(tuple(werte)).encode()).digest()
+
+
+def _als_objekte(werte, gueltig):
+    """Pandas-Spalte → Objekt-Array mit Python-Werten, None für fehlende Werte."""
+    return np.where(gueltig, werte.to_numpy(dtype=object), None)
+
+
+def lese_csv(tabelle, pfad=None, inhalt=None):
+    """
+    Liest die CSV-Datei einer `ImportTabelle` und gibt `Importdaten` zurück.
+
+    Alle Spalten werden als Text gelesen (damit z. B. die Zeilennummer '2.10'
+    nicht zu 2.1 wird) und anschließend spaltenweise konvertiert: Zahlen mit
+    Dezimalkomma sind erlaubt, Ganzzahlen müssen ganzzahlig sein. Die Werte
+    haben danach den Python-Typ des Modellfelds. Zeilen mit ungültigen oder
+    fehlenden Pflichtwerten werden übersprungen, ebenso Kommentarzeilen ('#'
+    im ersten Schlüsselfeld). Bei doppelten Schlüsseln gilt die letzte
+    Zeile. Fehlende Spalten führen zu einem ValueError.
+
+    `inhalt` sind die bereits gelesenen Bytes der Datei (optional).
+    """
+    pfad = Path(pfad) if pfad else tabelle.pfad
+    if inhalt is None:
+        inhalt = pfad.read_bytes()
+    df = pd.read_csv(io.BytesIO(inhalt), dtype=str, keep_default_na=False, encoding=tabelle.encoding)
+    df.columns = df.columns.str.strip()
+
+    fehlend = [s.csv for s in tabelle.spalten if s.csv not in df.columns]
+    if fehlend:
+        raise ValueError(f"{pfad.name}: Spalten fehlen: {', '.join(fehlend)}")
+
+    modell = tabelle.modell
+    zeilennummern = np.arange(2, len(df) + 2)
+    ungueltig = np.zeros(len(df), dtype=bool)
+    spalten = {}
+
+    for spalte in tabelle.spalten:
+        roh = df[spalte.csv].str.strip()
+        leer = roh.eq("").to_numpy()
+
+        if spalte.typ == TEXT:
+            spalten[spalte.feld] = _als_objekte(roh, ~leer)
+            fehler = np.zeros(len(df), dtype=bool)
+        else:
+            zahl = pd.to_numeric(roh.str.replace(",", ".", regex=False), errors="coerce").to_numpy(dtype=np.float64)
+            fehler = np.isnan(zahl) & ~leer
+            if spalte.typ == GANZZAHL:
+                fehler |= ~np.isnan(zahl) & (zahl != np.round(zahl))
+                zahl_feld = pd.Series(np.nan_to_num(zahl).astype(np.int64))
+            else:
+                zahl_feld = pd.Series(zahl)
+
+            feld = modell._meta.get_field(spalte.feld)
+            if isinstance(feld, models.CharField):
+                werte = zahl_feld.astype(str)
+            elif isinstance(feld, models.FloatField):
+                werte = zahl_feld.astype(np.float64)
+            else:
+                werte = zahl_feld
+            spalten[spalte.feld] = _als_objekte(werte, ~np.isnan(zahl))
+
+        if spalte.pflicht:
+            fehler |= leer
+        ungueltig |= fehler
+
+    erste = next(s for s in tabelle.spalten if s.feld == tabelle.schluessel[0])
+    kommentar = df[erste.csv].str.strip().str.startswith("#").to_numpy()
+    behalten = ~ungueltig & ~kommentar
+
+    # Doppelte Schlüssel: die letzte Zeile gewinnt
+    doppelt = np.zeros(len(df), dtype=bool)
+    doppelt[behalten] = pd.DataFrame(
+        {f: spalten[f][behalten] for f in tabelle.schluessel}
+    ).duplicated(keep="last").to_numpy()
+    behalten &= ~doppelt
+
+    felder = list(spalten)
+    datensaetze = [dict(zip(felder, zeile)) for zeile in zip(*(spalten[f][behalten] for f in felder))]
+    uebersprungen = zeilennummern[(ungueltig & ~kommentar) | doppelt].tolist()
+    return Importdaten(tabelle, datensaetze, uebersprungen, inhalts_hash(tabelle, inhalt))
+
+
+# ————— Schreiben —————
+
+def ist_unveraendert(tabelle, datei_hash):
+    """True, wenn der letzte Import dieser Tabelle denselben Inhalts-Hash hatte."""
+    from .models import ReferenzImport
+    return ReferenzImport.objects.filter(tabelle=tabelle.name, datei_hash=datei_hash).exists()
+
+
+def _abschliessen(daten, geaendert=True):
+    """Merkt den Inhalts-Hash und invalidiert den Referenzdaten-Cache (sofort und nach dem Commit)."""
+    from .models import ReferenzImport
+    name = daten.tabelle.name
+    ReferenzImport.objects.update_or_create(
+        tabelle=name, defaults={"datei_hash": daten.datei_hash, "datensaetze": len(daten)}
+    )
+    if geaendert:
+        # bulk_create/bulk_update lösen keine post_save-Signale aus
+        referenzdaten.invalidieren(name)
+        transaction.on_commit(lambda: referenzdaten.invalidieren(name))
+
+
+def schreibe_tabelle(daten, batch_size=BULK_BATCHGROESSE):
+    """
+    Ersetzt den Inhalt der Tabelle durch `daten` (Ergebnis von `lese_csv`).
+
+    Löschen und Einfügen laufen in einer Transaktion. Gibt die Zahl der
+    Datensätze zurück.
+    """
+    modell = daten.tabelle.modell
+    objekte = [modell(**datensatz) for datensatz in daten.datensaetze]
+
+    with transaction.atomic():
+        modell.objects.all().delete()
+        modell.objects.bulk_create(objekte, batch_size=batch_size)
+        _abschliessen(daten)
+
+    return len(objekte)
+
+
+def abgleichen(daten, batch_size=BULK_BATCHGROESSE):
+    """
+    Gleicht die Tabelle inkrementell mit `daten` ab: Zeilen werden über den
+    natürlichen Schlüssel zugeordnet und per Zeilen-Hash verglichen; nur neue
+    Zeilen werden eingefügt, geänderte aktualisiert (Primärschlüssel bleiben
+    erhalten) und fehlende gelöscht, alles in einer Transaktion.
+
+    Gibt die Anzahlen {"neu", "geaendert", "geloescht", "unveraendert"}
+    zurück. Wird eine zu löschende Zeile noch referenziert (PROTECT), bricht
+    der Abgleich mit `ProtectedError` ab.
+    """
+    tabelle = daten.tabelle
+    modell = tabelle.modell
+    felder = [s.feld for s in tabelle.spalten]
+    schluessel_index = [felder.index(f) for f in tabelle.schluessel]
+
+    bestand = {}
+    for pk, *werte in modell.objects.values_list("pk", *felder):
+        bestand[tuple(werte[i] for i in schluessel_index)] = (pk, zeilen_hash(werte))
+
+    neu, geaendert = [], []
+    for datensatz in daten.datensaetze:
+        werte = [datensatz[f] for f in felder]
+        vorhanden = bestand.pop(tuple(werte[i] for i in schluessel_index), None)
+        if vorhanden is None:
+            neu.append(modell(**datensatz))
+        elif vorhanden[1] != zeilen_hash(werte):
+            geaendert.append(modell(pk=vorhanden[0], **datensatz))
+    geloescht = [pk for pk, _hash in bestand.values()]
+
+    with transaction.atomic():
+        if geloescht:
+            modell.objects.filter(pk__in=geloescht).delete()
+        if geaendert:
+            modell.objects.bulk_update(
+                geaendert, [f for f in felder if f not in tabelle.schluessel], batch_size=batch_size
+            )
+        if neu:
+            modell.objects.bulk_create(neu, batch_size=batch_size)
+        _abschliessen(daten, geaendert=bool(neu or geaendert or geloescht))
+
+    return {
+        "neu":          len(neu),
+        "geaendert":    len(geaendert),
+        "geloescht":    len(geloescht),
+        "unveraendert": len(daten) - len(neu) - len(geaendert),
+    }
+
+
+# ————— Paralleles Einlesen (import_all) —————
+
+def finde_csv_dateien():
+    """
+    Ordnet die CSV-Dateien in `CSV_VERZEICHNIS` und im Projektverzeichnis
+    den Einträgen in `IMPORTE` zu. Gibt ({tabellenname: pfad}, [unbekannte
+    CSV-Dateien]) zurück; Tabellen ohne Datei fehlen im Dict.
+    """
+    nach_datei = {tabelle.datei: tabelle for tabelle in IMPORTE.values()}
+    gefunden, unbekannt = {}, []
+    for pfad in sorted(CSV_VERZEICHNIS.glob("*.csv")):
+        tabelle = nach_datei.get(pfad.name)
+        if tabelle is None:
+            unbekannt.append(pfad)
+        else:
+            gefunden[tabelle.name] = pfad
+    for tabelle in IMPORTE.values():
+        if tabelle.name not in gefunden and tabelle.pfad.is_file():
+            gefunden[tabelle.name] = tabelle.pfad
+    return {name: gefunden[name] for name in IMPORTE if name in gefunden}, unbekannt
+
+
+def _lese_auftrag(name, pfad, inhalt):
+    start = time.perf_counter()
+    daten = lese_csv(IMPORTE[name], pfad, inhalt)
+    return daten, time.perf_counter() - start
+
+
+def lese_parallel(auftraege, prozesse=None):
+    """
+    Liest mehrere CSV-Dateien in einem Prozesspool ein.
+
+    `auftraege` ist {tabellenname: (pfad, inhalt)}; Rückgabe ist
+    {tabellenname: (Importdaten, Sekunden)} in derselben Reihenfolge. Mit
+    `prozesse=1` (oder nur einer Datei) wird im aktuellen Prozess gelesen.
+    Ein ValueError beim Einlesen wird an den Aufrufer weitergereicht.
+    """
+    if prozesse == 1 or len(auftraege) <= 1:
+        return {name: _lese_auftrag(name, *auftrag) for name, auftrag in auftraege.items()}
+
+    with prozesspool(prozesse) as pool:
+        futures = {name: pool.submit(_lese_auftrag, name, *auftrag) for name, auftrag in auftraege.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+# ————— Management-Befehle —————
+
+def uebersprungen_text(daten):
+    return (
+        f"{len(daten.uebersprungen)} Zeile(n) übersprungen (ungültig oder doppelt): "
+        + ", ".join(map(str, daten.uebersprungen))
+    )
+
+
+def erfasse_lauf(tabelle, art, datensaetze=0, dauer=None):
+    """
+    Trägt einen Import-Lauf in die Metriken ein (siehe metriken.py) und
+    schreibt den Abzug sofort, da Import-Befehle eigene Prozesse sind.
+    """
+    metriken.zaehle("mylist_import_laeufe_total", tabelle=tabelle.name, art=art)
+    if datensaetze:
+        metriken.zaehle("mylist_import_datensaetze_total", datensaetze, tabelle=tabelle.name)
+    if dauer is not None:
+        metriken.beobachte("mylist_import_dauer_sekunden", dauer, tabelle=tabelle.name)
+    metriken.setze("mylist_import_letzter_lauf_sekunden", time.time(), tabelle=tabelle.name)
+    metriken.schreiben()
+
+
+def importiere(daten, voll=False):
+    """
+    Schreibt `daten` voll (`schreibe_tabelle`) oder inkrementell
+    (`abgleichen`) und gibt eine Zusammenfassung für die Befehlsausgabe
+    zurück. Noch referenzierte Zeilen führen zu einem CommandError.
+    """
+    tabelle = daten.tabelle
+    start = time.perf_counter()
+    try:
+        if voll:
+            geschrieben = schreibe_tabelle(daten)
+        else:
+            anzahl = abgleichen(daten)
+            geschrieben = anzahl["neu"] + anzahl["geaendert"]
+    except ProtectedError as e:
+        raise CommandError(
+            f"{tabelle.modellname}: {len(e.protected_objects)} Zeile(n) fehlen in der CSV-Datei, "
+            "werden aber noch verwendet und können nicht gelöscht werden."
+        )
+    erfasse_lauf(tabelle, "voll" if voll else "inkrementell", geschrieben, time.perf_counter() - start)
+
+    if voll:
+        return f"{geschrieben} Datensätze importiert."
+    return (
+        f"{anzahl['neu']} neu, {anzahl['geaendert']} geändert, "
+        f"{anzahl['geloescht']} gelöscht, {anzahl['unveraendert']} unverändert."
+    )
+
+
+class ReferenzImportBefehl(BaseCommand):
+    """
+    Basisklasse der `import_*`-Befehle; Unterklassen setzen nur `tabelle`
+    (Schlüssel in `IMPORTE`) und `help`.
+
+    Standardmäßig wird inkrementell importiert: unveränderte CSV-Dateien
+    werden übersprungen, sonst nur die geänderten Zeilen geschrieben.
+    """
+
+    tabelle = None
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--datei",
+            help="Abweichende CSV-Datei (Standard: %s)" % IMPORTE[self.tabelle].pfad.name,
+        )
+        parser.add_argument(
+            "--voll", action="store_true",
+            help="Tabelle komplett löschen und neu befüllen statt inkrementell abzugleichen",
+        )
+        parser.add_argument(
+            "--erzwingen", action="store_true",
+            help="Auch abgleichen, wenn sich die CSV-Datei seit dem letzten Import nicht geändert hat",
+        )
+
+    def handle(self, *args, **options):
+        tabelle = IMPORTE[self.tabelle]
+        pfad = Path(options["datei"]) if options.get("datei") else tabelle.pfad
+
+        if not pfad.is_file():
+            raise CommandError(f"CSV-Datei nicht gefunden: {pfad}")
+
+        inhalt = pfad.read_bytes()
+        inkrementell = not options["voll"]
+        if inkrementell and not options["erzwingen"] and ist_unveraendert(tabelle, inhalts_hash(tabelle, inhalt)):
+            erfasse_lauf(tabelle, "unveraendert")
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {tabelle.modellname}: CSV-Datei unverändert, nichts zu tun."
+            ))
+            return
+
+        try:
+            daten = lese_csv(tabelle, pfad, inhalt)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if daten.uebersprungen:
+            self.stderr.write(self.style.WARNING(f"⚠ {tabelle.modellname}: {uebersprungen_text(daten)}"))
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {tabelle.modellname}: {importiere(daten, voll=not inkrementell)}"))
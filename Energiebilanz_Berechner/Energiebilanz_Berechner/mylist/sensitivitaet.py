@@ -0,0 +1,255 @@
+# mylist/sensitivitaet.py
+
+"""
+Globale Sensitivitätsanalyse der Rechenkette (/api/berechnung/sensitivitaet/
+und Ergebnisseite des Wizards).
+
+Die unsicheren Eingaben sind gleichverteilt in ihren Bereichen
+`bereiche` (Spalte → (von, bis)), alle übrigen Spalten fest. Zwei Verfahren:
+
+- Morris (Elementareffekte): `trajektorien` zufällige One-at-a-time-Pfade
+  auf einem Gitter mit `stufen` Stufen, (k + 1) · r Auswertungen. Liefert
+  je Eingabe mu, mu* (Mittel der Beträge, Maß für den Einfluss) und sigma
+  (Streuung, Hinweis auf Nichtlinearität/Wechselwirkung). Effekte beziehen
+  sich auf den auf [0, 1] normierten Bereich und haben die Einheit der
+  Zielgröße.
+- Sobol (Saltelli-Schema): Matrizen A, B aus Latin-Hypercube-Stichproben
+  und je Eingabe eine Matrix AB_i, N · (k + 2) Auswertungen. Liefert
+  Haupteffekt S1 (Saltelli 2010) und Totaleffekt ST (Jansen) mit
+  95-%-Konfidenz aus dem Standardfehler der Schätzer.
+
+Die Punkte werden blockweise erzeugt und mit `berechne_bilanz_batch`
+ausgewertet; mit `prozesse` > 1 verteilen sich die Blöcke auf einen
+Prozess-Pool (lohnt erst bei Millionen Auswertungen).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .berechnungen import BATCH_EINGABEN, berechne_bilanz_batch
+from .parameterstudie import ZIELGROESSEN
+
+
+STANDARD_BLOCKGROESSE = 100_000
+
+# Anzeigenamen der Eingabespalten (Ergebnisseite)
+BEZEICHNUNGEN = {
+    "laenge":                      "Länge",
+    "breite":                      "Breite",
+    "geschosshoehe":               "Geschosshöhe",
+    "anz_geschosse":               "Geschosse",
+    "jahres_heizwaermebedarf_kwh": "Jahresheizwärmebedarf",
+    "trinkwarmwasser_kwh_pro_m2":  "Trinkwarmwasser",
+    "luftfoerderung_kwh_pro_m2":   "Luftförderung",
+    "beleuchtung_kwh_pro_m2":      "Beleuchtung",
+    "nutzer_pro_m2":               "Nutzerstrom",
+    "verteilungsverlust_kwh":      "Verteilungsverluste",
+    "speicherverlust_kwh":         "Speicherverluste",
+    "warmwasserbedarf_kwh":        "Warmwasserbedarf",
+}
+
+
+def _pruefe(bereiche, feste, ziel):
+    feste = dict(feste or {})
+    unbekannt = (set(bereiche) | set(feste)) - set(BATCH_EINGABEN)
+    if unbekannt:
+        raise ValueError(f"Unbekannte Spalten: {', '.join(sorted(unbekannt))}")
+    doppelt = set(bereiche) & set(feste)
+    if doppelt:
+        raise ValueError(f"Spalten sowohl als Bereich als auch fest angegeben: {', '.join(sorted(doppelt))}")
+    if not bereiche:
+        raise ValueError("Mindestens ein Bereich")
+    for name, (von, bis) in bereiche.items():
+        if not von < bis:
+            raise ValueError(f"Bereich für '{name}': 'von' muss kleiner als 'bis' sein")
+    if ziel not in ZIELGROESSEN:
+        raise ValueError(f"Unbekannte Zielgröße: {ziel}")
+    return feste
+
+
+def _block_auswerten(namen, block, feste, ziel):
+    spalten = dict(zip(namen, block.T))
+    return berechne_bilanz_batch(spalten, **feste)[ziel]
+
+
+def _teile(matrix, blockgroesse):
+    for start in range(0, len(matrix), blockgroesse):
+        yield matrix[start:start + blockgroesse]
+
+
+def auswerten(bereiche, bloecke, feste, ziel, prozesse=None):
+    """
+    Wertet die Zielgröße für Blöcke von Punkten aus. Jeder Block ist eine
+    Matrix (Zeilen = Punkte, Spalten = Eingaben in der Reihenfolge von
+    `bereiche`, Werte in [0, 1]). Rückgabe ist ein float64-Array mit einem
+    Wert je Zeile über alle Blöcke.
+    """
+    namen = list(bereiche)
+    von = np.array([bereiche[name][0] for name in namen])
+    spanne = np.array([bereiche[name][1] for name in namen]) - von
+    punkte = (von + block * spanne for block in bloecke)
+
+    if prozesse and prozesse > 1:
+        with ProcessPoolExecutor(max_workers=prozesse) as pool:
+            futures = [pool.submit(_block_auswerten, namen, block, feste, ziel) for block in punkte]
+            ergebnisse = [future.result() for future in futures]
+    else:
+        ergebnisse = [_block_auswerten(namen, block, feste, ziel) for block in punkte]
+    return np.concatenate(ergebnisse)
+
+
+def morris(bereiche, feste=None, ziel="ee_absolut", trajektorien=20, stufen=4, seed=None,
+           blockgroesse=STANDARD_BLOCKGROESSE, prozesse=None):
+    """
+    Elementareffekte nach Morris.
+
+    Rückgabe: {"methode": "morris", "ziel", "auswertungen", "seed",
+    "eingaben": {spalte: {"mu", "mu_stern", "sigma"}}}
+    """
+    feste = _pruefe(bereiche, feste, ziel)
+    if stufen < 2 or stufen % 2:
+        raise ValueError("'stufen' muss eine gerade Zahl >= 2 sein")
+    if trajektorien < 2:
+        raise ValueError("Mindestens zwei Trajektorien")
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % 2**32)
+    rng = np.random.default_rng(seed)
+    k, r = len(bereiche), trajektorien
+    delta = stufen / (2 * (stufen - 1))
+
+    # Startpunkte auf dem Gitter so, dass der Schritt um ±delta im Bereich bleibt
+    basis = rng.integers(0, stufen // 2, size=(r, k)) / (stufen - 1)
+    richtung = rng.choice((-1.0, 1.0), size=(r, k))
+    start = basis + delta * (richtung < 0)
+    reihenfolge = np.argsort(rng.random((r, k)), axis=1)
+
+    # Schritt j einer Trajektorie ändert nur die Eingabe reihenfolge[:, j]
+    schritte = np.zeros((r, k, k))
+    zeilen = np.arange(r)[:, None]
+    schritte[zeilen, np.arange(k), reihenfolge] = delta * np.take_along_axis(richtung, reihenfolge, axis=1)
+    pfade = start[:, None, :] + np.concatenate([np.zeros((r, 1, k)), np.cumsum(schritte, axis=1)], axis=1)
+
+    y = auswerten(bereiche, _teile(pfade.reshape(-1, k), blockgroesse), feste, ziel, prozesse).reshape(r, k + 1)
+    effekte = np.empty((r, k))
+    effekte[zeilen, reihenfolge] = np.diff(y, axis=1) / (delta * np.take_along_axis(richtung, reihenfolge, axis=1))
+
+    return {
+        "methode":      "morris",
+        "ziel":         ziel,
+        "auswertungen": r * (k + 1),
+        "seed":         seed,
+        "eingaben": {
+            name: {
+                "mu":       float(effekte[:, i].mean()),
+                "mu_stern": float(np.abs(effekte[:, i]).mean()),
+                "sigma":    float(effekte[:, i].std(ddof=1)),
+            }
+            for i, name in enumerate(bereiche)
+        },
+    }
+
+
+def _latin_hypercube(rng, anzahl, dimensionen):
+    """Latin-Hypercube-Stichprobe in [0, 1): jede Spalte trifft jedes der `anzahl` Intervalle genau einmal."""
+    schichten = np.argsort(rng.random((anzahl, dimensionen)), axis=0)
+    return (schichten + rng.random((anzahl, dimensionen))) / anzahl
+
+
+def _saltelli_bloecke(a, b, blockgroesse):
+    """Blöcke der Zeilen A, B, AB_1 … AB_k (AB_i = A mit Spalte i aus B), ohne AB_i als Ganzes aufzubauen."""
+    yield from _teile(a, blockgroesse)
+    yield from _teile(b, blockgroesse)
+    for i in range(a.shape[1]):
+        for start in range(0, len(a), blockgroesse):
+            block = a[start:start + blockgroesse].copy()
+            block[:, i] = b[start:start + blockgroesse, i]
+            yield block
+
+
+def sobol(bereiche, feste=None, ziel="ee_absolut", stichproben=1024, seed=None,
+          blockgroesse=STANDARD_BLOCKGROESSE, prozesse=None):
+    """
+    Sobol-Indizes nach dem Saltelli-Schema.
+
+    Rückgabe: {"methode": "sobol", "ziel", "auswertungen", "seed", "varianz",
+    "eingaben": {spalte: {"s1", "s1_konf", "st", "st_konf"}}}. Bei Varianz 0
+    (Zielgröße hängt von keiner Eingabe ab) sind alle Indizes 0.
+    """
+    feste = _pruefe(bereiche, feste, ziel)
+    if stichproben < 2:
+        raise ValueError("Mindestens zwei Stichproben")
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % 2**32)
+    rng = np.random.default_rng(seed)
+    k, n = len(bereiche), stichproben
+
+    basis = _latin_hypercube(rng, n, 2 * k)
+    a, b = basis[:, :k], basis[:, k:]
+    y = auswerten(bereiche, _saltelli_bloecke(a, b, blockgroesse), feste, ziel, prozesse)
+    f_a, f_b, f_ab = y[:n], y[n:2 * n], y[2 * n:].reshape(k, n)
+
+    varianz = float(np.var(np.concatenate([f_a, f_b])))
+    # Summanden der Schätzer je Eingabe und Stichprobe: S1 (Saltelli 2010), ST (Jansen)
+    s1_terme = f_b * (f_ab - f_a)
+    st_terme = 0.5 * (f_a - f_ab) ** 2
+    if varianz > 0:
+        s1 = s1_terme.mean(axis=1) / varianz
+        st = st_terme.mean(axis=1) / varianz
+        # 95-%-Konfidenz über den Standardfehler der Mittelwerte
+        s1_konf = 1.96 * s1_terme.std(axis=1, ddof=1) / np.sqrt(n) / varianz
+        st_konf = 1.96 * st_terme.std(axis=1, ddof=1) / np.sqrt(n) / varianz
+    else:
+        s1 = st = s1_konf = st_konf = np.zeros(k)
+
+    return {
+        "methode":      "sobol",
+        "ziel":         ziel,
+        "auswertungen": n * (k + 2),
+        "seed":         seed,
+        "varianz":      varianz,
+        "eingaben": {
+            name: {
+                "s1":      float(s1[i]),
+                "s1_konf": float(s1_konf[i]),
+                "st":      float(st[i]),
+                "st_konf": float(st_konf[i]),
+            }
+            for i, name in enumerate(bereiche)
+        },
+    }
+
+
+def einflussgroessen(eingaben, spanne=0.2, ziel="ee_absolut", trajektorien=20):
+    """
+    Einfluss der Eingaben eines Gebäudes auf `ziel` für die Ergebnisseite:
+    Morris mit Bereichen ±`spanne` um die eingegebenen Werte (Eingaben mit
+    Wert 0 und die Geschosszahl bleiben fest, fester Seed).
+
+    Rückgabe: Liste von {"spalte", "bezeichnung", "mu_stern", "anteil"},
+    absteigend nach mu*; `anteil` ist mu* relativ zur Summe (0 … 1).
+    Eingaben ohne Einfluss fehlen.
+    """
+    bereiche, feste = {}, {}
+    for name, wert in eingaben.items():
+        wert = float(wert or 0)
+        if wert > 0 and name != "anz_geschosse":
+            bereiche[name] = (wert * (1 - spanne), wert * (1 + spanne))
+        else:
+            feste[name] = wert
+    if not bereiche:
+        return []
+
+    ergebnis = morris(bereiche, feste, ziel, trajektorien=trajektorien, seed=0)["eingaben"]
+    summe = sum(werte["mu_stern"] for werte in ergebnis.values())
+    einfluss = [
+        {
+            "spalte":      name,
+            "bezeichnung": BEZEICHNUNGEN[name],
+            "mu_stern":    werte["mu_stern"],
+            "anteil":      werte["mu_stern"] / summe,
+        }
+        for name, werte in ergebnis.items()
+        if werte["mu_stern"] > 0
+    ]
+    return sorted(einfluss, key=lambda zeile: zeile["mu_stern"], reverse=True)
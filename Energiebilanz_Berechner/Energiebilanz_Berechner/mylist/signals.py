@@ -0,0 +1,31 @@
+# mylist/signals.py
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+from .referenzdaten import TABELLEN, referenzdaten, tabelle_fuer_modell
+
+
+def referenzdaten_invalidieren(sender, **kwargs):
+    """
+    Verwirft den zwischengespeicherten Index einer Referenztabelle, sobald
+    eine ihrer Zeilen gespeichert oder gelöscht wird. Nach dem Commit wird
+    noch einmal invalidiert, damit kein Zwischenstand aus der laufenden
+    Transaktion im Cache bleibt.
+    """
+    name = tabelle_fuer_modell(sender)
+    referenzdaten.invalidieren(name)
+    transaction.on_commit(lambda: referenzdaten.invalidieren(name))
+
+
+def verbinden():
+    """
+    Registriert den Handler nur für die Referenzmodelle; ein Empfänger ohne
+    `sender` würde das schnelle Löschen (ohne Signale) für alle Modelle
+    abschalten.
+    """
+    for modellname, _lader in TABELLEN.values():
+        modell = apps.get_model("mylist", modellname)
+        post_save.connect(referenzdaten_invalidieren, sender=modell)
+        post_delete.connect(referenzdaten_invalidieren, sender=modell)
@@ -0,0 +1,223 @@
+# mylist/sommerschutz.py
+
+"""
+Nachweis des sommerlichen Wärmeschutzes über Sonneneintragskennwerte
+(DIN 4108-2, Abschnitt 8.3) für kritische Räume.
+
+    S_vorh = A_w · g_tot / A_G        mit g_tot = g · F_C
+    S_zul  = S1 + S2 + S3 + S4 + S5 + S6
+
+S1 (Nachtlüftung und Bauart), S2 (grundflächenbezogener
+Fensterflächenanteil f_WG = A_w / A_G), S3 (Sonnenschutzglas g ≤ 0,40),
+S4 (Fensterneigung ≤ 60°), S5 (Nordorientierung) und S6 (passive Kühlung)
+kommen aus `SonneneintragsKennwert`, F_C aus `SonnenschutzFaktor`.
+
+Beide Tabellen werden einmal je geladenem Tabellenstand zu indizierten
+Arrays übersetzt (`sonneneintrag_tabellen`). `pruefe_sonneneintrag` rechnet
+damit beliebig viele Räume (eines Gebäudes oder eines ganzen Bestands) in
+einem Aufruf; Kategorien wie Klimaregion oder Bauart werden dazu in
+Indizes übersetzt.
+"""
+
+import numpy as np
+
+from .berechnungen import als_spalte, runde
+from .messung import gemessen
+from .referenzdaten import referenzdaten
+
+
+# Kategorien in der Reihenfolge der Tabellenachsen
+NACHTLUEFTUNG = ("ohne", "erhoehte", "hohe")     # ohne, ≥ 2 h⁻¹, ≥ 5 h⁻¹
+BAUARTEN = ("leicht", "mittel", "schwer")
+GEBAEUDETYPEN = ("W", "N")                        # Wohn-, Nichtwohngebäude
+KLIMAREGIONEN = ("A", "B", "C")                   # Sommer-Klimaregionen nach DIN 4108-2
+ORIENTIERUNGEN = ("Nord", "Ost", "Sued", "West")  # wie `SonneneintragsParameter`
+VERGLASUNGEN = ("zweifach", "dreifach")
+
+# g-Wert der Verglasung, wenn keiner angegeben ist
+G_STANDARD = {"zweifach": 0.60, "dreifach": 0.50}
+
+# Fc-Spalten von `SonnenschutzFaktor`; für g > 0,40 gibt es nur den Zweifach-Wert
+FC_SPALTEN = ("f_c_g_le_0_40_zweifach", "f_c_g_le_0_40_dreifach", "f_c_g_gt_0_40_zweifach")
+
+# Höchster Fensterflächenanteil f_WG ohne Nachweis (DIN 4108-2, Tabelle 6)
+GRENZE_GENEIGT = 0.07    # Fensterneigung ≤ 60°
+GRENZE_NORD = 0.15       # Nordwest über Nord bis Nordost
+GRENZE_SONST = 0.10
+
+SOMMER_ERGEBNISSE = ("f_wg", "g_tot", "s_vorh", "s1", "s2", "s3", "s4", "s5", "s6", "s_zul")
+
+_tabellen_stand = (None, None, None)    # (Sonneneintrag-Index, Sonnenschutz-Index, Arrays)
+
+
+def _tabellenwerte(zeile):
+    """Zeile der S-Tabelle → Array (Gebäudetyp, Klimaregion), fehlende Zeilen NaN."""
+    werte = np.full((len(GEBAEUDETYPEN), len(KLIMAREGIONEN)), np.nan)
+    if zeile is not None:
+        for t, spalte in enumerate(("wohng", "nw")):
+            for r, region in enumerate(KLIMAREGIONEN):
+                wert = zeile.get(f"{spalte}_{region}")
+                if wert is not None:
+                    werte[t, r] = wert
+    return werte
+
+
+def sonneneintrag_tabellen():
+    """
+    S1–S6 und F_C als Arrays; wird nur neu aufgebaut, wenn referenzdaten.py
+    eine der beiden Tabellen neu geladen hat.
+
+    Rückgabe (Dictionary):
+    {
+      "s1":      (Nachtlüftung, Bauart, Gebäudetyp, Klimaregion),
+      "s2_a", "s2_b", "s3", "s4", "s5": (Gebäudetyp, Klimaregion),
+      "s6":      (Bauart, Gebäudetyp, Klimaregion),
+      "zeilen":  Zeilennummern aus `SonnenschutzFaktor` (+ "" = ohne Sonnenschutz),
+      "fc":      (Zeile, `FC_SPALTEN`), letzte Zeile 1,0
+    }
+    """
+    global _tabellen_stand
+    kennwerte = referenzdaten.tabelle("sonneneintrag")
+    sonnenschutz = referenzdaten.tabelle("sonnenschutz")
+    index_kennwerte, index_sonnenschutz, tabellen = _tabellen_stand
+    if index_kennwerte is kennwerte and index_sonnenschutz is sonnenschutz:
+        return tabellen
+
+    tabellen = {
+        "s1": np.array([
+            [_tabellenwerte(kennwerte.get(f"{lueftung}_{bauart}")) for bauart in BAUARTEN]
+            for lueftung in NACHTLUEFTUNG
+        ]),
+        "s2_a": _tabellenwerte(kennwerte.get("a")),
+        "s2_b": _tabellenwerte(kennwerte.get("b")),
+        "s3":   _tabellenwerte(kennwerte.get("sonnenschutzglas")),
+        "s4":   _tabellenwerte(kennwerte.get("fensterneigung")),
+        "s5":   _tabellenwerte(kennwerte.get("orientierung")),
+        "s6":   np.array([_tabellenwerte(kennwerte.get(bauart)) for bauart in BAUARTEN]),
+        "zeilen": (*sonnenschutz, ""),
+        "fc": np.array(
+            [[zeile[spalte] for spalte in FC_SPALTEN] for zeile in sonnenschutz.values()] + [[1.0] * 3],
+            dtype=np.float64,
+        ),
+    }
+    for array in tabellen.values():
+        if isinstance(array, np.ndarray):
+            array.setflags(write=False)
+    _tabellen_stand = (kennwerte, sonnenschutz, tabellen)
+    return tabellen
+
+
+def _codes(werte, auswahl, name):
+    """Kategorien (Skalar oder Array) → Indizes in `auswahl`; None zählt als ""."""
+    werte = np.asarray(werte, dtype=object)
+    werte = np.where(np.equal(werte, None), "", werte).astype(str)
+    eindeutig, inverse = np.unique(werte, return_inverse=True)
+    unbekannt = sorted(set(eindeutig) - set(auswahl))
+    if unbekannt:
+        raise ValueError(f"Unbekannte Werte für '{name}': {', '.join(unbekannt)}")
+    return np.array([auswahl.index(wert) for wert in eindeutig], dtype=np.intp)[inverse].reshape(werte.shape)
+
+
+@gemessen()
+def pruefe_sonneneintrag(fensterflaeche, grundflaeche, orientierung, g=None, fc=None, sonnenschutz=None,
+                         verglasungsart="zweifach", fensterneigung=90.0, passive_kuehlung=False,
+                         klimaregion="B", gebaeudetyp="W", bauart="mittel", nachtlueftung="ohne"):
+    """
+    Sonneneintragskennwerte für einen oder viele kritische Räume.
+
+    Alle Argumente sind Skalare oder Arrays (n,):
+    - fensterflaeche: A_w in m², grundflaeche: Nettogrundfläche A_G in m²
+    - orientierung: aus `ORIENTIERUNGEN`
+    - g: g-Wert der Verglasung (ohne Angabe `G_STANDARD` der Verglasungsart)
+    - fc: Abminderungsfaktor F_C; ohne Angabe aus der `SonnenschutzFaktor`-Zeile
+      `sonnenschutz` (z. B. '3.1.2', None = ohne Sonnenschutz)
+    - fensterneigung: Neigung gegen die Horizontale in °
+    - klimaregion, gebaeudetyp, bauart, nachtlueftung: Kategorien der S-Tabellen
+
+    Rückgabe (Dictionary, je ein Array (n,)): die Werte aus `SOMMER_ERGEBNISSE`
+    (gerundet auf 4 Nachkommastellen), "nachweis_erforderlich" (f_WG über der
+    Grenze aus Tabelle 6) und "erfuellt" (kein Nachweis nötig oder
+    S_vorh ≤ S_zul).
+
+    Wirft LookupError, wenn benötigte Kennwerte in `SonneneintragsKennwert`
+    fehlen, und ValueError bei unbekannten Kategorien.
+    """
+    tabellen = sonneneintrag_tabellen()
+    verglasung = _codes(verglasungsart, VERGLASUNGEN, "verglasungsart")
+    g = np.asarray(g if g is not None else np.nan, dtype=np.float64)
+    g = np.where(np.isnan(g), np.array([G_STANDARD[name] for name in VERGLASUNGEN])[verglasung], g)
+    if fc is None:
+        zeile = _codes(sonnenschutz, tabellen["zeilen"], "sonnenschutz")
+        spalte = np.where(g <= 0.40, verglasung, FC_SPALTEN.index("f_c_g_gt_0_40_zweifach"))
+        fc = tabellen["fc"][zeile, spalte]
+
+    (a_w, a_g, g, fc, neigung, passiv, richtung, region, typ, art, lueftung) = (
+        np.atleast_1d(werte) for werte in np.broadcast_arrays(
+            np.asarray(fensterflaeche, dtype=np.float64), np.asarray(grundflaeche, dtype=np.float64),
+            g, np.asarray(fc, dtype=np.float64), np.asarray(fensterneigung, dtype=np.float64),
+            np.asarray(passive_kuehlung, dtype=bool),
+            _codes(orientierung, ORIENTIERUNGEN, "orientierung"),
+            _codes(klimaregion, KLIMAREGIONEN, "klimaregion"),
+            _codes(gebaeudetyp, GEBAEUDETYPEN, "gebaeudetyp"),
+            _codes(bauart, BAUARTEN, "bauart"),
+            _codes(nachtlueftung, NACHTLUEFTUNG, "nachtlueftung"),
+        )
+    )
+    if np.any(a_g <= 0):
+        raise ValueError("Die Grundfläche muss > 0 sein")
+
+    f_wg = a_w / a_g
+    g_tot = g * fc
+    s_vorh = f_wg * g_tot
+
+    geneigt = neigung <= 60.0
+    nord = richtung == ORIENTIERUNGEN.index("Nord")
+    s1 = tabellen["s1"][lueftung, art, typ, region]
+    s2 = tabellen["s2_a"][typ, region] - tabellen["s2_b"][typ, region] * f_wg
+    s3 = np.where(g <= 0.40, tabellen["s3"][typ, region], 0.0)
+    s4 = np.where(geneigt, tabellen["s4"][typ, region] * f_wg, 0.0)
+    s5 = np.where(nord, tabellen["s5"][typ, region], 0.0)
+    s6 = np.where(passiv, tabellen["s6"][art, typ, region], 0.0)
+    s_zul = s1 + s2 + s3 + s4 + s5 + s6
+    if np.isnan(s_zul).any():
+        raise LookupError("Sonneneintragskennwerte (S1–S6) fehlen, bitte import_sonneneintragskennwerte ausführen")
+
+    grenze = np.where(geneigt, GRENZE_GENEIGT, np.where(nord, GRENZE_NORD, GRENZE_SONST))
+    nachweis = f_wg > grenze
+    ergebnis = {
+        name: runde(wert, 4) for name, wert in zip(
+            SOMMER_ERGEBNISSE, (f_wg, g_tot, s_vorh, s1, s2, s3, s4, s5, s6, s_zul)
+        )
+    }
+    ergebnis["nachweis_erforderlich"] = nachweis
+    ergebnis["erfuellt"] = ~nachweis | (ergebnis["s_vorh"] <= ergebnis["s_zul"])
+    return ergebnis
+
+
+def pruefe_parameter(parameter, fensterflaeche, grundflaeche, **annahmen):
+    """
+    Prüft gespeicherte `SonneneintragsParameter` (QuerySet, z. B. die
+    kritischen Räume eines Gebäudes oder aller Gebäude) mit einer
+    Datenbankabfrage.
+
+    Fensterfläche und Grundfläche der Räume sind nicht gespeichert und werden
+    als Skalare oder Arrays in der Reihenfolge der Einträge (nach id)
+    übergeben; `annahmen` sind die übrigen Argumente von
+    `pruefe_sonneneintrag` (z. B. klimaregion, bauart, nachtlueftung, g).
+
+    Rückgabe wie `pruefe_sonneneintrag` mit zusätzlich "parameter_id" und
+    "gebaeude_id".
+    """
+    zeilen = list(parameter.order_by("id").values_list(
+        "id", "gebaeude_id", "fassadenorientierung", "sonnenschutzart__zeile",
+        "verglasungsart", "passive_kuehlung", "fensterneigung",
+    ))
+    if not zeilen:
+        return {}
+    ids, gebaeude, orientierung, sonnenschutz, verglasung, passiv, neigung = (np.array(spalte) for spalte in zip(*zeilen))
+    ergebnis = pruefe_sonneneintrag(
+        als_spalte(fensterflaeche), als_spalte(grundflaeche), orientierung, sonnenschutz=sonnenschutz,
+        verglasungsart=verglasung, passive_kuehlung=passiv.astype(bool), fensterneigung=neigung.astype(np.float64),
+        **annahmen,
+    )
+    return {"parameter_id": ids, "gebaeude_id": gebaeude, **ergebnis}
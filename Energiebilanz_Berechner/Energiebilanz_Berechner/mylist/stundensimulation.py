@@ -0,0 +1,246 @@
+# mylist/stundensimulation.py
+
+"""
+Stündliche Simulation (8760 h) für Heizung, Beleuchtung und interne
+Gewinne (/api/berechnung/stunden/).
+
+Klima: Die Monatsmittel aus `lade_klimadaten` werden auf Stunden verteilt.
+Die Außentemperatur bekommt einen Tagesgang (Sinus, Minimum 5 Uhr), die
+Strahlung einen Tagesverlauf über die Tageslänge. Die Monatsmittel bleiben
+dabei exakt erhalten.
+
+Zeitpläne: Betriebsstunden pro Tag und Betriebstage pro Jahr aus
+`Beleuchtung`, `Waermequelle` und den Lüftungsangaben des `Bauteil` werden
+zu Stundenprofilen (Anteil 0 … 1 je Stunde) aufgespannt (`zeitplan`).
+
+Raummodell: ein Widerstand, eine Kapazität (1R1C). Transmission,
+Flächen und Speicherfähigkeit kommen aus der Monatsbilanz. Pro Stunde gilt
+die exakte Lösung bei konstanten Randbedingungen:
+
+    θ(t+1) = a · θ(t) + (1 − a) · (θ_e + Φ / H),   a = exp(−H · 1 h / C)
+
+Ideales Heizen auf θ_soll (und optional Kühlen auf θ_kuehl) begrenzt
+θ(t+1) nach unten bzw. oben. Die Schrittfunktionen x ↦ clip(a·x + b, lo, hi)
+bleiben unter Hintereinanderausführung von dieser Form. Deshalb wird das
+ganze Jahr als paralleler Präfix-Scan gerechnet: log₂(8760) ≈ 14
+vektorisierte Schritte über alle Stunden und Gebäude statt einer
+Python-Schleife über 8760 Stunden. Gestartet wird mit der Endtemperatur
+eines ersten Durchlaufs (eingeschwungenes Jahr).
+"""
+
+import numpy as np
+
+from .berechnungen import als_spalte
+from .messung import gemessen
+from .monatsbilanz import FLAECHEN_STRAHLUNG, STANDARDWERTE, TAGE_PRO_MONAT, berechne_heizwaerme_monatlich
+
+
+STUNDEN = 8760
+TAGE = 365
+
+# Tag des Jahres (0 … 364) und Monat (0 … 11) je Stunde
+_TAG = np.arange(STUNDEN) // 24
+_MONAT = np.repeat(np.arange(12), (TAGE_PRO_MONAT * 24).astype(int))
+_UHRZEIT = np.tile(np.arange(24), TAGE)
+
+# Tagesgang der Außentemperatur (K, ± um das Monatsmittel), Minimum um 5 Uhr
+STANDARD_TAGESAMPLITUDE = 4.0
+
+# Beginn des Betriebs (Uhr), wenn ein Zeitplan weniger als 24 h pro Tag umfasst
+STANDARD_BETRIEBSBEGINN = 7.0
+
+
+def stundenklima(klima, tagesamplitude=STANDARD_TAGESAMPLITUDE):
+    """
+    Stundenwerte aus den Monatswerten von `lade_klimadaten`.
+
+    Rückgabe: {"theta_e": Array (8760,) bzw. (n, 8760) in °C,
+    "strahlung": Dict Fläche → Array (8760,) in W/m²}
+    """
+    theta_e = np.asarray(klima["theta_e"], dtype=np.float64)
+    tagesgang = -tagesamplitude * np.cos(2 * np.pi * (_UHRZEIT + 0.5 - 5.0) / 24.0)
+    # Der Tagesgang hat im Stundenmittel je Tag den Wert 0: das Monatsmittel bleibt
+    theta_e = theta_e[..., _MONAT] + tagesgang
+
+    # Tageslänge (h) für etwa 51° nördlicher Breite, Sonnenhöchststand 12 Uhr
+    tageslaenge = 12.0 + 4.3 * np.sin(2 * np.pi * (_TAG - 80) / TAGE)
+    form = np.maximum(np.cos(np.pi * (_UHRZEIT + 0.5 - 12.0) / tageslaenge), 0.0)
+    form = form * ((np.abs(_UHRZEIT + 0.5 - 12.0) < tageslaenge / 2))
+    # Je Tag auf Mittelwert 1 normiert
+    form = form / form.reshape(TAGE, 24).mean(axis=1).repeat(24)
+
+    strahlung = {
+        name: np.asarray(klima["strahlung"][name], dtype=np.float64)[_MONAT] * form
+        for name in FLAECHEN_STRAHLUNG
+    }
+    return {"theta_e": theta_e, "strahlung": strahlung}
+
+
+def zeitplan(stunden_pro_tag, tage_pro_jahr, beginn=STANDARD_BETRIEBSBEGINN):
+    """
+    Stundenprofil (8760,) mit dem Betriebsanteil je Stunde (0 … 1).
+
+    Betrieb ist täglich ab `beginn` für `stunden_pro_tag` Stunden (bei
+    Bedarf früher, damit er vor Mitternacht endet; angebrochene Stunden
+    anteilig). Betriebstage sind zuerst Montag bis Freitag, dann Samstag,
+    dann Sonntag, jeweils in Kalenderreihenfolge; das Jahr beginnt an
+    einem Montag.
+    """
+    stunden = min(max(float(stunden_pro_tag or 0), 0.0), 24.0)
+    tage = int(round(min(max(float(tage_pro_jahr or 0), 0.0), TAGE)))
+    beginn = min(beginn, 24.0 - stunden)
+
+    uhrzeit = np.arange(24)
+    tagesprofil = np.clip(beginn + stunden - uhrzeit, 0.0, 1.0) - np.clip(beginn - uhrzeit, 0.0, 1.0)
+
+    wochentag = np.arange(TAGE) % 7
+    rang = np.where(wochentag < 5, 0, wochentag - 4)
+    betriebstage = np.zeros(TAGE)
+    betriebstage[np.lexsort((np.arange(TAGE), rang))[:tage]] = 1.0
+    return np.repeat(betriebstage, 24) * np.tile(tagesprofil, TAGE)
+
+
+def beleuchtungsprofil(beleuchtungen, nf):
+    """
+    Elektrische Beleuchtungsleistung (W) je Stunde aus `Beleuchtung`-Einträgen
+    (e_soll in W/m², laufzeit_hd, laufzeit_da). Die Nutzfläche `nf` wird zu
+    gleichen Teilen auf die Einträge aufgeteilt.
+    """
+    beleuchtungen = list(beleuchtungen)
+    profil = np.zeros(STUNDEN)
+    for eintrag in beleuchtungen:
+        profil += eintrag.e_soll * nf / len(beleuchtungen) * zeitplan(eintrag.laufzeit_hd, eintrag.laufzeit_da)
+    return profil
+
+
+def waermequellenprofil(waermequellen):
+    """Wärmeabgabe (W) je Stunde aus `Waermequelle`-Einträgen (anzahl · leistung_kw, betrieb_hd, betrieb_da)."""
+    profil = np.zeros(STUNDEN)
+    for quelle in waermequellen:
+        profil += quelle.anzahl * quelle.leistung_kw * 1000.0 * zeitplan(quelle.betrieb_hd, quelle.betrieb_da)
+    return profil
+
+
+def lueftungsprofil(bauteil):
+    """Betriebsprofil der Lüftung aus `Bauteil.laufzeit_hd/laufzeit_da`; ohne Angaben durchgehend."""
+    if bauteil is None or bauteil.laufzeit_hd is None or bauteil.laufzeit_da is None:
+        return np.ones(STUNDEN)
+    return zeitplan(bauteil.laufzeit_hd, bauteil.laufzeit_da)
+
+
+def _verketten(spaeter, frueher):
+    """Hintereinanderausführung spaeter ∘ frueher zweier Abbildungen x ↦ clip(a·x + b, lo, hi) (a > 0)."""
+    a2, b2, lo2, hi2 = spaeter
+    a1, b1, lo1, hi1 = frueher
+    with np.errstate(invalid="ignore"):
+        return (
+            a2 * a1,
+            a2 * b1 + b2,
+            np.clip(a2 * lo1 + b2, lo2, hi2),
+            np.clip(a2 * hi1 + b2, lo2, hi2),
+        )
+
+
+def _praefix_scan(a, b, lo, hi):
+    """Alle Präfixe f_t ∘ … ∘ f_0 entlang der letzten Achse (Hillis-Steele, log₂(T) Schritte)."""
+    funktionen = tuple(np.array(werte, dtype=np.float64) for werte in (a, b, lo, hi))
+    schritt = 1
+    while schritt < a.shape[-1]:
+        neu = _verketten(
+            tuple(werte[..., schritt:] for werte in funktionen),
+            tuple(werte[..., :-schritt] for werte in funktionen),
+        )
+        # Erst alle vier Teile berechnen, dann zuweisen (sie lesen die alten Werte)
+        for werte, teil in zip(funktionen, neu):
+            werte[..., schritt:] = teil
+        schritt *= 2
+    return funktionen
+
+
+@gemessen()
+def simuliere_stuendlich(klima, laenge, breite, geschosshoehe, anz_geschosse, beleuchtung=0.0,
+                         waermequellen=0.0, lueftung=1.0, theta_kuehl=None,
+                         tagesamplitude=STANDARD_TAGESAMPLITUDE, **eingaben):
+    """
+    Stündliche Simulation für ein oder viele Gebäude.
+
+    Argumente:
+    - klima, Geometrie und **eingaben wie bei `berechne_heizwaerme_monatlich`
+      (theta_i ist die Heiz-Solltemperatur, q_i die Grundlast der internen
+      Gewinne in W/m² NF, luftwechsel/wrg gelten während des Lüftungsbetriebs)
+    - beleuchtung, waermequellen: Leistung in W je Stunde, (8760,) bzw.
+      (n, 8760) oder Skalar (siehe `beleuchtungsprofil`, `waermequellenprofil`)
+    - lueftung: Betriebsanteil der Lüftung je Stunde (siehe `lueftungsprofil`)
+    - theta_kuehl: Kühl-Solltemperatur in °C; None = ohne Kühlung
+
+    Rückgabe (Dictionary, Stundenwerte als Array (n, 8760)):
+    {
+      "theta_i":                  Raumtemperatur in °C,
+      "heizlast", "kuehllast":    Heiz- und Kühlleistung in W,
+      "solar", "intern":          solare und interne Gewinne in W (intern inkl. Beleuchtung),
+      "heizlast_max", "kuehllast_max": Spitzenlasten in W (n,),
+      "heizwaerme_jahr", "kuehlung_jahr", "beleuchtung_jahr": Jahressummen in kWh (n,)
+    }
+    """
+    monat = berechne_heizwaerme_monatlich(klima, laenge, breite, geschosshoehe, anz_geschosse, **eingaben)
+    wetter = stundenklima(klima, tagesamplitude)
+
+    def wert(name):
+        return als_spalte(eingaben.get(name, STANDARDWERTE[name]))[:, None]
+
+    h_t = monat["h_t"][:, None]
+    h_v = monat["h_v"][:, None] * np.asarray(lueftung, dtype=np.float64)
+    h = np.broadcast_to(h_t + h_v, (len(monat["h_t"]), STUNDEN))
+    # Gebäude ohne Volumen oder Nutzfläche haben wie in der Monatsbilanz keinen Bedarf;
+    # die Kapazität 1 Wh/K vermeidet dort nur die Division durch 0
+    leer = ((monat["volumen"] <= 0) | (monat["nf"] <= 0))[:, None]
+    kapazitaet = np.where(leer, 1.0, wert("c_wirk") * monat["volumen"][:, None])   # Wh/K
+
+    beleuchtung = np.broadcast_to(np.asarray(beleuchtung, dtype=np.float64), h.shape)
+    solar = wert("g_wirksam") * sum(
+        monat["a_fenster"][name][:, None] * wetter["strahlung"][name] for name in FLAECHEN_STRAHLUNG
+    )
+    intern = wert("q_i") * monat["nf"][:, None] + beleuchtung + np.asarray(waermequellen, dtype=np.float64)
+    intern = np.broadcast_to(intern, h.shape)
+
+    # Exakte Schrittlösung: θ(t+1) = a·θ(t) + (1 − a)·θ_∞ mit θ_∞ = θ_e + Φ/H
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = np.exp(-h / kapazitaet)
+        theta_inf = np.where(h > 0, wetter["theta_e"] + (solar + intern) / h, wetter["theta_e"])
+    a = np.where(np.isfinite(a), a, 0.0)
+    b = (1.0 - a) * theta_inf
+    soll = np.broadcast_to(wert("theta_i"), h.shape)
+    kuehl = np.broadcast_to(np.inf if theta_kuehl is None else als_spalte(theta_kuehl)[:, None], h.shape)
+
+    praefix_a, praefix_b, praefix_lo, praefix_hi = _praefix_scan(a, b, soll, kuehl)
+    # Eingeschwungen: Start mit der Endtemperatur eines ersten Durchlaufs ab θ_soll
+    start = np.clip(praefix_a[:, -1:] * soll[:, :1] + praefix_b[:, -1:], praefix_lo[:, -1:], praefix_hi[:, -1:])
+    theta = np.clip(praefix_a * start + praefix_b, praefix_lo, praefix_hi)
+
+    # Freie Temperatur ohne Heizen/Kühlen in jeder Stunde und die dafür nötige Leistung
+    vorher = np.concatenate([start, theta[:, :-1]], axis=1)
+    frei = a * vorher + b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        leitwert = np.where(a < 1.0, h / (1.0 - a), 0.0)
+    heizlast = np.where(leer, 0.0, np.maximum(soll - frei, 0.0) * leitwert)
+    kuehllast = np.where(leer | ~np.isfinite(kuehl), 0.0, np.maximum(frei - kuehl, 0.0) * leitwert)
+    theta = np.where(leer, soll, theta)
+
+    return {
+        "theta_i":          theta,
+        "heizlast":         heizlast,
+        "kuehllast":        kuehllast,
+        "solar":            np.broadcast_to(solar, h.shape),
+        "intern":           intern,
+        "heizlast_max":     heizlast.max(axis=1),
+        "kuehllast_max":    kuehllast.max(axis=1),
+        "heizwaerme_jahr":  heizlast.sum(axis=1) / 1000.0,
+        "kuehlung_jahr":    kuehllast.sum(axis=1) / 1000.0,
+        "beleuchtung_jahr": beleuchtung.sum(axis=1) / 1000.0,
+    }
+
+
+def monatssummen(stundenwerte):
+    """Monatssummen (…, 12) von Stundenwerten in W als kWh."""
+    grenzen = np.concatenate([[0], np.cumsum(TAGE_PRO_MONAT * 24).astype(int)[:-1]])
+    return np.add.reduceat(stundenwerte, grenzen, axis=-1) / 1000.0
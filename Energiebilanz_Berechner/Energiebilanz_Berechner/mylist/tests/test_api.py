@@ -1,4 +1,4 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 import json
 
@@ -228,4 +228,395 @@ class ApiTest(TestCase):
         self.assertAlmostEqual(waermebedarf['wb_absolut'], 0.0, delta=0.1)
         
         endenergie = data['endenergie']
-        self.assertAlmostEqual(endenergie['ee_absolut'], 0.0, delta=0.1)
\ No newline at end of file
+        self.assertAlmostEqual(endenergie['ee_absolut'], 0.0, delta=0.1)
+
+class ApiBatchTest(TestCase):
+    """Test the batch API endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+
+    def _post(self, daten):
+        return self.client.post(
+            '/api/berechnung/batch/', json.dumps(daten), content_type='application/json'
+        )
+
+    def test_batch_matches_single_requests(self):
+        """Test that batch results equal the single-building API."""
+        params = {
+            'laenge': 20.0,
+            'breite': 15.0,
+            'geschosshoehe': 3.0,
+            'anz_geschosse': 3,
+            'jahres_heizbedarf': 10000.0,
+            'tw_pro_m2': 15.0,
+            'lwt_pro_m2': 8.0,
+            'bel_pro_m2': 10.0,
+            'nutzer_pro_m2': 5.0,
+            'verlust_verteilung': 500.0,
+            'verlust_speicher': 300.0,
+            'ww_warmwasser': 2000.0
+        }
+        response = self._post([params, {'laenge': 10, 'breite': 10, 'geschosshoehe': 2.5, 'anz_geschosse': 2}])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['anzahl'], 2)
+        self.assertEqual(data['fehlerhaft'], 0)
+
+        einzeln = self.client.get('/api/berechnung/', params).json()
+        ergebnis = data['ergebnisse'][0]
+        self.assertEqual(ergebnis['index'], 0)
+        for block in ('gebaeudedaten', 'nutzenergie', 'strombedarf', 'waermebedarf', 'endenergie'):
+            self.assertEqual(ergebnis[block], einzeln[block])
+
+        self.assertEqual(data['ergebnisse'][1]['gebaeudedaten']['nf'], 160.0)
+
+    def test_batch_reports_invalid_records(self):
+        """Test that invalid records are reported without failing the batch."""
+        response = self._post([
+            {'laenge': 'abc', 'breite': 15.0, 'geschosshoehe': 3.0, 'anz_geschosse': 3},
+            {'laenge': 20.0, 'breite': 15.0, 'geschosshoehe': 3.0, 'anz_geschosse': 3},
+            {'laenge': 20.0, 'anz_geschosse': 2.5},
+            'kein Objekt',
+            {'laenge': 10 ** 400, 'breite': float('nan'), 'geschosshoehe': float('inf')},
+        ])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['fehlerhaft'], 4)
+        ergebnisse = data['ergebnisse']
+        self.assertIn('laenge', ergebnisse[0]['fehler'])
+        self.assertEqual(ergebnisse[1]['gebaeudedaten']['nf'], 720.0)
+        self.assertIn('anz_geschosse', ergebnisse[2]['fehler'])
+        self.assertIn('datensatz', ergebnisse[3]['fehler'])
+        self.assertEqual(set(ergebnisse[4]['fehler']), {'laenge', 'breite', 'geschosshoehe'})
+
+    def test_batch_rejects_invalid_body(self):
+        """Test malformed bodies and wrong HTTP methods."""
+        response = self.client.post(
+            '/api/berechnung/batch/', 'kein json', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self._post({'laenge': 1}).status_code, 400)
+        self.assertEqual(self.client.get('/api/berechnung/batch/').status_code, 405)
+
+
+class ApiStreamTest(TestCase):
+    """Test the streaming NDJSON endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_stream_returns_one_line_per_record(self):
+        """Test that every input line yields one result line in order."""
+        zeilen = [
+            json.dumps({'laenge': 20.0, 'breite': 15.0, 'geschosshoehe': 3.0, 'anz_geschosse': i % 5})
+            for i in range(300)
+        ]
+        zeilen.insert(100, 'kein json')
+        zeilen.insert(50, '')
+        zeilen.append('{"laenge": 1%s}' % ('0' * 400))
+        response = self.client.post(
+            '/api/berechnung/stream/', '\n'.join(zeilen), content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        ergebnisse = [
+            json.loads(zeile)
+            for zeile in b''.join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual(len(ergebnisse), 302)
+        self.assertEqual([e['index'] for e in ergebnisse], list(range(302)))
+        self.assertIn('fehler', ergebnisse[100])
+        self.assertEqual(ergebnisse[3]['gebaeudedaten']['nf'], 720.0)
+        self.assertEqual(ergebnisse[300]['gebaeudedaten']['bgf'], 1200.0)
+        self.assertIn('laenge', ergebnisse[301]['fehler'])
+
+
+class ApiConditionalCachingTest(TestCase):
+    """Test ETag and Cache-Control handling of /api/berechnung/."""
+
+    PARAMETER = {'laenge': 20, 'breite': 15, 'geschosshoehe': 3, 'anz_geschosse': 3, 'tw_pro_m2': 15}
+
+    def test_etag_and_not_modified(self):
+        """Test that a matching If-None-Match yields a 304 with the same headers."""
+        response = self.client.get('/api/berechnung/', self.PARAMETER)
+        etag = response['ETag']
+        self.assertIn('max-age=300', response['Cache-Control'])
+
+        # Gleiche Eingaben in anderer Schreibweise ergeben dasselbe ETag
+        response = self.client.get('/api/berechnung/', dict(self.PARAMETER, laenge='20.0', bel_pro_m2=0))
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get('/api/berechnung/', self.PARAMETER, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertIn('public', response['Cache-Control'])
+
+        response = self.client.get('/api/berechnung/', dict(self.PARAMETER, laenge=21), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    @override_settings(API_CACHE_CONTROL={'no_cache': True})
+    def test_configurable_cache_control(self):
+        """Test that the Cache-Control header follows the setting."""
+        response = self.client.get('/api/berechnung/', self.PARAMETER)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+
+class ApiStudieTest(TestCase):
+    """Test the parametric sweep endpoint /api/berechnung/studie/."""
+
+    def _post(self, anfrage):
+        return self.client.post('/api/berechnung/studie/', json.dumps(anfrage), content_type='application/json')
+
+    def test_columnar_output(self):
+        """Test that results are returned per target column in row-major order."""
+        response = self._post({
+            'parameter': {
+                'laenge': {'von': 10, 'bis': 30, 'schritte': 3},
+                'anz_geschosse': [1, 2],
+                'breite': 10, 'geschosshoehe': 3, 'tw_pro_m2': 15,
+            },
+            'ziele': ['nf', 'sb_absolut'],
+        })
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['anzahl'], 6)
+        self.assertEqual(data['achsen'], {'laenge': [10.0, 20.0, 30.0], 'anz_geschosse': [1.0, 2.0]})
+        self.assertEqual(data['ergebnisse']['nf'], [80.0, 160.0, 160.0, 320.0, 240.0, 480.0])
+        self.assertEqual(data['ergebnisse']['sb_absolut'][1], 2400.0)
+
+    def test_reduction_output(self):
+        """Test that the reduction reports extremes with API parameter names."""
+        response = self._post({
+            'parameter': {
+                'laenge': [10, 20], 'breite': [10, 20], 'geschosshoehe': 3, 'anz_geschosse': 2,
+                'jahres_heizbedarf': 50000,
+            },
+            'ziele': ['ee_spezifisch'],
+            'ausgabe': 'reduktion',
+        })
+        self.assertEqual(response.status_code, 200)
+        reduktion = json.loads(response.content)['reduktionen']['ee_spezifisch']
+        self.assertEqual(reduktion['argmin']['parameter'], {'laenge': 20.0, 'breite': 20.0})
+        self.assertEqual(reduktion['argmax']['parameter'], {'laenge': 10.0, 'breite': 10.0})
+        self.assertLess(reduktion['min'], reduktion['max'])
+
+    @override_settings(API_STUDIE_MAX_SPALTEN=10)
+    def test_invalid_requests(self):
+        """Test that invalid parameters and oversized sweeps are rejected."""
+        response = self._post({'parameter': {'laenge': [], 'anz_geschosse': [1.5], 'foo': 1}})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(json.loads(response.content)['fehler']), {'laenge', 'anz_geschosse', 'foo'})
+
+        zu_gross = {'parameter': {'laenge': list(range(1, 5)), 'breite': list(range(1, 5)), 'geschosshoehe': 3, 'anz_geschosse': 1}}
+        self.assertEqual(self._post(zu_gross).status_code, 400)
+        self.assertEqual(self._post(dict(zu_gross, ausgabe='reduktion')).status_code, 200)
+        self.assertEqual(self._post(dict(zu_gross, ziele=['nope'])).status_code, 400)
+
+
+class ApiUnsicherheitTest(TestCase):
+    """Test the Monte Carlo endpoint /api/berechnung/unsicherheit/."""
+
+    def _post(self, anfrage):
+        return self.client.post('/api/berechnung/unsicherheit/', json.dumps(anfrage), content_type='application/json')
+
+    def test_percentiles_and_histograms(self):
+        """Test that a seeded request returns reproducible percentiles and histograms."""
+        anfrage = {
+            'parameter': {
+                'laenge': 20, 'breite': 15, 'geschosshoehe': 3,
+                'anz_geschosse': {'verteilung': 'diskret', 'werte': [2, 3]},
+                'tw_pro_m2': {'verteilung': 'normal', 'mittel': 15, 'std': 3},
+            },
+            'stichproben': 2000, 'seed': 3, 'ziele': ['ne_absolut'], 'perzentile': [10, 90], 'klassen': 5,
+        }
+        response = self._post(anfrage)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['seed'], 3)
+        ne = data['ergebnisse']['ne_absolut']
+        self.assertEqual(set(ne['perzentile']), {'p10', 'p90'})
+        self.assertEqual(len(ne['histogramm']['grenzen']), 6)
+        self.assertEqual(sum(ne['histogramm']['anzahl']), 2000)
+        self.assertEqual(json.loads(self._post(anfrage).content), data)
+
+    def test_invalid_requests(self):
+        """Test that invalid distributions and options are reported per field."""
+        response = self._post({
+            'parameter': {
+                'laenge': 20, 'anz_geschosse': {'verteilung': 'normal', 'mittel': 3, 'std': 1},
+                'tw_pro_m2': {'verteilung': 'gleich', 'min': 5},
+            },
+            'stichproben': 0, 'seed': -1,
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            set(json.loads(response.content)['fehler']), {'anz_geschosse', 'tw_pro_m2', 'stichproben', 'seed'}
+        )
+
+
+class ApiSensitivitaetTest(TestCase):
+    """Test the sensitivity endpoint /api/berechnung/sensitivitaet/."""
+
+    PARAMETER = {
+        'laenge': 20, 'breite': 15, 'geschosshoehe': 3, 'anz_geschosse': 3,
+        'jahres_heizbedarf': {'von': 5000, 'bis': 15000}, 'bel_pro_m2': {'von': 5, 'bis': 10},
+    }
+
+    def _post(self, anfrage):
+        return self.client.post('/api/berechnung/sensitivitaet/', json.dumps(anfrage), content_type='application/json')
+
+    def test_sobol_and_morris(self):
+        """Test that both methods report indices under the API parameter names."""
+        response = self._post({'parameter': self.PARAMETER, 'stichproben': 256, 'seed': 1})
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['methode'], 'sobol')
+        self.assertEqual(set(data['eingaben']), {'jahres_heizbedarf', 'bel_pro_m2'})
+        self.assertGreater(data['eingaben']['jahres_heizbedarf']['st'], data['eingaben']['bel_pro_m2']['st'])
+
+        response = self._post({'parameter': self.PARAMETER, 'methode': 'morris', 'trajektorien': 5, 'ziel': 'sb_absolut'})
+        data = json.loads(response.content)
+        self.assertEqual(data['auswertungen'], 15)
+        self.assertEqual(data['eingaben']['jahres_heizbedarf']['mu_stern'], 0.0)
+
+    @override_settings(API_SENSITIVITAET_MAX_AUSWERTUNGEN=1000)
+    def test_invalid_requests(self):
+        """Test that invalid ranges, options and oversized requests are rejected."""
+        response = self._post({
+            'parameter': {'anz_geschosse': {'von': 1, 'bis': 3}, 'laenge': {'von': 5, 'bis': 5}},
+            'methode': 'fast', 'stufen': 3,
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(json.loads(response.content)['fehler']), {'anz_geschosse', 'laenge', 'methode', 'stufen'})
+        self.assertEqual(self._post({'parameter': self.PARAMETER, 'stichproben': 1000}).status_code, 400)
+
+
+class ApiOptimierungHuelleTest(TestCase):
+    """Test the envelope optimization endpoint /api/optimierung/huelle/."""
+
+    PARAMETER = {'laenge': 20, 'breite': 15, 'geschosshoehe': 3, 'anz_geschosse': 3, 'tw_pro_m2': 12}
+
+    def _post(self, anfrage):
+        return self.client.post('/api/optimierung/huelle/', json.dumps(anfrage), content_type='application/json')
+
+    def test_front_and_start_solution(self):
+        """Test that the endpoint returns a Pareto front and evaluates the component as start solution."""
+        from mylist.models import Bauteil
+        from mylist.tests.test_monatsbilanz import lege_klimadaten_an
+        lege_klimadaten_an()
+        bauteil = Bauteil.objects.create(u_wand_nord=0.35, u_dach=0.25, luftwechselrate=0.5)
+        response = self._post({
+            'parameter': self.PARAMETER, 'klimaregion': 4, 'bauteil': bauteil.pk,
+            'variablen': {'u_dach': {'von': 0.1, 'bis': 0.3}, 'fenster_sued': None},
+            'ziele': ['gwp_gesamt', 'kosten'], 'population': 10, 'generationen': 3, 'seed': 2,
+        })
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['ziele'], ['gwp_gesamt', 'kosten'])
+        self.assertEqual(set(data['front'][0]['variablen']), {'u_dach', 'fenster_sued'})
+        self.assertEqual(data['ausgangsloesung']['variablen'], {'u_wand_nord': 0.35, 'u_dach': 0.25})
+        self.assertGreater(data['ausgangsloesung']['kennwerte']['endenergie'], 0)
+
+    @override_settings(API_OPTIMIERUNG_MAX_AUSWERTUNGEN=100)
+    def test_invalid_requests(self):
+        """Test that unknown variables, objectives, preset demand and oversized runs are rejected."""
+        response = self._post({
+            'parameter': {**self.PARAMETER, 'jahres_heizbedarf': 5000},
+            'variablen': {'u_tuer': None}, 'ziele': ['preis'], 'budget': {'kosten': 'viel'},
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            set(json.loads(response.content)['fehler']),
+            {'jahres_heizbedarf', 'variablen.u_tuer', 'ziele', 'budget.kosten'},
+        )
+        self.assertEqual(self._post({'parameter': self.PARAMETER, 'population': 50}).status_code, 400)
+        self.assertEqual(self._post({
+            'parameter': self.PARAMETER, 'klimaregion': 9, 'population': 4, 'generationen': 1,
+        }).status_code, 404)
+
+
+class ApiLiveTest(TestCase):
+    """Test the incremental live endpoint /api/berechnung/live/."""
+
+    def _post(self, anfrage):
+        return self.client.post('/api/berechnung/live/', json.dumps(anfrage), content_type='application/json')
+
+    def test_session_recomputes_changed_parts(self):
+        """Test that a session keeps its inputs and recomputes only what a change affects."""
+        parameter = {'laenge': 20, 'breite': 15, 'geschosshoehe': 3, 'anz_geschosse': 3, 'jahres_heizbedarf': 10000}
+        data = json.loads(self._post({'parameter': parameter}).content)
+        self.assertTrue(data['neu'])
+        self.assertEqual(data['endenergie'], json.loads(self.client.get('/api/berechnung/', parameter).content)['endenergie'])
+
+        data = json.loads(self._post({'sitzung': data['sitzung'], 'parameter': {'bel_pro_m2': 5}}).content)
+        self.assertFalse(data['neu'])
+        self.assertEqual(sorted(data['neu_berechnet']), ['endenergie', 'nutzenergie', 'strombedarf'])
+        self.assertEqual(data['strombedarf']['sb_absolut'], 3600.0)
+
+        data = json.loads(self._post({'sitzung': 'unbekannt', 'parameter': {'bel_pro_m2': 5}}).content)
+        self.assertTrue(data['neu'])
+        self.assertEqual(data['gebaeudedaten']['nf'], 0.0)
+
+    def test_invalid_requests(self):
+        """Test that invalid parameters and session ids are rejected."""
+        response = self._post({'sitzung': 5, 'parameter': {'bel_pro_m2': 'viel', 'preis': 1}})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(json.loads(response.content)['fehler']), {'sitzung', 'bel_pro_m2', 'preis'})
+
+
+class ApiStundenTest(TestCase):
+    """Test the hourly simulation endpoint /api/berechnung/stunden/."""
+
+    def _post(self, anfrage):
+        return self.client.post('/api/berechnung/stunden/', json.dumps(anfrage), content_type='application/json')
+
+    def test_profiles_and_peaks(self):
+        """Test that schedules are expanded and hourly profiles and peak loads are returned."""
+        from mylist.tests.test_monatsbilanz import lege_klimadaten_an
+        lege_klimadaten_an()
+        response = self._post({
+            'laenge': 20, 'breite': 15, 'geschosshoehe': 3, 'anz_geschosse': 3,
+            'monatsbilanz': {'luftwechsel': 0.5},
+            'beleuchtung': [{'e_soll': 8, 'laufzeit_hd': 10, 'laufzeit_da': 250}],
+            'waermequellen': [{'anzahl': 2, 'leistung_kw': 0.5, 'betrieb_hd': 8, 'betrieb_da': 250}],
+            'lueftung': {'laufzeit_hd': 12, 'laufzeit_da': 250}, 'theta_kuehl': 26,
+        })
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(len(data['stunden']['heizlast']), 8760)
+        self.assertEqual(len(data['monate']['heizwaerme']), 12)
+        self.assertAlmostEqual(data['beleuchtung_jahr'], 8 * 720 * 10 * 250 / 1000, places=2)
+        self.assertGreater(data['heizlast_max'], 0)
+
+    def test_zero_geometry(self):
+        """Test that a building without volume returns zero demand as valid JSON."""
+        from mylist.tests.test_monatsbilanz import lege_klimadaten_an
+        lege_klimadaten_an()
+        response = self._post({'laenge': 0, 'breite': 15, 'geschosshoehe': 3, 'anz_geschosse': 3})
+        self.assertEqual(response.status_code, 200)
+
+        def ungueltig(konstante):
+            raise ValueError(konstante)
+
+        data = json.loads(response.content, parse_constant=ungueltig)
+        self.assertEqual(data['heizwaerme_jahr'], 0.0)
+        self.assertEqual(data['heizlast_max'], 0.0)
+        self.assertEqual(set(data['monate']['heizwaerme']), {0.0})
+
+    def test_invalid_requests(self):
+        """Test that missing geometry, invalid schedules and set points are rejected."""
+        response = self._post({
+            'laenge': 20, 'anz_geschosse': 2.5, 'beleuchtung': [{'e_soll': 8}], 'monatsbilanz': {'u_tuer': 1},
+            'theta_kuehl': 10,
+        })
+        self.assertEqual(response.status_code, 400)
+        fehler = json.loads(response.content)['fehler']
+        self.assertIn('breite', fehler)
+        self.assertIn('anz_geschosse', fehler)
+        self.assertIn('beleuchtung.0.laufzeit_hd', fehler)
+        self.assertIn('monatsbilanz.u_tuer', fehler)
+        self.assertIn('theta_kuehl', fehler)
@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from mylist.benchmark import vergleiche
+
+
+class BenchmarkTest(TestCase):
+    """Test the benchmark management command."""
+
+    def setUp(self):
+        datei = tempfile.NamedTemporaryFile(suffix='.json', delete=False)
+        datei.close()
+        self.pfad = datei.name
+        self.addCleanup(os.remove, self.pfad)
+
+    def test_writes_results(self):
+        """Test that all benchmarks run and the results are written as JSON."""
+        call_command(
+            'benchmark', groessen='5', wiederholungen=1, ausgabe=self.pfad,
+            ohne_testdatenbank=True, stdout=StringIO(),
+        )
+        with open(self.pfad) as datei:
+            dokument = json.load(datei)
+        namen = {ergebnis['name'] for ergebnis in dokument['ergebnisse']}
+        self.assertEqual(namen, {'skalar', 'batch', 'api', 'wizard', 'pdf', 'import'})
+        for ergebnis in dokument['ergebnisse']:
+            self.assertGreater(ergebnis['median_s'], 0)
+
+    def test_regression_against_baseline(self):
+        """Test that a slower run than the baseline fails the command."""
+        baseline = {'ergebnisse': [{'name': 'batch', 'groesse': 5, 'median_s': 1e-9}]}
+        with open(self.pfad, 'w') as datei:
+            json.dump(baseline, datei)
+        with self.assertRaises(CommandError):
+            call_command(
+                'benchmark', nur='batch', groessen='5', wiederholungen=1, baseline=self.pfad,
+                ohne_testdatenbank=True, stdout=StringIO(),
+            )
+
+    def test_vergleiche(self):
+        """Test the threshold of the baseline comparison."""
+        baseline = {'ergebnisse': [{'name': 'pdf', 'groesse': None, 'median_s': 1.0}]}
+        aktuell = {'ergebnisse': [{'name': 'pdf', 'groesse': None, 'median_s': 1.1}]}
+        self.assertFalse(vergleiche(aktuell, baseline, 0.2)[0][4])
+        self.assertTrue(vergleiche(aktuell, baseline, 0.05)[0][4])
@@ -1,5 +1,12 @@
+from unittest import mock
+
+import numpy as np
 from django.test import TestCase
+from mylist import berechnungen
 from mylist.berechnungen import (
+    batch_als_datensaetze,
+    berechne_bilanz,
+    berechne_bilanz_batch,
     berechne_gebaeudedaten,
     berechne_nutzenergiebedarf,
     berechne_strombedarf,
@@ -164,4 +171,97 @@ class BerechnungenTest(TestCase):
         result = berechne_endenergiebedarf(-720.0, sb, wb)
         expected_ee_absolut = -27360.0 + -12800.0
         self.assertEqual(result['ee_absolut'], expected_ee_absolut)
-        self.assertEqual(result['ee_spezifisch'], expected_ee_absolut / -720.0)
\ No newline at end of file
+        self.assertEqual(result['ee_spezifisch'], expected_ee_absolut / -720.0)
+
+class BilanzBatchTest(TestCase):
+    """Test the vectorized batch calculation against the scalar functions."""
+
+    def _skalar_kette(self, zeile):
+        geb = berechne_gebaeudedaten(
+            zeile['laenge'], zeile['breite'], zeile['geschosshoehe'], zeile['anz_geschosse']
+        )
+        ne = berechne_nutzenergiebedarf(
+            geb['nf'],
+            zeile['jahres_heizwaermebedarf_kwh'],
+            zeile['trinkwarmwasser_kwh_pro_m2'],
+            zeile['luftfoerderung_kwh_pro_m2'],
+            zeile['beleuchtung_kwh_pro_m2'],
+            zeile['nutzer_pro_m2'],
+        )
+        sb = berechne_strombedarf(
+            geb['nf'],
+            zeile['trinkwarmwasser_kwh_pro_m2'],
+            zeile['luftfoerderung_kwh_pro_m2'],
+            zeile['beleuchtung_kwh_pro_m2'],
+            zeile['nutzer_pro_m2'],
+        )
+        wb = berechne_waermebedarf(
+            zeile['jahres_heizwaermebedarf_kwh'],
+            zeile['verteilungsverlust_kwh'],
+            zeile['speicherverlust_kwh'],
+            zeile['warmwasserbedarf_kwh'],
+        )
+        ee = berechne_endenergiebedarf(geb['nf'], sb, wb)
+        return {**geb, **ne, **sb, **wb, **ee}
+
+    def test_batch_matches_scalar_chain(self):
+        """Test that every batch result equals the scalar chain exactly."""
+        rng = np.random.default_rng(42)
+        n = 500
+        spalten = {
+            'laenge': np.round(rng.uniform(0, 80, n), 3),
+            'breite': np.round(rng.uniform(0, 50, n), 3),
+            'geschosshoehe': np.round(rng.uniform(2.5, 4, n), 3),
+            'anz_geschosse': rng.integers(0, 12, n),
+            'jahres_heizwaermebedarf_kwh': np.round(rng.uniform(0, 1e5, n), 3),
+            'trinkwarmwasser_kwh_pro_m2': np.round(rng.uniform(0, 30, n), 3),
+            'luftfoerderung_kwh_pro_m2': np.round(rng.uniform(0, 20, n), 3),
+            'beleuchtung_kwh_pro_m2': np.round(rng.uniform(0, 20, n), 3),
+            'nutzer_pro_m2': np.round(rng.uniform(0, 20, n), 3),
+            'verteilungsverlust_kwh': np.round(rng.uniform(0, 1e3, n), 3),
+            'speicherverlust_kwh': np.round(rng.uniform(0, 1e3, n), 3),
+            'warmwasserbedarf_kwh': np.round(rng.uniform(0, 5e3, n), 3),
+        }
+        result = berechne_bilanz_batch(spalten)
+
+        for i in range(n):
+            zeile = {name: float(werte[i]) for name, werte in spalten.items()}
+            erwartet = self._skalar_kette(zeile)
+            for schluessel, wert in erwartet.items():
+                self.assertEqual(result[schluessel][i], wert, (i, schluessel))
+
+    def test_batch_rounding_matches_round(self):
+        """Test values at the rounding boundary where np.round differs from round()."""
+        result = berechne_bilanz_batch(
+            laenge=[1.0, 1.0], breite=[1.0, 1.0], geschosshoehe=[1.0, 1.0], anz_geschosse=[1, 1],
+            verteilungsverlust_kwh=[2.675, 1.005],
+        )
+        self.assertEqual(list(result['wb_absolut']), [round(2.675, 2), round(1.005, 2)])
+
+    def test_batch_accepts_structured_array_and_defaults(self):
+        """Test structured-array input, broadcasting and default columns."""
+        daten = np.zeros(2, dtype=[('laenge', 'f8'), ('breite', 'f8'), ('anz_geschosse', 'i4')])
+        daten['laenge'] = [20.0, 10.0]
+        daten['breite'] = [15.0, 10.0]
+        daten['anz_geschosse'] = [3, 2]
+
+        result = berechne_bilanz_batch(daten, geschosshoehe=3.0)
+        self.assertEqual(list(result['nf']), [720.0, 160.0])
+        self.assertEqual(list(result['ee_absolut']), [0.0, 0.0])
+
+    def test_batch_as_records_across_blocks(self):
+        """Test that records converted block by block match the scalar chain, also at block boundaries."""
+        laenge = np.arange(1.0, 8.0)
+        result = berechne_bilanz_batch(laenge=laenge, breite=10.0, geschosshoehe=3.0, anz_geschosse=2)
+        with mock.patch.object(berechnungen, 'DATENSATZ_BLOCK', 3):
+            datensaetze = list(batch_als_datensaetze(result))
+        self.assertEqual(datensaetze, [
+            berechne_bilanz(laenge=wert, breite=10.0, geschosshoehe=3.0, anz_geschosse=2) for wert in laenge
+        ])
+        self.assertEqual(list(batch_als_datensaetze(berechne_bilanz_batch(laenge=[], breite=[], geschosshoehe=[],
+                                                                           anz_geschosse=[]))), [])
+
+    def test_batch_missing_column(self):
+        """Test that a missing required column raises a ValueError."""
+        with self.assertRaises(ValueError):
+            berechne_bilanz_batch(laenge=[1.0], breite=[1.0], geschosshoehe=[1.0])
@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from mylist import ergebniscache as modul
+from mylist.berechnungen import berechne_bilanz
+from mylist.ergebniscache import ergebnis_schluessel, ergebniscache, normalisiere
+
+
+EINGABEN = {
+    'laenge': 20.0,
+    'breite': 15.0,
+    'geschosshoehe': 3.0,
+    'anz_geschosse': 3,
+    'jahres_heizwaermebedarf_kwh': 10000.0,
+    'trinkwarmwasser_kwh_pro_m2': 15.0,
+}
+
+
+class ErgebniscacheTest(TestCase):
+    """Test the content-addressed result cache of the calculation chain."""
+
+    def setUp(self):
+        ergebniscache.leeren()
+
+    def tearDown(self):
+        ergebniscache.leeren()
+
+    def test_hit_and_miss(self):
+        """Test that identical inputs are computed once and match the uncached chain."""
+        erstes = ergebniscache.bilanz(**EINGABEN)
+        self.assertEqual(erstes, berechne_bilanz(**EINGABEN))
+        with mock.patch.object(modul, 'berechne_bilanz') as berechnung:
+            # int/float und weggelassene Standardwerte ergeben denselben Schlüssel
+            zweites = ergebniscache.bilanz(**dict(EINGABEN, anz_geschosse=3.0, nutzer_pro_m2=0))
+        berechnung.assert_not_called()
+        self.assertEqual(zweites, erstes)
+
+        statistik = ergebniscache.statistik()
+        self.assertEqual(statistik['treffer'], 1)
+        self.assertEqual(statistik['fehlschlaege'], 1)
+        self.assertEqual(statistik['trefferquote'], 0.5)
+
+    def test_results_are_copies(self):
+        """Test that modifying a returned result does not change the cached entry."""
+        ergebniscache.bilanz(**EINGABEN)['gebaeudedaten']['nf'] = -1
+        self.assertEqual(ergebniscache.bilanz(**EINGABEN)['gebaeudedaten']['nf'], 720.0)
+
+    @override_settings(ERGEBNISCACHE_GROESSE=2)
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        for laenge in (10, 20, 10, 30):
+            ergebniscache.bilanz(**dict(EINGABEN, laenge=laenge))
+        self.assertEqual(ergebniscache.statistik()['eintraege'], 2)
+        ergebniscache.bilanz(**dict(EINGABEN, laenge=10))
+        self.assertEqual(ergebniscache.statistik()['treffer'], 2)
+
+    def test_version_changes_key(self):
+        """Test that a new engine version yields different keys."""
+        vektor = normalisiere(EINGABEN)
+        schluessel = ergebnis_schluessel(vektor)
+        with mock.patch.object(modul, 'BERECHNUNGSVERSION', 2):
+            self.assertNotEqual(ergebnis_schluessel(vektor), schluessel)
+
+    @override_settings(ERGEBNISCACHE_DJANGO='default')
+    def test_shared_tier(self):
+        """Test that a second process finds results in the Django cache."""
+        ergebniscache.bilanz(**EINGABEN)
+        ergebniscache.leeren()
+        with mock.patch.object(modul, 'berechne_bilanz') as berechnung:
+            ergebniscache.bilanz(**EINGABEN)
+        berechnung.assert_not_called()
+        self.assertEqual(ergebniscache.statistik()['treffer_geteilt'], 1)
+
+    def test_api_uses_cache(self):
+        """Test that repeated API requests are served from the cache."""
+        parameter = {'laenge': 20, 'breite': 15, 'geschosshoehe': 3, 'anz_geschosse': 3}
+        erste = self.client.get(reverse('api_berechnung'), parameter).json()
+        zweite = self.client.get(reverse('api_berechnung'), parameter).json()
+        self.assertEqual(erste, zweite)
+        self.assertEqual(ergebniscache.statistik()['treffer'], 1)
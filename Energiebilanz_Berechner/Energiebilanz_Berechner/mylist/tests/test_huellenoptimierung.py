@@ -0,0 +1,78 @@
+import numpy as np
+from django.test import TestCase
+from mylist.models import Bauteil
+from mylist.monatsbilanz import lade_klimadaten
+from mylist.referenzdaten import referenzdaten
+from mylist.huellenoptimierung import ausgangsloesung, bewerte, optimiere
+from mylist.tests.test_monatsbilanz import lege_klimadaten_an
+
+
+class HuellenoptimierungTest(TestCase):
+    """Test the envelope optimizer for U-values and window ratios."""
+
+    GEOMETRIE = {'laenge': 20.0, 'breite': 15.0, 'geschosshoehe': 3.0, 'anz_geschosse': 3}
+
+    def setUp(self):
+        lege_klimadaten_an()
+        self.klima = lade_klimadaten(4)
+
+    def test_bewerte_trade_off(self):
+        """Test that lower U-values cut end energy but cost more insulation and embodied GWP."""
+        kennwerte = bewerte(self.klima, self.GEOMETRIE, {'u_dach': np.array([0.3, 0.1])})
+        self.assertLess(kennwerte['endenergie'][1], kennwerte['endenergie'][0])
+        self.assertGreater(kennwerte['gwp_herstellung'][1], kennwerte['gwp_herstellung'][0])
+        self.assertGreater(kennwerte['kosten'][1], kennwerte['kosten'][0])
+        # Zusätzliche Dämmung auf 300 m² Dach: 0.035 · (1/0.1 − 1/0.3) m · 60 kg/m³
+        self.assertAlmostEqual(
+            kennwerte['gwp_herstellung'][1] - kennwerte['gwp_herstellung'][0], 300 * 0.035 * (10 - 10 / 3) * 60
+        )
+        np.testing.assert_allclose(
+            kennwerte['gwp_gesamt'], kennwerte['gwp_herstellung'] + kennwerte['endenergie'] * 0.3 * 50
+        )
+
+    def test_bewerte_without_database_when_fx_given(self):
+        """Test that an evaluation with all Fx values passed in (as in the worker context) reads no tables."""
+        referenzdaten.invalidieren()
+        self.addCleanup(referenzdaten.invalidieren)
+        monatsbilanz = {'fx_wand': 0.9, 'fx_fenster': 0.9, 'fx_dach': 0.8}
+        with self.assertNumQueries(0):
+            kennwerte = bewerte(self.klima, self.GEOMETRIE, {'u_dach': np.array([0.3])}, monatsbilanz)
+        ohne_fx = bewerte(self.klima, self.GEOMETRIE, {'u_dach': np.array([0.3])})
+        self.assertLess(kennwerte['heizwaerme'][0], ohne_fx['heizwaerme'][0])
+
+    def test_pareto_front_with_budget(self):
+        """Test that the front is non-dominated, respects bounds and budget, and is reproducible."""
+        grenzen = {'u_dach': (0.1, 0.3), 'u_wand_sued': (0.1, 0.4), 'fenster_nord': (0.05, 0.5)}
+        ergebnis = optimiere(
+            self.klima, self.GEOMETRIE, grenzen=grenzen, budget={'kosten': 80000},
+            population=20, generationen=15, seed=1,
+        )
+        self.assertEqual(ergebnis['auswertungen'], 20 * 16)
+        front = ergebnis['front']
+        self.assertGreater(len(front), 1)
+        punkte = np.array([[l['kennwerte']['endenergie'], l['kennwerte']['gwp_herstellung']] for l in front])
+        self.assertTrue((np.diff(punkte[:, 0]) >= 0).all())
+        self.assertTrue((np.diff(punkte[:, 1]) <= 0).all())
+        for loesung in front:
+            self.assertLessEqual(loesung['kennwerte']['kosten'], 80000)
+            for name, (unten, oben) in grenzen.items():
+                self.assertTrue(unten - 1e-4 <= loesung['variablen'][name] <= oben + 1e-4)
+        # Nordfenster bringen kaum Gewinne: auf der Front bleiben sie klein
+        self.assertLess(max(l['variablen']['fenster_nord'] for l in front), 0.2)
+        self.assertEqual(optimiere(
+            self.klima, self.GEOMETRIE, grenzen=grenzen, budget={'kosten': 80000},
+            population=20, generationen=15, seed=1, prozesse=2,
+        )['front'], front)
+
+        with self.assertRaises(ValueError):
+            optimiere(self.klima, self.GEOMETRIE, ziele=['preis'])
+        self.assertEqual(optimiere(
+            self.klima, self.GEOMETRIE, grenzen=grenzen, budget={'kosten': 1}, population=8, generationen=2, seed=1,
+        )['front'], [])
+
+    def test_ausgangsloesung_from_bauteil(self):
+        """Test that a component's U-values become the start solution and its ventilation stays fixed."""
+        bauteil = Bauteil.objects.create(u_wand_nord=0.3, u_dach=0.25, u_bodenplatte=0.4, luftwechselrate=0.5)
+        variablen, monatsbilanz = ausgangsloesung(bauteil)
+        self.assertEqual(variablen, {'u_wand_nord': 0.3, 'u_dach': 0.25, 'u_boden': 0.4})
+        self.assertEqual(monatsbilanz, {'luftwechsel': 0.5})
@@ -0,0 +1,84 @@
+import numpy as np
+from django.test import TestCase
+from django.urls import reverse
+from mylist.interne_gewinne import berechne_interne_gewinne, interne_gewinne_fuer_gebaeude
+from mylist.models import Bauteil, Beleuchtung, Gebaeude, Waermequelle
+from mylist.monatsbilanz import heizwaerme_fuer_gebaeude
+from mylist.tests.test_monatsbilanz import lege_klimadaten_an
+from mylist.tests.test_wizard_entwurf import SCHRITTE
+
+
+class InterneGewinneTest(TestCase):
+    """Test the internal gains and lighting electricity from Beleuchtung and Waermequelle entries."""
+
+    def test_grouped_sums_per_building(self):
+        """Test lighting and heat source sums grouped by building, including a building without entries."""
+        ergebnis = berechne_interne_gewinne(
+            [100.0, 400.0, 50.0],
+            beleuchtung={
+                'gebaeude': [0, 1, 1], 'e_soll': [10.0, 8.0, 4.0],
+                'laufzeit_hd': [10.0, 12.0, 30.0], 'laufzeit_da': [250.0, 365.0, 365.0],
+            },
+            waermequellen={
+                'gebaeude': [1, 0], 'anzahl': [2, 1], 'leistung_kw': [0.5, 1.0],
+                'betrieb_hd': [8.0, 24.0], 'betrieb_da': [200.0, 365.0],
+            },
+        )
+        # Gebäude 1: zwei Zonen zu je 200 m², Laufzeit auf 24 h/d begrenzt
+        beleuchtung = [10 * 100 * 2500 / 1000, (8 * 200 * 12 + 4 * 200 * 24) * 365 / 1000, 0.0]
+        waermequellen = [8760.0, 1600.0, 0.0]
+        self.assertEqual(ergebnis['beleuchtung_kwh'].tolist(), beleuchtung)
+        self.assertEqual(ergebnis['waermequellen_kwh'].tolist(), waermequellen)
+        self.assertEqual(ergebnis['beleuchtung_spezifisch'][0], 25.0)
+        self.assertAlmostEqual(ergebnis['q_i'][0], (2500 + 8760) * 1000 / (8760 * 100), places=4)
+        self.assertEqual(ergebnis['interne_gewinne_kwh'][2], 0.0)
+        np.testing.assert_allclose(ergebnis['gewinne_monate'].sum(axis=1), ergebnis['interne_gewinne_kwh'], atol=0.05)
+
+        with self.assertRaises(ValueError):
+            berechne_interne_gewinne(100.0, waermequellen={
+                'gebaeude': [1], 'anzahl': [1], 'leistung_kw': [1.0], 'betrieb_hd': [1.0], 'betrieb_da': [1.0],
+            })
+
+    def test_buildings_from_database_in_one_query_per_model(self):
+        """Test that all entries of several buildings are read with one query per model."""
+        geb1 = Gebaeude.objects.create(name='A', laenge_ns=10.0, breite_ow=10.0, geschosshoehe=3.0, geschosse=2)
+        geb2 = Gebaeude.objects.create(name='B', laenge_ns=20.0, breite_ow=10.0, geschosshoehe=3.0, geschosse=1)
+        for gebaeude, e_soll in ((geb2, 5.0), (geb2, 10.0), (geb1, 8.0), (None, 100.0)):
+            Beleuchtung.objects.create(bereich='buero', beleuchtungsart='LED', regelungsart='manuell',
+                                       e_soll=e_soll, laufzeit_hd=10, laufzeit_da=200, gebaeude=gebaeude)
+        Waermequelle.objects.create(name='Server', anzahl=3, leistung_kw=0.2, betrieb_hd=24, betrieb_da=365,
+                                    gebaeude=geb1)
+
+        with self.assertNumQueries(3):
+            ergebnis = interne_gewinne_fuer_gebaeude(Gebaeude.objects.order_by('-pk'))
+        self.assertEqual(ergebnis['gebaeude_id'].tolist(), [geb2.pk, geb1.pk])
+        self.assertEqual(ergebnis['beleuchtung_kwh'].tolist(), [(5 + 10) * 80 * 2000 / 1000, 8 * 160 * 2000 / 1000])
+        self.assertEqual(ergebnis['waermequellen_kwh'].tolist(), [0.0, 0.6 * 8760])
+        self.assertEqual(interne_gewinne_fuer_gebaeude([geb1])['beleuchtung_kwh'].tolist(), [2560.0])
+
+    def test_wizard_feeds_heating_balance(self):
+        """Test that the wizard links the entries to the building and uses their gains in the monthly balance."""
+        lege_klimadaten_an()
+        schritte = [
+            (url, {**daten, 'jahres_heizwert': ''} if url == 'wizard_energie' else
+             {**daten, 'e_soll': 8.0} if url == 'wizard_beleuchtung' else daten)
+            for url, daten in SCHRITTE
+        ]
+        schritte.insert(5, ('wizard_waermequelle', {
+            'name': 'Quelle 1', 'anzahl': 4, 'leistung_kw': 0.3, 'betrieb_hd': 8, 'betrieb_da': 250,
+        }))
+        for url, daten in schritte:
+            self.client.post(reverse(url), daten)
+        response = self.client.get(reverse('wizard_ergebnis'))
+        self.assertContains(response, 'Interne Gewinne')
+
+        gebaeude = Gebaeude.objects.get()
+        gewinne = response.context['interne_gewinne']
+        self.assertEqual(gewinne['beleuchtung_kwh'], 8 * 720 * 2500 / 1000)
+        self.assertEqual(gewinne['waermequellen_kwh'], 2400.0)
+        self.assertEqual(Beleuchtung.objects.get().gebaeude, gebaeude)
+        self.assertEqual(Waermequelle.objects.get().gebaeude, gebaeude)
+
+        erwartet = heizwaerme_fuer_gebaeude(gebaeude, Bauteil.objects.get(), gewinne['q_i'])
+        self.assertEqual(gebaeude.jahres_heizwert, erwartet)
+        self.assertNotEqual(erwartet, heizwaerme_fuer_gebaeude(gebaeude, Bauteil.objects.get()))
@@ -0,0 +1,50 @@
+from django.core.servers.basehttp import WSGIServer
+from django.test import LiveServerTestCase
+from django.test.testcases import LiveServerThread, QuietWSGIRequestHandler
+from mylist.lasttest import Lasttest
+from mylist.models import Gebaeude, SonneneintragsParameter, SonnenschutzFaktor
+
+
+class EinfacherServerThread(LiveServerThread):
+    # Die Test-Datenbank (SQLite im Speicher) teilt eine Verbindung über alle
+    # Server-Threads; parallele Transaktionen kollidieren dort. Die Anfragen
+    # der Nutzer laufen hier nacheinander, der Lasttest bleibt nebenläufig.
+    server_class = WSGIServer
+
+    def _create_server(self, connections_override=None):
+        return self.server_class((self.host, self.port), QuietWSGIRequestHandler, allow_reuse_address=False)
+
+
+class LasttestTest(LiveServerTestCase):
+    """Test the wizard load-test harness against a live server."""
+
+    server_thread_class = EinfacherServerThread
+
+    def setUp(self):
+        SonnenschutzFaktor.objects.create(
+            zeile="2.1",
+            sonnenschutzvorrichtung="Jalousie",
+            f_c_g_le_0_40_zweifach=0.65,
+            f_c_g_le_0_40_dreifach=0.7,
+            f_c_g_gt_0_40_zweifach=0.65,
+        )
+
+    def test_concurrent_wizard_runs(self):
+        """Test that concurrent users complete the wizard and are reported per step."""
+        bericht = Lasttest(self.live_server_url, nutzer=2, durchlaeufe=2, denkzeit=0).ausfuehren()
+
+        self.assertEqual(bericht['fehler'], {})
+        self.assertEqual(bericht['durchlaeufe'], 4)
+        self.assertEqual(bericht['fehlerquote'], 0.0)
+        self.assertEqual(len(bericht['schritte']), 19)
+        self.assertEqual(bericht['schritte']['wizard_ergebnis GET']['anzahl'], 4)
+        self.assertEqual(Gebaeude.objects.count(), 4)
+        self.assertEqual(SonneneintragsParameter.objects.count(), 4)
+
+    def test_errors_are_reported(self):
+        """Test that failing steps are counted instead of aborting the test."""
+        SonnenschutzFaktor.objects.all().delete()
+        bericht = Lasttest(self.live_server_url, nutzer=1, durchlaeufe=1, denkzeit=0).ausfuehren()
+        self.assertEqual(bericht['durchlaeufe_fehler'], 1)
+        self.assertEqual(bericht['schritte']['wizard_sonneneintrag POST']['fehler'], 1)
+        self.assertGreater(bericht['fehlerquote'], 0)
@@ -0,0 +1,67 @@
+import numpy as np
+from django.test import TestCase
+from django.urls import reverse
+from mylist.lueftungsbilanz import berechne_lueftung, berechne_lueftung_batch, summe_druckverluste
+from mylist.models import Bauteil, DruckverlustBauteil
+from mylist.monatsbilanz import STUNDEN_PRO_MONAT, lade_klimadaten
+from mylist.tests.test_monatsbilanz import POTSDAM, lege_klimadaten_an
+from mylist.tests.test_wizard_entwurf import SCHRITTE
+
+
+class LueftungsbilanzTest(TestCase):
+    """Test the ventilation heat demand and fan energy engine."""
+
+    def setUp(self):
+        lege_klimadaten_an()
+        DruckverlustBauteil.objects.create(bauteil='Erhitzer', druckverlust_pa=100)
+        DruckverlustBauteil.objects.create(bauteil='Filter F7', druckverlust_pa=200)
+        self.klima = lade_klimadaten(4)
+
+    def test_heat_demand_and_fan_energy(self):
+        """Test ventilation heat from air change, heat recovery and schedule, and SFP fan energy."""
+        ergebnis = berechne_lueftung(
+            self.klima, 20.0, 15.0, 3.0, 3, luftwechselrate=0.5, wrg_wirkungsgrad=80,
+            raum_temp_soll=20.0, laufzeit_hd=12, laufzeit_da=365,
+        )
+        volumenstrom = 0.5 * 0.8 * 2700.0
+        erwartet = 0.34 * volumenstrom * 0.2 * 0.5 * np.maximum(20.0 - np.array(POTSDAM), 0) * STUNDEN_PRO_MONAT / 1000
+        self.assertEqual(ergebnis['luftvolumenstrom'], volumenstrom)
+        self.assertAlmostEqual(ergebnis['lb_absolut'], erwartet.sum(), places=1)
+        self.assertAlmostEqual(ergebnis['lb_spezifisch'], round(erwartet.sum() / 720, 2), places=2)
+        self.assertEqual(len(ergebnis['lb_monate']), 12)
+        # SFP = 300 Pa / (0,6 · 3600), 12 h am Tag
+        self.assertAlmostEqual(ergebnis['sfp'], round(300 / 2160, 4))
+        self.assertAlmostEqual(ergebnis['ventilator_kwh'], 300 / 2160 * volumenstrom * 4380 / 1000, places=1)
+
+        self.assertEqual(summe_druckverluste(['Erhitzer']), 100.0)
+        with self.assertRaises(LookupError):
+            summe_druckverluste(['Kühler'])
+
+    def test_batch_matches_scalar(self):
+        """Test that the batch interface equals scalar calls row by row."""
+        spalten = {
+            'laenge': [20.0, 12.0], 'breite': [15.0, 10.0], 'geschosshoehe': 3.0, 'anz_geschosse': [3, 2],
+            'luftwechselrate': [0.5, 1.0], 'wrg_wirkungsgrad': [75.0, 0.0], 'druckverlust_pa': 150.0,
+        }
+        batch = berechne_lueftung_batch(self.klima, spalten)
+        for i in range(2):
+            zeile = {name: (werte[i] if isinstance(werte, list) else werte) for name, werte in spalten.items()}
+            einzeln = berechne_lueftung(self.klima, **zeile)
+            self.assertEqual(einzeln['lb_absolut'], batch['lb_absolut'][i])
+            self.assertEqual(einzeln['ventilator_spezifisch'], batch['ventilator_spezifisch'][i])
+        with self.assertRaises(ValueError):
+            berechne_lueftung_batch(self.klima, laenge=10.0, breite=10.0, geschosshoehe=3.0)
+
+    def test_wizard_fills_bauteil_results(self):
+        """Test that the wizard result step stores lb_absolut/lb_spezifisch from the ventilation step."""
+        schritte = SCHRITTE[:4] + [('wizard_lueftung', {
+            'lueftungstyp': 'Zu-/Abluft', 'luftwechselrate': 0.5, 'wrg_wirkungsgrad': 80,
+            'raum_temp_soll': 20, 'laufzeit_hd': 12, 'laufzeit_da': 250,
+        })] + SCHRITTE[4:]
+        for url, daten in schritte:
+            self.client.post(reverse(url), daten)
+        response = self.client.get(reverse('wizard_ergebnis'))
+        self.assertContains(response, 'Ventilatorstrom')
+        bauteil = Bauteil.objects.get()
+        self.assertEqual(bauteil.lb_absolut, response.context['lueftung']['lb_absolut'])
+        self.assertGreater(bauteil.lb_spezifisch, 0)
@@ -0,0 +1,65 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from mylist import messung
+
+
+class MessungTest(TestCase):
+    """Test the timing and query-count middleware."""
+
+    def setUp(self):
+        messung.zuruecksetzen()
+
+    def tearDown(self):
+        messung.zuruecksetzen()
+
+    def test_server_timing_header(self):
+        """Test that calculation time and response size are reported."""
+        response = self.client.get(reverse('api_berechnung'), {'laenge': 11, 'breite': 7, 'geschosshoehe': 3, 'anz_geschosse': 2})
+        kopf = response['Server-Timing']
+        self.assertTrue(kopf.startswith('total;dur='))
+        self.assertIn('berechnung;dur=', kopf)
+        self.assertIn(f'size;desc="{len(response.content)} B"', kopf)
+
+    def test_query_count(self):
+        """Test that database queries of a view are counted."""
+        session = self.client.session
+        session['geb_pk'] = 999
+        session.save()
+        response = self.client.get(reverse('wizard_energie'))
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ queries"')
+
+    def test_rolling_percentiles(self):
+        """Test that the aggregate collects percentiles per URL name."""
+        for _ in range(3):
+            self.client.get(reverse('startseite'))
+        statistik = messung.statistik()['startseite']
+        self.assertEqual(statistik['anzahl'], 3)
+        self.assertLessEqual(statistik['p50'], statistik['p99'])
+
+    def test_nested_calls_counted_once(self):
+        """Test that nested measured functions do not double count."""
+        aufrufe = []
+
+        @messung.gemessen('test')
+        def innen():
+            aufrufe.append(1)
+
+        @messung.gemessen('test')
+        def aussen():
+            innen()
+
+        aktuell = messung.Messung()
+        token = messung._aktuell.set(aktuell)
+        try:
+            aussen()
+        finally:
+            messung._aktuell.reset(token)
+        self.assertEqual(list(aktuell.zeiten), ['test'])
+        self.assertEqual(aufrufe, [1])
+
+    @override_settings(MESSUNG_AKTIV=False)
+    def test_disabled(self):
+        """Test that the middleware can be switched off."""
+        response = self.client.get(reverse('startseite'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(messung.statistik(), {})
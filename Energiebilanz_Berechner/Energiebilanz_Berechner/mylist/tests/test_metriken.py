@@ -0,0 +1,101 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from mylist.ergebniscache import ergebniscache
+from mylist.metriken import metriken, prometheus_text
+from mylist.referenzdaten import referenzdaten
+
+
+class MetrikenTest(TestCase):
+    """Test the Prometheus metrics endpoint."""
+
+    def setUp(self):
+        metriken.zuruecksetzen()
+        ergebniscache.leeren()
+
+    def tearDown(self):
+        metriken.zuruecksetzen()
+        referenzdaten.invalidieren()
+
+    def test_request_and_calculation_metrics(self):
+        """Test that requests, latencies and calculation durations are exported."""
+        self.client.get(reverse('api_berechnung'), {'laenge': 10, 'breite': 10, 'geschosshoehe': 3, 'anz_geschosse': 1})
+        response = self.client.get(reverse('metriken'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+
+        self.assertIn('# TYPE mylist_anfragen_total counter', text)
+        self.assertIn('mylist_anfragen_total{methode="GET",status="200",url_name="api_berechnung"} 1', text)
+        self.assertIn('mylist_anfrage_dauer_sekunden_count{url_name="api_berechnung"} 1', text)
+        self.assertIn('le="+Inf"', text)
+        self.assertIn(
+            'mylist_funktion_dauer_sekunden_count{funktion="berechne_bilanz",kategorie="berechnung"} 1', text
+        )
+        self.assertIn('mylist_ergebniscache_zugriffe_total{ergebnis="fehlschlag"} 1', text)
+        self.assertIn('mylist_referenzdaten_zugriffe_total{ergebnis="treffer",tabelle="klima"}', text)
+
+    def test_import_metrics(self):
+        """Test that import runs are counted and the database state is exported."""
+        call_command('import_druckverlust', stdout=StringIO())
+        call_command('import_druckverlust', stdout=StringIO())
+        text = self.client.get(reverse('metriken')).content.decode()
+        self.assertIn('mylist_import_laeufe_total{art="inkrementell",tabelle="druckverlust"} 1', text)
+        self.assertIn('mylist_import_laeufe_total{art="unveraendert",tabelle="druckverlust"} 1', text)
+        self.assertIn('mylist_import_datensaetze_total{tabelle="druckverlust"} 15', text)
+        self.assertIn('mylist_referenzimport_datensaetze{tabelle="druckverlust"} 15', text)
+
+    def test_multi_process_aggregation(self):
+        """Test that snapshots of several processes are summed up."""
+        verzeichnis = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, verzeichnis)
+
+        # Abzug eines anderen Worker-Prozesses
+        fremd = [
+            ['mylist_anfragen_total', [['methode', 'GET'], ['status', '200'], ['url_name', 'startseite']], 2],
+            ['mylist_anfrage_dauer_sekunden', [['url_name', 'startseite']], [1] + [0] * 11 + [1, 20.0]],
+        ]
+        with open(os.path.join(verzeichnis, '1.json'), 'w') as datei:
+            json.dump(fremd, datei)
+
+        with override_settings(METRIKEN_VERZEICHNIS=verzeichnis):
+            metriken.zaehle('mylist_anfragen_total', methode='GET', status=200, url_name='startseite')
+            metriken.beobachte('mylist_anfrage_dauer_sekunden', 0.002, url_name='startseite')
+            text = prometheus_text()
+
+        self.assertIn('mylist_anfragen_total{methode="GET",status="200",url_name="startseite"} 3', text)
+        self.assertIn('mylist_anfrage_dauer_sekunden_bucket{url_name="startseite",le="0.001"} 1', text)
+        self.assertIn('mylist_anfrage_dauer_sekunden_bucket{url_name="startseite",le="0.005"} 2', text)
+        self.assertIn('mylist_anfrage_dauer_sekunden_count{url_name="startseite"} 3', text)
+        self.assertIn('mylist_anfrage_dauer_sekunden_sum{url_name="startseite"} 20.002', text)
+        self.assertTrue(os.path.exists(os.path.join(verzeichnis, f'{os.getpid()}.json')))
+
+    def test_stale_snapshots_are_pruned(self):
+        """Test that snapshots not renewed within METRIKEN_MAX_ALTER are deleted and not counted."""
+        verzeichnis = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, verzeichnis)
+        alt = os.path.join(verzeichnis, '2.json')
+        with open(alt, 'w') as datei:
+            json.dump([['mylist_anfragen_total', [['methode', 'GET'], ['status', '200'], ['url_name', 'alt']], 5]], datei)
+        os.utime(alt, (0, 0))
+
+        with override_settings(METRIKEN_VERZEICHNIS=verzeichnis, METRIKEN_MAX_ALTER=60):
+            text = prometheus_text()
+        self.assertNotIn('url_name="alt"', text)
+        self.assertFalse(os.path.exists(alt))
+
+    def test_unwritable_directory_does_not_fail_requests(self):
+        """Test that a failing snapshot write is logged instead of breaking the request."""
+        datei = tempfile.NamedTemporaryFile()
+        self.addCleanup(datei.close)
+        with override_settings(METRIKEN_VERZEICHNIS=os.path.join(datei.name, 'metriken'), METRIKEN_SCHREIBINTERVALL=0):
+            with self.assertLogs('mylist.metriken', level='WARNING'):
+                metriken.schreiben()
+                response = self.client.get(reverse('api_berechnung'), {'laenge': 10, 'breite': 10})
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,126 @@
+import numpy as np
+from django.test import TestCase, Client
+from django.urls import reverse
+from mylist.models import Gebaeude, KlimaregionTemperatur, SolarStrahlungMonat
+from mylist.monatsbilanz import (
+    MONATE,
+    MONATE_STRAHLUNG,
+    lade_klimadaten,
+    berechne_heizwaerme_monatlich,
+    berechne_jahres_heizwaermebedarf,
+)
+from mylist.tests.test_wizard_entwurf import SCHRITTE
+
+POTSDAM = [1.0, 1.9, 4.7, 9.2, 14.1, 16.7, 19.0, 18.6, 14.3, 9.5, 4.1, 0.9]
+SUED_90 = [60, 87, 115, 106, 114, 95, 106, 120, 86, 83, 36, 33]
+
+
+def lege_klimadaten_an():
+    KlimaregionTemperatur.objects.create(
+        region=4, referenzort='Potsdam', jahreswert=9.5, **dict(zip(MONATE, POTSDAM))
+    )
+    SolarStrahlungMonat.objects.create(
+        orientierung='Süd', neigung='90', jahreswert=760, **dict(zip(MONATE_STRAHLUNG, SUED_90))
+    )
+
+
+class MonatsbilanzTest(TestCase):
+    """Test the monthly heating balance engine."""
+
+    def setUp(self):
+        lege_klimadaten_an()
+        self.klima = lade_klimadaten(4)
+
+    def test_lade_klimadaten(self):
+        """Test loading temperatures and radiation; missing rows are zero."""
+        self.assertEqual(self.klima['theta_e'].tolist(), POTSDAM)
+        self.assertEqual(self.klima['strahlung']['sued'].tolist(), SUED_90)
+        self.assertEqual(self.klima['strahlung']['nord'].tolist(), [0.0] * 12)
+        with self.assertRaises(LookupError):
+            lade_klimadaten(7)
+
+    def test_losses_without_gains(self):
+        """Test that without gains Q_h equals transmission plus ventilation losses."""
+        ergebnis = berechne_heizwaerme_monatlich(
+            self.klima, 20.0, 15.0, 3.0, 3, q_i=0.0, fensteranteil=0.0, h_t=500.0, luftwechsel=0.0
+        )
+        stunden = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]) * 24
+        erwartet = 500.0 * (19.0 - np.array(POTSDAM)) * stunden / 1000.0
+        np.testing.assert_allclose(ergebnis['q_h'][0], erwartet)
+        self.assertAlmostEqual(ergebnis['q_h_jahr'][0], round(erwartet.sum(), 2))
+
+    def test_gains_reduce_demand(self):
+        """Test that solar and internal gains lower the heating demand."""
+        ohne = berechne_jahres_heizwaermebedarf(self.klima, 20.0, 15.0, 3.0, 3, q_i=0.0, fensteranteil=0.0)
+        mit = berechne_jahres_heizwaermebedarf(self.klima, 20.0, 15.0, 3.0, 3)
+        self.assertLess(mit['q_h_jahr'], ohne['q_h_jahr'])
+        self.assertEqual(len(mit['q_h_monate']), 12)
+        self.assertEqual(mit['q_h_monate'][6], 0.0)  # Juli
+
+    def test_batch_matches_single_buildings(self):
+        """Test that the vectorized call equals single-building calls."""
+        laenge = np.array([10.0, 20.0, 35.0])
+        u_wand = np.array([0.2, 0.28, 0.5])
+        ergebnis = berechne_heizwaerme_monatlich(self.klima, laenge, 12.0, 3.0, 2, u_wand=u_wand)
+        for i in range(3):
+            einzeln = berechne_jahres_heizwaermebedarf(self.klima, laenge[i], 12.0, 3.0, 2, u_wand=u_wand[i])
+            self.assertEqual(ergebnis['q_h_jahr'][i], einzeln['q_h_jahr'])
+
+    def test_unknown_input(self):
+        """Test that unknown inputs are rejected."""
+        with self.assertRaises(ValueError):
+            berechne_heizwaerme_monatlich(self.klima, 10.0, 10.0, 3.0, 1, u_fassade=0.3)
+
+
+class MonatsbilanzViewsTest(TestCase):
+    """Test the API endpoint and the wizard integration."""
+
+    def setUp(self):
+        self.client = Client()
+        lege_klimadaten_an()
+
+    def test_api_heizwaerme(self):
+        """Test the live calculation endpoint."""
+        params = {'laenge': 20.0, 'breite': 15.0, 'geschosshoehe': 3.0, 'anz_geschosse': 3, 'u_wand': 0.24}
+        response = self.client.get(reverse('api_heizwaerme'), params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        erwartet = berechne_jahres_heizwaermebedarf(lade_klimadaten(), 20.0, 15.0, 3.0, 3, u_wand=0.24)
+        self.assertEqual(data['q_h_jahr'], erwartet['q_h_jahr'])
+        self.assertEqual(data['monate'], list(MONATE))
+
+        self.assertEqual(self.client.get(reverse('api_heizwaerme'), {'laenge': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_heizwaerme'), {'klimaregion': 9}).status_code, 404)
+
+    def test_wizard_fills_jahres_heizwert(self):
+        """Test that an empty Heizwärmebedarf is filled by the monthly balance."""
+        gebaeude = Gebaeude.objects.create(
+            name='Test', laenge_ns=20.0, breite_ow=15.0, geschosshoehe=3.0, geschosse=3, klimaregion=4
+        )
+        session = self.client.session
+        session['geb_pk'] = gebaeude.pk
+        session.save()
+
+        response = self.client.post(reverse('wizard_energie'), {
+            'jahres_heizwert': '',
+            'tw_kwh_m2': 15.0,
+            'luft_kwh_m2': 8.0,
+            'bel_kwh_m2': 10.0,
+            'nutz_kwh_m2': 5.0,
+        })
+        self.assertEqual(response.status_code, 302)
+        jahres_heizwert = self.client.session['wizard_entwurf']['gebaeude']['jahres_heizwert']
+        erwartet = berechne_jahres_heizwaermebedarf(lade_klimadaten(4), 20.0, 15.0, 3.0, 3)
+        self.assertEqual(jahres_heizwert, erwartet['q_h_jahr'])
+        self.assertGreater(jahres_heizwert, 0)
+
+    def test_wizard_keeps_entered_zero(self):
+        """Test that an explicitly entered Heizwärmebedarf of 0 is not replaced by the monthly balance."""
+        # Ohne Beleuchtung: deren Gewinne allein brächten die Monatsbilanz schon auf 0
+        for url, daten in SCHRITTE:
+            if url == 'wizard_energie':
+                daten = {**daten, 'jahres_heizwert': 0}
+            if url != 'wizard_beleuchtung':
+                self.client.post(reverse(url), daten)
+        self.assertEqual(self.client.get(reverse('wizard_ergebnis')).status_code, 200)
+        self.assertEqual(Gebaeude.objects.get().jahres_heizwert, 0.0)
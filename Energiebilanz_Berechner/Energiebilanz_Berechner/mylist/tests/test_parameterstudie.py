@@ -0,0 +1,61 @@
+import itertools
+
+import numpy as np
+from django.test import TestCase
+from mylist.berechnungen import berechne_bilanz
+from mylist.parameterstudie import Parameterstudie, achsenwerte
+
+
+class ParameterstudieTest(TestCase):
+    """Test the parametric sweep engine."""
+
+    ACHSEN = {'laenge': [10.0, 20.0, 30.0], 'breite': [8.0, 12.0], 'anz_geschosse': [1.0, 2.0, 4.0]}
+    FESTE = {'geschosshoehe': 3.0, 'trinkwarmwasser_kwh_pro_m2': 15.0, 'jahres_heizwaermebedarf_kwh': 20000.0}
+
+    def test_axis_specifications(self):
+        """Test lists, point counts and step widths as axis specifications."""
+        np.testing.assert_array_equal(achsenwerte([1, 2.5]), [1.0, 2.5])
+        np.testing.assert_array_equal(achsenwerte({'von': 10, 'bis': 50, 'schritte': 5}), [10, 20, 30, 40, 50])
+        np.testing.assert_array_equal(achsenwerte({'von': 0.1, 'bis': 0.3, 'schritt': 0.1}), [0.1, 0.2, 0.3])
+        np.testing.assert_array_equal(achsenwerte(7), [7.0])
+        for ungueltig in ([], {'von': 1}, {'von': 1, 'bis': 2, 'schritt': 0}, [1, 'x'], float('nan')):
+            with self.assertRaises(ValueError):
+                achsenwerte(ungueltig)
+        with self.assertRaises(ValueError):
+            achsenwerte({'von': 0, 'bis': 1, 'schritte': 1e12}, hoechstens=1000)
+
+    def test_columns_match_scalar_chain_in_row_major_order(self):
+        """Test that every variant matches the scalar calculation, last axis fastest."""
+        studie = Parameterstudie(self.ACHSEN, self.FESTE)
+        self.assertEqual(studie.anzahl, 18)
+        spalten = studie.spalten(['nf', 'ee_spezifisch'], blockgroesse=4)
+
+        for index, werte in enumerate(itertools.product(*self.ACHSEN.values())):
+            erwartet = berechne_bilanz(**dict(zip(self.ACHSEN, werte)), **self.FESTE)
+            self.assertEqual(spalten['nf'][index], erwartet['gebaeudedaten']['nf'])
+            self.assertEqual(spalten['ee_spezifisch'][index], erwartet['endenergie']['ee_spezifisch'])
+        self.assertEqual(studie.parameter(5), {'laenge': 10.0, 'breite': 12.0, 'anz_geschosse': 4.0})
+
+    def test_reduction_across_blocks(self):
+        """Test that min/max and their parameters are found across block boundaries."""
+        studie = Parameterstudie(self.ACHSEN, self.FESTE)
+        reduktion = studie.reduziere(['nf', 'ee_spezifisch'], blockgroesse=5)
+        spalten = studie.spalten(['nf', 'ee_spezifisch'])
+
+        for ziel in ('nf', 'ee_spezifisch'):
+            self.assertEqual(reduktion[ziel]['min'], spalten[ziel].min())
+            self.assertEqual(reduktion[ziel]['max'], spalten[ziel].max())
+            self.assertEqual(reduktion[ziel]['argmin']['index'], int(np.argmin(spalten[ziel])))
+            self.assertEqual(reduktion[ziel]['argmax']['index'], int(np.argmax(spalten[ziel])))
+        self.assertEqual(reduktion['nf']['argmax']['parameter'], {'laenge': 30.0, 'breite': 12.0, 'anz_geschosse': 4.0})
+
+    def test_invalid_studies(self):
+        """Test that missing, unknown or duplicate columns are rejected."""
+        with self.assertRaises(ValueError):
+            Parameterstudie({'laenge': [10]}, {'breite': 10, 'geschosshoehe': 3})
+        with self.assertRaises(ValueError):
+            Parameterstudie({'hoehe': [10]}, self.FESTE)
+        with self.assertRaises(ValueError):
+            Parameterstudie(self.ACHSEN, {**self.FESTE, 'laenge': 10})
+        with self.assertRaises(ValueError):
+            Parameterstudie(self.ACHSEN, self.FESTE).spalten(['unbekannt'])
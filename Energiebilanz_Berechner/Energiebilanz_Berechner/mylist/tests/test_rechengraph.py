@@ -0,0 +1,111 @@
+from django.test import TestCase
+from mylist.berechnungen import BATCH_EINGABEN, berechne_bilanz
+from mylist.interne_gewinne import BELEUCHTUNG_SPALTEN, berechne_interne_gewinne, eintragsspalten
+from mylist.lueftungsbilanz import berechne_lueftung
+from mylist.monatsbilanz import berechne_jahres_heizwaermebedarf, lade_klimadaten
+from mylist.rechengraph import MODELL_EINGABEN, MODELL_KNOTEN, Rechengraph
+from mylist.tests.test_monatsbilanz import lege_klimadaten_an
+
+
+class RechengraphTest(TestCase):
+    """Test the incremental dependency-graph recalculation."""
+
+    EINGABEN = {
+        'laenge': 20.0, 'breite': 15.0, 'geschosshoehe': 3.0, 'anz_geschosse': 3,
+        'jahres_heizwaermebedarf_kwh': 10000.0, 'beleuchtung_kwh_pro_m2': 5.0, 'speicherverlust_kwh': 50.0,
+    }
+
+    def test_matches_full_chain(self):
+        """Test that the graph yields the same blocks as berechne_bilanz, also after changes."""
+        graph = Rechengraph(self.EINGABEN)
+        self.assertEqual(graph.ergebnis(), berechne_bilanz(**self.EINGABEN))
+        graph.setze(breite=12.5, nutzer_pro_m2=3.0)
+        self.assertEqual(graph.ergebnis(), berechne_bilanz(**{**self.EINGABEN, 'breite': 12.5, 'nutzer_pro_m2': 3.0}))
+
+    def test_only_affected_nodes_are_recomputed(self):
+        """Test that a change recomputes only downstream nodes and stops where values stay equal."""
+        graph = Rechengraph(self.EINGABEN)
+        graph.ergebnis()
+        self.assertEqual(len(graph.neu_berechnet), 6)
+
+        self.assertEqual(graph.setze(beleuchtung_kwh_pro_m2=8.0), ['beleuchtung_kwh_pro_m2'])
+        graph.ergebnis()
+        self.assertEqual(sorted(graph.neu_berechnet), ['endenergie', 'nutzenergie', 'strombedarf'])
+
+        graph.setze(speicherverlust_kwh=75.0)
+        graph.ergebnis()
+        self.assertEqual(sorted(graph.neu_berechnet), ['endenergie', 'waermebedarf'])
+
+        # Geschosshöhe ändert Höhe und Volumen, aber nicht die Nutzfläche
+        graph.setze(geschosshoehe=3.2)
+        self.assertEqual(graph.ergebnis()['gebaeudedaten']['volumen'], 2880.0)
+        self.assertEqual(graph.neu_berechnet, ['gebaeudedaten', 'nf'])
+
+        self.assertEqual(graph.setze(beleuchtung_kwh_pro_m2=8), [])
+        graph.ergebnis()
+        self.assertEqual(graph.neu_berechnet, [])
+
+    def test_extension_nodes(self):
+        """Test that further model parts can be attached and invalid definitions are rejected."""
+        graph = Rechengraph(self.EINGABEN)
+        graph.eingabe('emissionsfaktor', 0.3)
+        graph.definiere('co2', lambda ee, faktor: round(ee['ee_absolut'] * faktor, 2), ('endenergie', 'emissionsfaktor'))
+        co2 = graph.wert('co2')
+        graph.setze(emissionsfaktor=0.2)
+        self.assertAlmostEqual(graph.wert('co2'), co2 / 0.3 * 0.2, places=1)
+        self.assertEqual(graph.neu_berechnet, ['co2'])
+
+        with self.assertRaises(ValueError):
+            graph.definiere('zyklus', lambda x: x, ('unbekannt',))
+        with self.assertRaises(ValueError):
+            graph.setze(preis=1)
+        with self.assertRaises(ValueError):
+            Rechengraph().wert('endenergie')
+
+    def test_model_nodes(self):
+        """Test monthly balance, ventilation and lighting nodes feeding the chain, recomputed only when affected."""
+        lege_klimadaten_an()
+        geometrie = {'laenge': 20.0, 'breite': 15.0, 'geschosshoehe': 3.0, 'anz_geschosse': 3}
+        beleuchtung = [{'e_soll': 10.0, 'laufzeit_hd': 10.0, 'laufzeit_da': 250.0}]
+        graph = Rechengraph(
+            {**geometrie, 'lueftung': {'druckverlust_pa': 400.0}, 'beleuchtung': beleuchtung},
+            standardwerte={**BATCH_EINGABEN, **MODELL_EINGABEN}, knoten=MODELL_KNOTEN,
+        )
+        with self.assertRaises(ValueError):
+            graph.setze(jahres_heizwaermebedarf_kwh=1.0)
+
+        klima = lade_klimadaten(4)
+        gewinne = berechne_interne_gewinne(900.0, beleuchtung=eintragsspalten(beleuchtung, BELEUCHTUNG_SPALTEN))
+        heizwaerme = berechne_jahres_heizwaermebedarf(klima, **geometrie, q_i=gewinne['q_i'][0])['q_h_jahr']
+        lueftung = berechne_lueftung(klima, **geometrie, druckverlust_pa=400.0)
+        erwartet = berechne_bilanz(
+            **geometrie, jahres_heizwaermebedarf_kwh=heizwaerme,
+            luftfoerderung_kwh_pro_m2=lueftung['ventilator_spezifisch'],
+            beleuchtung_kwh_pro_m2=gewinne['beleuchtung_spezifisch'][0],
+        )
+        self.assertEqual(graph.ergebnis(), erwartet)
+        self.assertEqual(len(graph.neu_berechnet), len(MODELL_KNOTEN))
+
+        graph.setze(lueftung={'druckverlust_pa': 600.0})
+        graph.ergebnis()
+        self.assertEqual(
+            sorted(graph.neu_berechnet),
+            ['endenergie', 'lueftungsbilanz', 'luftfoerderung_kwh_pro_m2', 'nutzenergie', 'strombedarf'],
+        )
+
+        # Bessere Dachdämmung ändert nur den Heizwärmebedarf und die Wärmeseite
+        graph.setze(monatsbilanz={'u_dach': 0.1})
+        graph.ergebnis()
+        self.assertEqual(
+            sorted(graph.neu_berechnet),
+            ['endenergie', 'heizwaerme', 'jahres_heizwaermebedarf_kwh', 'nutzenergie', 'waermebedarf'],
+        )
+        self.assertLess(graph.wert('jahres_heizwaermebedarf_kwh'), heizwaerme)
+
+        # Ohne Einträge gelten wieder die pauschalen internen Gewinne
+        graph.setze(beleuchtung=())
+        self.assertEqual(graph.wert('beleuchtung_kwh_pro_m2'), 0.0)
+        self.assertEqual(
+            graph.wert('jahres_heizwaermebedarf_kwh'),
+            berechne_jahres_heizwaermebedarf(klima, **geometrie, u_dach=0.1)['q_h_jahr'],
+        )
@@ -0,0 +1,55 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from mylist.models import DruckverlustBauteil, KlimaregionTemperatur, SolarStrahlungMonat
+from mylist.referenzdaten import MONATE_KLIMA, MONATE_STRAHLUNG, referenzdaten
+
+
+class ReferenzdatenTest(TestCase):
+    """Test the process-wide reference data cache."""
+
+    def setUp(self):
+        KlimaregionTemperatur.objects.create(
+            region=4, referenzort='Potsdam', jahreswert=9.5, **dict.fromkeys(MONATE_KLIMA, 5.0)
+        )
+        SolarStrahlungMonat.objects.create(
+            orientierung='Süd', neigung='90', jahreswert=760, **dict.fromkeys(MONATE_STRAHLUNG, 100)
+        )
+        DruckverlustBauteil.objects.create(bauteil='Zuluftkanalsystem', druckverlust_pa=300)
+
+    def tearDown(self):
+        # Der Rollback nach jedem Test löst keine Signale aus
+        referenzdaten.invalidieren()
+
+    def test_lookup_is_cached(self):
+        """Test that repeated lookups do not hit the database."""
+        self.assertEqual(referenzdaten.klima(4)['referenzort'], 'Potsdam')
+        with self.assertNumQueries(0):
+            self.assertEqual(referenzdaten.klima(4)['temperaturen'].tolist(), [5.0] * 12)
+            self.assertIsNone(referenzdaten.klima(7))
+        self.assertEqual(referenzdaten.strahlung('süd', '90°').tolist(), [100.0] * 12)
+        self.assertIsNone(referenzdaten.strahlung('Nord', 90))
+
+    def test_cached_arrays_are_read_only(self):
+        """Test that cached monthly values cannot be modified by callers."""
+        with self.assertRaises(ValueError):
+            referenzdaten.klima(4)['temperaturen'][0] = 0.0
+
+    def test_invalidated_on_save_and_delete(self):
+        """Test that saving or deleting a row drops the cached table."""
+        self.assertEqual(referenzdaten.druckverlust('Zuluftkanalsystem'), 300)
+
+        zeile = DruckverlustBauteil.objects.get(bauteil='Zuluftkanalsystem')
+        zeile.druckverlust_pa = 250
+        zeile.save()
+        self.assertEqual(referenzdaten.druckverlust('Zuluftkanalsystem'), 250)
+
+        zeile.delete()
+        self.assertIsNone(referenzdaten.druckverlust('Zuluftkanalsystem'))
+
+    def test_invalidated_by_import_command(self):
+        """Test that an import command refreshes the cached table."""
+        self.assertIsNone(referenzdaten.fx('Zweischeibenverglasung'))
+        call_command('import_temperaturkorrektur', stdout=StringIO())
+        self.assertEqual(referenzdaten.fx('Zweischeibenverglasung'), 0.7)
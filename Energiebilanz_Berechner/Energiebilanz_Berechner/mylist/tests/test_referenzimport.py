@@ -0,0 +1,184 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from mylist.models import (
+    DruckverlustBauteil,
+    Gebaeude,
+    ReferenzImport,
+    SolarStrahlungMonat,
+    SonneneintragsParameter,
+    SonnenschutzFaktor,
+)
+from mylist.referenzdaten import referenzdaten
+from mylist.referenzimport import IMPORTE, abgleichen, lese_csv
+
+
+def schreibe_csv(inhalt, encoding='utf-8'):
+    datei = tempfile.NamedTemporaryFile('w', suffix='.csv', encoding=encoding, delete=False)
+    with datei:
+        datei.write(inhalt)
+    return datei.name
+
+
+class ReferenzImportTest(TestCase):
+    """Test the shared bulk loader of the import_* commands."""
+
+    def setUp(self):
+        self.dateien = []
+
+    def tearDown(self):
+        for pfad in self.dateien:
+            os.remove(pfad)
+        referenzdaten.invalidieren()
+
+    def csv(self, inhalt):
+        pfad = schreibe_csv(inhalt)
+        self.dateien.append(pfad)
+        return pfad
+
+    def test_lese_csv_validates_rows(self):
+        """Test that invalid, commented and duplicate rows are skipped."""
+        pfad = self.csv(
+            'bauteil,druckverlust_pa\n'
+            'Erhitzer,80\n'
+            'Kühler,abc\n'
+            '#Kommentar,\n'
+            'Erhitzer,90\n'
+            'Befeuchter,1.5\n'
+            'Filter,\n'
+            ' Wäscher , 200 \n'
+        )
+        daten = lese_csv(IMPORTE['druckverlust'], pfad)
+        self.assertEqual(daten.datensaetze, [
+            {'bauteil': 'Erhitzer', 'druckverlust_pa': 90},
+            {'bauteil': 'Wäscher', 'druckverlust_pa': 200},
+        ])
+        self.assertEqual(daten.uebersprungen, [2, 3, 6, 7])
+
+    def test_lese_csv_missing_column(self):
+        """Test that a missing column is reported."""
+        pfad = self.csv('bauteil,pa\nErhitzer,80\n')
+        with self.assertRaises(ValueError):
+            lese_csv(IMPORTE['druckverlust'], pfad)
+
+    def test_shipped_csv_files(self):
+        """Test that the bundled CSV files import completely with bulk inserts."""
+        with CaptureQueriesContext(connection) as abfragen:
+            call_command('import_solarstrahlung', voll=True, stdout=StringIO())
+        inserts = [q for q in abfragen if q['sql'].startswith('INSERT INTO "mylist_solarstrahlungmonat"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(SolarStrahlungMonat.objects.count(), 33)
+        sued = SolarStrahlungMonat.objects.get(orientierung='Süd', neigung='90')
+        self.assertEqual(sued.jahreswert, 760)
+
+        call_command('import_sonnenschutzfaktor', stdout=StringIO())
+        self.assertEqual(SonnenschutzFaktor.objects.get(zeile='3.1.2').f_c_g_le_0_40_zweifach, 0.15)
+
+    def test_import_replaces_table_atomically(self):
+        """Test that a failing insert leaves the previous rows in place."""
+        DruckverlustBauteil.objects.create(bauteil='Alt', druckverlust_pa=1)
+        pfad = self.csv('bauteil,druckverlust_pa\nNeu,2\n')
+
+        with mock.patch.object(DruckverlustBauteil.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                call_command('import_druckverlust', datei=pfad, voll=True, stdout=StringIO())
+        self.assertEqual(list(DruckverlustBauteil.objects.values_list('bauteil', flat=True)), ['Alt'])
+
+        call_command('import_druckverlust', datei=pfad, voll=True, stdout=StringIO())
+        self.assertEqual(list(DruckverlustBauteil.objects.values_list('bauteil', flat=True)), ['Neu'])
+
+    def test_missing_file(self):
+        """Test that a missing CSV file raises a CommandError."""
+        with self.assertRaises(CommandError):
+            call_command('import_druckverlust', datei='/nicht/vorhanden.csv', stdout=StringIO())
+
+    def test_incremental_import(self):
+        """Test that only changed rows are written and primary keys stay stable."""
+        pfad = self.csv('bauteil,druckverlust_pa\nErhitzer,80\nKühler,140\nBefeuchter,100\n')
+        call_command('import_druckverlust', datei=pfad, stdout=StringIO())
+        pks = dict(DruckverlustBauteil.objects.values_list('bauteil', 'pk'))
+        self.assertEqual(ReferenzImport.objects.get(tabelle='druckverlust').datensaetze, 3)
+
+        pfad = self.csv('bauteil,druckverlust_pa\nErhitzer,80\nKühler,150\nWäscher,200\n')
+        ausgabe = StringIO()
+        call_command('import_druckverlust', datei=pfad, stdout=ausgabe)
+        self.assertIn('1 neu, 1 geändert, 1 gelöscht, 1 unverändert', ausgabe.getvalue())
+        self.assertEqual(
+            dict(DruckverlustBauteil.objects.values_list('bauteil', 'druckverlust_pa')),
+            {'Erhitzer': 80, 'Kühler': 150, 'Wäscher': 200},
+        )
+        self.assertEqual(DruckverlustBauteil.objects.get(bauteil='Erhitzer').pk, pks['Erhitzer'])
+        self.assertEqual(DruckverlustBauteil.objects.get(bauteil='Kühler').pk, pks['Kühler'])
+
+    def test_unchanged_file_is_skipped(self):
+        """Test that re-importing an unchanged file only checks the content hash."""
+        call_command('import_solarstrahlung', stdout=StringIO())
+        ausgabe = StringIO()
+        with self.assertNumQueries(1):
+            call_command('import_solarstrahlung', stdout=ausgabe)
+        self.assertIn('unverändert', ausgabe.getvalue())
+
+        ausgabe = StringIO()
+        call_command('import_solarstrahlung', erzwingen=True, stdout=ausgabe)
+        self.assertIn('0 neu, 0 geändert, 0 gelöscht, 33 unverändert', ausgabe.getvalue())
+
+    def test_protected_rows_are_not_deleted(self):
+        """Test that rows still referenced via PROTECT abort the import cleanly."""
+        call_command('import_sonnenschutzfaktor', stdout=StringIO())
+        gebaeude = Gebaeude.objects.create(
+            name='Test', laenge_ns=20.0, breite_ow=15.0, geschosshoehe=3.0, geschosse=3
+        )
+        SonneneintragsParameter.objects.create(
+            gebaeude=gebaeude,
+            fassadenorientierung='Sued',
+            sonnenschutzart=SonnenschutzFaktor.objects.get(zeile='3.1.2'),
+            verglasungsart='zweifach',
+            fensterneigung=90.0,
+        )
+        pfad = self.csv(
+            'zeile,sonnenschutzvorrichtung,f_c_g_le_0_40_zweifach,f_c_g_le_0_40_dreifach,f_c_g_gt_0_40_zweifach\n'
+            '1,ohne Sonnenschutzvorrichtung,1,1,1\n'
+        )
+        with self.assertRaises(CommandError):
+            call_command('import_sonnenschutzfaktor', datei=pfad, stdout=StringIO())
+        self.assertEqual(SonnenschutzFaktor.objects.count(), 10)
+
+
+class ImportAllTest(TestCase):
+    """Test the import_all command."""
+
+    def tearDown(self):
+        referenzdaten.invalidieren()
+
+    def test_imports_all_tables(self):
+        """Test that all bundled CSV files are imported and a re-run is a no-op."""
+        ausgabe = StringIO()
+        call_command('import_all', prozesse=2, stdout=ausgabe, stderr=StringIO())
+        self.assertEqual(SolarStrahlungMonat.objects.count(), 33)
+        self.assertEqual(SonnenschutzFaktor.objects.count(), 10)
+        self.assertEqual(DruckverlustBauteil.objects.count(), 15)
+        self.assertIn('SonneneintragsKennwert', ausgabe.getvalue())
+
+        ausgabe = StringIO()
+        call_command('import_all', prozesse=1, stdout=ausgabe, stderr=StringIO())
+        self.assertIn('0 Tabelle(n) importiert', ausgabe.getvalue())
+
+    def test_single_transaction(self):
+        """Test that a failure in a later table rolls back the earlier ones."""
+        def abgleichen_mit_fehler(daten, *args, **kwargs):
+            if daten.tabelle.name == 'druckverlust':
+                raise RuntimeError
+            return abgleichen(daten, *args, **kwargs)
+
+        with mock.patch('mylist.referenzimport.abgleichen', side_effect=abgleichen_mit_fehler):
+            with self.assertRaises(RuntimeError):
+                call_command('import_all', prozesse=1, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(SolarStrahlungMonat.objects.count(), 0)
+        self.assertFalse(ReferenzImport.objects.exists())
@@ -0,0 +1,66 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from mylist.sensitivitaet import einflussgroessen, morris, sobol
+from mylist.tests.test_wizard_entwurf import SCHRITTE
+
+
+class SensitivitaetTest(TestCase):
+    """Test the Morris and Sobol sensitivity analysis."""
+
+    FESTE = {'laenge': 20.0, 'breite': 15.0, 'geschosshoehe': 3.0, 'anz_geschosse': 3.0}
+    BEREICHE = {
+        'jahres_heizwaermebedarf_kwh': (5000.0, 15000.0),
+        'beleuchtung_kwh_pro_m2':      (5.0, 10.0),
+        'speicherverlust_kwh':         (0.0, 100.0),
+    }
+
+    def test_morris_on_additive_chain(self):
+        """Test that Morris effects equal the range effects of the linear end-energy chain."""
+        ergebnis = morris(self.BEREICHE, self.FESTE, 'ee_absolut', trajektorien=10, seed=1)
+        self.assertEqual(ergebnis['auswertungen'], 40)
+        eingaben = ergebnis['eingaben']
+        # EE ist linear: Effekt über den normierten Bereich = Spannweite · Faktor
+        self.assertAlmostEqual(eingaben['jahres_heizwaermebedarf_kwh']['mu_stern'], 10000, delta=1)
+        self.assertAlmostEqual(eingaben['beleuchtung_kwh_pro_m2']['mu_stern'], 5 * 720, delta=1)
+        self.assertAlmostEqual(eingaben['speicherverlust_kwh']['mu'], 100, delta=1)
+        self.assertLess(eingaben['beleuchtung_kwh_pro_m2']['sigma'], 1e-6)
+
+    def test_sobol_indices(self):
+        """Test first-order and total indices, reproducibility and the process pool."""
+        ergebnis = sobol(self.BEREICHE, self.FESTE, 'ee_absolut', stichproben=4096, seed=3)
+        self.assertEqual(ergebnis['auswertungen'], 4096 * 5)
+        eingaben = ergebnis['eingaben']
+        # Varianzanteile der Gleichverteilungen: 10000² : 3600² : 100²
+        summe = 10000 ** 2 + 3600 ** 2 + 100 ** 2
+        for name, spanne in (('jahres_heizwaermebedarf_kwh', 10000), ('beleuchtung_kwh_pro_m2', 3600)):
+            self.assertAlmostEqual(eingaben[name]['st'], spanne ** 2 / summe, delta=3 * eingaben[name]['st_konf'] + 0.01)
+            self.assertAlmostEqual(eingaben[name]['s1'], spanne ** 2 / summe, delta=3 * eingaben[name]['s1_konf'] + 0.01)
+        self.assertLess(eingaben['speicherverlust_kwh']['st'], 0.01)
+
+        parallel = sobol(self.BEREICHE, self.FESTE, 'ee_absolut', stichproben=4096, seed=3, blockgroesse=5000, prozesse=2)
+        self.assertEqual(parallel, ergebnis)
+
+    def test_invalid_and_constant(self):
+        """Test invalid ranges and targets that do not depend on the inputs."""
+        with self.assertRaises(ValueError):
+            morris({'laenge': (10, 5)}, self.FESTE)
+        with self.assertRaises(ValueError):
+            sobol(self.BEREICHE, self.FESTE, 'unbekannt')
+        konstant = sobol({'speicherverlust_kwh': (0.0, 100.0)}, self.FESTE, 'nf', stichproben=64, seed=1)
+        self.assertEqual(konstant['eingaben']['speicherverlust_kwh'], {'s1': 0.0, 's1_konf': 0.0, 'st': 0.0, 'st_konf': 0.0})
+
+    def test_result_page_ranking(self):
+        """Test that the wizard result page lists the influential inputs."""
+        for url, daten in SCHRITTE:
+            self.client.post(reverse(url), daten)
+        response = self.client.get(reverse('wizard_ergebnis'))
+        self.assertContains(response, 'Einflussgrößen auf die Endenergie')
+        einfluss = response.context['einflussgroessen']
+        self.assertEqual({zeile['spalte'] for zeile in einfluss[:2]}, {'laenge', 'breite'})
+        self.assertNotIn('geschosshoehe', [zeile['spalte'] for zeile in einfluss])
+        self.assertAlmostEqual(sum(zeile['anteil'] for zeile in einfluss), 1.0)
+
+        with override_settings(SENSITIVITAET_ERGEBNISSEITE_SPANNE=0):
+            response = self.client.get(reverse('wizard_ergebnis'))
+        self.assertNotContains(response, 'Einflussgrößen auf die Endenergie')
+        self.assertEqual(einflussgroessen({'laenge': 0, 'breite': 0}), [])
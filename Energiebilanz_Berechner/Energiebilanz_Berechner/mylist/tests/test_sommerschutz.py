@@ -0,0 +1,93 @@
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase
+from mylist.models import Gebaeude, SonneneintragsKennwert, SonneneintragsParameter, SonnenschutzFaktor
+from mylist.referenzdaten import referenzdaten
+from mylist.sommerschutz import SOMMER_ERGEBNISSE, pruefe_parameter, pruefe_sonneneintrag, sonneneintrag_tabellen
+
+
+class SommerschutzTest(TestCase):
+    """Test the summer thermal protection check with solar gain indices S_vorh and S_zul."""
+
+    def setUp(self):
+        call_command('import_sonneneintragskennwerte', stdout=StringIO())
+        call_command('import_sonnenschutzfaktor', stdout=StringIO())
+        self.addCleanup(referenzdaten.invalidieren)
+
+    def test_single_room(self):
+        """Test S_vorh and S_zul of one room against the DIN 4108-2 formulas and table values."""
+        ergebnis = pruefe_sonneneintrag(6.0, 20.0, 'Sued', sonnenschutz='3.2.1')
+        # g = 0,6 (Zweifach) > 0,40 → F_C = 0,25; S1 ohne Nachtlüftung, mittel, Wohngebäude B
+        self.assertEqual(ergebnis['f_wg'][0], 0.3)
+        self.assertEqual(ergebnis['g_tot'][0], 0.15)
+        self.assertEqual(ergebnis['s_vorh'][0], 0.045)
+        self.assertEqual(ergebnis['s1'][0], 0.067)
+        self.assertEqual(ergebnis['s2'][0], round(0.06 - 0.231 * 0.3, 4))
+        self.assertEqual(ergebnis['s_zul'][0], round(0.067 + 0.06 - 0.231 * 0.3, 4))
+        self.assertTrue(ergebnis['nachweis_erforderlich'][0])
+        self.assertTrue(ergebnis['erfuellt'][0])
+
+        ohne = pruefe_sonneneintrag(6.0, 20.0, 'Sued')
+        self.assertEqual(ohne['s_vorh'][0], 0.18)
+        self.assertFalse(ohne['erfuellt'][0])
+
+        # Kleiner Fensterflächenanteil nach Norden: kein Nachweis erforderlich
+        nord = pruefe_sonneneintrag(2.5, 20.0, 'Nord')
+        self.assertFalse(nord['nachweis_erforderlich'][0])
+        self.assertEqual(nord['s5'][0], 0.1)
+
+        with self.assertRaises(ValueError):
+            pruefe_sonneneintrag(6.0, 20.0, 'Süd')
+        SonneneintragsKennwert.objects.filter(typ='S1').delete()
+        with self.assertRaises(LookupError):
+            pruefe_sonneneintrag(6.0, 20.0, 'Sued')
+
+    def test_batch_matches_single_rooms(self):
+        """Test that one vectorized call gives the same values as checking each room separately."""
+        raeume = {
+            'fensterflaeche':   np.array([6.0, 4.0, 9.0, 3.0]),
+            'grundflaeche':     np.array([20.0, 25.0, 30.0, 12.0]),
+            'orientierung':     np.array(['Sued', 'Nord', 'West', 'Ost']),
+            'g':                np.array([0.6, 0.35, 0.5, 0.6]),
+            'sonnenschutz':     np.array(['3.1.2', '', '2.1', '3.3'], dtype=object),
+            'verglasungsart':   np.array(['zweifach', 'dreifach', 'dreifach', 'zweifach']),
+            'fensterneigung':   np.array([90.0, 90.0, 30.0, 90.0]),
+            'passive_kuehlung': np.array([False, True, False, True]),
+            'klimaregion':      np.array(['A', 'B', 'C', 'C']),
+            'gebaeudetyp':      np.array(['W', 'N', 'W', 'N']),
+            'bauart':           np.array(['leicht', 'schwer', 'mittel', 'mittel']),
+            'nachtlueftung':    np.array(['ohne', 'hohe', 'erhoehte', 'ohne']),
+        }
+        batch = pruefe_sonneneintrag(**raeume)
+        for i in range(4):
+            einzeln = pruefe_sonneneintrag(**{name: werte[i] for name, werte in raeume.items()})
+            for name in (*SOMMER_ERGEBNISSE, 'nachweis_erforderlich', 'erfuellt'):
+                self.assertEqual(batch[name][i], einzeln[name][0], name)
+        # Dreifach, g ≤ 0,40, ohne Sonnenschutz: S3 Sonnenschutzglas und S6 passive Kühlung (schwer)
+        self.assertEqual(batch['g_tot'][1], 0.35)
+        self.assertEqual(batch['s3'][1], 0.03)
+        self.assertEqual(batch['s6'][1], 0.06)
+        # Geneigtes Fenster: S4 = −0,035 · f_WG
+        self.assertEqual(batch['s4'][2], round(-0.035 * 0.3, 4))
+
+    def test_saved_parameters_in_one_query(self):
+        """Test checking the stored SonneneintragsParameter of several buildings with one query."""
+        geb1 = Gebaeude.objects.create(name='A', laenge_ns=20.0, breite_ow=10.0, geschosshoehe=3.0, geschosse=2)
+        geb2 = Gebaeude.objects.create(name='B', laenge_ns=15.0, breite_ow=12.0, geschosshoehe=3.0, geschosse=3)
+        rollladen = SonnenschutzFaktor.objects.get(zeile='3.1.2')
+        ohne = SonnenschutzFaktor.objects.get(zeile='1')
+        for gebaeude, richtung, schutz in ((geb1, 'Sued', rollladen), (geb1, 'West', ohne), (geb2, 'Ost', rollladen)):
+            SonneneintragsParameter.objects.create(
+                gebaeude=gebaeude, kritischer_raum=True, fassadenorientierung=richtung,
+                sonnenschutzart=schutz, verglasungsart='zweifach', fensterneigung=90.0,
+            )
+        sonneneintrag_tabellen()
+
+        with self.assertNumQueries(1):
+            ergebnis = pruefe_parameter(SonneneintragsParameter.objects.all(), [6.0, 6.0, 4.0], 20.0, klimaregion='C')
+        self.assertEqual(ergebnis['gebaeude_id'].tolist(), [geb1.pk, geb1.pk, geb2.pk])
+        self.assertEqual(ergebnis['g_tot'].tolist(), [0.06, 0.6, 0.06])
+        self.assertEqual(ergebnis['erfuellt'].tolist(), [True, False, True])
+        self.assertEqual(pruefe_parameter(SonneneintragsParameter.objects.none(), [], []), {})
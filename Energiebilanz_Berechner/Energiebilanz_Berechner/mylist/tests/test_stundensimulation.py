@@ -0,0 +1,60 @@
+import numpy as np
+from django.test import TestCase
+from mylist.models import Beleuchtung, Waermequelle
+from mylist.monatsbilanz import STUNDEN_PRO_MONAT, berechne_heizwaerme_monatlich, lade_klimadaten
+from mylist.stundensimulation import (
+    STUNDEN,
+    beleuchtungsprofil,
+    monatssummen,
+    simuliere_stuendlich,
+    stundenklima,
+    waermequellenprofil,
+    zeitplan,
+)
+from mylist.tests.test_monatsbilanz import POTSDAM, SUED_90, lege_klimadaten_an
+
+
+class StundensimulationTest(TestCase):
+    """Test the hourly (8760 h) simulation mode."""
+
+    def setUp(self):
+        lege_klimadaten_an()
+        self.klima = lade_klimadaten(4)
+
+    def test_hourly_climate_keeps_monthly_means(self):
+        """Test that the daily temperature and radiation profiles preserve the monthly means."""
+        wetter = stundenklima(self.klima)
+        self.assertEqual(wetter['theta_e'].shape, (STUNDEN,))
+        np.testing.assert_allclose(monatssummen(wetter['theta_e']) * 1000 / STUNDEN_PRO_MONAT, POTSDAM)
+        np.testing.assert_allclose(monatssummen(wetter['strahlung']['sued']) * 1000 / STUNDEN_PRO_MONAT, SUED_90)
+        self.assertEqual(wetter['strahlung']['sued'][:5].tolist(), [0.0] * 5)   # nachts
+
+    def test_schedules(self):
+        """Test that daily hours and yearly days expand to weekday-first hourly profiles."""
+        profil = zeitplan(10.5, 250)
+        self.assertAlmostEqual(profil.sum(), 10.5 * 250)
+        self.assertEqual(profil[:24].tolist(), [0.0] * 7 + [1.0] * 10 + [0.5] + [0.0] * 6)
+        self.assertEqual(profil[5 * 24:7 * 24].sum(), 0.0)                       # erstes Wochenende frei
+        self.assertEqual(zeitplan(24, 365).sum(), STUNDEN)
+
+        beleuchtung = [Beleuchtung(e_soll=10, laufzeit_hd=10, laufzeit_da=250)] * 2
+        self.assertAlmostEqual(beleuchtungsprofil(beleuchtung, 100).sum(), 10 * 100 * 10 * 250)
+        quellen = [Waermequelle(anzahl=2, leistung_kw=0.5, betrieb_hd=8, betrieb_da=200)]
+        self.assertAlmostEqual(waermequellenprofil(quellen).max(), 1000.0)
+
+    def test_heating_close_to_monthly_balance(self):
+        """Test that the RC model matches the monthly balance and reports loads, peaks and cooling."""
+        ergebnis = simuliere_stuendlich(self.klima, [20.0, 20.0], [15.0, 10.0], 3.0, 3)
+        monat = berechne_heizwaerme_monatlich(self.klima, [20.0, 20.0], [15.0, 10.0], 3.0, 3)
+        np.testing.assert_allclose(ergebnis['heizwaerme_jahr'], monat['q_h_jahr'], rtol=0.05)
+        self.assertEqual(ergebnis['heizlast'].shape, (2, STUNDEN))
+        self.assertTrue((ergebnis['theta_i'] >= 19.0 - 1e-9).all())
+        self.assertGreater(ergebnis['heizlast_max'][0], ergebnis['heizlast_max'][1])
+        self.assertEqual(ergebnis['kuehlung_jahr'].tolist(), [0.0, 0.0])
+
+        gekuehlt = simuliere_stuendlich(
+            self.klima, 20.0, 15.0, 3.0, 3, theta_kuehl=24.0, waermequellen=zeitplan(10, 250) * 20000
+        )
+        self.assertLessEqual(gekuehlt['theta_i'].max(), 24.0 + 1e-9)
+        self.assertGreater(gekuehlt['kuehlung_jahr'][0], 0)
+        self.assertLess(gekuehlt['heizwaerme_jahr'][0], ergebnis['heizwaerme_jahr'][0])
@@ -0,0 +1,87 @@
+import numpy as np
+from django.test import TestCase
+from mylist.models import Bauteil, BuildingProject, Temperaturkorrekturfaktor
+from mylist.monatsbilanz import berechne_heizwaerme_monatlich, lade_klimadaten
+from mylist.referenzdaten import referenzdaten
+from mylist.tests.test_monatsbilanz import lege_klimadaten_an
+from mylist.transmission import berechne_h_t, fx_werte, huellflaechen, transmission_fuer_projekt
+
+
+class TransmissionTest(TestCase):
+    """Test the envelope areas and the transmission heat transfer coefficient H_T."""
+
+    def test_areas_and_h_t_with_fx_table(self):
+        """Test window deduction and H_T = Σ U·A·Fx, with Fx from the table or the fallback values."""
+        flaechen = huellflaechen(20.0, 10.0, 3.0, 2, {"sued": 0.5, "dach": 0.1})
+        self.assertEqual(flaechen["fassaden"]["sued"][0], 60.0)
+        self.assertEqual(flaechen["fassaden"]["ost"][0], 120.0)
+        self.assertEqual(flaechen["fenster"]["sued"][0], 30.0)
+        self.assertEqual(flaechen["fenster"]["nord"][0], 0.0)
+        self.assertEqual(flaechen["waende"]["sued"][0], 30.0)
+        self.assertAlmostEqual(flaechen["dach"][0], 180.0)
+        self.assertEqual(flaechen["a_huelle"][0], 760.0)
+
+        # Ohne Tabelleneinträge gelten die Rückfallwerte (Bodenplatte 0,6)
+        self.assertEqual(fx_werte(), {"wand": 1.0, "fenster": 1.0, "dach": 1.0, "boden": 0.6})
+        h_t = berechne_h_t(flaechen, 0.25, 0.2, 0.3, 1.0, delta_u_wb=0.05)
+        self.assertAlmostEqual(h_t["wand"][0], 0.25 * 330.0)
+        self.assertAlmostEqual(h_t["fenster"][0], 50.0)
+        self.assertAlmostEqual(h_t["boden"][0], 0.3 * 200.0 * 0.6)
+        self.assertAlmostEqual(h_t["h_t"][0], 82.5 + 36.0 + 36.0 + 50.0 + 38.0)
+
+        # Neue Tabellenwerte werden nach der Invalidierung übernommen
+        Temperaturkorrekturfaktor.objects.create(bauteil="Dach (als Systemgrenze)", fx=0.8)
+        self.addCleanup(referenzdaten.invalidieren)
+        self.assertEqual(fx_werte()["dach"], 0.8)
+        self.assertAlmostEqual(berechne_h_t(flaechen, 0.25, 0.2, 0.3, 1.0)["dach"][0], 0.2 * 180.0 * 0.8)
+
+    def test_wall_row_as_stored_by_csv_import(self):
+        """Test that the wall/window row as stored by the CSV import (capital Ü) reaches H_T."""
+        Temperaturkorrekturfaktor.objects.create(bauteil="Außenwand, Fenster, Decke Über Außenluft", fx=0.9)
+        self.addCleanup(referenzdaten.invalidieren)
+        self.assertEqual(fx_werte()["wand"], 0.9)
+        self.assertEqual(fx_werte()["fenster"], 0.9)
+
+        flaechen = huellflaechen(20.0, 10.0, 3.0, 2, {"sued": 0.5})
+        h_t = berechne_h_t(flaechen, 0.25, 0.2, 0.3, 1.0)
+        self.assertAlmostEqual(h_t["wand"][0], 0.25 * 330.0 * 0.9)
+        self.assertAlmostEqual(h_t["fenster"][0], 30.0 * 0.9)
+
+    def test_batch_matches_single_buildings_and_monthly_balance(self):
+        """Test that the vectorized H_T equals per-building results and the H_T of the monthly balance."""
+        lege_klimadaten_an()
+        laenge = np.array([10.0, 20.0, 35.0])
+        breite = np.array([8.0, 12.0, 15.0])
+        anteile = np.array([0.1, 0.3, 0.5])
+        u_wand = np.array([0.15, 0.24, 0.4])
+        batch = berechne_h_t(huellflaechen(laenge, breite, 3.0, 4, {"ost": anteile}), u_wand, 0.2, 0.35, 1.3)["h_t"]
+        for i in range(3):
+            einzeln = berechne_h_t(huellflaechen(laenge[i], breite[i], 3.0, 4, {"ost": anteile[i]}), u_wand[i],
+                                   0.2, 0.35, 1.3)["h_t"]
+            self.assertAlmostEqual(batch[i], einzeln[0])
+
+        monat = berechne_heizwaerme_monatlich(
+            lade_klimadaten(4), laenge, breite, 3.0, 4, u_wand=u_wand, fenster_ost=anteile,
+        )
+        erwartet = berechne_h_t(
+            huellflaechen(laenge, breite, 3.0, 4, {"nord": 0.2, "sued": 0.2, "west": 0.2, "ost": anteile}),
+            u_wand, 0.2, 0.35, 1.3, delta_u_wb=0.05,
+        )["h_t"]
+        np.testing.assert_allclose(monat["h_t"], erwartet)
+
+    def test_project_with_bauteil(self):
+        """Test areas and H_T of a BuildingProject with window ratios in % and U-values of a Bauteil."""
+        projekt = BuildingProject.objects.create(
+            standort="Berlin", laenge_ns=20.0, breite_ow=10.0, geschosshoehe=3.0, geschosse=2,
+            fenster_sued=40, fenster_nord=10,
+        )
+        bauteil = Bauteil(laenge=20.0, breite=10.0, geschosshoehe=3.0, anz_geschosse=2,
+                          u_wand_sued=0.5, u_dach=0.1)
+        ergebnis = transmission_fuer_projekt(projekt, bauteil, u_fenster=0.9, delta_u_wb=0.0)
+        self.assertEqual(ergebnis["flaechen"]["fenster_sued"], 24.0)
+        self.assertEqual(ergebnis["flaechen"]["wand_nord"], 54.0)
+        self.assertEqual(ergebnis["flaechen"]["wand_ost"], 120.0)
+        self.assertEqual(ergebnis["h_t"]["fenster"], round(0.9 * 30.0, 2))
+        self.assertEqual(ergebnis["h_t"]["dach"], 20.0)
+        self.assertAlmostEqual(ergebnis["h_t"]["wand"], 0.5 * 36.0 + 0.28 * (54.0 + 240.0), places=2)
+        self.assertEqual(ergebnis["h_t"]["waermebruecken"], 0.0)
@@ -0,0 +1,58 @@
+import numpy as np
+from django.test import TestCase
+from mylist.berechnungen import berechne_bilanz
+from mylist.unsicherheit import monte_carlo, pruefe_verteilung, ziehe
+
+
+class UnsicherheitTest(TestCase):
+    """Test the Monte Carlo uncertainty analysis."""
+
+    FESTE = {'laenge': 20.0, 'breite': 15.0, 'geschosshoehe': 3.0, 'anz_geschosse': 3.0}
+
+    def test_distributions(self):
+        """Test that samples follow the requested distributions."""
+        rng = np.random.default_rng(0)
+        normal = ziehe(pruefe_verteilung({'verteilung': 'normal', 'mittel': 15, 'std': 2}), 100000, rng)
+        self.assertAlmostEqual(normal.mean(), 15, delta=0.05)
+        lognormal = ziehe(pruefe_verteilung({'verteilung': 'lognormal', 'mittel': 500, 'std': 100}), 100000, rng)
+        self.assertAlmostEqual(lognormal.mean(), 500, delta=2)
+        self.assertAlmostEqual(lognormal.std(), 100, delta=2)
+        dreieck = ziehe(pruefe_verteilung({'verteilung': 'dreieck', 'min': 5, 'modus': 10, 'max': 20}), 1000, rng)
+        self.assertTrue(((dreieck >= 5) & (dreieck <= 20)).all())
+        diskret = ziehe(pruefe_verteilung({'verteilung': 'diskret', 'werte': [2, 3], 'gewichte': [1, 3]}), 10000, rng)
+        self.assertEqual(set(np.unique(diskret)), {2.0, 3.0})
+        self.assertAlmostEqual((diskret == 3).mean(), 0.75, delta=0.02)
+
+        for ungueltig in (
+            {'verteilung': 'poisson'},
+            {'verteilung': 'normal', 'mittel': 1},
+            {'verteilung': 'gleich', 'min': 2, 'max': 1},
+            {'verteilung': 'dreieck', 'min': 0, 'modus': 5, 'max': 4},
+            {'verteilung': 'diskret', 'werte': [1], 'gewichte': [1, 2]},
+            {'verteilung': 'diskret', 'werte': [1, 2], 'gewichte': [1e308, 1e308]},
+        ):
+            with self.assertRaises(ValueError):
+                pruefe_verteilung(ungueltig)
+
+    def test_reproducible_with_seed(self):
+        """Test that equal seeds give equal results independent of the block size."""
+        verteilungen = {
+            'trinkwarmwasser_kwh_pro_m2': pruefe_verteilung({'verteilung': 'normal', 'mittel': 15, 'std': 3}),
+            'jahres_heizwaermebedarf_kwh': pruefe_verteilung({'verteilung': 'gleich', 'min': 8000, 'max': 12000}),
+        }
+        a = monte_carlo(verteilungen, self.FESTE, 5000, seed=7)
+        b = monte_carlo(verteilungen, self.FESTE, 5000, seed=7, blockgroesse=777)
+        c = monte_carlo(verteilungen, self.FESTE, 5000, seed=8)
+        self.assertEqual(a, b)
+        self.assertNotEqual(a['ergebnisse'], c['ergebnisse'])
+        self.assertEqual(sum(a['ergebnisse']['ee_absolut']['histogramm']['anzahl']), 5000)
+        self.assertLess(a['ergebnisse']['ee_absolut']['perzentile']['p5'], a['ergebnisse']['ee_absolut']['perzentile']['p95'])
+
+    def test_degenerate_distribution_matches_point_value(self):
+        """Test that zero-width distributions reproduce the deterministic chain."""
+        verteilungen = {'beleuchtung_kwh_pro_m2': pruefe_verteilung({'verteilung': 'gleich', 'min': 10, 'max': 10})}
+        feste = {**self.FESTE, 'jahres_heizwaermebedarf_kwh': 10000.0}
+        ergebnis = monte_carlo(verteilungen, feste, 100, seed=1, perzentile=[50])['ergebnisse']
+        erwartet = berechne_bilanz(**feste, beleuchtung_kwh_pro_m2=10.0)
+        self.assertEqual(ergebnis['ee_absolut']['perzentile']['p50'], erwartet['endenergie']['ee_absolut'])
+        self.assertEqual(ergebnis['ne_absolut']['std'], 0.0)
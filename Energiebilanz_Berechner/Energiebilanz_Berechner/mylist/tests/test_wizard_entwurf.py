@@ -0,0 +1,94 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mylist.models import Bauteil, Beleuchtung, Gebaeude, GwpEingabe
+
+
+SCHRITTE = [
+    ('wizard_allg', {
+        'name': 'Testgebäude', 'laenge_ns': 20.0, 'breite_ow': 15.0,
+        'geschosshoehe': 3.0, 'geschosse': 3,
+    }),
+    ('wizard_energie', {
+        'jahres_heizwert': 10000.0, 'tw_kwh_m2': 15.0, 'luft_kwh_m2': 8.0,
+        'bel_kwh_m2': 10.0, 'nutz_kwh_m2': 5.0,
+    }),
+    ('wizard_verluste', {
+        'verteilungsverlust_kwh': 500.0, 'speicherverlust_kwh': 300.0, 'warmwasserbedarf_kwh': 2000.0,
+    }),
+    ('wizard_bauteile', {
+        'laenge': 20.0, 'breite': 15.0, 'geschosshoehe': 3.0, 'anz_geschosse': 3,
+        'u_wand_nord': 0.24, 'u_wand_sued': 0.24, 'u_wand_west': 0.24, 'u_wand_ost': 0.24,
+        'u_bodenplatte': 0.3, 'u_dach': 0.2,
+    }),
+    ('wizard_beleuchtung', {
+        'bereich': 'buero', 'beleuchtungsart': 'LED', 'regelungsart': 'Präsenzmelder',
+        'e_soll': 500.0, 'laufzeit_hd': 10.0, 'laufzeit_da': 250.0,
+    }),
+    ('wizard_gwp', {'variante': '300', 'menge': 100.0, 'spez_co2': 20.0}),
+]
+
+
+def schreibzugriffe(abfragen):
+    """Schreibende SQL-Abfragen auf die Tabellen der App (ohne Sessions)."""
+    return [
+        q['sql'] for q in abfragen
+        if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE')) and '"mylist_' in q['sql']
+    ]
+
+
+class WizardEntwurfTest(TestCase):
+    """Test that the wizard keeps its input in a draft until the result step."""
+
+    def durchlaufen(self):
+        for url, daten in SCHRITTE:
+            response = self.client.post(reverse(url), daten)
+            self.assertEqual(response.status_code, 302, url)
+
+    def pruefe_ablauf(self):
+        with CaptureQueriesContext(connection) as abfragen:
+            self.durchlaufen()
+        self.assertEqual(schreibzugriffe(abfragen), [])
+        self.assertFalse(Gebaeude.objects.exists())
+
+        response = self.client.get(reverse('wizard_ergebnis'))
+        self.assertEqual(response.status_code, 200)
+        gebaeude = Gebaeude.objects.get()
+        bauteil = Bauteil.objects.get()
+        self.assertEqual(gebaeude.name, 'Testgebäude')
+        self.assertEqual(gebaeude.jahres_heizwert, 10000.0)
+        self.assertEqual(bauteil.nf, 720.0)
+        self.assertIsNotNone(bauteil.ee_absolut)
+        self.assertEqual(Beleuchtung.objects.count(), 1)
+        self.assertEqual(GwpEingabe.objects.get().gebaeude, gebaeude)
+        self.assertEqual(self.client.session['geb_pk'], gebaeude.pk)
+
+        # Erneuter Aufruf ohne Änderungen schreibt nichts
+        with CaptureQueriesContext(connection) as abfragen:
+            response = self.client.get(reverse('wizard_ergebnis'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(schreibzugriffe(abfragen), [])
+
+    def test_no_rows_until_result(self):
+        """Test that the steps write nothing and the result step persists once."""
+        self.pruefe_ablauf()
+
+    @override_settings(WIZARD_ENTWURF_SPEICHER='cache')
+    def test_cache_storage(self):
+        """Test the same flow with the draft stored in the Django cache."""
+        self.pruefe_ablauf()
+        self.assertIsInstance(self.client.session['wizard_entwurf'], str)
+
+    def test_abandoned_wizard_leaves_no_rows(self):
+        """Test that restarting the wizard discards the previous draft."""
+        self.durchlaufen()
+        self.client.post(reverse('wizard_allg'), SCHRITTE[0][1])
+        self.assertFalse(self.client.session['wizard_entwurf']['beleuchtung'])
+        self.assertFalse(Gebaeude.objects.exists())
+        self.assertFalse(Beleuchtung.objects.exists())
+
+    def test_step_without_draft_redirects(self):
+        """Test that a later step without a draft starts the wizard over."""
+        response = self.client.get(reverse('wizard_energie'))
+        self.assertRedirects(response, reverse('wizard_allg'))
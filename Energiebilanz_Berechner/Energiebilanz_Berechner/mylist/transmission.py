@@ -0,0 +1,176 @@
+# mylist/transmission.py
+
+"""
+Hüllflächen und Transmissionswärmetransferkoeffizient
+
+    H_T = Σ U · A · Fx + ΔU_WB · A_ges
+
+für einzelne Gebäude oder ganze Variantenreihen (alle Größen als
+NumPy-Arrays (n,)). Die Geometrie entspricht `berechne_gebaeudedaten`
+(Höhe = Geschosse · Geschosshöhe); die Fensterflächen werden über die
+Fensterflächenanteile je Fassade bzw. Dach aus den Wand- und Dachflächen
+herausgerechnet.
+
+Die Fx-Faktoren kommen aus `Temperaturkorrekturfaktor` und werden einmal je
+geladenem Tabellenstand in ein kleines Dict übersetzt (`fx_werte`), sodass
+Monatsbilanz und Stundensimulation `berechne_h_t` ohne Datenbankzugriff in
+ihren inneren Schleifen aufrufen können.
+"""
+
+from .berechnungen import als_spalte, runde
+from .referenzdaten import referenzdaten
+
+
+# Fassaden wie in der Monatsbilanz: Nord/Süd haben die Breite (O/W), Ost/West die Länge (N/S)
+FASSADEN = ("nord", "sued", "ost", "west")
+
+# Hüllfläche → Zeile der Tabelle `Temperaturkorrekturfaktor` (Vergleich über `_schluessel`,
+# der CSV-Import liest z. B. "Decke Über Außenluft" mit großem Ü)
+FX_BAUTEILE = {
+    "wand":    "Außenwand, Fenster, Decke über Außenluft",
+    "fenster": "Außenwand, Fenster, Decke über Außenluft",
+    "dach":    "Dach (als Systemgrenze)",
+}
+
+# Rückfall ohne Tabelleneintrag; die Bodenplatte steht nicht in der Tabelle
+# (Wert wie `fx_boden` in den Standardwerten der Monatsbilanz)
+FX_STANDARD = {
+    "wand":    1.0,
+    "fenster": 1.0,
+    "dach":    1.0,
+    "boden":   0.6,
+}
+
+_fx_stand = (None, None)    # (Tabellenindex, daraus abgeleitete Fx-Werte)
+
+
+def _schluessel(bauteil):
+    """Bauteilbezeichnung ohne Unterschiede in Groß-/Kleinschreibung und Leerzeichen."""
+    return " ".join(str(bauteil).casefold().split())
+
+
+def fx_werte():
+    """
+    Hüllfläche → Fx aus `FX_BAUTEILE` bzw. `FX_STANDARD`. Wird nur neu
+    aufgebaut, wenn referenzdaten.py die Tabelle neu geladen hat.
+    """
+    global _fx_stand
+    tabelle = referenzdaten.tabelle("temperaturkorrektur")
+    index, werte = _fx_stand
+    if index is not tabelle:
+        zeilen = {_schluessel(bauteil): fx for bauteil, fx in tabelle.items()}
+        werte = dict(FX_STANDARD)
+        for flaeche, bauteil in FX_BAUTEILE.items():
+            if zeilen.get(_schluessel(bauteil)) is not None:
+                werte[flaeche] = float(zeilen[_schluessel(bauteil)])
+        _fx_stand = (tabelle, werte)
+    return werte
+
+
+def huellflaechen(laenge, breite, geschosshoehe, anz_geschosse, fensteranteile=None):
+    """
+    Hüllflächen in m² für ein oder viele Gebäude.
+
+    Argumente: Geometrie als Skalare oder Arrays (n,), `fensteranteile` als
+    Dict Fläche ("nord", "sued", "ost", "west", "dach") → Anteil 0 … 1
+    (fehlende Flächen ohne Fenster).
+
+    Rückgabe (Dictionary, je ein Array (n,)):
+    {
+      "fassaden":  Dict Fassade → Bruttofläche,
+      "fenster":   Dict Fassade bzw. "dach" → Fensterfläche,
+      "waende":    Dict Fassade → Wandfläche ohne Fenster,
+      "dach":      Dachfläche ohne Fenster,
+      "boden":     Bodenplatte (= Grundfläche),
+      "a_huelle":  gesamte Hüllfläche (Fassaden + Dach + Boden)
+    }
+    """
+    fensteranteile = fensteranteile or {}
+    laenge, breite = als_spalte(laenge), als_spalte(breite)
+    hoehe = als_spalte(anz_geschosse) * als_spalte(geschosshoehe)
+    grundflaeche = laenge * breite
+
+    fassaden = {
+        "nord": breite * hoehe,
+        "sued": breite * hoehe,
+        "ost":  laenge * hoehe,
+        "west": laenge * hoehe,
+    }
+    fenster = {
+        name: flaeche * als_spalte(fensteranteile.get(name, 0.0))
+        for name, flaeche in fassaden.items()
+    }
+    fenster["dach"] = grundflaeche * als_spalte(fensteranteile.get("dach", 0.0))
+
+    return {
+        "fassaden": fassaden,
+        "fenster":  fenster,
+        "waende":   {name: fassaden[name] - fenster[name] for name in FASSADEN},
+        "dach":     grundflaeche - fenster["dach"],
+        "boden":    grundflaeche,
+        "a_huelle": sum(fassaden.values()) + 2.0 * grundflaeche,
+    }
+
+
+def berechne_h_t(flaechen, u_waende, u_dach, u_boden, u_fenster, delta_u_wb=0.0, fx=None):
+    """
+    Transmissionswärmetransferkoeffizient aus den Flächen von `huellflaechen`.
+
+    - u_waende: Dict Fassade → U-Wert bzw. ein U-Wert für alle Fassaden
+    - u_dach, u_boden, u_fenster, delta_u_wb: W/(m²K), Skalare oder Arrays (n,)
+    - fx: einzelne Fx-Werte ("wand", "fenster", "dach", "boden"), die die
+      Werte aus `fx_werte()` überschreiben; sind alle vier angegeben, wird
+      die Tabelle nicht gelesen
+
+    Rückgabe (Dictionary, je ein Array (n,) in W/K): Anteile "wand", "fenster",
+    "dach", "boden", "waermebruecken" und die Summe "h_t".
+    """
+    fx = dict(fx or {})
+    if not set(FX_STANDARD) <= set(fx):
+        fx = {**fx_werte(), **fx}
+    if not isinstance(u_waende, dict):
+        u_waende = dict.fromkeys(FASSADEN, u_waende)
+
+    anteile = {
+        "wand":           sum(u_waende[name] * flaechen["waende"][name] for name in FASSADEN) * fx["wand"],
+        "dach":           u_dach * flaechen["dach"] * fx["dach"],
+        "boden":          u_boden * flaechen["boden"] * fx["boden"],
+        "fenster":        u_fenster * sum(flaechen["fenster"].values()) * fx["fenster"],
+        "waermebruecken": delta_u_wb * flaechen["a_huelle"],
+    }
+    anteile = {name: als_spalte(wert) for name, wert in anteile.items()}
+    anteile["h_t"] = sum(anteile.values())
+    return anteile
+
+
+def transmission_fuer_projekt(projekt, bauteil=None, **u_werte):
+    """
+    Hüllflächen und H_T für ein `BuildingProject` (Fensteranteile dort in %).
+
+    U-Werte kommen aus einem `Bauteil` (gesetzte Felder), aus `u_werte`
+    (u_wand, u_dach, u_boden, u_fenster, delta_u_wb) oder aus den
+    Standardwerten der Monatsbilanz.
+
+    Rückgabe (Dictionary): "flaechen" (Fläche → m²) und "h_t" (Anteil → W/K),
+    jeweils als float, gerundet auf 2 Nachkommastellen.
+    """
+    from .monatsbilanz import STANDARDWERTE, bauteil_eingaben
+
+    flaechen = huellflaechen(
+        projekt.laenge_ns, projekt.breite_ow, projekt.geschosshoehe, projekt.geschosse,
+        {name: getattr(projekt, f"fenster_{name}") / 100.0 for name in (*FASSADEN, "dach")},
+    )
+    u = {**STANDARDWERTE, **u_werte, **(bauteil_eingaben(bauteil) if bauteil is not None else {})}
+    u_waende = {name: u.get(f"u_wand_{name}", u["u_wand"]) for name in FASSADEN}
+
+    h_t = berechne_h_t(flaechen, u_waende, u["u_dach"], u["u_boden"], u["u_fenster"], u["delta_u_wb"])
+    return {
+        "flaechen": {
+            **{f"wand_{name}": float(runde(flaechen["waende"][name])[0]) for name in FASSADEN},
+            **{f"fenster_{name}": float(runde(wert)[0]) for name, wert in flaechen["fenster"].items()},
+            "dach":     float(runde(flaechen["dach"])[0]),
+            "boden":    float(runde(flaechen["boden"])[0]),
+            "a_huelle": float(runde(flaechen["a_huelle"])[0]),
+        },
+        "h_t": {name: float(runde(wert)[0]) for name, wert in h_t.items()},
+    }
@@ -0,0 +1,171 @@
+# mylist/unsicherheit.py
+
+"""
+Monte-Carlo-Unsicherheitsanalyse der Rechenkette (/api/berechnung/unsicherheit/).
+
+Jede Eingabespalte aus `BATCH_EINGABEN` ist entweder ein fester Wert oder
+eine Verteilung (siehe `VERTEILUNGEN`). Es werden `stichproben` Varianten
+gezogen und blockweise mit `berechne_bilanz_batch` gerechnet; zurück kommen
+Kennwerte, Perzentile und Histogramme je Zielgröße.
+
+Jede Verteilung zieht aus einem eigenen Zufallsgenerator, der aus `seed`
+abgeleitet ist. Gleicher Seed und gleiche Verteilungen ergeben damit
+dieselben Stichproben, unabhängig von der Blockgröße und davon, welche
+anderen Eingaben unsicher sind.
+"""
+
+import math
+
+import numpy as np
+
+from .berechnungen import BATCH_EINGABEN, berechne_bilanz_batch
+from .parameterstudie import ZIELGROESSEN
+
+
+# Verteilungsart → Pflichtangaben (zusätzlich zu "verteilung")
+VERTEILUNGEN = {
+    "normal":    ("mittel", "std"),        # negative Ziehungen werden auf 0 gesetzt
+    "lognormal": ("mittel", "std"),        # Mittelwert/Standardabweichung der Werte selbst
+    "gleich":    ("min", "max"),
+    "dreieck":   ("min", "modus", "max"),
+    "diskret":   ("werte",),               # optional "gewichte"
+}
+
+# Standard-Zielgrößen: die Energiekennwerte der Kette
+STANDARD_ZIELE = ("ne_absolut", "ne_spezifisch", "sb_absolut", "wb_absolut", "ee_absolut", "ee_spezifisch")
+STANDARD_PERZENTILE = (5, 10, 25, 50, 75, 90, 95)
+STANDARD_KLASSEN = 20
+STANDARD_BLOCKGROESSE = 100_000
+
+
+def _zahl(wert, name):
+    if isinstance(wert, bool) or not isinstance(wert, (int, float)) or not math.isfinite(wert):
+        raise ValueError(f"'{name}' muss aus Zahlen bestehen")
+    return float(wert)
+
+
+def pruefe_verteilung(angabe):
+    """
+    Prüft eine Verteilungsangabe, z. B. {"verteilung": "normal", "mittel": 15, "std": 2},
+    und gibt sie normalisiert (Zahlen als float) zurück. Löst ValueError aus.
+    """
+    art = angabe.get("verteilung")
+    if art not in VERTEILUNGEN:
+        raise ValueError(f"'verteilung' muss eine aus {', '.join(VERTEILUNGEN)} sein")
+    erlaubt = {"verteilung", *VERTEILUNGEN[art]} | ({"gewichte"} if art == "diskret" else set())
+    unbekannt = set(angabe) - erlaubt
+    if unbekannt:
+        raise ValueError(f"Unbekannte Angaben: {', '.join(sorted(unbekannt))}")
+
+    if art == "diskret":
+        werte = angabe.get("werte")
+        if not isinstance(werte, list) or not werte:
+            raise ValueError("'werte' muss eine nicht leere Liste sein")
+        werte = [_zahl(w, "werte") for w in werte]
+        gewichte = angabe.get("gewichte")
+        if gewichte is not None:
+            if not isinstance(gewichte, list) or len(gewichte) != len(werte):
+                raise ValueError("'gewichte' muss so lang sein wie 'werte'")
+            gewichte = [_zahl(g, "gewichte") for g in gewichte]
+            try:
+                summe = math.fsum(gewichte)
+            except OverflowError:
+                summe = math.inf
+            if min(gewichte) < 0 or not 0 < summe < math.inf:
+                raise ValueError("'gewichte' müssen >= 0 sein und eine positive, endliche Summe haben")
+            gewichte = [g / summe for g in gewichte]
+        return {"verteilung": art, "werte": werte, "gewichte": gewichte}
+
+    parameter = {schluessel: _zahl(angabe.get(schluessel), schluessel) for schluessel in VERTEILUNGEN[art]}
+    if art in ("normal", "lognormal") and parameter["std"] < 0:
+        raise ValueError("'std' muss >= 0 sein")
+    if art == "lognormal" and parameter["mittel"] <= 0:
+        raise ValueError("'mittel' muss bei lognormal > 0 sein")
+    if art == "gleich" and parameter["min"] > parameter["max"]:
+        raise ValueError("'min' muss <= 'max' sein")
+    if art == "dreieck" and not parameter["min"] <= parameter["modus"] <= parameter["max"]:
+        raise ValueError("Es muss min <= modus <= max gelten")
+    return {"verteilung": art, **parameter}
+
+
+def ziehe(verteilung, anzahl, rng):
+    """`anzahl` Stichproben einer geprüften Verteilung als float64-Array."""
+    art = verteilung["verteilung"]
+    if art == "normal":
+        return np.maximum(rng.normal(verteilung["mittel"], verteilung["std"], anzahl), 0.0)
+    if art == "lognormal":
+        # Parameter der zugrunde liegenden Normalverteilung aus Mittelwert und Streuung
+        mittel, std = verteilung["mittel"], verteilung["std"]
+        sigma2 = math.log1p((std / mittel) ** 2)
+        return rng.lognormal(math.log(mittel) - sigma2 / 2, math.sqrt(sigma2), anzahl)
+    if art == "gleich":
+        return rng.uniform(verteilung["min"], verteilung["max"], anzahl)
+    if art == "dreieck":
+        if verteilung["min"] == verteilung["max"]:
+            return np.full(anzahl, verteilung["min"])
+        return rng.triangular(verteilung["min"], verteilung["modus"], verteilung["max"], anzahl)
+    return rng.choice(np.asarray(verteilung["werte"], dtype=np.float64), anzahl, p=verteilung["gewichte"])
+
+
+def _kennwerte(werte, perzentile, klassen):
+    anzahl, grenzen = np.histogram(werte, bins=klassen)
+    return {
+        "mittel":     float(werte.mean()),
+        "std":        float(werte.std()),
+        "min":        float(werte.min()),
+        "max":        float(werte.max()),
+        "perzentile": {
+            f"p{p:g}": float(wert) for p, wert in zip(perzentile, np.percentile(werte, perzentile))
+        },
+        "histogramm": {"grenzen": grenzen.tolist(), "anzahl": anzahl.tolist()},
+    }
+
+
+def monte_carlo(verteilungen, feste=None, stichproben=100_000, seed=None, ziele=STANDARD_ZIELE,
+                perzentile=STANDARD_PERZENTILE, klassen=STANDARD_KLASSEN, blockgroesse=STANDARD_BLOCKGROESSE):
+    """
+    Monte-Carlo-Lauf über die gesamte Kette.
+
+    - verteilungen: Spalte → geprüfte Verteilung (siehe `pruefe_verteilung`)
+    - feste: Spalte → fester Wert für die übrigen Eingabespalten
+    - seed: ganze Zahl für reproduzierbare Läufe (None = zufällig, wird zurückgegeben)
+
+    Rückgabe: {"stichproben", "seed", "ergebnisse": {ziel: {"mittel", "std",
+    "min", "max", "perzentile": {"p5": ...}, "histogramm": {"grenzen", "anzahl"}}}}
+    """
+    feste = dict(feste or {})
+    unbekannt = (set(verteilungen) | set(feste)) - set(BATCH_EINGABEN)
+    if unbekannt:
+        raise ValueError(f"Unbekannte Spalten: {', '.join(sorted(unbekannt))}")
+    doppelt = set(verteilungen) & set(feste)
+    if doppelt:
+        raise ValueError(f"Spalten sowohl als Verteilung als auch fest angegeben: {', '.join(sorted(doppelt))}")
+    unbekannt = set(ziele) - set(ZIELGROESSEN)
+    if unbekannt:
+        raise ValueError(f"Unbekannte Zielgrößen: {', '.join(sorted(unbekannt))}")
+    if stichproben < 1:
+        raise ValueError("Mindestens eine Stichprobe")
+
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % 2**32)
+    # Ein eigener Generator je Eingabespalte, abgeleitet aus Seed und Spaltenposition
+    generatoren = {
+        name: np.random.default_rng([seed, list(BATCH_EINGABEN).index(name)]) for name in verteilungen
+    }
+
+    werte = {ziel: np.empty(stichproben, dtype=np.float64) for ziel in ziele}
+    for start in range(0, stichproben, blockgroesse):
+        anzahl = min(blockgroesse, stichproben - start)
+        spalten = {
+            name: ziehe(verteilung, anzahl, generatoren[name]) for name, verteilung in verteilungen.items()
+        }
+        spalten.update({name: np.full(anzahl, wert, dtype=np.float64) for name, wert in feste.items()})
+        ergebnis = berechne_bilanz_batch(spalten)
+        for ziel in ziele:
+            werte[ziel][start:start + anzahl] = ergebnis[ziel]
+
+    return {
+        "stichproben": stichproben,
+        "seed":        seed,
+        "ergebnisse":  {ziel: _kennwerte(werte[ziel], perzentile, klassen) for ziel in ziele},
+    }
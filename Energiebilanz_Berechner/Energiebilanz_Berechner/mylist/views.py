@@ -1,14 +1,20 @@
 # mylist/views.py
 
 from io import BytesIO
-import csv, os
+import csv, os, json, math
+from functools import wraps
+from itertools import islice
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.conf import settings
+from django.views.decorators.csrf import csrf_exempt
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_POST
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 
 from .models import (
+    ReferenzImport,
     Gebaeude,
     Bauteil,
     Beleuchtung,
@@ -27,12 +33,48 @@ from .forms import (
     GwpEingabeForm,
     SonneneintragsParameterForm,
 )
+from .monatsbilanz import (
+    STANDARDWERTE as MONATSBILANZ_STANDARDWERTE,
+    ZUSATZEINGABEN as MONATSBILANZ_ZUSATZEINGABEN,
+    MONATE,
+    lade_klimadaten,
+    berechne_jahres_heizwaermebedarf,
+    heizwaerme_fuer_gebaeude,
+)
+from .wizard_entwurf import WizardEntwurf, formularwerte
+from .messung import gemessen
+from .metriken import prometheus_text
+from .ergebniscache import ergebnis_schluessel, ergebniscache, normalisiere
+from .parameterstudie import ZIELGROESSEN, Parameterstudie, achsenwerte
+from .unsicherheit import STANDARD_PERZENTILE, STANDARD_ZIELE, monte_carlo, pruefe_verteilung
+from .sensitivitaet import einflussgroessen, morris, sobol
+from .huellenoptimierung import (
+    ANNAHMEN as HUELLE_ANNAHMEN,
+    GRENZEN as HUELLE_GRENZEN,
+    ZIELE as HUELLE_ZIELE,
+    ausgangsloesung as huelle_ausgangsloesung,
+    bewerte as bewerte_huelle,
+    optimiere as optimiere_huelle,
+)
+from .rechengraph import live_sitzungen
+from .lueftungsbilanz import lueftung_fuer_bauteil
+from .stundensimulation import (
+    beleuchtungsprofil,
+    lueftungsprofil,
+    monatssummen,
+    simuliere_stuendlich,
+    waermequellenprofil,
+)
+from .interne_gewinne import (
+    BELEUCHTUNG_SPALTEN,
+    WAERMEQUELLEN_SPALTEN,
+    berechne_interne_gewinne,
+    eintragsspalten,
+)
 from .berechnungen import (
     berechne_gebaeudedaten,
-    berechne_nutzenergiebedarf,
-    berechne_strombedarf,
-    berechne_waermebedarf,
-    berechne_endenergiebedarf,
+    berechne_bilanz_batch,
+    batch_als_datensaetze,
 )
 
 
@@ -98,7 +140,7 @@ def beleuchtung(request, gebaeude_id):
         form = BeleuchtungForm(request.POST)
         if form.is_valid():
             beleuchtung = form.save(commit=False)
-            # You might want to associate the beleuchtung with the gebaeude here
+            beleuchtung.gebaeude = geb
             beleuchtung.save()
             return redirect('waermequelle', gebaeude_id=geb.pk)
     else:
@@ -112,7 +154,7 @@ def waermequelle(request, gebaeude_id):
         form = WaermequelleForm(request.POST)
         if form.is_valid():
             waermequelle = form.save(commit=False)
-            # You might want to associate the waermequelle with the gebaeude here
+            waermequelle.gebaeude = geb
             waermequelle.save()
             return redirect('gwp', gebaeude_id=geb.pk)
     else:
@@ -150,6 +192,7 @@ def sonneneintrag(request, gebaeude_id):
 
 # ————— PDF-Export —————
 
+@gemessen("pdf")
 def einfach_ergebnis_pdf(request):
     buffer = BytesIO()
     p = canvas.Canvas(buffer, pagesize=A4)
@@ -179,57 +222,906 @@ def einfach_ergebnis_pdf(request):
 
 # ————— JSON-API —————
 
-def api_berechnung(request):
+def _api_eingaben(query):
+    """
+    Liest die Parameter von /api/berechnung/ (fehlende Parameter sind 0).
+
+    Rückgabe ist ein Tupel (eingaben, gueltig): `eingaben` enthält die
+    Spalten aus `BATCH_EINGABEN`; ungültige Abmessungen zählen als 0. Ist
+    einer der übrigen Parameter ungültig, ist `gueltig` False und
+    `eingaben` enthält nur die Abmessungen.
+    """
     try:
-        laenge = float(request.GET.get("laenge", 0))
-        breite = float(request.GET.get("breite", 0))
-        geschosshoehe = float(request.GET.get("geschosshoehe", 0))
-        anz_geschosse = int(request.GET.get("anz_geschosse", 0))
+        eingaben = {
+            "laenge":        float(query.get("laenge", 0)),
+            "breite":        float(query.get("breite", 0)),
+            "geschosshoehe": float(query.get("geschosshoehe", 0)),
+            "anz_geschosse": int(query.get("anz_geschosse", 0)),
+        }
     except (ValueError, TypeError):
-        laenge = breite = geschosshoehe = 0
-        anz_geschosse = 0
+        eingaben = dict.fromkeys(("laenge", "breite", "geschosshoehe", "anz_geschosse"), 0)
 
-    geb = berechne_gebaeudedaten(laenge, breite, geschosshoehe, anz_geschosse)
-    
     try:
-        ne = berechne_nutzenergiebedarf(
-            geb["nf"],
-            float(request.GET.get("jahres_heizbedarf", 0)),
-            float(request.GET.get("tw_pro_m2", 0)),
-            float(request.GET.get("lwt_pro_m2", 0)),
-            float(request.GET.get("bel_pro_m2", 0)),
-            float(request.GET.get("nutzer_pro_m2", 0)),
+        weitere = {
+            spalte: float(query.get(parameter, 0))
+            for parameter, spalte in API_PARAMETER.items()
+            if spalte not in eingaben
+        }
+    except (ValueError, TypeError):
+        return eingaben, False
+    return {**eingaben, **weitere}, True
+
+
+def _api_berechnung_etag(request):
+    """
+    ETag von /api/berechnung/: Hash über die normalisierten Eingaben und die
+    Berechnungsversion, ohne die Berechnung auszuführen.
+    """
+    eingaben, gueltig = _api_eingaben(request.GET)
+    return ergebnis_schluessel([gueltig, normalisiere(eingaben)])
+
+
+def _api_cache_control(view):
+    """Setzt `API_CACHE_CONTROL` auf Antworten (auch 304) einer cachebaren API-View."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            patch_cache_control(
+                response, **getattr(settings, "API_CACHE_CONTROL", {"public": True, "max_age": 300})
+            )
+        return response
+    return wrapper
+
+
+@_api_cache_control
+@condition(etag_func=_api_berechnung_etag)
+def api_berechnung(request):
+    """
+    Rechenkette für ein Gebäude aus den Query-Parametern (siehe
+    `API_PARAMETER`). Die Antwort hängt nur von der Query ab und trägt ein
+    ETag; bei passendem If-None-Match antwortet die View mit 304.
+    """
+    eingaben, gueltig = _api_eingaben(request.GET)
+
+    if gueltig:
+        ergebnis = ergebniscache.bilanz(**eingaben)
+    else:
+        ergebnis = {
+            "gebaeudedaten": berechne_gebaeudedaten(**eingaben),
+            "nutzenergie":   {"ne_absolut": 0, "ne_spezifisch": 0},
+            "strombedarf":   {"sb_absolut": 0, "sb_spezifisch": 0},
+            "waermebedarf":  {"wb_absolut": 0},
+            "endenergie":    {"ee_absolut": 0, "ee_spezifisch": 0},
+        }
+
+    return JsonResponse(ergebnis)
+
+
+def metriken_prometheus(request):
+    """
+    Metriken aller Prozesse im Prometheus-Textformat (siehe metriken.py),
+    ergänzt um den Stand der Referenztabellen aus `ReferenzImport`.
+    """
+    zusaetzlich = []
+    for tabelle, datensaetze, aktualisiert in ReferenzImport.objects.values_list(
+        "tabelle", "datensaetze", "aktualisiert"
+    ):
+        zusaetzlich.append(("mylist_referenzimport_datensaetze", {"tabelle": tabelle}, datensaetze))
+        zusaetzlich.append(
+            ("mylist_referenzimport_aktualisiert_sekunden", {"tabelle": tabelle}, aktualisiert.timestamp())
         )
-        sb = berechne_strombedarf(
-            geb["nf"],
-            float(request.GET.get("tw_pro_m2", 0)),
-            float(request.GET.get("lwt_pro_m2", 0)),
-            float(request.GET.get("bel_pro_m2", 0)),
-            float(request.GET.get("nutzer_pro_m2", 0)),
+    return HttpResponse(prometheus_text(zusaetzlich), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def api_heizwaerme(request):
+    """
+    Heizwärmebedarf nach dem Monatsbilanzverfahren für die Live-Berechnung
+    im Wizard. Erwartet laenge, breite, geschosshoehe, anz_geschosse und
+    optional klimaregion sowie Eingaben aus `monatsbilanz.STANDARDWERTE`.
+    """
+    erlaubt = set(MONATSBILANZ_STANDARDWERTE) | set(MONATSBILANZ_ZUSATZEINGABEN)
+    try:
+        geometrie = [
+            float(request.GET.get(name, 0))
+            for name in ("laenge", "breite", "geschosshoehe", "anz_geschosse")
+        ]
+        eingaben = {
+            name: float(wert) for name, wert in request.GET.items() if name in erlaubt
+        }
+        klimaregion = int(request.GET["klimaregion"]) if request.GET.get("klimaregion") else None
+    except (ValueError, TypeError):
+        return JsonResponse({"fehler": "Ungültige Eingabe"}, status=400)
+
+    try:
+        klima = lade_klimadaten(klimaregion)
+    except LookupError as e:
+        return JsonResponse({"fehler": str(e)}, status=404)
+
+    ergebnis = berechne_jahres_heizwaermebedarf(klima, *geometrie, **eingaben)
+    return JsonResponse({"monate": list(MONATE), **ergebnis})
+
+
+def _heizwert_monatsbilanz(gebaeude, bauteil=None, q_i=None):
+    """Heizwärmebedarf per Monatsbilanz; None, wenn keine Klimadaten vorliegen."""
+    try:
+        return heizwaerme_fuer_gebaeude(gebaeude, bauteil, q_i)
+    except LookupError:
+        return None
+
+
+def _interne_gewinne_entwurf(entwurf, gebaeude):
+    """
+    Beleuchtungsstrom und interne Gewinne aus den Beleuchtungs- und
+    Wärmequellen-Einträgen des Entwurfs; None ohne Einträge.
+    """
+    if not entwurf.hat('beleuchtung') and not entwurf.hat('waermequellen'):
+        return None
+    ergebnis = berechne_interne_gewinne(
+        berechne_gebaeudedaten(
+            gebaeude.laenge_ns, gebaeude.breite_ow, gebaeude.geschosshoehe, gebaeude.geschosse
+        )['nf'],
+        beleuchtung=eintragsspalten(entwurf.daten['beleuchtung'], BELEUCHTUNG_SPALTEN),
+        waermequellen=eintragsspalten(entwurf.daten['waermequellen'], WAERMEQUELLEN_SPALTEN),
+    )
+    ergebnis.pop('gewinne_monate')
+    return {name: float(werte[0]) for name, werte in ergebnis.items()}
+
+
+def _lueftung_bauteil(bauteil, klimaregion=None):
+    """Lüftungswärmebedarf und Ventilatorstrom eines Bauteils; None ohne Luftwechsel oder Klimadaten."""
+    if bauteil.luftwechselrate is None:
+        return None
+    try:
+        return lueftung_fuer_bauteil(bauteil, klimaregion)
+    except LookupError:
+        return None
+
+
+# Zuordnung der API-Parameter (wie in /api/berechnung/) zu den Eingabespalten
+# der Batch-Berechnung
+API_PARAMETER = {
+    "laenge":             "laenge",
+    "breite":             "breite",
+    "geschosshoehe":      "geschosshoehe",
+    "anz_geschosse":      "anz_geschosse",
+    "jahres_heizbedarf":  "jahres_heizwaermebedarf_kwh",
+    "tw_pro_m2":          "trinkwarmwasser_kwh_pro_m2",
+    "lwt_pro_m2":         "luftfoerderung_kwh_pro_m2",
+    "bel_pro_m2":         "beleuchtung_kwh_pro_m2",
+    "nutzer_pro_m2":      "nutzer_pro_m2",
+    "verlust_verteilung": "verteilungsverlust_kwh",
+    "verlust_speicher":   "speicherverlust_kwh",
+    "ww_warmwasser":      "warmwasserbedarf_kwh",
+}
+
+
+def _api_datensatz(datensatz):
+    """
+    Prüft einen Eingabedatensatz der Batch-API.
+
+    Fehlende Parameter sind wie bei /api/berechnung/ 0. Rückgabe ist ein
+    Tupel (werte, fehler): `werte` ist ein Dict mit den Eingabespalten der
+    Batch-Berechnung, `fehler` ein Dict Parameter → Fehlermeldung (leer,
+    wenn der Datensatz gültig ist).
+    """
+    if not isinstance(datensatz, dict):
+        return {}, {"datensatz": "Erwartet wird ein JSON-Objekt"}
+
+    werte, fehler = {}, {}
+    for parameter, spalte in API_PARAMETER.items():
+        wert = datensatz.get(parameter, 0)
+        try:
+            if isinstance(wert, bool) or wert is None:
+                raise TypeError
+            zahl = float(wert)
+            if not math.isfinite(zahl):
+                raise ValueError
+            if parameter == "anz_geschosse" and not zahl.is_integer():
+                raise ValueError
+        except (ValueError, TypeError, OverflowError):
+            fehler[parameter] = f"Ungültiger Wert: {wert!r}"
+            continue
+        werte[spalte] = zahl
+
+    unbekannt = set(datensatz) - set(API_PARAMETER)
+    for parameter in sorted(unbekannt):
+        fehler[parameter] = "Unbekannter Parameter"
+
+    return werte, fehler
+
+
+@csrf_exempt
+@require_POST
+def api_berechnung_batch(request):
+    """
+    Batch-Variante von /api/berechnung/: erwartet ein JSON-Array von
+    Datensätzen mit denselben Parametern und berechnet alle gültigen
+    Datensätze in einem Durchlauf. Ungültige Datensätze liefern einen
+    Fehlereintrag, ohne den restlichen Batch abzubrechen.
+    """
+    try:
+        datensaetze = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"fehler": "Ungültiges JSON"}, status=400)
+
+    if not isinstance(datensaetze, list):
+        return JsonResponse(
+            {"fehler": "Erwartet wird ein JSON-Array von Datensätzen"}, status=400
         )
-        wb = berechne_waermebedarf(
-            float(request.GET.get("jahres_heizbedarf", 0)),
-            float(request.GET.get("verlust_verteilung", 0)),
-            float(request.GET.get("verlust_speicher", 0)),
-            float(request.GET.get("ww_warmwasser", 0)),
+
+    max_datensaetze = getattr(settings, "API_BATCH_MAX_DATENSAETZE", 10000)
+    if len(datensaetze) > max_datensaetze:
+        return JsonResponse(
+            {"fehler": f"Höchstens {max_datensaetze} Datensätze pro Anfrage"}, status=400
         )
-        ee = berechne_endenergiebedarf(geb["nf"], sb, wb)
-    except (ValueError, TypeError):
-        ne = {"ne_absolut": 0, "ne_spezifisch": 0}
-        sb = {"sb_absolut": 0, "sb_spezifisch": 0}
-        wb = {"wb_absolut": 0}
-        ee = {"ee_absolut": 0, "ee_spezifisch": 0}
+
+    ergebnisse = _api_ergebnisse(datensaetze)
 
     return JsonResponse({
-        "gebaeudedaten": geb,
-        "nutzenergie":   ne,
-        "strombedarf":   sb,
-        "waermebedarf":  wb,
-        "endenergie":    ee,
+        "anzahl":      len(datensaetze),
+        "fehlerhaft":  sum(1 for ergebnis in ergebnisse if "fehler" in ergebnis),
+        "ergebnisse":  ergebnisse,
     })
 
 
+@csrf_exempt
+@require_POST
+def api_berechnung_stream(request):
+    """
+    Streaming-Variante von /api/berechnung/batch/ für sehr große Variantensätze.
+
+    Erwartet NDJSON (ein JSON-Objekt pro Zeile), liest den Request-Body
+    zeilenweise, rechnet in Blöcken und schreibt pro Datensatz eine
+    Ergebniszeile als NDJSON. Der erste Block ist klein, damit die ersten
+    Ergebnisse sofort ankommen; danach wächst die Blockgröße bis
+    `API_STREAM_CHUNKGROESSE`.
+    """
+    max_chunk = getattr(settings, "API_STREAM_CHUNKGROESSE", 5000)
+
+    def ergebniszeilen():
+        datensaetze = _ndjson_datensaetze(request)
+        start, chunk = 0, min(64, max_chunk)
+        while True:
+            block = list(islice(datensaetze, chunk))
+            if not block:
+                break
+            yield "".join(
+                json.dumps(ergebnis) + "\n" for ergebnis in _api_ergebnisse(block, start)
+            )
+            start += len(block)
+            chunk = min(chunk * 2, max_chunk)
+
+    response = StreamingHttpResponse(ergebniszeilen(), content_type="application/x-ndjson")
+    # Reverse-Proxies (nginx) sollen die Antwort nicht puffern
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _ndjson_datensaetze(stream):
+    """
+    Liest NDJSON zeilenweise aus `stream` und liefert die Datensätze einzeln.
+    Leerzeilen werden übersprungen; nicht lesbare Zeilen werden als Text
+    weitergereicht und von `_api_datensatz` als Fehler gemeldet.
+    """
+    for zeile in stream:
+        zeile = zeile.strip()
+        if not zeile:
+            continue
+        try:
+            yield json.loads(zeile)
+        except (ValueError, UnicodeDecodeError):
+            yield zeile.decode("utf-8", "replace")
+
+
+def _api_ergebnisse(datensaetze, start=0):
+    """
+    Prüft und berechnet eine Liste von API-Datensätzen mit einem einzigen
+    Aufruf von `berechne_bilanz_batch`. Rückgabe ist eine Liste von
+    Ergebnis-Dicts in Eingabereihenfolge, jeweils mit "index" (ab `start`)
+    und entweder den Ergebnisblöcken oder "fehler".
+    """
+    ergebnisse = [None] * len(datensaetze)
+    gueltig = []
+    spalten = {spalte: [] for spalte in API_PARAMETER.values()}
+
+    for position, datensatz in enumerate(datensaetze):
+        werte, fehler = _api_datensatz(datensatz)
+        if fehler:
+            ergebnisse[position] = {"index": start + position, "fehler": fehler}
+            continue
+        gueltig.append(position)
+        for spalte, wert in werte.items():
+            spalten[spalte].append(wert)
+
+    if gueltig:
+        bloecke = batch_als_datensaetze(berechne_bilanz_batch(spalten))
+        for position, block in zip(gueltig, bloecke):
+            ergebnisse[position] = {"index": start + position, **block}
+
+    return ergebnisse
+
+
+@csrf_exempt
+@require_POST
+def api_berechnung_studie(request):
+    """
+    Parameterstudie über das kartesische Produkt mehrerer Eingaben.
+
+    Erwartet ein JSON-Objekt:
+    {"parameter": {"laenge": {"von": 10, "bis": 50, "schritte": 5},
+                   "breite": [10, 20, 30], "anz_geschosse": 3, ...},
+     "ziele": ["ee_spezifisch", ...],          (optional, Standard: alle)
+     "ausgabe": "spalten" | "reduktion"}       (optional, Standard: "spalten")
+
+    Parameter wie bei /api/berechnung/ (siehe `API_PARAMETER`): Listen und
+    Bereiche (siehe `parameterstudie.achsenwerte`) sind Achsen, Zahlen feste
+    Werte, fehlende Parameter sind 0.
+
+    "spalten" liefert die Achsenwerte und je Zielgröße eine Liste über alle
+    Varianten in zeilenweiser Reihenfolge (letzte Achse läuft am
+    schnellsten), "reduktion" nur Minimum/Maximum mit den zugehörigen
+    Parametern. Die Höchstzahl an Varianten ist je Ausgabe begrenzt
+    (`API_STUDIE_MAX_SPALTEN`, `API_STUDIE_MAX_VARIANTEN`).
+    """
+    try:
+        anfrage = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"fehler": "Ungültiges JSON"}, status=400)
+    if not isinstance(anfrage, dict) or not isinstance(anfrage.get("parameter"), dict):
+        return JsonResponse({"fehler": "Erwartet wird ein JSON-Objekt mit 'parameter'"}, status=400)
+
+    ausgabe = anfrage.get("ausgabe", "spalten")
+    if ausgabe not in ("spalten", "reduktion"):
+        return JsonResponse({"fehler": "'ausgabe' muss 'spalten' oder 'reduktion' sein"}, status=400)
+    ziele = anfrage.get("ziele", list(ZIELGROESSEN))
+    if not isinstance(ziele, list) or not ziele or not set(ziele) <= set(ZIELGROESSEN):
+        return JsonResponse(
+            {"fehler": f"'ziele' muss eine Liste aus {', '.join(ZIELGROESSEN)} sein"}, status=400
+        )
+
+    max_varianten = (
+        getattr(settings, "API_STUDIE_MAX_SPALTEN", 100000) if ausgabe == "spalten"
+        else getattr(settings, "API_STUDIE_MAX_VARIANTEN", 10000000)
+    )
+    achsen, feste, fehler = {}, {}, {}
+    for parameter, angabe in anfrage["parameter"].items():
+        if parameter not in API_PARAMETER:
+            fehler[parameter] = "Unbekannter Parameter"
+            continue
+        try:
+            werte = achsenwerte(angabe, hoechstens=max_varianten)
+            if parameter == "anz_geschosse" and not all(float(w).is_integer() for w in werte):
+                raise ValueError("Nur ganze Geschosszahlen")
+        except ValueError as e:
+            fehler[parameter] = str(e)
+            continue
+        if isinstance(angabe, (list, dict)):
+            achsen[parameter] = werte
+        else:
+            feste[API_PARAMETER[parameter]] = float(werte[0])
+    if fehler:
+        return JsonResponse({"fehler": fehler}, status=400)
+
+    # Fehlende Parameter sind wie bei /api/berechnung/ 0
+    for parameter, spalte in API_PARAMETER.items():
+        if parameter not in achsen and spalte not in feste:
+            feste[spalte] = 0.0
+    studie = Parameterstudie({API_PARAMETER[p]: werte for p, werte in achsen.items()}, feste)
+    if studie.anzahl > max_varianten:
+        return JsonResponse(
+            {"fehler": f"Höchstens {max_varianten} Varianten für die Ausgabe '{ausgabe}' "
+                       f"(angefragt: {studie.anzahl})"},
+            status=400,
+        )
+
+    blockgroesse = getattr(settings, "API_STUDIE_BLOCKGROESSE", 100000)
+    antwort = {
+        "anzahl": studie.anzahl,
+        "achsen": {parameter: werte.tolist() for parameter, werte in achsen.items()},
+    }
+    if ausgabe == "spalten":
+        antwort["ergebnisse"] = {
+            ziel: werte.tolist() for ziel, werte in studie.spalten(ziele, blockgroesse).items()
+        }
+    else:
+        # Parameter der Extremwerte unter den API-Namen ausgeben
+        namen = {spalte: parameter for parameter, spalte in API_PARAMETER.items()}
+        reduktionen = studie.reduziere(ziele, blockgroesse)
+        for werte in reduktionen.values():
+            for arg in ("argmin", "argmax"):
+                werte[arg]["parameter"] = {
+                    namen[spalte]: wert for spalte, wert in werte[arg]["parameter"].items()
+                }
+        antwort["reduktionen"] = reduktionen
+    return JsonResponse(antwort)
+
+
+@csrf_exempt
+@require_POST
+def api_berechnung_unsicherheit(request):
+    """
+    Monte-Carlo-Unsicherheitsanalyse der Rechenkette.
+
+    Erwartet ein JSON-Objekt:
+    {"parameter": {"laenge": 20, ..., "tw_pro_m2": {"verteilung": "normal", "mittel": 15, "std": 3}},
+     "stichproben": 100000,                    (optional)
+     "seed": 42,                               (optional, für reproduzierbare Ergebnisse)
+     "ziele": ["ne_absolut", ...],             (optional, Standard: `unsicherheit.STANDARD_ZIELE`)
+     "perzentile": [5, 50, 95],                (optional)
+     "klassen": 20}                            (optional, Anzahl Histogrammklassen)
+
+    Parameter wie bei /api/berechnung/; Zahlen sind feste Werte, Objekte
+    Verteilungen (siehe `unsicherheit.VERTEILUNGEN`), fehlende Parameter 0.
+    anz_geschosse ist fest oder "diskret" mit ganzen Zahlen.
+    """
+    try:
+        anfrage = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"fehler": "Ungültiges JSON"}, status=400)
+    if not isinstance(anfrage, dict) or not isinstance(anfrage.get("parameter"), dict):
+        return JsonResponse({"fehler": "Erwartet wird ein JSON-Objekt mit 'parameter'"}, status=400)
+
+    verteilungen, feste, fehler = {}, {}, {}
+    for parameter, angabe in anfrage["parameter"].items():
+        if parameter not in API_PARAMETER:
+            fehler[parameter] = "Unbekannter Parameter"
+            continue
+        spalte = API_PARAMETER[parameter]
+        try:
+            if isinstance(angabe, dict):
+                verteilung = pruefe_verteilung(angabe)
+                if parameter == "anz_geschosse" and (
+                    verteilung["verteilung"] != "diskret"
+                    or not all(w.is_integer() for w in verteilung["werte"])
+                ):
+                    raise ValueError("Nur fest oder 'diskret' mit ganzen Geschosszahlen")
+                verteilungen[spalte] = verteilung
+            else:
+                if isinstance(angabe, bool) or not isinstance(angabe, (int, float)) or not math.isfinite(angabe):
+                    raise ValueError(f"Ungültiger Wert: {angabe!r}")
+                if parameter == "anz_geschosse" and not float(angabe).is_integer():
+                    raise ValueError("Nur ganze Geschosszahlen")
+                feste[spalte] = float(angabe)
+        except ValueError as e:
+            fehler[parameter] = str(e)
+
+    max_stichproben = getattr(settings, "API_UNSICHERHEIT_MAX_STICHPROBEN", 1000000)
+    stichproben = anfrage.get("stichproben", 100000)
+    if isinstance(stichproben, bool) or not isinstance(stichproben, int) or not 1 <= stichproben <= max_stichproben:
+        fehler["stichproben"] = f"Ganze Zahl zwischen 1 und {max_stichproben}"
+    seed = anfrage.get("seed")
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or seed < 0):
+        fehler["seed"] = "Ganze Zahl >= 0"
+    ziele = anfrage.get("ziele", list(STANDARD_ZIELE))
+    if not isinstance(ziele, list) or not ziele or not set(ziele) <= set(ZIELGROESSEN):
+        fehler["ziele"] = f"Liste aus {', '.join(ZIELGROESSEN)}"
+    perzentile = anfrage.get("perzentile", list(STANDARD_PERZENTILE))
+    if not isinstance(perzentile, list) or not perzentile or not all(
+        isinstance(p, (int, float)) and not isinstance(p, bool) and 0 <= p <= 100 for p in perzentile
+    ):
+        fehler["perzentile"] = "Liste von Zahlen zwischen 0 und 100"
+    klassen = anfrage.get("klassen", 20)
+    if isinstance(klassen, bool) or not isinstance(klassen, int) or not 1 <= klassen <= 1000:
+        fehler["klassen"] = "Ganze Zahl zwischen 1 und 1000"
+    if fehler:
+        return JsonResponse({"fehler": fehler}, status=400)
+
+    # Fehlende Parameter sind wie bei /api/berechnung/ 0
+    for spalte in API_PARAMETER.values():
+        if spalte not in verteilungen and spalte not in feste:
+            feste[spalte] = 0.0
+    ergebnis = monte_carlo(
+        verteilungen, feste, stichproben, seed, ziele, perzentile, klassen,
+        blockgroesse=getattr(settings, "API_STUDIE_BLOCKGROESSE", 100000),
+    )
+    return JsonResponse(ergebnis)
+
+
+@csrf_exempt
+@require_POST
+def api_berechnung_sensitivitaet(request):
+    """
+    Globale Sensitivitätsanalyse (Morris oder Sobol) für ein Gebäude.
+
+    Erwartet ein JSON-Objekt:
+    {"parameter": {"laenge": 20, ..., "tw_pro_m2": {"von": 10, "bis": 20}},
+     "methode": "sobol" | "morris",            (optional, Standard: "sobol")
+     "ziel": "ee_absolut",                     (optional)
+     "stichproben": 1024,                      (Sobol: N, N · (k + 2) Auswertungen)
+     "trajektorien": 20, "stufen": 4,          (Morris: r · (k + 1) Auswertungen)
+     "seed": 42}                               (optional)
+
+    Parameter wie bei /api/berechnung/; Zahlen sind feste Werte, Bereiche
+    {"von", "bis"} gleichverteilte Eingaben, fehlende Parameter 0.
+    anz_geschosse ist immer fest. Siehe sensitivitaet.py für die Kennwerte.
+    """
+    try:
+        anfrage = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"fehler": "Ungültiges JSON"}, status=400)
+    if not isinstance(anfrage, dict) or not isinstance(anfrage.get("parameter"), dict):
+        return JsonResponse({"fehler": "Erwartet wird ein JSON-Objekt mit 'parameter'"}, status=400)
+
+    def ganzzahl(name, standard, minimum):
+        wert = anfrage.get(name, standard)
+        if isinstance(wert, bool) or not isinstance(wert, int) or wert < minimum:
+            fehler[name] = f"Ganze Zahl >= {minimum}"
+        return wert
+
+    def zahl(wert):
+        if isinstance(wert, bool) or not isinstance(wert, (int, float)) or not math.isfinite(wert):
+            raise ValueError(f"Ungültiger Wert: {wert!r}")
+        return float(wert)
+
+    bereiche, feste, fehler = {}, {}, {}
+    for parameter, angabe in anfrage["parameter"].items():
+        if parameter not in API_PARAMETER:
+            fehler[parameter] = "Unbekannter Parameter"
+            continue
+        try:
+            if isinstance(angabe, dict):
+                if parameter == "anz_geschosse":
+                    raise ValueError("Die Geschosszahl ist immer fest")
+                if set(angabe) != {"von", "bis"}:
+                    raise ValueError("Bereich braucht genau 'von' und 'bis'")
+                von, bis = zahl(angabe["von"]), zahl(angabe["bis"])
+                if not von < bis:
+                    raise ValueError("'von' muss kleiner als 'bis' sein")
+                bereiche[API_PARAMETER[parameter]] = (von, bis)
+            else:
+                wert = zahl(angabe)
+                if parameter == "anz_geschosse" and not wert.is_integer():
+                    raise ValueError("Nur ganze Geschosszahlen")
+                feste[API_PARAMETER[parameter]] = wert
+        except ValueError as e:
+            fehler[parameter] = str(e)
+    if not bereiche and not fehler:
+        fehler["parameter"] = "Mindestens ein Parameter als Bereich {'von', 'bis'}"
+
+    methode = anfrage.get("methode", "sobol")
+    if methode not in ("sobol", "morris"):
+        fehler["methode"] = "'sobol' oder 'morris'"
+    ziel = anfrage.get("ziel", "ee_absolut")
+    if ziel not in ZIELGROESSEN:
+        fehler["ziel"] = f"Eine aus {', '.join(ZIELGROESSEN)}"
+    stichproben = ganzzahl("stichproben", 1024, 2)
+    trajektorien = ganzzahl("trajektorien", 20, 2)
+    stufen = ganzzahl("stufen", 4, 2)
+    if "stufen" not in fehler and stufen % 2:
+        fehler["stufen"] = "Gerade Zahl >= 2"
+    seed = anfrage.get("seed")
+    if seed is not None:
+        ganzzahl("seed", None, 0)
+    if fehler:
+        return JsonResponse({"fehler": fehler}, status=400)
+
+    k = len(bereiche)
+    auswertungen = stichproben * (k + 2) if methode == "sobol" else trajektorien * (k + 1)
+    max_auswertungen = getattr(settings, "API_SENSITIVITAET_MAX_AUSWERTUNGEN", 2000000)
+    if auswertungen > max_auswertungen:
+        return JsonResponse(
+            {"fehler": f"Höchstens {max_auswertungen} Modellauswertungen (angefragt: {auswertungen})"},
+            status=400,
+        )
+
+    # Fehlende Parameter sind wie bei /api/berechnung/ 0
+    for spalte in API_PARAMETER.values():
+        if spalte not in bereiche and spalte not in feste:
+            feste[spalte] = 0.0
+    optionen = {
+        "seed":         seed,
+        "blockgroesse": getattr(settings, "API_STUDIE_BLOCKGROESSE", 100000),
+        "prozesse":     getattr(settings, "SENSITIVITAET_PROZESSE", None),
+    }
+    if methode == "sobol":
+        ergebnis = sobol(bereiche, feste, ziel, stichproben, **optionen)
+    else:
+        ergebnis = morris(bereiche, feste, ziel, trajektorien, stufen, **optionen)
+
+    # Eingaben unter den API-Namen ausgeben
+    namen = {spalte: parameter for parameter, spalte in API_PARAMETER.items()}
+    ergebnis["eingaben"] = {namen[spalte]: werte for spalte, werte in ergebnis["eingaben"].items()}
+    return JsonResponse(ergebnis)
+
+
+@csrf_exempt
+@require_POST
+def api_optimierung_huelle(request):
+    """
+    Pareto-Optimierung der Gebäudehülle (U-Werte, Fensterflächenanteile).
+
+    Erwartet ein JSON-Objekt:
+    {"parameter": {"laenge": 20, "breite": 15, ..., "tw_pro_m2": 12},
+     "monatsbilanz": {"luftwechsel": 0.5, ...},       (optional, feste Eingaben der Monatsbilanz)
+     "klimaregion": 4,                                (optional)
+     "variablen": {"u_dach": {"von": 0.1, "bis": 0.2}, ...},  (optional, Standard: alle mit Standardgrenzen)
+     "ziele": ["endenergie", "gwp_herstellung"],     (optional)
+     "budget": {"kosten": 150000},                    (optional, Höchstwerte)
+     "annahmen": {"emissionsfaktor": 0.2, ...},       (optional)
+     "population": 60, "generationen": 40, "seed": 42,
+     "bauteil": 1}                                    (optional, Ausgangslösung)
+
+    Parameter wie bei /api/berechnung/ ohne jahres_heizbedarf (der kommt aus
+    der Monatsbilanz); fehlende Parameter sind 0. Ein Bauteil liefert die
+    bestehenden U-Werte als Startlösung und seine Lüftungsangaben als feste
+    Eingaben. Siehe huellenoptimierung.py für die Kennwerte.
+    """
+    try:
+        anfrage = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"fehler": "Ungültiges JSON"}, status=400)
+    if not isinstance(anfrage, dict) or not isinstance(anfrage.get("parameter"), dict):
+        return JsonResponse({"fehler": "Erwartet wird ein JSON-Objekt mit 'parameter'"}, status=400)
+
+    def ganzzahl(name, standard, minimum):
+        wert = anfrage.get(name, standard)
+        if isinstance(wert, bool) or not isinstance(wert, int) or wert < minimum:
+            fehler[name] = f"Ganze Zahl >= {minimum}"
+        return wert
+
+    def zahlen(name, erlaubt):
+        angabe = anfrage.get(name, {})
+        if not isinstance(angabe, dict):
+            fehler[name] = "Erwartet wird ein JSON-Objekt"
+            return {}
+        werte = {}
+        for schluessel, wert in angabe.items():
+            if schluessel not in erlaubt:
+                fehler[f"{name}.{schluessel}"] = "Unbekannte Angabe"
+            elif isinstance(wert, bool) or not isinstance(wert, (int, float)) or not math.isfinite(wert):
+                fehler[f"{name}.{schluessel}"] = f"Ungültiger Wert: {wert!r}"
+            else:
+                werte[schluessel] = float(wert)
+        return werte
+
+    fehler = {}
+    parameter = {name: wert for name, wert in anfrage["parameter"].items() if name != "jahres_heizbedarf"}
+    if "jahres_heizbedarf" in anfrage["parameter"]:
+        fehler["jahres_heizbedarf"] = "Wird aus der Monatsbilanz berechnet"
+    werte, parameter_fehler = _api_datensatz(parameter)
+    fehler.update(parameter_fehler)
+    monatsbilanz = zahlen("monatsbilanz", MONATSBILANZ_STANDARDWERTE)
+    annahmen = zahlen("annahmen", HUELLE_ANNAHMEN)
+    budget = zahlen("budget", HUELLE_ZIELE)
+
+    grenzen = dict(HUELLE_GRENZEN)
+    variablen = anfrage.get("variablen")
+    if variablen is not None:
+        grenzen = {}
+        for name, angabe in variablen.items() if isinstance(variablen, dict) else ():
+            if name not in HUELLE_GRENZEN:
+                fehler[f"variablen.{name}"] = "Unbekannte Variable"
+            elif angabe is None:
+                grenzen[name] = HUELLE_GRENZEN[name]
+            elif (isinstance(angabe, dict) and set(angabe) == {"von", "bis"}
+                  and all(isinstance(w, (int, float)) and not isinstance(w, bool) for w in angabe.values())):
+                grenzen[name] = (float(angabe["von"]), float(angabe["bis"]))
+            else:
+                fehler[f"variablen.{name}"] = "Bereich {'von', 'bis'} oder null (Standardgrenzen)"
+        if not isinstance(variablen, dict) or not variablen:
+            fehler["variablen"] = "Erwartet wird ein nicht leeres JSON-Objekt"
+
+    ziele = anfrage.get("ziele", ["endenergie", "gwp_herstellung"])
+    if not isinstance(ziele, list) or not ziele or not set(ziele) <= set(HUELLE_ZIELE) or len(set(ziele)) != len(ziele):
+        fehler["ziele"] = f"Liste verschiedener Ziele aus {', '.join(HUELLE_ZIELE)}"
+    population = ganzzahl("population", 60, 4)
+    generationen = ganzzahl("generationen", 40, 1)
+    seed = anfrage.get("seed")
+    if seed is not None:
+        ganzzahl("seed", None, 0)
+    klimaregion = anfrage.get("klimaregion")
+    if klimaregion is not None:
+        ganzzahl("klimaregion", None, 1)
+    bauteil = anfrage.get("bauteil")
+    if bauteil is not None:
+        ganzzahl("bauteil", None, 1)
+    if fehler:
+        return JsonResponse({"fehler": fehler}, status=400)
+
+    auswertungen = (population + population % 2) * (generationen + 1)
+    max_auswertungen = getattr(settings, "API_OPTIMIERUNG_MAX_AUSWERTUNGEN", 100000)
+    if auswertungen > max_auswertungen:
+        return JsonResponse(
+            {"fehler": f"Höchstens {max_auswertungen} Auswertungen (angefragt: {auswertungen})"},
+            status=400,
+        )
+
+    try:
+        klima = lade_klimadaten(klimaregion)
+    except LookupError as e:
+        return JsonResponse({"fehler": str(e)}, status=404)
+
+    geometrie = {name: werte.pop(name) for name in ("laenge", "breite", "geschosshoehe", "anz_geschosse")}
+    startloesungen = []
+    if bauteil is not None:
+        bestand, lueftung = huelle_ausgangsloesung(get_object_or_404(Bauteil, pk=bauteil))
+        # Nicht optimierte U-Werte des Bauteils bleiben fest
+        fest = {name: wert for name, wert in bestand.items() if name not in grenzen}
+        monatsbilanz = {**lueftung, **fest, **monatsbilanz}
+        startloesungen.append(bestand)
+
+    try:
+        ergebnis = optimiere_huelle(
+            klima, geometrie, ziele, grenzen, budget,
+            monatsbilanz=monatsbilanz, bilanz=werte, annahmen=annahmen,
+            startloesungen=startloesungen, population=population, generationen=generationen,
+            seed=seed, prozesse=getattr(settings, "OPTIMIERUNG_PROZESSE", None),
+        )
+    except ValueError as e:
+        return JsonResponse({"fehler": str(e)}, status=400)
+
+    if startloesungen:
+        kennwerte = bewerte_huelle(
+            klima, geometrie, {name: [wert] for name, wert in startloesungen[0].items()},
+            monatsbilanz, werte, annahmen,
+        )
+        ergebnis["ausgangsloesung"] = {
+            "variablen": startloesungen[0],
+            "kennwerte": {name: float(spalte[0]) for name, spalte in kennwerte.items()},
+        }
+    return JsonResponse(ergebnis)
+
+
+@csrf_exempt
+@require_POST
+def api_berechnung_live(request):
+    """
+    Live-Berechnung bei jeder Eingabeänderung: nur die betroffenen Teile der
+    Rechenkette werden neu gerechnet (siehe rechengraph.py).
+
+    Erwartet ein JSON-Objekt:
+    {"sitzung": "…",                     (optional, aus der letzten Antwort)
+     "parameter": {"bel_pro_m2": 8}}     (nur die geänderten Parameter)
+
+    Antwort: die Blöcke wie bei /api/berechnung/ sowie "sitzung", "neu" und
+    "neu_berechnet" (neu gerechnete Knoten). Ist "neu" True, kannte der
+    Server die Sitzung nicht; fehlende Parameter sind dann 0 und der Client
+    sendet beim nächsten Mal alle Parameter.
+    """
+    try:
+        anfrage = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"fehler": "Ungültiges JSON"}, status=400)
+    if not isinstance(anfrage, dict) or not isinstance(anfrage.get("parameter", {}), dict):
+        return JsonResponse({"fehler": "Erwartet wird ein JSON-Objekt mit 'parameter'"}, status=400)
+
+    parameter = anfrage.get("parameter", {})
+    werte, fehler = _api_datensatz(parameter)
+    sitzung = anfrage.get("sitzung")
+    if sitzung is not None and not isinstance(sitzung, str):
+        fehler["sitzung"] = "Erwartet wird eine Zeichenkette"
+    if fehler:
+        return JsonResponse({"fehler": fehler}, status=400)
+
+    # Nur die gesendeten Parameter setzen, alle übrigen bleiben im Graphen stehen
+    geaendert = {API_PARAMETER[name]: werte[API_PARAMETER[name]] for name in parameter}
+    sitzung, neu, ergebnis, neu_berechnet = live_sitzungen.rechne(sitzung, geaendert)
+    return JsonResponse({"sitzung": sitzung, "neu": neu, "neu_berechnet": neu_berechnet, **ergebnis})
+
+
+@csrf_exempt
+@require_POST
+def api_berechnung_stunden(request):
+    """
+    Stündliche Simulation (8760 h) eines Gebäudes mit Lastprofilen und
+    Spitzenlasten (siehe stundensimulation.py).
+
+    Erwartet ein JSON-Objekt:
+    {"laenge": 20, "breite": 15, "geschosshoehe": 3, "anz_geschosse": 3,
+     "klimaregion": 4,                                      (optional)
+     "monatsbilanz": {"luftwechsel": 0.5, ...},             (optional, wie /api/heizwaerme/)
+     "beleuchtung": [{"e_soll": 8, "laufzeit_hd": 10, "laufzeit_da": 250}, ...],
+     "waermequellen": [{"anzahl": 2, "leistung_kw": 0.5, "betrieb_hd": 8, "betrieb_da": 250}, ...],
+     "lueftung": {"laufzeit_hd": 12, "laufzeit_da": 250},  (optional, sonst durchgehend)
+     "theta_kuehl": 26,                                     (optional)
+     "profile": true}                                       (Stundenwerte mitsenden)
+    """
+    try:
+        anfrage = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"fehler": "Ungültiges JSON"}, status=400)
+    if not isinstance(anfrage, dict):
+        return JsonResponse({"fehler": "Erwartet wird ein JSON-Objekt"}, status=400)
+
+    fehler = {}
+
+    def zahl(angabe, name, feld=None, minimum=0.0):
+        wert = angabe.get(feld or name)
+        if isinstance(wert, bool) or not isinstance(wert, (int, float)) or not math.isfinite(wert) or wert < minimum:
+            fehler[name] = f"Zahl >= {minimum:g}"
+            return None
+        return float(wert)
+
+    def eintraege(name, modell, felder):
+        liste = anfrage.get(name, [])
+        if not isinstance(liste, list) or not all(isinstance(eintrag, dict) for eintrag in liste):
+            fehler[name] = "Erwartet wird eine Liste von JSON-Objekten"
+            return []
+        return [
+            modell(**{feld: zahl(eintrag, f"{name}.{i}.{feld}", feld) for feld in felder})
+            for i, eintrag in enumerate(liste)
+        ]
+
+    geometrie = [zahl(anfrage, name) for name in ("laenge", "breite", "geschosshoehe", "anz_geschosse")]
+    if geometrie[3] is not None and not geometrie[3].is_integer():
+        fehler["anz_geschosse"] = "Ganze Zahl"
+    erlaubt = set(MONATSBILANZ_STANDARDWERTE) | set(MONATSBILANZ_ZUSATZEINGABEN)
+    monatsbilanz = anfrage.get("monatsbilanz", {})
+    if not isinstance(monatsbilanz, dict):
+        fehler["monatsbilanz"] = "Erwartet wird ein JSON-Objekt"
+        monatsbilanz = {}
+    for name in monatsbilanz:
+        if name not in erlaubt:
+            fehler[f"monatsbilanz.{name}"] = "Unbekannte Angabe"
+    eingaben = {
+        name: zahl(monatsbilanz, f"monatsbilanz.{name}", name, -math.inf)
+        for name in monatsbilanz if name in erlaubt
+    }
+    beleuchtungen = eintraege("beleuchtung", Beleuchtung, ("e_soll", "laufzeit_hd", "laufzeit_da"))
+    waermequellen = eintraege("waermequellen", Waermequelle, ("anzahl", "leistung_kw", "betrieb_hd", "betrieb_da"))
+    lueftung = None
+    if anfrage.get("lueftung") is not None:
+        if isinstance(anfrage["lueftung"], dict):
+            lueftung = Bauteil(
+                laufzeit_hd=zahl(anfrage["lueftung"], "lueftung.laufzeit_hd", "laufzeit_hd"),
+                laufzeit_da=zahl(anfrage["lueftung"], "lueftung.laufzeit_da", "laufzeit_da"),
+            )
+        else:
+            fehler["lueftung"] = "Erwartet wird ein JSON-Objekt"
+    theta_kuehl = None
+    if anfrage.get("theta_kuehl") is not None:
+        theta_kuehl = zahl(anfrage, "theta_kuehl", minimum=-math.inf)
+        theta_soll = eingaben.get("theta_i", MONATSBILANZ_STANDARDWERTE["theta_i"])
+        if theta_kuehl is not None and theta_soll is not None and theta_kuehl < theta_soll:
+            fehler["theta_kuehl"] = "Muss >= der Heiz-Solltemperatur theta_i sein"
+    klimaregion = anfrage.get("klimaregion")
+    if klimaregion is not None and (isinstance(klimaregion, bool) or not isinstance(klimaregion, int)):
+        fehler["klimaregion"] = "Ganze Zahl"
+    if fehler:
+        return JsonResponse({"fehler": fehler}, status=400)
+
+    try:
+        klima = lade_klimadaten(klimaregion)
+    except LookupError as e:
+        return JsonResponse({"fehler": str(e)}, status=404)
+
+    nf = berechne_gebaeudedaten(*geometrie)["nf"]
+    ergebnis = simuliere_stuendlich(
+        klima, *geometrie,
+        beleuchtung=beleuchtungsprofil(beleuchtungen, nf) if beleuchtungen else 0.0,
+        waermequellen=waermequellenprofil(waermequellen),
+        lueftung=lueftungsprofil(lueftung),
+        theta_kuehl=theta_kuehl,
+        **eingaben,
+    )
+    antwort = {
+        name: round(float(ergebnis[name][0]), 2)
+        for name in ("heizlast_max", "kuehllast_max", "heizwaerme_jahr", "kuehlung_jahr", "beleuchtung_jahr")
+    }
+    antwort["monate"] = {
+        "heizwaerme": [round(float(wert), 2) for wert in monatssummen(ergebnis["heizlast"][0])],
+        "kuehlung":   [round(float(wert), 2) for wert in monatssummen(ergebnis["kuehllast"][0])],
+    }
+    if anfrage.get("profile", True):
+        antwort["stunden"] = {
+            name: [round(float(wert), 1) for wert in ergebnis[name][0]]
+            for name in ("theta_i", "heizlast", "kuehllast", "solar", "intern")
+        }
+    return JsonResponse(antwort)
+
+
 # ————— Neue Wizard-Flow Views —————
+#
+# Die Schritte halten ihre Eingaben im serverseitigen Entwurf (siehe
+# wizard_entwurf.py); erst wizard_ergebnis schreibt in die Datenbank.
+
+def _entwurfsformular(form_klasse, *args, **kwargs):
+    """Formular für den Entwurf: das Gebäude wird erst beim Speichern gesetzt."""
+    form = form_klasse(*args, **kwargs)
+    form.fields.pop('gebaeude', None)
+    return form
+
 
 def allg_angaben(request):
     """
@@ -238,8 +1130,11 @@ def allg_angaben(request):
     if request.method == 'POST':
         form = GebaeudeAllgForm(request.POST)
         if form.is_valid():
-            gebaeude = form.save()
-            request.session['geb_pk'] = gebaeude.pk
+            # Neuer Durchlauf → neuer Entwurf
+            WizardEntwurf.verwerfen(request)
+            entwurf = WizardEntwurf()
+            entwurf.setze('gebaeude', formularwerte(form))
+            entwurf.sichern(request)
             return redirect('wizard_energie')
     else:
         form = GebaeudeAllgForm()
@@ -256,37 +1151,49 @@ def energie_angaben(request):
     """
     Zweiter Schritt des Wizards: Energiekennzahlen.
     """
-    gebaeude_pk = request.session.get('geb_pk')
-    if not gebaeude_pk:
+    entwurf = WizardEntwurf.laden(request)
+    if entwurf is None or not entwurf.hat('gebaeude'):
         return redirect('wizard_allg')
     
-    gebaeude = get_object_or_404(Gebaeude, pk=gebaeude_pk)
+    gebaeude = entwurf.gebaeude()
     
     if request.method == 'POST':
         form = GebaeudeEnergieKennzahlenForm(request.POST, instance=gebaeude)
         if form.is_valid():
-            form.save()
+            werte = formularwerte(form)
+            # Kein Wert eingegeben → Monatsbilanzverfahren (im Ergebnisschritt
+            # mit Bauteil und internen Gewinnen neu gerechnet)
+            entwurf.daten['heizwert_monatsbilanz'] = werte['jahres_heizwert'] is None
+            if werte['jahres_heizwert'] is None:
+                werte['jahres_heizwert'] = _heizwert_monatsbilanz(gebaeude) or 0
+            entwurf.setze('gebaeude', werte)
+            entwurf.sichern(request)
             return redirect('wizard_verluste')
     else:
         form = GebaeudeEnergieKennzahlenForm(instance=gebaeude)
     
-    return render(request, 'energie_angaben.html', {'form': form, 'gebaeude': gebaeude})
+    return render(request, 'energie_angaben.html', {
+        'form': form,
+        'gebaeude': gebaeude,
+        'heizwert_monatsbilanz': _heizwert_monatsbilanz(gebaeude),
+    })
 
 
 def verluste_angaben(request):
     """
     Dritter Schritt des Wizards: Verluste und Warmwasserbedarf.
     """
-    gebaeude_pk = request.session.get('geb_pk')
-    if not gebaeude_pk:
+    entwurf = WizardEntwurf.laden(request)
+    if entwurf is None or not entwurf.hat('gebaeude'):
         return redirect('wizard_allg')
     
-    gebaeude = get_object_or_404(Gebaeude, pk=gebaeude_pk)
+    gebaeude = entwurf.gebaeude()
     
     if request.method == 'POST':
         form = GebaeudeVerlusteForm(request.POST, instance=gebaeude)
         if form.is_valid():
-            form.save()
+            entwurf.setze('gebaeude', formularwerte(form))
+            entwurf.sichern(request)
             return redirect('wizard_bauteile')
     else:
         form = GebaeudeVerlusteForm(instance=gebaeude)
@@ -298,40 +1205,36 @@ def bauteile_angaben(request):
     """
     Vierter Schritt des Wizards: Bauteile.
     """
-    gebaeude_pk = request.session.get('geb_pk')
-    if not gebaeude_pk:
+    entwurf = WizardEntwurf.laden(request)
+    if entwurf is None or not entwurf.hat('gebaeude'):
         return redirect('wizard_allg')
     
-    gebaeude = get_object_or_404(Gebaeude, pk=gebaeude_pk)
+    gebaeude = entwurf.gebaeude()
     
     if request.method == 'POST':
         form = BauteilForm(request.POST)
         if form.is_valid():
-            bauteil = form.save(commit=False)
+            werte = formularwerte(form)
             
             # Gebäude-Basisdaten berechnen
             gd = berechne_gebaeudedaten(
-                laenge=bauteil.laenge,
-                breite=bauteil.breite,
-                geschosshoehe=bauteil.geschosshoehe,
-                anz_geschosse=bauteil.anz_geschosse,
+                laenge=werte['laenge'],
+                breite=werte['breite'],
+                geschosshoehe=werte['geschosshoehe'],
+                anz_geschosse=werte['anz_geschosse'],
             )
             
             # Berechnete Werte setzen
-            bauteil.hoehe = gd['hoehe']
-            bauteil.volumen = gd['volumen']
-            bauteil.bgf = gd['bgf']
-            bauteil.nf = gd['nf']
-            
-            # Bauteil mit Gebäude verknüpfen
-            # Annahme: Bauteil hat ein ForeignKey-Feld 'gebaeude'
-            # bauteil.gebaeude = gebaeude
+            werte['hoehe'] = gd['hoehe']
+            werte['volumen'] = gd['volumen']
+            werte['bgf'] = gd['bgf']
+            werte['nf'] = gd['nf']
             
-            bauteil.save()
-            request.session['teil_pk'] = bauteil.pk
+            entwurf.setze('bauteil', werte)
+            entwurf.sichern(request)
             return redirect('wizard_lueftung')
     else:
-        form = BauteilForm()
+        form = BauteilForm(initial=entwurf.daten['bauteil'])
     
     return render(request, 'bauteile_angaben.html', {'form': form, 'gebaeude': gebaeude})
 
@@ -340,16 +1243,17 @@ def lueftung_angaben(request):
     """
     Fünfter Schritt des Wizards: Lüftung.
     """
-    bauteil_pk = request.session.get('teil_pk')
-    if not bauteil_pk:
+    entwurf = WizardEntwurf.laden(request)
+    if entwurf is None or not entwurf.hat('bauteil'):
         return redirect('wizard_bauteile')
     
-    bauteil = get_object_or_404(Bauteil, pk=bauteil_pk)
+    bauteil = entwurf.bauteil()
     
     if request.method == 'POST':
         form = LueftungForm(request.POST, instance=bauteil)
         if form.is_valid():
-            form.save()
+            entwurf.setze('bauteil', formularwerte(form))
+            entwurf.sichern(request)
             return redirect('wizard_beleuchtung')
     else:
         form = LueftungForm(instance=bauteil)
@@ -361,19 +1265,17 @@ def beleuchtung_angaben(request):
     """
     Sechster Schritt des Wizards: Beleuchtung.
     """
-    gebaeude_pk = request.session.get('geb_pk')
-    if not gebaeude_pk:
+    entwurf = WizardEntwurf.laden(request)
+    if entwurf is None or not entwurf.hat('gebaeude'):
         return redirect('wizard_allg')
     
-    gebaeude = get_object_or_404(Gebaeude, pk=gebaeude_pk)
+    gebaeude = entwurf.gebaeude()
     
     if request.method == 'POST':
         form = BeleuchtungForm(request.POST)
         if form.is_valid():
-            beleuchtung = form.save(commit=False)
-            # Annahme: Beleuchtung hat ein ForeignKey-Feld 'gebaeude'
-            # beleuchtung.gebaeude = gebaeude
-            beleuchtung.save()
+            entwurf.anhaengen('beleuchtung', formularwerte(form))
+            entwurf.sichern(request)
             return redirect('wizard_waermequelle')
     else:
         form = BeleuchtungForm()
@@ -385,19 +1287,17 @@ def waermequelle_angaben(request):
     """
     Siebter Schritt des Wizards: Wärmequelle.
     """
-    gebaeude_pk = request.session.get('geb_pk')
-    if not gebaeude_pk:
+    entwurf = WizardEntwurf.laden(request)
+    if entwurf is None or not entwurf.hat('gebaeude'):
         return redirect('wizard_allg')
     
-    gebaeude = get_object_or_404(Gebaeude, pk=gebaeude_pk)
+    gebaeude = entwurf.gebaeude()
     
     if request.method == 'POST':
         form = WaermequelleForm(request.POST)
         if form.is_valid():
-            waermequelle = form.save(commit=False)
-            # Annahme: Waermequelle hat ein ForeignKey-Feld 'gebaeude'
-            # waermequelle.gebaeude = gebaeude
-            waermequelle.save()
+            entwurf.anhaengen('waermequellen', formularwerte(form))
+            entwurf.sichern(request)
             return redirect('wizard_gwp')
     else:
         form = WaermequelleForm()
@@ -409,21 +1309,20 @@ def gwp_angaben(request):
     """
     Achter Schritt des Wizards: GWP (Global Warming Potential).
     """
-    gebaeude_pk = request.session.get('geb_pk')
-    if not gebaeude_pk:
+    entwurf = WizardEntwurf.laden(request)
+    if entwurf is None or not entwurf.hat('gebaeude'):
         return redirect('wizard_allg')
     
-    gebaeude = get_object_or_404(Gebaeude, pk=gebaeude_pk)
+    gebaeude = entwurf.gebaeude()
     
     if request.method == 'POST':
-        form = GwpEingabeForm(request.POST)
+        form = _entwurfsformular(GwpEingabeForm, request.POST)
         if form.is_valid():
-            gwp = form.save(commit=False)
-            gwp.gebaeude = gebaeude
-            gwp.save()
+            entwurf.anhaengen('gwp', formularwerte(form))
+            entwurf.sichern(request)
             return redirect('wizard_sonneneintrag')
     else:
-        form = GwpEingabeForm(initial={'gebaeude': gebaeude})
+        form = _entwurfsformular(GwpEingabeForm)
     
     return render(request, 'gwp_angaben.html', {'form': form, 'gebaeude': gebaeude})
 
@@ -432,66 +1331,85 @@ def sonneneintrag_angaben(request):
     """
     Neunter Schritt des Wizards: Sonneneintrag.
     """
-    gebaeude_pk = request.session.get('geb_pk')
-    if not gebaeude_pk:
+    entwurf = WizardEntwurf.laden(request)
+    if entwurf is None or not entwurf.hat('gebaeude'):
         return redirect('wizard_allg')
     
-    gebaeude = get_object_or_404(Gebaeude, pk=gebaeude_pk)
+    gebaeude = entwurf.gebaeude()
     
     if request.method == 'POST':
-        form = SonneneintragsParameterForm(request.POST)
+        form = _entwurfsformular(SonneneintragsParameterForm, request.POST)
         if form.is_valid():
-            sonneneintrag = form.save(commit=False)
-            sonneneintrag.gebaeude = gebaeude
-            sonneneintrag.save()
+            entwurf.anhaengen('sonneneintrag', formularwerte(form))
+            entwurf.sichern(request)
             return redirect('wizard_ergebnis')
     else:
-        form = SonneneintragsParameterForm(initial={'gebaeude': gebaeude})
+        form = _entwurfsformular(SonneneintragsParameterForm)
     
     return render(request, 'sonneneintrag_angaben.html', {'form': form, 'gebaeude': gebaeude})
 
 
+def _einflussgroessen(eingaben):
+    """Sensitivität der Endenergie für die Ergebnisseite (leer, wenn abgeschaltet)."""
+    spanne = getattr(settings, "SENSITIVITAET_ERGEBNISSEITE_SPANNE", 0.2)
+    if not spanne:
+        return []
+    return einflussgroessen(eingaben, spanne)
+
+
 def wizard_ergebnis(request):
     """
     Letzter Schritt des Wizards: Ergebnisanzeige.
+
+    Berechnet die Ergebnisse aus dem Entwurf und speichert Gebäude, Bauteil
+    und alle Listeneinträge einmalig in einer Transaktion. Ein erneuter
+    Aufruf ohne geänderte Eingaben schreibt nichts.
     """
-    gebaeude_pk = request.session.get('geb_pk')
-    bauteil_pk = request.session.get('teil_pk')
-    
-    if not gebaeude_pk or not bauteil_pk:
+    entwurf = WizardEntwurf.laden(request)
+    if entwurf is None or not entwurf.hat('gebaeude') or not entwurf.hat('bauteil'):
         return redirect('wizard_allg')
     
-    gebaeude = get_object_or_404(Gebaeude, pk=gebaeude_pk)
-    bauteil = get_object_or_404(Bauteil, pk=bauteil_pk)
-    
-    # Berechnungen durchführen
-    ne = berechne_nutzenergiebedarf(
-        nf_m2=bauteil.nf,
-        jahres_heizwaermebedarf_kwh=gebaeude.jahres_heizwert,
-        trinkwarmwasser_kwh_pro_m2=gebaeude.tw_kwh_m2,
-        luftfoerderung_kwh_pro_m2=gebaeude.luft_kwh_m2,
-        beleuchtung_kwh_pro_m2=gebaeude.bel_kwh_m2,
-        nutzer_pro_m2=gebaeude.nutz_kwh_m2,
-    )
+    gebaeude = entwurf.gebaeude()
+    bauteil = entwurf.bauteil()
     
-    sb = berechne_strombedarf(
-        nf_m2=bauteil.nf,
-        trinkwarmwasser_kwh_pro_m2=gebaeude.tw_kwh_m2,
-        luftfoerderung_kwh_pro_m2=gebaeude.luft_kwh_m2,
-        beleuchtung_kwh_pro_m2=gebaeude.bel_kwh_m2,
-        nutzer_pro_m2=gebaeude.nutz_kwh_m2,
-    )
+    # Beleuchtungsstrom und interne Gewinne aus Beleuchtung und Wärmequellen
+    interne_gewinne = _interne_gewinne_entwurf(entwurf, gebaeude)
     
-    wb = berechne_waermebedarf(
-        jahres_heizwaermebedarf_kwh=gebaeude.jahres_heizwert,
-        verteilungsverlust_kwh=gebaeude.verteilungsverlust_kwh,
-        speicherverlust_kwh=gebaeude.speicherverlust_kwh,
-        warmwasserbedarf_kwh=gebaeude.warmwasserbedarf_kwh,
-    )
+    # Ohne eingegebenen Heizwärmebedarf (Feld leer gelassen, ein eingegebener
+    # Wert 0 bleibt): Monatsbilanz mit den U-Werten und Lüftungsangaben aus dem
+    # Bauteil-Schritt und den internen Gewinnen
+    if entwurf.daten.get('heizwert_monatsbilanz'):
+        heizwert = _heizwert_monatsbilanz(
+            gebaeude, bauteil, interne_gewinne['q_i'] if interne_gewinne else None
+        )
+        if heizwert is not None:
+            gebaeude.jahres_heizwert = heizwert
     
-    ee = berechne_endenergiebedarf(bauteil.nf, sb, wb)
+    # Lüftungswärmebedarf (lb_absolut/lb_spezifisch) und Ventilatorstrom
+    lueftungsbilanz = _lueftung_bauteil(bauteil, gebaeude.klimaregion)
     
-    # Ergebnisse im Bauteil speichern
+    # Berechnungen durchführen (NF ergibt sich aus den Bauteil-Abmessungen)
+    eingaben = {
+        "laenge":                      bauteil.laenge,
+        "breite":                      bauteil.breite,
+        "geschosshoehe":               bauteil.geschosshoehe,
+        "anz_geschosse":               bauteil.anz_geschosse,
+        "jahres_heizwaermebedarf_kwh": gebaeude.jahres_heizwert,
+        "trinkwarmwasser_kwh_pro_m2":  gebaeude.tw_kwh_m2,
+        "luftfoerderung_kwh_pro_m2":   gebaeude.luft_kwh_m2,
+        "beleuchtung_kwh_pro_m2":      gebaeude.bel_kwh_m2,
+        "nutzer_pro_m2":               gebaeude.nutz_kwh_m2,
+        "verteilungsverlust_kwh":      gebaeude.verteilungsverlust_kwh,
+        "speicherverlust_kwh":         gebaeude.speicherverlust_kwh,
+        "warmwasserbedarf_kwh":        gebaeude.warmwasserbedarf_kwh,
+    }
+    ergebnis = ergebniscache.bilanz(**eingaben)
+    ne = ergebnis['nutzenergie']
+    sb = ergebnis['strombedarf']
+    wb = ergebnis['waermebedarf']
+    ee = ergebnis['endenergie']
+    
+    # Ergebnisse im Bauteil setzen
     bauteil.ne_absolut = ne['ne_absolut']
     bauteil.ne_spez = ne['ne_spezifisch']
     bauteil.sb_absolut = sb['sb_absolut']
@@ -499,7 +1417,13 @@ def wizard_ergebnis(request):
     bauteil.wb_absolut = wb['wb_absolut']
     bauteil.ee_absolut = ee['ee_absolut']
     bauteil.ee_spez = ee['ee_spezifisch']
-    bauteil.save()
+    
+    # Entwurf einmalig persistieren
+    if not entwurf.gespeichert:
+        entwurf.speichern(gebaeude, bauteil)
+        entwurf.sichern(request)
+        request.session['geb_pk'] = gebaeude.pk
+        request.session['teil_pk'] = bauteil.pk
     
     # Alle relevanten Daten für die Ergebnisseite sammeln
     context = {
@@ -509,6 +1433,10 @@ def wizard_ergebnis(request):
         'strombedarf': sb,
         'waermebedarf': wb,
         'endenergie': ee,
+        'lueftung': lueftungsbilanz,
+        'interne_gewinne': interne_gewinne,
+        'einflussgroessen': _einflussgroessen(eingaben),
+        'einfluss_spanne': getattr(settings, 'SENSITIVITAET_ERGEBNISSEITE_SPANNE', 0.2),
         # Weitere Daten wie GWP, Beleuchtung, etc. könnten hier hinzugefügt werden
     }
     
@@ -525,19 +1453,20 @@ def einfach_ergebnis(request):
     geschosshoehe = float(request.GET.get('geschosshoehe', 0))
     geschosse = int(request.GET.get('geschosse', 0))
     
-    # Gebäudedaten berechnen
-    daten = berechne_gebaeudedaten(laenge, breite, geschosshoehe, geschosse)
-    
-    # Nutzenergiebedarf berechnen (Beispielwerte)
-    jahres_heizwert = float(request.GET.get('jahres_heizwert', 0))
-    tw_kwh_m2 = float(request.GET.get('tw_kwh_m2', 0))
-    luft_kwh_m2 = float(request.GET.get('luft_kwh_m2', 0))
-    bel_kwh_m2 = float(request.GET.get('bel_kwh_m2', 0))
-    nutz_kwh_m2 = float(request.GET.get('nutz_kwh_m2', 0))
-    
-    ne = berechne_nutzenergiebedarf(
-        daten['nf'], jahres_heizwert, tw_kwh_m2, luft_kwh_m2, bel_kwh_m2, nutz_kwh_m2
+    # Gebäudedaten und Nutzenergiebedarf berechnen (Beispielwerte)
+    ergebnis = ergebniscache.bilanz(
+        laenge=laenge,
+        breite=breite,
+        geschosshoehe=geschosshoehe,
+        anz_geschosse=geschosse,
+        jahres_heizwaermebedarf_kwh=float(request.GET.get('jahres_heizwert', 0)),
+        trinkwarmwasser_kwh_pro_m2=float(request.GET.get('tw_kwh_m2', 0)),
+        luftfoerderung_kwh_pro_m2=float(request.GET.get('luft_kwh_m2', 0)),
+        beleuchtung_kwh_pro_m2=float(request.GET.get('bel_kwh_m2', 0)),
+        nutzer_pro_m2=float(request.GET.get('nutz_kwh_m2', 0)),
     )
+    daten = ergebnis['gebaeudedaten']
+    ne = ergebnis['nutzenergie']
     
     context = {
         'daten': daten,
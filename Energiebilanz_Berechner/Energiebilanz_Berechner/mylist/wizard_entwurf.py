@@ -0,0 +1,225 @@
+# mylist/wizard_entwurf.py
+
+"""
+Serverseitiger Entwurf des Eingabe-Wizards.
+
+Die Wizard-Schritte speichern ihre Eingaben nicht mehr einzeln als
+`Gebaeude`, `Bauteil`, `Beleuchtung` … in der Datenbank, sondern in einem
+kompakten, JSON-serialisierbaren Dokument:
+
+    {
+        "gebaeude":      {Feld: Wert, …},
+        "bauteil":       {Feld: Wert, …},
+        "beleuchtung":   [{…}, …],
+        "waermequellen": [{…}, …],
+        "gwp":           [{…}, …],
+        "sonneneintrag": [{…}, …],
+        "pk":            {"gebaeude": …, "bauteil": …},   # nach dem Speichern
+        "gespeichert":   bool,
+        "heizwert_monatsbilanz": bool,   # Heizwärmebedarf nicht eingegeben, sondern gerechnet
+    }
+
+Erst der Ergebnisschritt schreibt den Entwurf mit `speichern()` in einer
+Transaktion in die normalisierten Tabellen. Abgebrochene Wizards
+hinterlassen so keine verwaisten Zeilen.
+
+Der Entwurf liegt in der Session (`WIZARD_ENTWURF_SPEICHER = "session"`)
+oder im Django-Cache (`"cache"`); im Cache-Modus enthält die Session nur
+den Schlüssel, die Session wird also nur einmal pro Wizard geschrieben.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.forms.models import model_to_dict
+
+from .models import (
+    Gebaeude,
+    Bauteil,
+    Beleuchtung,
+    Waermequelle,
+    GwpEingabe,
+    SonneneintragsParameter,
+)
+
+
+SESSION_KEY = "wizard_entwurf"
+CACHE_PREFIX = "mylist:wizard:"
+
+# Listenbereiche des Entwurfs → Modell (alle Einträge werden beim Speichern angelegt)
+LISTEN = {
+    "beleuchtung":   Beleuchtung,
+    "waermequellen": Waermequelle,
+    "gwp":           GwpEingabe,
+    "sonneneintrag": SonneneintragsParameter,
+}
+
+# Modelle, deren Einträge per Fremdschlüssel am Gebäude hängen
+MIT_GEBAEUDE = ("beleuchtung", "waermequellen", "gwp", "sonneneintrag")
+
+
+def formularwerte(form):
+    """
+    Bereinigte Werte eines gültigen Formulars als JSON-taugliches Dict;
+    Modellinstanzen (Fremdschlüssel) werden als `<feld>_id` abgelegt,
+    das Feld `gebaeude` wird ignoriert (wird beim Speichern gesetzt).
+    """
+    werte = {}
+    for name, wert in form.cleaned_data.items():
+        if name == "gebaeude":
+            continue
+        if isinstance(wert, models.Model):
+            werte[f"{name}_id"] = wert.pk
+        else:
+            werte[name] = wert
+    return werte
+
+
+class WizardEntwurf:
+    """Eingaben eines laufenden Wizards, siehe Moduldokumentation."""
+
+    def __init__(self, daten=None):
+        self.daten = daten or {
+            "gebaeude": {},
+            "bauteil": {},
+            **{bereich: [] for bereich in LISTEN},
+            "pk": {},
+            "gespeichert": False,
+            "heizwert_monatsbilanz": False,
+        }
+
+    # — Laden und Sichern —
+
+    @staticmethod
+    def _im_cache():
+        return getattr(settings, "WIZARD_ENTWURF_SPEICHER", "session") == "cache"
+
+    @classmethod
+    def laden(cls, request):
+        """
+        Entwurf der aktuellen Session oder None. Ohne Entwurf, aber mit
+        gespeichertem Gebäude/Bauteil in der Session (`geb_pk`/`teil_pk`),
+        wird der Entwurf aus der Datenbank übernommen.
+        """
+        if cls._im_cache():
+            schluessel = request.session.get(SESSION_KEY)
+            daten = cache.get(CACHE_PREFIX + schluessel) if schluessel else None
+        else:
+            daten = request.session.get(SESSION_KEY)
+        if daten is not None:
+            return cls(daten)
+        return cls._aus_datenbank(request.session.get("geb_pk"), request.session.get("teil_pk"))
+
+    @classmethod
+    def _aus_datenbank(cls, gebaeude_pk, bauteil_pk):
+        entwurf = cls()
+        if gebaeude_pk:
+            gebaeude = Gebaeude.objects.filter(pk=gebaeude_pk).first()
+            if gebaeude is not None:
+                entwurf.daten["gebaeude"] = _felder(gebaeude)
+                entwurf.daten["pk"]["gebaeude"] = gebaeude.pk
+        if bauteil_pk:
+            bauteil = Bauteil.objects.filter(pk=bauteil_pk).first()
+            if bauteil is not None:
+                entwurf.daten["bauteil"] = _felder(bauteil)
+                entwurf.daten["pk"]["bauteil"] = bauteil.pk
+        return entwurf if entwurf.daten["pk"] else None
+
+    def sichern(self, request):
+        """Legt den Entwurf in der Session bzw. im Cache ab."""
+        if self._im_cache():
+            schluessel = request.session.get(SESSION_KEY)
+            if not schluessel:
+                schluessel = request.session[SESSION_KEY] = uuid.uuid4().hex
+            timeout = getattr(settings, "WIZARD_ENTWURF_TIMEOUT", 60 * 60 * 24)
+            cache.set(CACHE_PREFIX + schluessel, self.daten, timeout)
+        else:
+            request.session[SESSION_KEY] = self.daten
+
+    @classmethod
+    def verwerfen(cls, request):
+        """Löscht den Entwurf der Session (neuer Wizard-Durchlauf)."""
+        schluessel = request.session.pop(SESSION_KEY, None)
+        if schluessel and cls._im_cache():
+            cache.delete(CACHE_PREFIX + schluessel)
+        request.session.pop("geb_pk", None)
+        request.session.pop("teil_pk", None)
+
+    # — Schritte —
+
+    def setze(self, bereich, werte):
+        """Übernimmt Werte für `gebaeude` oder `bauteil`."""
+        self.daten[bereich].update(werte)
+        self.daten["gespeichert"] = False
+
+    def anhaengen(self, bereich, werte):
+        """Fügt einen Eintrag zu einem Listenbereich (siehe `LISTEN`) hinzu."""
+        self.daten[bereich].append(werte)
+        self.daten["gespeichert"] = False
+
+    def hat(self, bereich):
+        return bool(self.daten[bereich])
+
+    @property
+    def gespeichert(self):
+        return self.daten["gespeichert"]
+
+    # — Modellinstanzen (ungespeichert) —
+
+    def gebaeude(self):
+        return Gebaeude(pk=self.daten["pk"].get("gebaeude"), **self.daten["gebaeude"])
+
+    def bauteil(self):
+        return Bauteil(pk=self.daten["pk"].get("bauteil"), **self.daten["bauteil"])
+
+    # — Persistieren —
+
+    def speichern(self, gebaeude, bauteil):
+        """
+        Schreibt den Entwurf in einer Transaktion in die Datenbank:
+        `gebaeude` und `bauteil` (aus `gebaeude()`/`bauteil()`, ggf. mit
+        Ergebnissen ergänzt) werden gespeichert, die Listeneinträge per
+        `bulk_create` angelegt. Bereits gespeicherte Listeneinträge werden
+        dabei nicht erneut angelegt.
+        """
+        with transaction.atomic():
+            _speichere(gebaeude)
+            _speichere(bauteil)
+            for bereich, modell in LISTEN.items():
+                eintraege = self.daten[bereich]
+                neu = [e for e in eintraege if not e.get("pk")]
+                if not neu:
+                    continue
+                extra = {"gebaeude": gebaeude} if bereich in MIT_GEBAEUDE else {}
+                objekte = modell.objects.bulk_create([
+                    modell(**{k: v for k, v in e.items() if k != "pk"}, **extra) for e in neu
+                ])
+                for eintrag, objekt in zip(neu, objekte):
+                    eintrag["pk"] = objekt.pk
+
+        self.daten["pk"] = {"gebaeude": gebaeude.pk, "bauteil": bauteil.pk}
+        self.daten["gebaeude"] = _felder(gebaeude)
+        self.daten["bauteil"] = _felder(bauteil)
+        self.daten["gespeichert"] = True
+
+
+def _speichere(instanz):
+    # Bestehende Zeilen ohne die automatischen Zeitstempel aktualisieren
+    if instanz.pk is None:
+        instanz.save()
+    else:
+        instanz.save(update_fields=[
+            f.name for f in instanz._meta.concrete_fields
+            if not f.primary_key and not getattr(f, "auto_now_add", False)
+        ])
+
+
+def _felder(instanz):
+    """Feldwerte einer Modellinstanz ohne Primärschlüssel und automatische Felder."""
+    return {
+        name: wert
+        for name, wert in model_to_dict(instanz).items()
+        if name != "id"
+    }
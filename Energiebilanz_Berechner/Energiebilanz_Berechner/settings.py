@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'Energiebilanz_Berechner.mylist.messung.MessungMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -124,4 +125,70 @@ STATICFILES_DIRS = [
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
-DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Energiebilanz-API
+
+# Höchstzahl an Datensätzen pro Anfrage an /api/berechnung/batch/
+API_BATCH_MAX_DATENSAETZE = 10000
+
+# Maximale Blockgröße (Datensätze) beim Streaming über /api/berechnung/stream/
+API_STREAM_CHUNKGROESSE = 5000
+
+# Parameterstudien über /api/berechnung/studie/: Höchstzahl an Varianten bei
+# spaltenweiser Ausgabe bzw. bei reiner Reduktion (Min/Max) und Blockgröße
+API_STUDIE_MAX_SPALTEN = 100000
+API_STUDIE_MAX_VARIANTEN = 10000000
+API_STUDIE_BLOCKGROESSE = 100000
+
+# Höchstzahl an Stichproben pro Anfrage an /api/berechnung/unsicherheit/
+API_UNSICHERHEIT_MAX_STICHPROBEN = 1000000
+
+# Sensitivitätsanalyse: Höchstzahl an Modellauswertungen pro Anfrage an
+# /api/berechnung/sensitivitaet/, Prozess-Pool für die Auswertung (None = im
+# Anfrageprozess) und Spanne (±Anteil) der Einflussgrößen auf der
+# Ergebnisseite des Wizards (0 = aus)
+API_SENSITIVITAET_MAX_AUSWERTUNGEN = 2000000
+SENSITIVITAET_PROZESSE = None
+SENSITIVITAET_ERGEBNISSEITE_SPANNE = 0.2
+
+# Hüllenoptimierung (/api/optimierung/huelle/): Höchstzahl an Auswertungen
+# (Population · (Generationen + 1)) pro Anfrage und Prozess-Pool für die
+# Bewertung einer Generation (None = im Anfrageprozess)
+API_OPTIMIERUNG_MAX_AUSWERTUNGEN = 100000
+OPTIMIERUNG_PROZESSE = None
+
+# Live-Berechnung (/api/berechnung/live/): Rechengraphen laufender Sitzungen
+# im LRU je Prozess (0 = keine Sitzungen, jede Anfrage rechnet neu)
+LIVE_SITZUNGEN = 1000
+
+# Referenzdaten-Cache: Abstand (Sekunden), in dem jeder Prozess den
+# Versionsstempel im Django-Cache auf Invalidierungen anderer Prozesse prüft
+REFERENZDATEN_PRUEFINTERVALL = 30
+
+# Wizard-Entwurf: Ablage der Eingaben bis zum Ergebnisschritt in der
+# Session ("session") oder im Django-Cache ("cache", Session hält nur den Schlüssel)
+WIZARD_ENTWURF_SPEICHER = "session"
+WIZARD_ENTWURF_TIMEOUT = 60 * 60 * 24
+
+# Ergebnis-Cache der Rechenkette: Einträge im LRU je Prozess (0 = aus) und
+# optional ein CACHES-Alias als gemeinsame zweite Stufe (None = aus)
+ERGEBNISCACHE_GROESSE = 1024
+ERGEBNISCACHE_DJANGO = None
+ERGEBNISCACHE_TIMEOUT = 60 * 60 * 24
+
+# Cache-Control für /api/berechnung/ (Argumente für django.utils.cache.patch_cache_control)
+API_CACHE_CONTROL = {"public": True, "max_age": 300}
+
+# Laufzeitmessung (mylist/messung.py): Server-Timing-Header und
+# Perzentile über die letzten MESSUNG_FENSTER Anfragen je URL-Name
+MESSUNG_AKTIV = True
+MESSUNG_SERVER_TIMING = True
+MESSUNG_FENSTER = 1000
+
+# Metriken für /metrics (mylist/metriken.py). Bei mehreren Worker-Prozessen
+# ein gemeinsames, beschreibbares Verzeichnis für die Abzüge je Prozess setzen;
+# Abzüge, die älter als METRIKEN_MAX_ALTER Sekunden sind, werden verworfen.
+METRIKEN_VERZEICHNIS = None
+METRIKEN_SCHREIBINTERVALL = 5
+METRIKEN_MAX_ALTER = 3600
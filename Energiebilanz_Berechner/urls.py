@@ -61,6 +61,16 @@ urlpatterns = [
     path('bauteil/komplex/', views.bauteil_kp, name='bauteil_kp'),
 
     path("api/berechnung/", views.api_berechnung, name="api_berechnung"),
+    path("api/heizwaerme/", views.api_heizwaerme, name="api_heizwaerme"),
+    path("api/berechnung/batch/", views.api_berechnung_batch, name="api_berechnung_batch"),
+    path("api/berechnung/stream/", views.api_berechnung_stream, name="api_berechnung_stream"),
+    path("api/berechnung/studie/", views.api_berechnung_studie, name="api_berechnung_studie"),
+    path("api/berechnung/unsicherheit/", views.api_berechnung_unsicherheit, name="api_berechnung_unsicherheit"),
+    path("api/berechnung/sensitivitaet/", views.api_berechnung_sensitivitaet, name="api_berechnung_sensitivitaet"),
+    path("api/berechnung/live/", views.api_berechnung_live, name="api_berechnung_live"),
+    path("api/berechnung/stunden/", views.api_berechnung_stunden, name="api_berechnung_stunden"),
+    path("api/optimierung/huelle/", views.api_optimierung_huelle, name="api_optimierung_huelle"),
+    path("metrics", views.metriken_prometheus, name="metriken"),
 
     # Wizard flow
     path('wizard/allg/', views.allg_angaben, name='wizard_allg'),